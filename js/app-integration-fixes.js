@@ -155,11 +155,54 @@ function monitorAPIUsage() {
             return parseInt(sessionStorage.getItem('openai_api_calls') || '0');
         },
         
+        /**
+         * Record the token usage of an API response
+         * cached_tokens (prompt_tokens_details) counts prompt tokens served from
+         * the provider's prefix cache
+         * @param {Object} usage - The response's usage field
+         * @param {number} latencyMs - Request duration
+         */
+        recordTokenUsage: function(usage, latencyMs) {
+            const totals = this.getTokenUsage();
+            const cachedTokens = (usage.prompt_tokens_details && usage.prompt_tokens_details.cached_tokens) || 0;
+            
+            totals.calls++;
+            totals.promptTokens += usage.prompt_tokens || 0;
+            totals.cachedTokens += cachedTokens;
+            totals.completionTokens += usage.completion_tokens || 0;
+            
+            // Latency split by cache hit, to compare the two
+            if (cachedTokens > 0) {
+                totals.cachedCalls++;
+                totals.cachedLatencyMs += latencyMs;
+            } else {
+                totals.uncachedLatencyMs += latencyMs;
+            }
+            
+            sessionStorage.setItem('openai_token_usage', JSON.stringify(totals));
+            console.log(`OpenAI tokens: ${usage.prompt_tokens} prompt (${cachedTokens} cached), ` +
+                        `${usage.completion_tokens} completion, ${Math.round(latencyMs)} ms`);
+        },
+        
+        /**
+         * Get token usage totals for this session
+         * @returns {{calls: number, promptTokens: number, cachedTokens: number, completionTokens: number, cachedCalls: number, cachedLatencyMs: number, uncachedLatencyMs: number}}
+         */
+        getTokenUsage: function() {
+            const empty = { calls: 0, promptTokens: 0, cachedTokens: 0, completionTokens: 0, cachedCalls: 0, cachedLatencyMs: 0, uncachedLatencyMs: 0 };
+            try {
+                return { ...empty, ...JSON.parse(sessionStorage.getItem('openai_token_usage') || '{}') };
+            } catch (e) {
+                return empty;
+            }
+        },
+        
         /**
          * Reset the usage counter
          */
         resetUsage: function() {
             sessionStorage.setItem('openai_api_calls', '0');
+            sessionStorage.removeItem('openai_token_usage');
             console.log('OpenAI API usage counter reset');
         }
     };
@@ -78,6 +78,26 @@ function initializeApp() {
         setupFullPreviewFunctionality();
     }
     
+    // Set up Q&A history panel
+    if (typeof setupQAHistoryPanel === 'function') {
+        setupQAHistoryPanel();
+    }
+    
+    // Cancel background answers to suggested questions when the user types
+    if (typeof setupSpeculativeAnswers === 'function') {
+        setupSpeculativeAnswers();
+    }
+    
+    // Set up checklist (batch) questions
+    if (typeof setupBatchQuestions === 'function') {
+        setupBatchQuestions();
+    }
+    
+    // Set up multi-file ingestion queue and drag-and-drop
+    if (typeof setupIngestionPanel === 'function') {
+        setupIngestionPanel();
+    }
+    
     console.log('Document Q&A Application initialized');
 }
 
@@ -138,28 +158,28 @@ function updateUIState() {
 
 /**
  * Handle file upload
+ * Several files at once go through the ingestion queue
  * @param {Event} event - The change event from file input
  */
 async function handleFileUpload(event) {
-    const file = event.target.files[0];
-    if (!file) return;
+    const files = Array.from(event.target.files || []);
+    if (files.length === 0) return;
     
-    console.log("File upload started:", file.name);
-    
-    // Check file size
-    const maxSize = LLM_CONFIG?.document?.maxFileSize || 20 * 1024 * 1024; // 20MB default
-    if (file.size > maxSize) {
-        showNotification(`File too large. Maximum size is ${maxSize / (1024 * 1024)}MB.`, 'error');
+    // Queue multiple files, or more files once a queue is in use
+    const useQueue = files.length > 1 || (typeof hasIngestionJobs === 'function' && hasIngestionJobs());
+    if (useQueue && typeof enqueueDocuments === 'function') {
+        enqueueDocuments(files);
         fileInput.value = '';
         return;
     }
     
-    // Check file type
-    const fileExt = file.name.split('.').pop().toLowerCase();
-    const supportedTypes = LLM_CONFIG?.document?.supportedFileTypes || ['.pdf', '.docx', '.xlsx', '.txt'];
+    const file = files[0];
+    console.log("File upload started:", file.name);
     
-    if (!supportedTypes.includes(`.${fileExt}`)) {
-        showNotification(`Unsupported file type. Please upload ${supportedTypes.join(', ')}`, 'error');
+    // Check file size and type
+    const validationError = validateUploadFile(file);
+    if (validationError) {
+        showNotification(validationError, 'error');
         fileInput.value = '';
         return;
     }
@@ -178,66 +198,22 @@ async function handleFileUpload(event) {
         documentText = await processDocument(file);
         console.log("Document processed with length:", documentText.length);
         
-        // Make sure documentText is also available as a global variable
-        window.documentText = documentText;
-        window.lastProcessedDocumentText = documentText;
-        
-        // Update UI for successful upload
-        if (uploadStatus) {
-            uploadStatus.textContent = 'Document processed successfully';
-            uploadStatus.className = 'status-success';
-        }
-        
-        // Update document preview with the actual content
-        if (documentPreview) {
-            // Update the preview title
-            const previewTitle = document.getElementById('preview-title');
-            if (previewTitle) {
-                previewTitle.textContent = file.name || 'Document Preview';
-            }
-            
-            // Use the updateDocumentPreview function from preview.js
-            if (typeof updateDocumentPreview === 'function') {
-                updateDocumentPreview(documentText, file.name);
-            } else {
-                // Fallback preview if the function isn't available
-                const previewContent = document.getElementById('preview-content');
-                if (previewContent) {
-                    const previewLength = Math.min(500, documentText.length);
-                    const preview = documentText.substring(0, previewLength) + 
-                                  (documentText.length > previewLength ? '...' : '');
-                    
-                    previewContent.innerHTML = `
-                        <h3>${file.name}</h3>
-                        <p><strong>Document Preview:</strong></p>
-                        <pre style="max-height: 200px; overflow-y: auto; white-space: pre-wrap; background: #f5f5f5; padding: 10px; border-radius: 5px;">${preview}</pre>
-                    `;
-                }
-            }
-            
-            // Show the preview section
-            documentPreview.classList.remove('hidden');
-            
-            // Make sure the full preview button is visible 
-            const fullPreviewButton = document.getElementById('full-preview-button');
-            if (fullPreviewButton) {
-                fullPreviewButton.style.display = 'block';
-            }
-        }
-        
-        // Reinitialize the full preview functionality
-        if (typeof setupFullPreviewFunctionality === 'function') {
-            setupFullPreviewFunctionality();
-        }
+        activateDocument(file, {
+            text: documentText,
+            format: window.lastDocumentFormat,
+            report: window.lastExtractionReport,
+            tables: window.lastDocumentTables,
+            paged: window.lastPagedDocument,
+            profile: window.lastDocumentProfile,
+            termIndex: window.lastTermIndex,
+            entities: window.lastEntityIndex
+        });
         
-        // Show Q&A section
-        if (qaSection) {
-            qaSection.classList.remove('hidden');
+        // Make the document available to questions across all documents
+        if (typeof addDocumentToCollection === 'function') {
+            addDocumentToCollection(getDocumentKey(file), file.name, documentText);
         }
         
-        // Generate recommendation chips
-        generateRecommendationChips();
-        
         // Show success notification
         showNotification('Document processed successfully', 'success');
         
@@ -262,6 +238,164 @@ async function handleFileUpload(event) {
     updateUIState();
 }
 
+/**
+ * Check an uploaded file against the size and type limits
+ * @param {File} file - Uploaded file
+ * @returns {string|null} - Error message, or null when the file is accepted
+ */
+function validateUploadFile(file) {
+    const fileExt = file.name.split('.').pop().toLowerCase();
+    
+    // CSV rows are parsed into columns as they stream in and large PDF and TXT
+    // files are paged, so they get higher limits
+    let maxSize = LLM_CONFIG?.document?.maxFileSize || 20 * 1024 * 1024; // 20MB default
+    if (fileExt === 'csv') {
+        maxSize = LLM_CONFIG?.document?.maxCsvFileSize || 200 * 1024 * 1024; // 200MB default
+    } else if (typeof isLargeFile === 'function' && isLargeFile(file)) {
+        maxSize = getLargeFileSettings().maxFileSize;
+    }
+    if (file.size > maxSize) {
+        return `File too large. Maximum size is ${maxSize / (1024 * 1024)}MB.`;
+    }
+    
+    const supportedTypes = LLM_CONFIG?.document?.supportedFileTypes || ['.pdf', '.docx', '.doc', '.xlsx', '.csv', '.txt'];
+    
+    if (!supportedTypes.includes(`.${fileExt}`)) {
+        return `Unsupported file type. Please upload ${supportedTypes.join(', ')}`;
+    }
+    
+    return null;
+}
+
+/**
+ * Make an extracted document the one questions are asked about
+ * @param {File} file - Source file
+ * @param {{text: string, format: string, report: Object|null, tables: Object[]|null, paged: Object|null, profile: Object|null, termIndex: Object|null, entities: Object|null}} result - Extraction result
+ */
+function activateDocument(file, result) {
+    documentText = result.text;
+    
+    // Statistics and features for Document Analysis Mode answers and chips
+    if (typeof setActiveDocumentProfile === 'function') {
+        setActiveDocumentProfile(result.profile || buildDocumentProfile(result.text));
+    }
+    
+    // Word and trigram index for search questions
+    if (typeof setActiveTermIndex === 'function') {
+        setActiveTermIndex(result.termIndex !== undefined ? result.termIndex : buildTermIndex(result.text));
+    }
+    
+    // Amounts, percentages, dates and quarters with their values
+    if (typeof setActiveEntityIndex === 'function') {
+        setActiveEntityIndex(result.entities !== undefined ? result.entities : buildEntityIndex(result.text));
+    }
+    
+    // Extractive summary, computed in a worker while the user reads the preview
+    if (typeof prepareDocumentSummary === 'function') {
+        prepareDocumentSummary(documentText);
+    }
+    
+    // Spreadsheet data for aggregate questions
+    if (typeof setActiveTables === 'function') {
+        setActiveTables(result.tables || null);
+    }
+    
+    // Pages of large documents are searched in storage
+    if (typeof setActivePagedDocument === 'function') {
+        setActivePagedDocument(result.paged || null);
+    }
+    
+    // Make sure documentText is also available as a global variable
+    window.documentText = documentText;
+    window.lastProcessedDocumentText = documentText;
+    window.lastDocumentFormat = result.format;
+    window.lastExtractionReport = result.report;
+    
+    // Update UI for successful upload
+    if (uploadStatus) {
+        uploadStatus.textContent = 'Document processed successfully' + getExtractionSummary(file, result.report);
+        uploadStatus.className = 'status-success';
+    }
+    
+    // Update document preview with the actual content
+    if (documentPreview) {
+        // Update the preview title
+        const previewTitle = document.getElementById('preview-title');
+        if (previewTitle) {
+            previewTitle.textContent = file.name || 'Document Preview';
+        }
+        
+        // Use the updateDocumentPreview function from preview.js
+        if (typeof updateDocumentPreview === 'function') {
+            updateDocumentPreview(documentText, file.name);
+        } else {
+            // Fallback preview if the function isn't available
+            const previewContent = document.getElementById('preview-content');
+            if (previewContent) {
+                const previewLength = Math.min(500, documentText.length);
+                const preview = documentText.substring(0, previewLength) + 
+                              (documentText.length > previewLength ? '...' : '');
+                
+                previewContent.innerHTML = `
+                    <h3>${file.name}</h3>
+                    <p><strong>Document Preview:</strong></p>
+                    <pre style="max-height: 200px; overflow-y: auto; white-space: pre-wrap; background: #f5f5f5; padding: 10px; border-radius: 5px;">${preview}</pre>
+                `;
+            }
+        }
+        
+        // Show the preview section
+        documentPreview.classList.remove('hidden');
+        
+        // Make sure the full preview button is visible 
+        const fullPreviewButton = document.getElementById('full-preview-button');
+        if (fullPreviewButton) {
+            fullPreviewButton.style.display = 'block';
+        }
+    }
+    
+    // Page thumbnails are only available for PDFs
+    if (typeof setThumbnailSource === 'function') {
+        setThumbnailSource(result.format === 'pdf' ? file : null);
+    }
+    
+    // Reinitialize the full preview functionality
+    if (typeof setupFullPreviewFunctionality === 'function') {
+        setupFullPreviewFunctionality();
+    }
+    
+    // Show Q&A section
+    if (qaSection) {
+        qaSection.classList.remove('hidden');
+    }
+    
+    // Generate recommendation chips
+    generateRecommendationChips();
+    
+    // Load the question history for this document
+    if (typeof loadQAHistory === 'function') {
+        loadQAHistory(getDocumentKey(file));
+    }
+    
+    updateUIState();
+}
+
+/**
+ * Describe the size savings from an extraction
+ * @param {File} file - Processed file
+ * @param {Object} [report] - Extraction report (defaults to the last one)
+ * @returns {string} - Summary suffix for the upload status, or empty string
+ */
+function getExtractionSummary(file, report = window.lastExtractionReport) {
+    if (!report || report.fileName !== file.name || report.charsSaved <= 0) {
+        return '';
+    }
+    
+    const percent = Math.round(report.charsSaved / report.charsBefore * 100);
+    return ` (removed ${report.linesRemoved} repeated header/footer lines: ` +
+           `${report.charsSaved.toLocaleString()} characters, ~${report.tokensSaved.toLocaleString()} tokens, ${percent}%)`;
+}
+
 /**
  * Handle ask question button click
  */
@@ -298,9 +432,48 @@ async function handleAskQuestion() {
         
         // Use document content directly or get response
         let response;
-        if (mockModeToggle && mockModeToggle.checked) {
+        const acrossDocuments = typeof isCollectionModeEnabled === 'function' && isCollectionModeEnabled();
+        const tableAnswer = !acrossDocuments && typeof answerTableQuestion === 'function' ?
+            answerTableQuestion(query) : null;
+        const entityAnswer = !tableAnswer && !acrossDocuments && typeof answerEntityQuestion === 'function' ?
+            answerEntityQuestion(query) : null;
+        const pagedDocument = !acrossDocuments && typeof getActivePagedDocument === 'function' ?
+            getActivePagedDocument() : null;
+        const speculativeAnswer = typeof getSpeculativeAnswer === 'function' ?
+            await getSpeculativeAnswer(query) : null;
+        
+        if (speculativeAnswer) {
+            // Suggested question answered in the background (speculative mode)
+            response = speculativeAnswer;
+        } else if (tableAnswer) {
+            // Aggregates over spreadsheet columns are computed exactly, without the LLM
+            response = tableAnswer;
+        } else if (entityAnswer) {
+            // Superlatives and ranges over amounts, percentages and dates come from the entity index
+            response = entityAnswer;
+        } else if (pagedDocument && mockModeToggle && mockModeToggle.checked) {
+            // Large documents: list the best matching pages from storage
+            response = await generatePagedSearchResponse(query);
+        } else if (pagedDocument) {
+            // Large documents: send the best matching pages instead of the start of the text
+            response = await getLLMResponse(query, await buildPagedContext(query));
+        } else if (acrossDocuments && mockModeToggle && mockModeToggle.checked) {
+            // Show matching passages from every loaded document
+            response = generateCollectionResponse(query);
+        } else if (acrossDocuments) {
+            // Send the best passages from all documents, with their sources
+            response = await getLLMResponse(query, buildCollectionContext(query).context);
+        } else if (mockModeToggle && mockModeToggle.checked) {
+            // Summary answers use the extractive summary once it is ready
+            if (typeof getDocumentSummary === 'function' && isSummaryQuestion(query)) {
+                await getDocumentSummary(documentText);
+            }
+            
             // Generate a response based on actual document content
             response = generateDocumentResponse(query, documentText);
+        } else if (typeof buildSummaryContext === 'function') {
+            // Overview questions on long documents get the summary instead of the truncated start
+            response = await getLLMResponse(query, await buildSummaryContext(query, documentText));
         } else {
             // Get response from LLM
             response = await getLLMResponse(query, documentText);
@@ -313,6 +486,11 @@ async function handleAskQuestion() {
             responseContent.innerHTML = `<div class="response-text">${response}</div>`;
         }
         
+        // Keep the answer in the document's history
+        if (typeof recordQAHistoryEntry === 'function') {
+            recordQAHistoryEntry(query, response);
+        }
+        
         // Generate new recommendation chips based on the response
         generateRecommendationChips(response);
         
@@ -340,18 +518,9 @@ async function handleAskQuestion() {
  * @returns {string} - A response based on document content
  */
 function generateDocumentResponse(query, documentText) {
-    // Get statistics about the document
-    const lines = documentText.split('\n').filter(line => line.trim());
-    const words = documentText.split(/\s+/).filter(word => word.trim());
-    const chars = documentText.length;
-    
-    // Try to determine document title (first line or significant line)
-    const title = lines[0] || "Untitled Document";
-    
-    // Get a reasonable preview
-    const previewLength = Math.min(600, documentText.length);
-    const preview = documentText.substring(0, previewLength) + 
-                  (documentText.length > previewLength ? '...' : '');
+    // Statistics, title and preview were computed when the document was loaded
+    const profile = getDocumentProfile(documentText);
+    const preview = getProfilePreview(profile, 600);
     
     const queryLower = query.toLowerCase();
     
@@ -363,12 +532,12 @@ function generateDocumentResponse(query, documentText) {
     } else {
         return `## Document Content
 
-**Document Title/First Line**: ${title}
+**Document Title/First Line**: ${profile.title}
 
 **Document Statistics**:
-- ${lines.length} lines of text
-- Approximately ${words.length} words
-- ${chars} total characters
+- ${profile.nonEmptyLineCount} lines of text
+- Approximately ${profile.wordCount} words
+- ${profile.chars} total characters
 
 **Document Preview**:
 \`\`\`
@@ -388,38 +557,32 @@ This is showing the actual content of your document. To see specific information
  * @returns {string} - A summary response
  */
 function generateSummaryResponse(documentText) {
-    // Get document statistics
-    const lines = documentText.split('\n').filter(line => line.trim());
-    const words = documentText.split(/\s+/).filter(word => word.trim());
-    
-    // Get title or first line
-    const title = lines[0] || "Untitled Document";
-    
-    // Try to identify important lines (potential headings or key content)
-    const importantLines = lines
-        .filter(line => 
-            line === line.toUpperCase() || // ALL CAPS lines
-            (line.length < 50 && line.length > 10) || // Short lines (potential headings)
-            line.endsWith(':') || // Lines ending with colon
-            /^[A-Z0-9]/.test(line) // Lines starting with capital letter or number
-        )
-        .slice(0, 5);
-    
-    // Get document preview
-    const preview = documentText.substring(0, 400) + (documentText.length > 400 ? '...' : '');
+    // Statistics and key lines (potential headings or key content) come from the profile
+    const profile = getDocumentProfile(documentText);
+    const preview = getProfilePreview(profile, 400);
+    const sections = profile.headings.length > 1 ?
+        `\n**Sections**:\n${profile.headings.slice(0, 10).map(heading => `- ${heading}`).join('\n')}\n` : '';
+    
+    // The extractive summary (summarizer.js) replaces the key lines once it is ready
+    const summary = typeof getCachedDocumentSummary === 'function' ? getCachedDocumentSummary(documentText) : null;
+    let keyContent = `**Key Content**:\n${profile.keyLines.map(line => `- ${line}`).join('\n')}`;
+    if (summary && summary.sentences.length > 0) {
+        const sentences = getTopSummarySentences(summary, getSummarySettings().maxSentences);
+        keyContent = `**Summary** (${sentences.length} key sentences of ${summary.sentenceCount}):\n` +
+            sentences.map(sentence => `- ${sentence}`).join('\n');
+    }
     
     return `## Document Summary
 
-**Document Title/First Line**: ${title}
+**Document Title/First Line**: ${profile.title}
 
 **Document Statistics**:
-- Contains ${lines.length} lines of text
-- Contains approximately ${words.length} words
-- Total length: ${documentText.length} characters
-
-**Key Content**:
-${importantLines.map(line => `- ${line}`).join('\n')}
+- Contains ${profile.nonEmptyLineCount} lines of text
+- Contains approximately ${profile.wordCount} words
+- Total length: ${profile.chars} characters
 
+${keyContent}
+${sections}
 **Document Preview**:
 \`\`\`
 ${preview}
@@ -435,8 +598,14 @@ This is based on the actual content of your document.`;
  * @returns {string} - A search response
  */
 function generateSearchResponse(query, documentText) {
+    // Documents with a term index are searched through its postings, which
+    // support "exact phrases", NEAR/k and AND and tolerate typos; very long
+    // documents are scanned line by line
+    const termIndex = typeof getTermIndex === 'function' ? getTermIndex(documentText) : null;
+    const searchQuery = termIndex ? parseSearchQuery(query) : null;
+    
     // Extract search terms from query
-    const searchTerms = query.toLowerCase()
+    const searchTerms = searchQuery ? searchQuery.labels : query.toLowerCase()
         .replace(/find|search|for|about|where|is|are|show|me/g, ' ')
         .split(/\s+/)
         .filter(word => word.length > 2);
@@ -445,23 +614,33 @@ function generateSearchResponse(query, documentText) {
         return `I couldn't identify specific search terms in your query. Please try again with more specific terms to search for in the document.`;
     }
     
-    // Find matching lines
-    const lines = documentText.split('\n');
-    const matchingLines = [];
+    const searchLabel = searchQuery ?
+        searchTerms.join(searchQuery.requireAll ? ' AND ' : ', ') : `"${searchTerms.join(', ')}"`;
     
-    for (const line of lines) {
-        if (line.trim() && searchTerms.some(term => line.toLowerCase().includes(term))) {
-            matchingLines.push(line.trim());
+    // Find matching lines (ranked when they come from the index)
+    let matchingLines = [];
+    let corrections = [];
+    
+    if (searchQuery) {
+        ({ lines: matchingLines, corrections } = searchTermIndex(termIndex, searchQuery));
+    } else {
+        for (const line of documentText.split('\n')) {
+            if (line.trim() && searchTerms.some(term => line.toLowerCase().includes(term))) {
+                matchingLines.push(line.trim());
+            }
         }
     }
     
     if (matchingLines.length === 0) {
-        return `I couldn't find any content matching "${searchTerms.join(', ')}" in your document. Please try different search terms.`;
+        return `I couldn't find any content matching ${searchLabel} in your document. Please try different search terms.`;
     }
     
-    return `## Search Results for "${searchTerms.join(', ')}"
-
-Found ${matchingLines.length} matching lines in your document:
+    const correctionNote = corrections.length > 0 ?
+        `\nNo exact match for ${corrections.map(({ term, matches }) => `"${term}"; showing results for ${matches.map(match => `"${match}"`).join(', ')}`).join('. ')}.\n` : '';
+    
+    return `## Search Results for ${searchLabel}
+${correctionNote}
+Found ${matchingLines.length} matching lines in your document${searchQuery ? ', best matches first' : ''}:
 
 ${matchingLines.slice(0, 10).map((line, i) => `${i+1}. ${line}`).join('\n')}
 ${matchingLines.length > 10 ? `\n...and ${matchingLines.length - 10} more matches.` : ''}
@@ -482,6 +661,9 @@ function updateCharCount() {
     if (askButton) {
         askButton.disabled = count === 0 || !documentText || isProcessing;
     }
+    if (typeof updateBatchButtonState === 'function') {
+        updateBatchButtonState();
+    }
 }
 
 /**
@@ -522,9 +704,19 @@ function generateRecommendationChips(response = null) {
             queryInput.value = recommendation;
             updateCharCount();
             queryInput.focus();
+            
+            // A prefetched answer is shown right away
+            if (typeof hasSpeculativeAnswer === 'function' && hasSpeculativeAnswer(recommendation) && !isProcessing) {
+                handleAskQuestion();
+            }
         });
         recommendationChips.appendChild(chip);
     });
+    
+    // Optionally prefetch answers to the first suggestions while the user reads
+    if (!response && documentText && typeof scheduleSpeculativeAnswers === 'function') {
+        scheduleSpeculativeAnswers(recommendations);
+    }
 }
 
 /**
@@ -542,32 +734,40 @@ function generateInitialQuestions(documentText) {
     
     // Additional questions based on actual document content
     const additionalQuestions = [];
+    const { domains, keywords } = getDocumentProfile(documentText);
     
     // Look for specific content to generate relevant questions
-    if (documentText.includes('sales') || documentText.includes('revenue') || 
-        documentText.includes('profit') || documentText.includes('$')) {
+    if (domains.finance) {
         additionalQuestions.push(
             'Find financial information in the document',
             'What is the total revenue mentioned?'
         );
     }
     
-    if (documentText.includes('project') || documentText.includes('timeline') || 
-        documentText.includes('schedule') || documentText.includes('plan')) {
+    if (domains.project) {
         additionalQuestions.push(
             'What is the project timeline?',
             'Find information about project planning'
         );
     }
     
-    if (documentText.includes('recommend') || documentText.includes('conclusion') || 
-        documentText.includes('summary')) {
+    if (domains.recommendations) {
         additionalQuestions.push(
             'What are the key recommendations?',
             'Find the conclusions in the document'
         );
     }
     
+    // Otherwise suggest a search for the document's most frequent term
+    if (keywords.length > 0) {
+        additionalQuestions.push(`Find mentions of ${keywords[0]}`);
+    }
+    
+    // Spreadsheets get questions about their numeric columns first
+    if (typeof getTableQuestionSuggestions === 'function') {
+        additionalQuestions.unshift(...getTableQuestionSuggestions());
+    }
+    
     // Combine and return up to 5 questions
     return [...baseQuestions, ...additionalQuestions].slice(0, 5);
 }
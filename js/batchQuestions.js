@@ -0,0 +1,386 @@
+/**
+ * Batch Questions Module
+ * Answers a checklist of questions against the loaded document in one run.
+ * Retrieval is done once for the whole list; the LLM is then called with
+ * several questions packed into one prompt where they fit, and the calls
+ * run with bounded parallelism.
+ */
+
+/**
+ * Get batch settings with defaults
+ * @returns {{concurrency: number, packMaxQuestions: number, packMaxChars: number, packedAnswerTokens: number, maxQuestions: number}}
+ */
+function getBatchSettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.openai && LLM_CONFIG.openai.batch) || {};
+    return {
+        concurrency: settings.concurrency || 4,
+        packMaxQuestions: settings.packMaxQuestions || 8,
+        packMaxChars: settings.packMaxChars || 2000,
+        packedAnswerTokens: settings.packedAnswerTokens || 200,
+        maxQuestions: settings.maxQuestions || 50
+    };
+}
+
+/**
+ * Split a checklist into questions, one per non-empty line
+ * Leading list markers ("1.", "-", "*") are removed
+ * @param {string} text - Checklist text
+ * @returns {string[]}
+ */
+function parseBatchQuestions(text) {
+    return text.split(/\r?\n/)
+        .map(line => line.replace(/^\s*(?:\d+[.)]|[-*•])\s*/, '').trim())
+        .filter(line => line.length > 0);
+}
+
+/**
+ * Build the context shared by every question in a batch
+ * The collection or page store is searched once with all questions together
+ * @param {string[]} questions - The questions
+ * @returns {Promise<{context: string, source: string}>}
+ */
+async function buildBatchContext(questions) {
+    const combinedQuery = questions.join('\n');
+
+    if (typeof isCollectionModeEnabled === 'function' && isCollectionModeEnabled()) {
+        const settings = getCollectionSettings();
+        const { context } = buildCollectionContext(combinedQuery, { topK: settings.topK * 3 });
+        return { context, source: 'collection' };
+    }
+
+    if (typeof getActivePagedDocument === 'function' && getActivePagedDocument()) {
+        return { context: await buildPagedContext(combinedQuery), source: 'pages' };
+    }
+
+    return { context: documentText, source: 'document' };
+}
+
+/**
+ * Group questions into packed prompts
+ * A group holds at most packMaxQuestions questions and packMaxChars of question text
+ * @param {number[]} indices - Indices of the questions to group
+ * @param {string[]} questions - All questions
+ * @param {Object} settings - Batch settings
+ * @returns {number[][]}
+ */
+function packBatchQuestions(indices, questions, settings) {
+    const groups = [];
+    let group = [];
+    let chars = 0;
+
+    for (const index of indices) {
+        const length = questions[index].length;
+        if (group.length > 0 &&
+            (group.length >= settings.packMaxQuestions || chars + length > settings.packMaxChars)) {
+            groups.push(group);
+            group = [];
+            chars = 0;
+        }
+        group.push(index);
+        chars += length;
+    }
+
+    if (group.length > 0) groups.push(group);
+    return groups;
+}
+
+/**
+ * Build the question message for a packed prompt
+ * @param {string[]} groupQuestions - Questions answered together
+ * @returns {string}
+ */
+function buildPackedQuestionPrompt(groupQuestions) {
+    const list = groupQuestions.map((question, i) => `${i + 1}. ${question}`).join('\n');
+    return `Answer each of these ${groupQuestions.length} questions separately:\n${list}\n\n` +
+        `Reply with only a JSON array of ${groupQuestions.length} strings, one answer per question, in the same order.`;
+}
+
+/**
+ * Read the answers of a packed prompt
+ * @param {string} content - Model reply
+ * @param {number} count - Number of questions asked
+ * @returns {string[]|null} - Answers, or null when the reply is not a usable array
+ */
+function parsePackedAnswers(content, count) {
+    const start = content.indexOf('[');
+    const end = content.lastIndexOf(']');
+    if (start === -1 || end <= start) return null;
+
+    try {
+        const answers = JSON.parse(content.slice(start, end + 1));
+        if (!Array.isArray(answers) || answers.length !== count) return null;
+        return answers.map(answer => typeof answer === 'string' ? answer : JSON.stringify(answer));
+    } catch (e) {
+        return null;
+    }
+}
+
+/**
+ * Run async tasks with at most `limit` in flight
+ * @param {Array} items - Task inputs
+ * @param {number} limit - Maximum parallel tasks
+ * @param {Function} worker - async (item) => void
+ * @returns {Promise<void>}
+ */
+async function runWithConcurrency(items, limit, worker) {
+    let next = 0;
+    const runners = [];
+
+    for (let i = 0; i < Math.min(limit, items.length); i++) {
+        runners.push((async () => {
+            while (next < items.length) {
+                await worker(items[next++]);
+            }
+        })());
+    }
+
+    await Promise.all(runners);
+}
+
+/**
+ * Answer a list of questions about the loaded document
+ * Spreadsheet aggregates are computed locally; in Document Analysis Mode every
+ * answer is local. Otherwise the remaining questions share one retrieved
+ * context and are sent in packed prompts, falling back to one call per
+ * question when a packed reply cannot be read.
+ * @param {string[]} questions - The questions
+ * @param {Object} [options] - {onProgress(done, total)}
+ * @returns {Promise<{results: Object[], totalMs: number, apiCalls: number}>}
+ *   Each result is {question, answer, latencyMs, usage, method}
+ */
+async function answerQuestionBatch(questions, options = {}) {
+    const settings = getBatchSettings();
+    const startTime = performance.now();
+    const results = questions.map(question => ({ question, answer: null, latencyMs: 0, usage: null, method: '' }));
+    let done = 0;
+    let apiCalls = 0;
+
+    function complete(index, answer, latencyMs, usage, method) {
+        Object.assign(results[index], { answer, latencyMs, usage, method });
+        done++;
+        if (typeof options.onProgress === 'function') options.onProgress(done, questions.length);
+    }
+
+    // Exact spreadsheet and entity index answers first
+    const remaining = [];
+    const acrossDocuments = typeof isCollectionModeEnabled === 'function' && isCollectionModeEnabled();
+    questions.forEach((question, index) => {
+        const questionStart = performance.now();
+        const tableAnswer = !acrossDocuments && typeof answerTableQuestion === 'function' ?
+            answerTableQuestion(question) : null;
+        const entityAnswer = !tableAnswer && !acrossDocuments && typeof answerEntityQuestion === 'function' ?
+            answerEntityQuestion(question) : null;
+        if (tableAnswer) {
+            complete(index, tableAnswer, performance.now() - questionStart, null, 'table');
+        } else if (entityAnswer) {
+            complete(index, entityAnswer, performance.now() - questionStart, null, 'entities');
+        } else {
+            remaining.push(index);
+        }
+    });
+
+    if (remaining.length === 0) {
+        return { results, totalMs: performance.now() - startTime, apiCalls };
+    }
+
+    const useApi = typeof isOpenAiApiEnabled === 'function' && isOpenAiApiEnabled();
+
+    // Document Analysis Mode: the same local answers as single questions
+    if (!useApi) {
+        const pagedDocument = !acrossDocuments && typeof getActivePagedDocument === 'function' ?
+            getActivePagedDocument() : null;
+
+        for (const index of remaining) {
+            const questionStart = performance.now();
+            const question = questions[index];
+            const answer = pagedDocument ? await generatePagedSearchResponse(question) :
+                acrossDocuments ? generateCollectionResponse(question) :
+                generateDocumentResponse(question, documentText);
+            complete(index, answer, performance.now() - questionStart, null, 'local');
+        }
+        return { results, totalMs: performance.now() - startTime, apiCalls };
+    }
+
+    const { context } = await buildBatchContext(remaining.map(index => questions[index]));
+    const groups = packBatchQuestions(remaining, questions, settings);
+
+    async function askSingle(index) {
+        apiCalls++;
+        if (typeof apiUsageMonitor !== 'undefined' && typeof apiUsageMonitor.recordAPICall === 'function') {
+            apiUsageMonitor.recordAPICall();
+        }
+
+        try {
+            const completion = await requestChatCompletion(buildChatMessages(questions[index], context));
+            complete(index, completion.content, completion.latencyMs, completion.usage, 'single');
+        } catch (error) {
+            complete(index, `Error calling OpenAI API: ${error.message}`, 0, null, 'error');
+        }
+    }
+
+    await runWithConcurrency(groups, settings.concurrency, async group => {
+        if (group.length === 1) {
+            await askSingle(group[0]);
+            return;
+        }
+
+        apiCalls++;
+        if (typeof apiUsageMonitor !== 'undefined' && typeof apiUsageMonitor.recordAPICall === 'function') {
+            apiUsageMonitor.recordAPICall();
+        }
+
+        let answers = null;
+        let completion = null;
+        try {
+            const prompt = buildPackedQuestionPrompt(group.map(index => questions[index]));
+            completion = await requestChatCompletion(buildChatMessages(prompt, context), {
+                maxTokens: settings.packedAnswerTokens * group.length
+            });
+            answers = parsePackedAnswers(completion.content, group.length);
+        } catch (error) {
+            console.warn('Packed batch request failed, asking separately:', error);
+        }
+
+        if (!answers) {
+            for (const index of group) {
+                await askSingle(index);
+            }
+            return;
+        }
+
+        // One call answered the whole group: split its tokens evenly
+        const usage = completion.usage ? {
+            prompt_tokens: Math.round((completion.usage.prompt_tokens || 0) / group.length),
+            completion_tokens: Math.round((completion.usage.completion_tokens || 0) / group.length),
+            shared: group.length
+        } : null;
+        group.forEach((index, i) => complete(index, answers[i], completion.latencyMs, usage, 'packed'));
+    });
+
+    if (typeof updateApiUsageUI === 'function') updateApiUsageUI();
+
+    return { results, totalMs: performance.now() - startTime, apiCalls };
+}
+
+/**
+ * Escape text for HTML
+ * @param {string} text - Raw text
+ * @returns {string}
+ */
+function escapeBatchHtml(text) {
+    return String(text).replace(/[&<>"']/g, c =>
+        ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' })[c]);
+}
+
+/**
+ * Describe the token usage of one answer
+ * @param {Object|null} usage - Usage from answerQuestionBatch
+ * @returns {string}
+ */
+function formatBatchUsage(usage) {
+    if (!usage) return '–';
+    const tokens = `${usage.prompt_tokens || 0} + ${usage.completion_tokens || 0}`;
+    return usage.shared ? `${tokens} (shared by ${usage.shared})` : tokens;
+}
+
+/**
+ * Render batch answers as a table
+ * @param {Object} batch - Result of answerQuestionBatch
+ * @returns {string} - HTML
+ */
+function renderBatchResults(batch) {
+    const rows = batch.results.map((result, i) => `
+        <tr>
+            <td>${i + 1}</td>
+            <td>${escapeBatchHtml(result.question)}</td>
+            <td class="batch-answer">${escapeBatchHtml(result.answer)}</td>
+            <td>${Math.round(result.latencyMs).toLocaleString()} ms</td>
+            <td>${formatBatchUsage(result.usage)}</td>
+        </tr>`).join('');
+
+    return `<div class="batch-summary">${batch.results.length} questions answered in ` +
+        `${(batch.totalMs / 1000).toFixed(1)} s with ${batch.apiCalls} API calls</div>
+        <table class="batch-results">
+            <thead><tr><th>#</th><th>Question</th><th>Answer</th><th>Latency</th><th>Tokens (prompt + completion)</th></tr></thead>
+            <tbody>${rows}</tbody>
+        </table>`;
+}
+
+/**
+ * Handle the "Ask all" button: answer every line of the question box
+ */
+async function handleBatchQuestions() {
+    const input = document.getElementById('query-input');
+    const container = document.getElementById('response-container');
+    const content = document.getElementById('response-content');
+    const settings = getBatchSettings();
+    const questions = input ? parseBatchQuestions(input.value) : [];
+
+    if (questions.length === 0) {
+        showNotification('Enter one question per line', 'error');
+        return;
+    }
+    if (!documentText) {
+        showNotification('Please upload a document first', 'error');
+        return;
+    }
+    if (questions.length > settings.maxQuestions) {
+        showNotification(`A batch can hold at most ${settings.maxQuestions} questions`, 'error');
+        return;
+    }
+
+    isProcessing = true;
+    updateUIState();
+    if (container) container.classList.remove('hidden');
+    if (content) content.innerHTML = `<div class="loading">Answering ${questions.length} questions...</div>`;
+
+    try {
+        const batch = await answerQuestionBatch(questions, {
+            onProgress: (done, total) => {
+                if (content) content.innerHTML = `<div class="loading">Answered ${done} of ${total} questions...</div>`;
+            }
+        });
+
+        if (content) content.innerHTML = renderBatchResults(batch);
+
+        // Keep each answer in the document's history
+        if (typeof recordQAHistoryEntry === 'function') {
+            batch.results.forEach(result => recordQAHistoryEntry(result.question, result.answer));
+        }
+    } catch (error) {
+        console.error('Error answering batch:', error);
+        if (content) content.innerHTML = `<div class="error-text">Error: ${escapeBatchHtml(error.message)}</div>`;
+        showNotification(`Error: ${error.message}`, 'error');
+    }
+
+    isProcessing = false;
+    updateUIState();
+}
+
+/**
+ * Enable the "Ask all" button when the question box holds more than one question
+ */
+function updateBatchButtonState() {
+    const button = document.getElementById('batch-ask-button');
+    const input = document.getElementById('query-input');
+    if (!button || !input) return;
+
+    button.disabled = !documentText || isProcessing || parseBatchQuestions(input.value).length < 2;
+}
+
+/**
+ * Set up the "Ask all" button
+ */
+function setupBatchQuestions() {
+    const button = document.getElementById('batch-ask-button');
+    if (!button) return;
+
+    button.addEventListener('click', handleBatchQuestions);
+    updateBatchButtonState();
+}
+
+// Make functions globally available
+window.answerQuestionBatch = answerQuestionBatch;
+window.parseBatchQuestions = parseBatchQuestions;
+window.setupBatchQuestions = setupBatchQuestions;
+window.updateBatchButtonState = updateBatchButtonState;
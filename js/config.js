@@ -14,20 +14,146 @@ const LLM_CONFIG = {
         model: 'gpt-3.5-turbo', // Options: 'gpt-3.5-turbo', 'gpt-4'
         temperature: 0.3,
         maxTokens: 800,
+        promptLayout: 'cacheable', // 'cacheable' (stable prefix, question last) or 'inline'
+        
+        // More OpenAI-compatible endpoints; each entry may override apiUrl, apiKey and model
+        // e.g. [{ name: 'primary' }, { name: 'backup', apiUrl: 'https://...', model: '...' }]
+        endpoints: [],
+        
+        // With several endpoints: ask the next one when no token has arrived by
+        // the current one's p95 time to first token
+        hedging: {
+            enabled: true,
+            percentile: 0.95,
+            minDelayMs: 1000, // Hedge delay is kept between these bounds
+            maxDelayMs: 15000,
+            defaultDelayMs: 5000, // Until an endpoint has minSamples measurements
+            minSamples: 10
+        },
+        
+        // Checklist mode: many questions answered in one run
+        batch: {
+            concurrency: 4, // API requests in flight at once
+            packMaxQuestions: 8, // Questions answered by one packed prompt
+            packMaxChars: 2000, // Question text per packed prompt
+            packedAnswerTokens: 200, // Completion budget per packed question
+            maxQuestions: 50
+        },
         mockModeEnabled: true // Will be false when API key is configured
     },
 
     // Document processing settings
     document: {
         maxFileSize: 20 * 1024 * 1024, // 20MB in bytes
-        supportedFileTypes: ['.pdf', '.docx', '.doc', '.txt'],
-        maxCharacterLimit: 12000 // Approximate limit for context window
+        maxCsvFileSize: 200 * 1024 * 1024, // CSV rows go straight into the table store, so they may be larger
+        
+        // Large-file mode for PDF and TXT files above maxFileSize: read in slices
+        // or streamed, pages kept in IndexedDB
+        largeFile: {
+            enabled: true,
+            maxFileSize: 1024 * 1024 * 1024, // 1GB
+            rangeChunkSize: 1024 * 1024, // Bytes per PDF.js range request
+            textPageChars: 4000, // Characters per part of a large text file (cut at line breaks)
+            workingSetPages: 100, // Pages kept in memory (least recently used are dropped)
+            excerptChars: 100000, // Leading text kept as the document text and preview
+            writeBatchPages: 50, // Pages per IndexedDB write
+            previewBatchPages: 20, // Pages loaded per scroll step in the full preview
+            searchResults: 5, // Pages used to answer a question
+            maxStoredDocuments: 3 // Large documents whose pages stay in IndexedDB
+        },
+        supportedFileTypes: ['.pdf', '.docx', '.doc', '.xlsx', '.csv', '.txt'],
+        maxCharacterLimit: 12000, // Approximate limit for context window
+        
+        // Repeated header/footer removal for multi-page PDFs
+        headerFooter: {
+            edgeLines: 3, // Lines at the top and bottom of each page to check
+            minPages: 3, // Only filter documents with at least this many pages
+            pageRatio: 0.5 // A line must recur on this share of pages to be removed
+        },
+        
+        // Multi-file ingestion queue
+        ingestion: {
+            concurrency: 2, // Documents extracted at the same time
+            maxBytesInFlight: 64 * 1024 * 1024 // Don't start more files beyond this many bytes in extraction
+        },
+        
+        // Shared retrieval index across all loaded documents
+        collection: {
+            chunkChars: 1000, // Target passage size
+            topK: 8, // Passages retrieved per question
+            maxPerDocument: 3, // Passages taken from any single document
+            maxContextChars: 8000, // Prompt budget for retrieved passages
+            maxDfRatio: 0.5, // Skip terms found in more than this share of passages
+            retrieval: 'hybrid', // 'lexical' (BM25), 'vector' (hashed n-gram embeddings) or 'hybrid' (both, fused)
+            vectorDimensions: 256, // Embedding size (4 bytes per dimension per passage)
+            fusionCandidates: 50, // Passages taken from each ranking before fusion
+            minVectorScore: 0.15, // Cosine below which an embedding match is ignored
+            annMinVectors: 5000, // Passages before the approximate (IVF) vector index is used
+            annLists: 0, // IVF lists; 0 = square root of the passage count
+            annProbes: 8, // Lists scanned per query (more = better recall, slower)
+            annRetrainFactor: 4, // Retrain the lists when the collection grows this many times
+            compactDeadRatio: 0.5, // Drop removed passages once they reach this share of live ones
+            vectorStoreMaxDocuments: 100, // Documents whose passage vectors stay in IndexedDB
+            vectorStoreMaxBytes: 64 * 1024 * 1024 // Size of the stored passage vectors
+        },
+        
+        // Extractive summaries (TextRank, computed in a worker)
+        summary: {
+            maxSentences: 7, // Sentences shown in a Document Analysis Mode summary
+            contextSentences: 25, // Sentences kept as LLM context for overview questions
+            maxTextChars: 2 * 1024 * 1024 // Longer documents are summarized from their start
+        },
+        
+        // Search questions in Document Analysis Mode
+        search: {
+            maxIndexChars: 32 * 1024 * 1024, // Longer documents are searched by scanning the text
+            maxEdits: 2, // Largest edit distance for a misspelt search term
+            fuzzyMinLength: 5, // Shorter terms must match exactly
+            maxFuzzyTerms: 3, // Corrections used per misspelt term
+            persistMinChars: 100000, // Shorter documents are not stored between sessions
+            persistMaxDocuments: 20, // Stored document indexes kept (least recently used are evicted)
+            persistMaxBytes: 256 * 1024 * 1024 // Size of the stored indexes and texts
+        },
+        
+        // Amounts, percentages, dates and quarters indexed at extraction
+        entities: {
+            maxTextChars: 32 * 1024 * 1024, // Longer documents are not indexed
+            maxListed: 10 // Entities listed in an answer
+        },
+        
+        // Scanned-vs-text triage on a sample of PDF pages
+        triage: {
+            samplePages: 5, // Pages sampled before full extraction
+            minTextChars: 50, // Pages with less text are checked for images
+            minImageCoverage: 0.5 // Share of the page covered by images to treat it as scanned
+        },
+        
+        // Offline OCR for scanned PDF pages (engine files installed by setup.sh)
+        ocr: {
+            enabled: true,
+            engineUrl: 'lib/ocr/tesseract-core-simd-lstm.wasm.js',
+            languageDataUrl: 'lib/ocr/eng.traineddata.gz',
+            language: 'eng',
+            maxWorkers: 8, // Upper bound on the pool; defaults to one worker per core
+            renderScale: 2, // PDF points to pixels (about 144 DPI)
+            cacheMaxPages: 5000, // Recognized pages kept in IndexedDB (least recently used are evicted)
+            cacheMaxBytes: 32 * 1024 * 1024 // Size of the stored page texts
+        }
     },
     
     // API usage limits
     apiUsage: {
         maxCallsPerSession: 50, // Maximum API calls per session
         warningThreshold: 45, // Show warning when this many calls are reached
+        
+        // Background answers to the suggested question chips (opt-in)
+        speculative: {
+            enabled: false, // Prefetch answers after a document is loaded
+            maxChips: 3, // Suggestions answered in the background
+            callShare: 0.2, // Share of maxCallsPerSession prefetching may use
+            tokenBudget: 20000, // Tokens prefetching may use per session
+            idleTimeout: 3000 // Longest wait for idle time before each request (ms)
+        }
     }
 };
 
@@ -48,7 +174,24 @@ const UI_CONFIG = {
         'Can you summarize the main points?',
         'What are the key findings?',
         'Are there any recommendations?'
-    ]
+    ],
+    
+    // Q&A history panel (virtualized list)
+    history: {
+        rowHeight: 72, // Fixed row height in pixels
+        overscan: 6, // Extra rows rendered above and below the viewport
+        maxEntries: 1000, // Oldest entries are dropped beyond this
+        persistDelay: 500 // Delay before writing history to IndexedDB (ms)
+    },
+    
+    // PDF page thumbnails in the full preview modal
+    thumbnails: {
+        width: 110, // Thumbnail width in CSS pixels
+        cacheBytes: 16 * 1024 * 1024, // Memory budget for compressed thumbnails
+        maxConcurrentRenders: 2, // Pages rendered by the worker at the same time
+        imageType: 'image/webp', // Compression format for cached thumbnails
+        quality: 0.7
+    }
 };
 
 /**
@@ -0,0 +1,668 @@
+/**
+ * Document Collection Module
+ * Keeps every loaded document in one shared retrieval index so a question
+ * can pull the best passages from several documents, each attributed to
+ * its source. Lexical retrieval walks only the postings of the query terms,
+ * so its cost depends on how often those terms occur, not on collection
+ * size. Chunks are also embedded (see vectorIndex.js) so that reworded
+ * questions still find them; the two rankings are fused.
+ */
+
+// Shared index over every loaded document
+let documentCollection = null;
+
+// Running update of the approximate vector index
+let vectorIndexUpdate = null;
+
+// Common words that carry no retrieval signal
+const COLLECTION_STOPWORDS = new Set([
+    'a', 'an', 'as', 'at', 'be', 'by', 'do', 'if', 'in', 'is', 'it', 'of', 'on', 'or', 'so', 'to', 'we',
+    'the', 'and', 'for', 'are', 'was', 'were', 'with', 'that', 'this', 'from', 'what',
+    'which', 'who', 'how', 'why', 'when', 'where', 'does', 'did', 'has', 'have', 'had',
+    'not', 'but', 'you', 'your', 'its', 'our', 'their', 'there', 'they', 'them', 'can',
+    'all', 'any', 'into', 'about', 'than', 'then', 'also', 'been', 'being', 'will', 'would',
+    'should', 'could', 'may', 'these', 'those', 'such', 'each', 'between', 'document', 'documents'
+]);
+
+// BM25 parameters
+const BM25_K1 = 1.2;
+const BM25_B = 0.75;
+
+/**
+ * Get collection settings with defaults
+ * @returns {{chunkChars: number, topK: number, maxPerDocument: number, maxContextChars: number, maxDfRatio: number, retrieval: string, vectorDimensions: number, fusionCandidates: number, minVectorScore: number, annMinVectors: number, annLists: number, annProbes: number, annRetrainFactor: number, compactDeadRatio: number}}
+ */
+function getCollectionSettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.collection) || {};
+    return {
+        chunkChars: settings.chunkChars || 1000,
+        topK: settings.topK || 8,
+        maxPerDocument: settings.maxPerDocument || 3,
+        maxContextChars: settings.maxContextChars || 8000,
+        maxDfRatio: settings.maxDfRatio || 0.5,
+        retrieval: settings.retrieval || 'hybrid',
+        vectorDimensions: settings.vectorDimensions || 256,
+        fusionCandidates: settings.fusionCandidates || 50,
+        minVectorScore: settings.minVectorScore || 0.15,
+        annMinVectors: settings.annMinVectors || 5000,
+        annLists: settings.annLists || 0,
+        annProbes: settings.annProbes || 8,
+        annRetrainFactor: settings.annRetrainFactor || 4,
+        compactDeadRatio: settings.compactDeadRatio || 0.5
+    };
+}
+
+/**
+ * Split text into lowercase index terms
+ * @param {string} text - Text to tokenize
+ * @returns {string[]}
+ */
+function tokenizeForIndex(text) {
+    const terms = [];
+    const matches = text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+    for (const term of matches) {
+        if (term.length > 1 && !COLLECTION_STOPWORDS.has(term)) {
+            terms.push(term);
+        }
+    }
+    return terms;
+}
+
+/**
+ * Split document text into chunks of roughly chunkChars characters
+ * Chunks break at line boundaries and never span two PDF pages
+ * @param {string} text - Document text
+ * @param {number} chunkChars - Target chunk size
+ * @returns {{text: string, page: number|null}[]}
+ */
+function chunkDocumentText(text, chunkChars) {
+    const chunks = [];
+    let lines = [];
+    let length = 0;
+    let page = null;
+
+    const flush = () => {
+        const chunkText = lines.join('\n').trim();
+        if (chunkText) chunks.push({ text: chunkText, page });
+        lines = [];
+        length = 0;
+    };
+
+    for (const line of text.split('\n')) {
+        const pageMatch = line.match(/^## Page (\d+)/);
+        if (pageMatch) {
+            flush();
+            page = parseInt(pageMatch[1], 10);
+            continue;
+        }
+
+        if (length + line.length > chunkChars && length > 0) {
+            flush();
+        }
+        lines.push(line);
+        length += line.length + 1;
+    }
+    flush();
+
+    return chunks;
+}
+
+/**
+ * Create a retrieval index over document chunks
+ * Chunks are kept in parallel arrays and the inverted index maps each term
+ * to parallel arrays of chunk ids and term counts. Chunk vectors share the
+ * chunk ids as rows of a vector store.
+ * @returns {Object} - Index with add, remove, getDocuments and search methods
+ */
+function createRetrievalIndex() {
+    // Documents (id -> {id, key, name, firstChunk, chunkCount, termCount, removed})
+    const documents = new Map();
+    const documentIds = new Map(); // document key -> id
+    let nextDocumentId = 1;
+
+    // Chunks, indexed by chunk id
+    const chunkTexts = [];
+    const chunkDocuments = [];
+    const chunkPages = [];
+    const chunkLengths = [];
+
+    // Inverted index (term -> {chunkIds: number[], counts: number[]})
+    const index = new Map();
+    let liveChunks = 0;
+    let liveTerms = 0;
+    
+    // Chunk embeddings (row = chunk id), created with the first chunk
+    let vectors = null;
+
+    const isLiveChunk = chunkId => !documents.get(chunkDocuments[chunkId]).removed;
+
+    /**
+     * Count the live chunks in a postings list
+     * @param {{chunkIds: number[]}} postings - Postings of a term
+     * @returns {number}
+     */
+    function countLive(postings) {
+        if (liveChunks === chunkTexts.length) return postings.chunkIds.length;
+        let df = 0;
+        for (const chunkId of postings.chunkIds) {
+            if (isLiveChunk(chunkId)) df++;
+        }
+        return df;
+    }
+
+    /**
+     * Drop the chunks, postings and vectors of removed documents
+     * Live chunks are renumbered in order, so vector rows still match chunk ids
+     */
+    function compact() {
+        const remap = new Int32Array(chunkTexts.length).fill(-1);
+        let next = 0;
+        for (let chunkId = 0; chunkId < chunkTexts.length; chunkId++) {
+            if (!isLiveChunk(chunkId)) continue;
+            remap[chunkId] = next;
+            chunkTexts[next] = chunkTexts[chunkId];
+            chunkDocuments[next] = chunkDocuments[chunkId];
+            chunkPages[next] = chunkPages[chunkId];
+            chunkLengths[next] = chunkLengths[chunkId];
+            next++;
+        }
+
+        if (vectors) {
+            const compacted = createVectorStore(vectors.dimensions);
+            if (vectors.getQuantizer()) compacted.setQuantizer(vectors.getQuantizer());
+            for (let row = 0; row < chunkTexts.length; row++) {
+                if (remap[row] !== -1) compacted.addVector(vectors.getVector(row), vectors.getRowList(row));
+            }
+            vectors = compacted;
+        }
+
+        chunkTexts.length = next;
+        chunkDocuments.length = next;
+        chunkPages.length = next;
+        chunkLengths.length = next;
+
+        for (const [term, postings] of index) {
+            let kept = 0;
+            for (let i = 0; i < postings.chunkIds.length; i++) {
+                const chunkId = remap[postings.chunkIds[i]];
+                if (chunkId === -1) continue;
+                postings.chunkIds[kept] = chunkId;
+                postings.counts[kept] = postings.counts[i];
+                kept++;
+            }
+            if (kept === 0) {
+                index.delete(term);
+            } else {
+                postings.chunkIds.length = kept;
+                postings.counts.length = kept;
+            }
+        }
+
+        for (const [id, doc] of documents) {
+            if (doc.removed) {
+                documents.delete(id);
+            } else {
+                doc.firstChunk = doc.chunkCount > 0 ? remap[doc.firstChunk] : next;
+            }
+        }
+    }
+
+    /**
+     * Rank chunks by BM25
+     * @param {string} query - Question or search terms
+     * @returns {[number, number][]} - [chunkId, score] pairs, best first
+     */
+    function rankLexical(query) {
+        const settings = getCollectionSettings();
+
+        // Rarest terms first; very common terms are skipped once a rarer one has scored
+        const postingsLists = Array.from(new Set(tokenizeForIndex(query)))
+            .map(term => index.get(term))
+            .filter(Boolean)
+            .sort((a, b) => a.chunkIds.length - b.chunkIds.length);
+
+        const averageLength = liveTerms / liveChunks || 1;
+        const scores = new Map();
+
+        postingsLists.forEach((postings, listIndex) => {
+            // Removed documents' chunks wait for compaction; they don't count
+            const df = countLive(postings);
+            if (listIndex > 0 && df > liveChunks * settings.maxDfRatio) return;
+
+            const idf = Math.log(1 + (liveChunks - df + 0.5) / (df + 0.5));
+            for (let i = 0; i < postings.chunkIds.length; i++) {
+                const chunkId = postings.chunkIds[i];
+                if (!isLiveChunk(chunkId)) continue;
+
+                const tf = postings.counts[i];
+                const lengthNorm = 1 - BM25_B + BM25_B * chunkLengths[chunkId] / averageLength;
+                const score = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * lengthNorm);
+                scores.set(chunkId, (scores.get(chunkId) || 0) + score);
+            }
+        });
+
+        return Array.from(scores).sort((a, b) => b[1] - a[1]);
+    }
+
+    /**
+     * Rank chunks by embedding similarity
+     * @param {string} query - Question or search terms
+     * @param {number} limit - Chunks to return
+     * @returns {[number, number][]} - [chunkId, cosine] pairs, best first
+     */
+    function rankVector(query, limit) {
+        if (!vectors) return [];
+        const { minVectorScore, annProbes } = getCollectionSettings();
+        const queryVector = embedText(query, vectors.dimensions);
+        return vectors.search(queryVector, limit, isLiveChunk, { nprobe: annProbes })
+            .filter(result => result.score >= minVectorScore)
+            .map(result => [result.row, result.score]);
+    }
+
+    return {
+        /**
+         * Add a document, replacing an earlier copy with the same key
+         * @param {string} key - Stable document key (see getDocumentKey)
+         * @param {string} name - Display name
+         * @param {string} text - Extracted text
+         * @param {Object} [options] - {vectors}: stored vectors of this document (see exportVectors)
+         * @returns {number} - Document id
+         */
+        add(key, name, text, options = {}) {
+            this.remove(key);
+
+            const { chunkChars, vectorDimensions } = getCollectionSettings();
+            const id = nextDocumentId++;
+            const firstChunk = chunkTexts.length;
+            const chunks = chunkDocumentText(text, chunkChars);
+            let termCount = 0;
+
+            // Stored vectors are reused when they match this chunking
+            const segment = options.vectors && options.vectors.count === chunks.length ? options.vectors : null;
+            const vector = segment ? new Float32Array(vectorDimensions) : null;
+
+            for (const chunk of chunks) {
+                const chunkId = chunkTexts.length;
+                const terms = tokenizeForIndex(chunk.text);
+
+                chunkTexts.push(chunk.text);
+                chunkDocuments.push(id);
+                chunkPages.push(chunk.page);
+                chunkLengths.push(terms.length);
+                termCount += terms.length;
+
+                if (typeof createVectorStore === 'function') {
+                    if (!vectors) vectors = createVectorStore(vectorDimensions);
+
+                    if (segment) {
+                        const index = chunkId - firstChunk;
+                        const quantizer = vectors.getQuantizer();
+                        const list = quantizer && segment.lists && segment.quantizerId === quantizer.id ?
+                            segment.lists[index] : -1;
+                        vectors.addVector(decodeSegmentVector(segment, index, vector), list);
+                    } else {
+                        vectors.add(chunk.text);
+                    }
+                }
+
+                // Term frequencies for this chunk
+                const counts = new Map();
+                for (const term of terms) {
+                    counts.set(term, (counts.get(term) || 0) + 1);
+                }
+
+                for (const [term, count] of counts) {
+                    let postings = index.get(term);
+                    if (!postings) {
+                        postings = { chunkIds: [], counts: [] };
+                        index.set(term, postings);
+                    }
+                    postings.chunkIds.push(chunkId);
+                    postings.counts.push(count);
+                }
+            }
+
+            const chunkCount = chunkTexts.length - firstChunk;
+            documents.set(id, { id, key, name, firstChunk, chunkCount, termCount, removed: false });
+            documentIds.set(key, id);
+            liveChunks += chunkCount;
+            liveTerms += termCount;
+            return id;
+        },
+
+        /**
+         * Remove a document
+         * Its chunks are skipped at query time until removed chunks reach
+         * compactDeadRatio of the live ones; then the index is compacted
+         * @param {string} key - Document key
+         * @returns {boolean} - Whether the document was present
+         */
+        remove(key) {
+            const id = documentIds.get(key);
+            if (id === undefined) return false;
+
+            const doc = documents.get(id);
+            doc.removed = true;
+            documentIds.delete(key);
+            liveChunks -= doc.chunkCount;
+            liveTerms -= doc.termCount;
+
+            if (chunkTexts.length - liveChunks > liveChunks * getCollectionSettings().compactDeadRatio) {
+                compact();
+            }
+            return true;
+        },
+
+        /**
+         * Get the documents currently in the index
+         * @returns {{id: number, key: string, name: string, chunkCount: number}[]}
+         */
+        getDocuments() {
+            return Array.from(documents.values()).filter(doc => !doc.removed);
+        },
+
+        /**
+         * Get the chunk vectors of a document in storage format
+         * @param {string} key - Document key
+         * @returns {Object|null} - Segment for saveDocumentVectors
+         */
+        exportVectors(key) {
+            const id = documentIds.get(key);
+            if (id === undefined || !vectors) return null;
+
+            const doc = documents.get(id);
+            const dimensions = vectors.dimensions;
+            const quantizer = vectors.getQuantizer();
+            const data = new Float32Array(doc.chunkCount * dimensions);
+            const lists = quantizer ? new Int32Array(doc.chunkCount) : null;
+
+            for (let i = 0; i < doc.chunkCount; i++) {
+                data.set(vectors.getVector(doc.firstChunk + i), i * dimensions);
+                if (lists) lists[i] = vectors.getRowList(doc.firstChunk + i);
+            }
+            return encodeVectorSegment(data, dimensions, lists, quantizer ? quantizer.id : null);
+        },
+
+        getVectorStore() {
+            return vectors;
+        },
+
+        getStats() {
+            return {
+                documents: documentIds.size,
+                chunks: liveChunks,
+                terms: index.size,
+                vectorBytes: vectors ? vectors.size() * vectors.dimensions * 4 : 0
+            };
+        },
+
+        /**
+         * Find the passages that best match a query
+         * 'lexical' ranks by BM25, 'vector' by embedding similarity and
+         * 'hybrid' fuses the top candidates of both by reciprocal rank
+         * @param {string} query - Question or search terms
+         * @param {Object} [options] - {topK, maxPerDocument, retrieval}
+         * @returns {{documentId: number, documentName: string, chunkId: number, page: number|null, text: string, score: number}[]}
+         */
+        search(query, options = {}) {
+            const settings = getCollectionSettings();
+            const topK = options.topK || settings.topK;
+            const maxPerDocument = options.maxPerDocument || settings.maxPerDocument;
+            const retrieval = vectors ? options.retrieval || settings.retrieval : 'lexical';
+
+            if (liveChunks === 0) return [];
+
+            let ranked;
+            if (retrieval === 'vector') {
+                ranked = rankVector(query, settings.fusionCandidates);
+            } else if (retrieval === 'hybrid') {
+                const lexical = rankLexical(query).slice(0, settings.fusionCandidates);
+                const semantic = rankVector(query, settings.fusionCandidates);
+                ranked = fuseRankings([lexical.map(([id]) => id), semantic.map(([id]) => id)])
+                    .map(result => [result.id, result.score]);
+            } else {
+                ranked = rankLexical(query);
+            }
+
+            // Best chunks first, limited per document so one document can't crowd out the rest
+            const perDocument = new Map();
+            const results = [];
+
+            for (const [chunkId, score] of ranked) {
+                const documentId = chunkDocuments[chunkId];
+                const taken = perDocument.get(documentId) || 0;
+                if (taken >= maxPerDocument) continue;
+
+                perDocument.set(documentId, taken + 1);
+                results.push({
+                    documentId,
+                    documentName: documents.get(documentId).name,
+                    chunkId,
+                    page: chunkPages[chunkId],
+                    text: chunkTexts[chunkId],
+                    score
+                });
+
+                if (results.length >= topK) break;
+            }
+
+            return results;
+        }
+    };
+}
+
+/**
+ * Get the shared document collection, creating it on first use
+ * @returns {Object}
+ */
+function getDocumentCollection() {
+    if (!documentCollection) {
+        documentCollection = createRetrievalIndex();
+    }
+    return documentCollection;
+}
+
+/**
+ * Add a document to the shared collection
+ * Chunk vectors stored by an earlier session are reused; new ones are stored
+ * @param {string} key - Stable document key (see getDocumentKey)
+ * @param {string} name - Display name
+ * @param {string} text - Extracted text
+ * @returns {Promise<number>} - Document id
+ */
+async function addDocumentToCollection(key, name, text) {
+    const collection = getDocumentCollection();
+    const { vectorDimensions, chunkChars } = getCollectionSettings();
+    const stored = typeof loadDocumentVectors === 'function' ?
+        await loadDocumentVectors(key, vectorDimensions, chunkChars) : null;
+
+    const id = collection.add(key, name, text, { vectors: stored });
+    const stats = collection.getStats();
+
+    console.log(`Indexed ${name}: ${stats.documents} documents, ${stats.chunks} chunks, ${stats.terms} terms in collection`);
+    updateCollectionUI();
+
+    if (!stored && typeof saveDocumentVectors === 'function') {
+        const segment = collection.exportVectors(key);
+        if (segment) saveDocumentVectors(key, segment, chunkChars);
+    }
+    updateCollectionVectorIndex();
+    return id;
+}
+
+/**
+ * Build or refresh the approximate (IVF) index over chunk vectors
+ * Small collections are searched exactly. Once a collection reaches
+ * annMinVectors, centroids saved by an earlier session are loaded, or new
+ * ones are trained when the browser is idle; they are retrained when the
+ * collection has grown annRetrainFactor times since training.
+ * @returns {Promise<void>}
+ */
+function updateCollectionVectorIndex() {
+    if (vectorIndexUpdate) return vectorIndexUpdate;
+
+    vectorIndexUpdate = (async () => {
+        const store = getDocumentCollection().getVectorStore();
+        const settings = getCollectionSettings();
+        if (!store || store.size() < settings.annMinVectors) return;
+
+        let quantizer = store.getQuantizer();
+        if (!quantizer) {
+            quantizer = await loadVectorQuantizer(store.dimensions);
+            if (quantizer) store.setQuantizer(quantizer);
+        }
+
+        if (quantizer && store.size() <= quantizer.trainedRows * settings.annRetrainFactor) return;
+
+        // Training takes a moment; wait until the page is idle
+        await new Promise(resolve => typeof requestIdleCallback === 'function' ?
+            requestIdleCallback(resolve, { timeout: 2000 }) : setTimeout(resolve, 0));
+
+        const listCount = settings.annLists ||
+            Math.min(4096, Math.max(16, Math.round(Math.sqrt(store.size()))));
+        const start = performance.now();
+        quantizer = store.train(listCount);
+        console.log(`Vector index: ${listCount} lists over ${store.size()} chunks in ${(performance.now() - start).toFixed(0)} ms`);
+
+        await saveVectorQuantizer(store.dimensions, quantizer);
+    })().finally(() => {
+        vectorIndexUpdate = null;
+    });
+
+    return vectorIndexUpdate;
+}
+
+/**
+ * Remove a document from the shared collection
+ * @param {string} key - Document key
+ */
+function removeDocumentFromCollection(key) {
+    if (getDocumentCollection().remove(key)) {
+        updateCollectionUI();
+    }
+
+    // Pages of a large document are no longer needed either
+    if (typeof removePagedDocument === 'function') {
+        removePagedDocument(key);
+    }
+}
+
+/**
+ * Get the documents currently in the shared collection
+ * @returns {Object[]}
+ */
+function getCollectionDocuments() {
+    return getDocumentCollection().getDocuments();
+}
+
+/**
+ * Find the passages that best match a query across all loaded documents
+ * @param {string} query - Question or search terms
+ * @param {Object} [options] - {topK, maxPerDocument}
+ * @returns {Object[]} - Ranked passages with their source document and page
+ */
+function searchCollection(query, options = {}) {
+    return getDocumentCollection().search(query, options);
+}
+
+/**
+ * Describe where a passage comes from
+ * @param {Object} result - Result from searchCollection
+ * @returns {string}
+ */
+function formatCollectionSource(result) {
+    return result.page ? `${result.documentName}, page ${result.page}` : result.documentName;
+}
+
+/**
+ * Build prompt context from the passages that best match a query
+ * @param {string} query - The user's question
+ * @param {Object} [options] - {maxChars, topK, maxPerDocument}
+ * @returns {{context: string, sources: Object[]}}
+ */
+function buildCollectionContext(query, options = {}) {
+    const maxChars = options.maxChars || getCollectionSettings().maxContextChars;
+    const header = 'The excerpts below come from several documents. ' +
+        'Cite the document name for each fact you use.\n\n';
+    const sources = [];
+    let length = header.length;
+
+    // Pick the best passages that fit
+    for (const result of searchCollection(query, options)) {
+        const excerptLength = formatCollectionSource(result).length + result.text.length + 10;
+        if (length + excerptLength > maxChars && sources.length > 0) break;
+
+        length += excerptLength;
+        sources.push(result);
+    }
+
+    // List them in collection order, so questions that retrieve the same passages
+    // produce the same prompt prefix (and hit the provider's prompt cache)
+    sources.sort((a, b) => a.chunkId - b.chunkId);
+
+    const context = header + sources.map((result, i) =>
+        `[${i + 1}] ${formatCollectionSource(result)}\n${result.text}\n\n`).join('');
+
+    return { context, sources };
+}
+
+/**
+ * Generate a local answer listing matching passages from every document
+ * Used in Document Analysis Mode
+ * @param {string} query - The user's question
+ * @returns {string}
+ */
+function generateCollectionResponse(query) {
+    const results = searchCollection(query);
+    const documentCount = getCollectionDocuments().length;
+
+    if (results.length === 0) {
+        return `I couldn't find passages matching your question in any of the ${documentCount} loaded documents. Please try different terms.`;
+    }
+
+    const names = new Set(results.map(result => result.documentName));
+    const passages = results.map((result, i) => {
+        const snippet = result.text.length > 300 ? result.text.substring(0, 300) + '...' : result.text;
+        return `${i + 1}. **${formatCollectionSource(result)}**\n${snippet}`;
+    });
+
+    return `## Results across ${names.size} of ${documentCount} documents
+
+${passages.join('\n\n')}
+
+These passages were retrieved from the actual content of your documents.`;
+}
+
+/**
+ * Check whether questions should be answered from all loaded documents
+ * @returns {boolean}
+ */
+function isCollectionModeEnabled() {
+    const toggle = document.getElementById('collection-mode-toggle');
+    return !!toggle && toggle.checked && getCollectionDocuments().length > 1;
+}
+
+/**
+ * Show the "ask across documents" toggle once two or more documents are loaded
+ */
+function updateCollectionUI() {
+    const container = document.getElementById('collection-mode');
+    const count = document.getElementById('collection-count');
+    const documentCount = getCollectionDocuments().length;
+
+    if (container) {
+        container.classList.toggle('hidden', documentCount < 2);
+    }
+    if (count) {
+        count.textContent = documentCount;
+    }
+}
+
+// Make functions globally available
+window.createRetrievalIndex = createRetrievalIndex;
+window.addDocumentToCollection = addDocumentToCollection;
+window.removeDocumentFromCollection = removeDocumentFromCollection;
+window.searchCollection = searchCollection;
+window.buildCollectionContext = buildCollectionContext;
+window.generateCollectionResponse = generateCollectionResponse;
+window.isCollectionModeEnabled = isCollectionModeEnabled;
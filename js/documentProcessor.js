@@ -10,55 +10,198 @@ const PDFJS_WORKER_CDN = "https://cdnjs.cloudflare.com/ajax/libs/pdf.js/3.4.120/
 // Flag to track if PDF.js is loaded
 let pdfJsLoaded = false;
 
+// Extraction reports by file, so concurrent extractions don't overwrite each other
+const extractionReports = new WeakMap();
+
 /**
  * Process uploaded document
+ * Extracts the text and makes it the current document
  * @param {File} file - The uploaded file
+ * @param {Object} [options] - Extraction options, see extractDocument
  * @returns {Promise<string>} - Promise resolving to extracted text
  */
-async function processDocument(file) {
+async function processDocument(file, options = {}) {
     try {
-        if (!file) {
-            throw new Error('No file provided');
-        }
+        window.lastExtractionReport = null;
+        
+        const { text, format, report, tables, paged, profile, termIndex, entities } = await extractDocument(file, options);
+        
+        window.lastDocumentFormat = format;
+        window.lastExtractionReport = report;
+        window.lastDocumentTables = tables || null;
+        window.lastPagedDocument = paged || null;
+        window.lastDocumentProfile = profile;
+        window.lastTermIndex = termIndex;
+        window.lastEntityIndex = entities;
+        saveDocumentText(text);
+        return text;
+    }
+    catch (error) {
+        console.error('Error in processDocument:', error);
+        throw error;
+    }
+}
+
+/**
+ * Extract text from a document without touching the current document state
+ * Safe to run for several files at once
+ * @param {File} file - The uploaded file
+ * @param {Object} [options] - {onProgress({stage, done, total})}
+ * @returns {Promise<{text: string, format: string, report: Object|null, tables: Object[]|null, paged: Object|null, profile: Object, termIndex: Object|null, entities: Object|null}>}
+ */
+async function extractDocument(file, options = {}) {
+    if (!file) {
+        throw new Error('No file provided');
+    }
 
-        console.log("Processing file:", file.name, "Type:", file.type);
+    console.log("Processing file:", file.name, "Type:", file.type);
 
-        // Check file type
-        const fileExt = file.name.split('.').pop().toLowerCase();
-        
-        // Handle PDF files with PDF.js
-        if (fileExt === 'pdf') {
-            // Load PDF.js if needed
-            if (!pdfJsLoaded) {
-                await loadPdfJs();
-            }
-            
-            // Process PDF with PDF.js
-            const text = await processPdfWithPdfJs(file);
-            saveDocumentText(text);
-            return text;
-        }
-        
-        // For DOCX files
-        else if (fileExt === 'docx' || fileExt === 'doc') {
-            return processDocFile(file);
+    // Check file type
+    const fileExt = file.name.split('.').pop().toLowerCase();
+    
+    if (!['pdf', 'docx', 'doc', 'xlsx', 'csv', 'txt'].includes(fileExt)) {
+        throw new Error(`Unsupported file type: .${fileExt}. Please upload PDF, DOCX/DOC, XLSX, CSV or TXT files.`);
+    }
+    
+    // Documents opened before are restored from their stored text and index
+    // (spreadsheets keep their tables in memory only, so they are not stored)
+    const stored = fileExt !== 'xlsx' && fileExt !== 'csv' && typeof loadStoredTermIndex === 'function' ?
+        await loadStoredTermIndex(getDocumentKey(file)) : null;
+    if (stored) {
+        console.log(`Restored ${file.name} from its stored index (${stored.index.text.length} characters)`);
+        const text = stored.index.text;
+        return {
+            text,
+            format: stored.format,
+            report: null,
+            tables: null,
+            paged: null,
+            profile: buildDocumentProfile(text),
+            termIndex: stored.index,
+            entities: buildEntityIndex(text)
+        };
+    }
+    
+    // Route on the actual content rather than the extension (only the first bytes are read)
+    const head = await readFileAsArrayBuffer(file.slice(0, SNIFF_SAMPLE_SIZE));
+    const { format, encoding } = sniffFileType(head);
+    let route = format === 'unknown' ? getFormatForExtension(fileExt) : format;
+    
+    // Text is decoded as a stream and large PDFs are read in slices; other
+    // formats are read once into a buffer that every extractor below works from
+    const large = (route === 'pdf' || route === 'text') && typeof isLargeFile === 'function' && isLargeFile(file);
+    const arrayBuffer = route === 'text' || large ? null : await readFileAsArrayBuffer(file);
+    
+    // XLSX and DOCX are both ZIP packages; CSV is text with a known layout
+    if (route === 'zip' && isXlsxPackage(arrayBuffer)) {
+        route = 'xlsx';
+    }
+    else if (route === 'text' && fileExt === 'csv') {
+        route = 'csv';
+    }
+    
+    if (route !== getFormatForExtension(fileExt)) {
+        console.log(`Content of ${file.name} detected as ${route}, not .${fileExt}`);
+    }
+    
+    let text;
+    let tables = null;
+    let paged = null;
+    
+    // Handle PDF files with PDF.js
+    if (route === 'pdf') {
+        // Load PDF.js if needed
+        if (!pdfJsLoaded) {
+            await loadPdfJs();
         }
         
-        // For text files
-        else if (fileExt === 'txt') {
-            const text = await readTextFile(file);
-            saveDocumentText(text);
-            return text;
+        // Large PDFs keep their pages in IndexedDB instead of the document text
+        if (large) {
+            paged = createPagedDocument(getDocumentKey(file), file.name);
         }
         
-        // Unsupported file type
-        else {
-            throw new Error(`Unsupported file type: .${fileExt}. Please upload PDF, DOCX/DOC, or TXT files.`);
-        }
+        // Process PDF with PDF.js
+        text = await processPdfWithPdfJs(file, arrayBuffer, { ...options, paged });
     }
-    catch (error) {
-        console.error('Error in processDocument:', error);
-        throw error;
+    
+    // Spreadsheets are parsed into column tables; the text is a summary
+    else if (route === 'xlsx') {
+        tables = await parseXlsx(arrayBuffer, options);
+        text = formatTablesAsDocument(file.name, tables);
+    }
+    else if (route === 'csv') {
+        const stream = openTextFileStream(file, encoding || 'utf-8', options);
+        const table = await parseCsvStream(stream, file.name.replace(/\.csv$/i, ''));
+        tables = table ? [table] : [];
+        text = formatTablesAsDocument(file.name, tables);
+    }
+    
+    // For Word 97-2003 binaries (OLE compound files)
+    else if (route === 'ole') {
+        text = processWordBinaryFile(file, arrayBuffer);
+    }
+    
+    // For DOCX (zip) files
+    else if (route === 'zip') {
+        text = await processDocFile(file, arrayBuffer);
+    }
+    
+    // Large text files keep their lines in IndexedDB, like large PDFs
+    else if (large) {
+        paged = createPagedDocument(getDocumentKey(file), file.name, 'text');
+        text = await readTextFileIntoPages(file, encoding || 'utf-8', paged, options);
+    }
+    
+    // For text files (including text saved with another extension)
+    else {
+        text = await readTextFile(file, encoding || 'utf-8', options);
+    }
+    
+    // Statistics for Document Analysis Mode, computed once per document
+    const profile = buildDocumentProfile(text);
+    
+    // Term index for typo-tolerant search (null for very long texts)
+    const termIndex = buildTermIndex(text);
+    
+    // Amounts, percentages, dates and quarters for questions answered locally
+    const entities = buildEntityIndex(text);
+    
+    // Keep the text and index for the next time this file is opened (large
+    // PDFs already keep their pages in storage)
+    if (termIndex && !tables && !paged && typeof saveStoredTermIndex === 'function') {
+        saveStoredTermIndex(getDocumentKey(file), termIndex, route);
+    }
+    
+    return { text, format: route, report: extractionReports.get(file) || null, tables, paged, profile, termIndex, entities };
+}
+
+/**
+ * Check whether a ZIP package is an Excel workbook
+ * @param {ArrayBuffer} arrayBuffer - File content
+ * @returns {boolean}
+ */
+function isXlsxPackage(arrayBuffer) {
+    try {
+        return readZipDirectory(arrayBuffer).has('xl/workbook.xml');
+    } catch (error) {
+        return false;
+    }
+}
+
+/**
+ * Get the format expected for a file extension
+ * Used when the content itself is not recognized
+ * @param {string} fileExt - Lowercase file extension
+ * @returns {string} - 'pdf', 'zip', 'xlsx', 'ole', 'csv' or 'text'
+ */
+function getFormatForExtension(fileExt) {
+    switch (fileExt) {
+        case 'pdf': return 'pdf';
+        case 'docx': return 'zip';
+        case 'xlsx': return 'xlsx';
+        case 'doc': return 'ole';
+        case 'csv': return 'csv';
+        default: return 'text';
     }
 }
 
@@ -71,6 +214,19 @@ function saveDocumentText(text) {
     window.lastProcessedDocumentText = text;
 }
 
+/**
+ * Save the extraction report for the last processed document
+ * @param {File} file - Processed file
+ * @param {Object} report - Report from createHeaderFooterFilter().getReport()
+ */
+function saveExtractionReport(file, report) {
+    extractionReports.set(file, { fileName: file.name, ...report });
+    
+    console.log(`Header/footer filter for ${file.name}: removed ${report.linesRemoved} lines, ` +
+                `${report.charsBefore} -> ${report.charsAfter} characters, ` +
+                `~${report.tokensSaved} tokens saved`);
+}
+
 /**
  * Load PDF.js library
  * @returns {Promise<void>}
@@ -107,21 +263,52 @@ async function loadPdfJs() {
 /**
  * Process PDF file using PDF.js
  * @param {File} file - PDF file
- * @returns {Promise<string>} - Extracted text
+ * @param {ArrayBuffer} [arrayBuffer] - Optional buffer if already loaded
+ * @param {Object} [options] - {onProgress({stage, done, total}), paged} where paged
+ *        is a store from createPagedDocument for large-file mode
+ * @returns {Promise<string>} - Extracted text (an excerpt of the first pages in large-file mode)
  */
-async function processPdfWithPdfJs(file) {
+async function processPdfWithPdfJs(file, arrayBuffer = null, options = {}) {
+    const paged = options.paged || null;
+    
     try {
-        // Read file as array buffer
-        const arrayBuffer = await readFileAsArrayBuffer(file);
+        // Read file as array buffer if not provided
+        if (!arrayBuffer && !paged) {
+            arrayBuffer = await readFileAsArrayBuffer(file);
+        }
         
-        // Load document with PDF.js
-        const pdf = await window.pdfjsLib.getDocument({data: arrayBuffer}).promise;
+        // Load document with PDF.js. PDF.js transfers the buffer it is given to
+        // its worker, so it gets a copy and the original stays usable by the fallback.
+        // Large files are never read whole; PDF.js requests the ranges it needs.
+        const pdf = paged ? await openPdfFromBlob(file) :
+            await window.pdfjsLib.getDocument({data: arrayBuffer.slice(0)}).promise;
         console.log(`PDF loaded successfully. Pages: ${pdf.numPages}`);
         
         // Start with document title
         let extractedText = `# ${file.name}\n\n`;
         extractedText += `PDF Document - ${pdf.numPages} pages\n\n`;
         
+        // Page lines are collected first so repeated headers/footers can be stripped
+        const pages = [];
+        const headerFooterFilter = createHeaderFooterFilter();
+        const scannedPages = [];
+        
+        // Keep page lines, or spill them to storage in large-file mode
+        const keepPage = async (pageNumber, lines) => {
+            headerFooterFilter.addPage(lines);
+            if (paged) {
+                pages.push({ pageNumber, paged: true });
+                await paged.addPage(pageNumber, lines.join('\n'));
+            } else {
+                pages.push({ pageNumber, lines });
+            }
+        };
+        
+        // Sample a few pages to decide between text extraction and OCR
+        const canOcr = typeof ocrPdfPages === 'function' && isOcrAvailable();
+        const triage = typeof triagePdf === 'function' ? await triagePdf(pdf) : null;
+        const skipTextPass = canOcr && triage !== null && triage.mode === 'scanned';
+        
         // Process each page
         for (let i = 1; i <= pdf.numPages; i++) {
             try {
@@ -129,50 +316,122 @@ async function processPdfWithPdfJs(file) {
                 if (i === 1 || i % 10 === 0 || i === pdf.numPages) {
                     console.log(`Processing page ${i} of ${pdf.numPages}`);
                 }
+                reportExtractionProgress(options, 'pages', i, pdf.numPages);
+                
+                // Scanned documents go straight to OCR without a text pass
+                const sampled = triage ? triage.pages.get(i) : null;
+                if (skipTextPass && !sampled) {
+                    scannedPages.push(i);
+                    continue;
+                }
                 
                 // Get page
                 const page = await pdf.getPage(i);
                 
-                // Extract text content
-                const textContent = await page.getTextContent();
+                // Route the page to the text extractor or OCR
+                const analysis = sampled || (typeof analyzePdfPage === 'function' ?
+                    await analyzePdfPage(page) : { kind: 'text', textContent: await page.getTextContent() });
+                if (analysis.kind === 'scanned' && canOcr) {
+                    scannedPages.push(i);
+                    continue;
+                }
                 
-                // Process text items
-                let pageText = '';
-                let lastY = null;
+                // Extract text content
+                const pageText = getPdfPageText(analysis.textContent);
                 
-                for (const item of textContent.items) {
-                    if (item.str.trim().length === 0) continue;
-                    
-                    // Add newlines when Y position changes significantly (new paragraph)
-                    if (lastY !== null && Math.abs(lastY - item.transform[5]) > 5) {
-                        pageText += '\n';
-                    }
-                    
-                    // Add space or newline between items
-                    if (pageText.length > 0 && !pageText.endsWith('\n')) {
-                        pageText += ' ';
-                    }
-                    
-                    // Add text
-                    pageText += item.str;
-                    
-                    // Update last Y position
-                    lastY = item.transform[5];
+                // Keep page lines and count recurring edge lines
+                if (pageText.trim().length > 0) {
+                    await keepPage(i, pageText.trim().split('\n'));
                 }
                 
-                // Add page text to result
-                if (pageText.trim().length > 0) {
-                    extractedText += `## Page ${i}\n\n${pageText.trim()}\n\n`;
+                // Release the page's parsed resources
+                if (paged) {
+                    page.cleanup();
                 }
             }
             catch (pageError) {
                 console.error(`Error processing page ${i}:`, pageError);
-                extractedText += `## Page ${i}\n\nError extracting text from this page.\n\n`;
+                pages.push({ pageNumber: i, error: true });
+            }
+        }
+        
+        // Recognize scanned pages with the offline OCR engine
+        if (scannedPages.length > 0) {
+            const ocrText = await ocrPdfPages(pdf, scannedPages, {
+                onProgress: (done, total) => reportExtractionProgress(options, 'ocr', done, total)
+            });
+            
+            for (const [pageNumber, text] of ocrText) {
+                if (text.trim().length === 0) continue;
+                
+                await keepPage(pageNumber, text.trim().split('\n').filter(line => line.trim().length > 0));
+            }
+            
+            // Pages OCR could not read (engine missing, failed or found nothing)
+            // keep whatever text layer they have, including pages triage skipped
+            for (const pageNumber of scannedPages) {
+                if ((ocrText.get(pageNumber) || '').trim().length > 0) continue;
+                
+                try {
+                    const page = await pdf.getPage(pageNumber);
+                    const pageText = getPdfPageText(await page.getTextContent());
+                    if (pageText.trim().length > 0) {
+                        await keepPage(pageNumber, pageText.trim().split('\n'));
+                    }
+                    if (paged) {
+                        page.cleanup();
+                    }
+                }
+                catch (pageError) {
+                    console.error(`Error processing page ${pageNumber}:`, pageError);
+                    pages.push({ pageNumber, error: true });
+                }
+            }
+            pages.sort((a, b) => a.pageNumber - b.pageNumber);
+        }
+        
+        // Stored pages are filtered when they are read back
+        if (paged) {
+            await paged.flush();
+            paged.pageNumbers.sort((a, b) => a - b);
+            paged.setPageFilter(lines => headerFooterFilter.stripPage(lines));
+        }
+        const excerptChars = paged ? getLargeFileSettings().excerptChars : Infinity;
+        
+        // Strip repeated headers/footers while assembling the text
+        for (const page of pages) {
+            if (extractedText.length >= excerptChars) {
+                break;
+            }
+            
+            if (page.error) {
+                extractedText += `## Page ${page.pageNumber}\n\nError extracting text from this page.\n\n`;
+                continue;
+            }
+            
+            const pageText = page.paged ? await paged.getPage(page.pageNumber) : null;
+            const lines = page.paged ? (pageText ? pageText.split('\n') : []) :
+                headerFooterFilter.filterPage(page.lines);
+            if (lines.length > 0) {
+                extractedText += `## Page ${page.pageNumber}\n\n${lines.join('\n')}\n\n`;
             }
+            if (page.paged) {
+                paged.excerptPageCount++;
+            }
+        }
+        
+        if (paged && paged.excerptPageCount < paged.pageCount) {
+            extractedText += `Large document: showing the first ${paged.excerptPageCount} of ${paged.pageCount} pages with text. ` +
+                `The remaining pages are searched when you ask a question.\n`;
         }
         
-        // Check if we got meaningful content
-        if (extractedText.split('\n').length <= 3) {
+        const report = headerFooterFilter.getReport();
+        report.triage = triage ? triage.mode : null;
+        report.ocrPages = scannedPages.length;
+        saveExtractionReport(file, report);
+        
+        // Check if we got meaningful content (the fallback needs the whole file in memory)
+        if (extractedText.split('\n').length <= 3 && !paged) {
             // Try alternative approach
             return await processPdfWithFallback(file, arrayBuffer);
         }
@@ -181,8 +440,71 @@ async function processPdfWithPdfJs(file) {
     }
     catch (error) {
         console.error("Error processing PDF with PDF.js:", error);
+        if (paged) {
+            throw new Error(`Could not read large PDF: ${error.message}`);
+        }
         // Try fallback method
-        return processPdfWithFallback(file);
+        return processPdfWithFallback(file, arrayBuffer);
+    }
+}
+
+/**
+ * Join the text items of a PDF page into lines
+ * @param {Object} textContent - Result of PDF.js page.getTextContent()
+ * @returns {string} - Page text
+ */
+function getPdfPageText(textContent) {
+    let pageText = '';
+    let lastY = null;
+    
+    for (const item of textContent.items) {
+        if (item.str.trim().length === 0) continue;
+        
+        // Add newlines when Y position changes significantly (new paragraph)
+        if (lastY !== null && Math.abs(lastY - item.transform[5]) > 5) {
+            pageText += '\n';
+        }
+        
+        // Add space or newline between items
+        if (pageText.length > 0 && !pageText.endsWith('\n')) {
+            pageText += ' ';
+        }
+        
+        // Add text
+        pageText += item.str;
+        
+        // Update last Y position
+        lastY = item.transform[5];
+    }
+    
+    return pageText;
+}
+
+/**
+ * Report extraction progress to the caller
+ * Without a progress callback, OCR progress is shown in the upload status
+ * @param {Object} options - Extraction options
+ * @param {string} stage - 'pages' or 'ocr'
+ * @param {number} done - Units finished
+ * @param {number} total - Units in this stage
+ */
+function reportExtractionProgress(options, stage, done, total) {
+    if (typeof options.onProgress === 'function') {
+        options.onProgress({ stage, done, total });
+    } else if (stage === 'ocr') {
+        showOcrProgress(done, total);
+    }
+}
+
+/**
+ * Show OCR progress in the upload status
+ * @param {number} done - Pages finished
+ * @param {number} total - Pages to recognize
+ */
+function showOcrProgress(done, total) {
+    const uploadStatus = document.getElementById('upload-status');
+    if (uploadStatus) {
+        uploadStatus.textContent = `Recognizing text on scanned pages (${done}/${total})...`;
     }
 }
 
@@ -195,44 +517,36 @@ async function processPdfWithPdfJs(file) {
 async function processPdfWithFallback(file, arrayBuffer = null) {
     try {
         // Read file content if not provided
-        const content = arrayBuffer ? 
-            new TextDecoder().decode(arrayBuffer) : 
-            await readTextFile(file);
+        const bytes = new Uint8Array(arrayBuffer || await readFileAsArrayBuffer(file));
         
         // Format output
         let extractedText = `# ${file.name}\n\n`;
         extractedText += "PDF Document (processed with alternative method)\n\n";
         
-        // Extract text using pattern matching - multiple approaches
+        // Approach 1: Scan content streams (inflating FlateDecode) for text operators
+        const scanStart = performance.now();
+        const { lines, stats } = await scanPdfText(bytes);
+        const scanSeconds = (performance.now() - scanStart) / 1000;
         
-        // Approach 1: Find text between BT and ET markers (Basic Text objects)
-        let textFound = false;
-        const btEtRegex = /BT\s*([\s\S]*?)\s*ET/g;
-        let btEtMatches = [];
-        let match;
+        console.log(`PDF scanner: ${stats.streams} streams (${stats.inflatedStreams} inflated, ` +
+                    `${stats.skippedStreams} skipped), ${lines.length} text lines, ` +
+                    `${(bytes.length / (1024 * 1024) / Math.max(scanSeconds, 0.001)).toFixed(1)} MB/s`);
         
-        while ((match = btEtRegex.exec(content)) !== null) {
-            // Extract text inside parentheses within each BT/ET block
-            const textBlock = match[1];
-            const textRegex = /\(\s*([^\)]+)\s*\)\s*Tj/g;
-            let textMatch;
-            
-            while ((textMatch = textRegex.exec(textBlock)) !== null) {
-                if (textMatch[1] && textMatch[1].trim().length > 0) {
-                    btEtMatches.push(textMatch[1].trim());
-                    textFound = true;
-                }
-            }
+        if (lines.length > 0) {
+            extractedText += lines.join('\n');
+            return extractedText;
         }
         
-        if (textFound) {
-            extractedText += btEtMatches.join(' ').replace(/\s+/g, ' ').trim();
-            return extractedText;
+        // Files with content streams but no text are image-only (scanned) PDFs
+        if (stats.streams > 0) {
+            return `# ${file.name}\n\nThis PDF document appears to contain primarily non-text content such as images or scanned pages, or uses an encoding that cannot be directly extracted in the browser.\n\nFor best results, please use a PDF with searchable text content.`;
         }
         
-        // Approach 2: Find readable ASCII sequences
+        // Approach 2: Find readable ASCII sequences (files without any streams)
+        const content = new TextDecoder('windows-1252').decode(bytes);
         const asciiRegex = /[\x20-\x7E]{5,}/g;
         const asciiMatches = [];
+        let match;
         
         while ((match = asciiRegex.exec(content)) !== null) {
             const text = match[0].trim();
@@ -268,94 +582,211 @@ async function processPdfWithFallback(file, arrayBuffer = null) {
 }
 
 /**
- * Process DOC/DOCX file
- * @param {File} file - DOC/DOCX file
- * @returns {Promise<string>} - Extracted text
+ * Process a Word 97-2003 (.doc) file
+ * @param {File} file - DOC file
+ * @param {ArrayBuffer} arrayBuffer - File content
+ * @returns {string} - Extracted text
  */
-async function processDocFile(file) {
+function processWordBinaryFile(file, arrayBuffer) {
     try {
-        // Read as text and look for content
-        const content = await readTextFile(file);
+        const text = extractWordBinaryText(arrayBuffer);
         
-        // Parse DOCX content (simplified approach)
-        let extractedText = `# ${file.name}\n\n`;
-        
-        // Look for text content in DOCX XML
-        const textRegex = /<w:t[^>]*>([^<]+)<\/w:t>/g;
-        const textParts = [];
-        let match;
+        if (!text) {
+            return `# ${file.name}\n\nThis document does not contain any text.`;
+        }
+        return `# ${file.name}\n\n${text}`;
+    }
+    catch (error) {
+        console.error("Error processing Word binary file:", error);
+        return `# ${file.name}\n\nError extracting text: ${error.message}`;
+    }
+}
+
+/**
+ * Process DOCX file
+ * The main document part (word/document.xml) is inflated as a stream and
+ * read paragraph by paragraph; each paragraph becomes one line.
+ * @param {File} file - DOCX file
+ * @param {ArrayBuffer} [arrayBuffer] - Optional buffer if already loaded
+ * @returns {Promise<string>} - Extracted text
+ */
+async function processDocFile(file, arrayBuffer = null) {
+    try {
+        if (!arrayBuffer) {
+            arrayBuffer = await readFileAsArrayBuffer(file);
+        }
         
-        while ((match = textRegex.exec(content)) !== null) {
-            if (match[1] && match[1].trim()) {
-                textParts.push(match[1]);
-            }
+        const entry = readZipDirectory(arrayBuffer).get('word/document.xml');
+        if (!entry) {
+            return `# ${file.name}\n\nThis package has no Word document part (word/document.xml), so no text could be extracted.`;
         }
         
-        if (textParts.length > 0) {
-            // Format text with reasonable spacing
-            let formattedText = '';
-            let lastPart = '';
-            
-            for (const part of textParts) {
-                // Add spacing between parts as needed
-                if (lastPart.endsWith('.') || lastPart.endsWith('?') || lastPart.endsWith('!')) {
-                    formattedText += part + ' ';
-                } else if (lastPart.endsWith('-')) {
-                    formattedText += part;
-                } else {
-                    formattedText += ' ' + part;
+        // Paragraphs (not self-closing empty ones) and the runs, tabs and breaks inside them
+        const paragraphs = [];
+        await streamXmlElements(
+            openZipEntryTextStream(arrayBuffer, entry),
+            '</w:p>',
+            /<w:p\b(?:[^>]*[^\/>])?>([\s\S]*?)<\/w:p>/g,
+            match => {
+                let paragraph = '';
+                const runRegex = /<w:t\b[^>]*>([^<]*)<\/w:t>|<w:(tab|br|cr)\b[^>]*\/>/g;
+                let run;
+                while ((run = runRegex.exec(match[1])) !== null) {
+                    paragraph += run[2] === undefined ? run[1] : (run[2] === 'tab' ? '\t' : '\n');
+                }
+                paragraph = decodeXmlText(paragraph).trim();
+                if (paragraph) {
+                    paragraphs.push(paragraph);
                 }
-                
-                lastPart = part;
             }
-            
-            extractedText += formattedText.trim();
-            saveDocumentText(extractedText);
-            return extractedText;
-        }
+        );
         
-        // Fallback to general text extraction if XML parsing fails
-        const lines = content.split('\n')
-            .map(line => line.trim())
-            .filter(line => {
-                return line.length > 5 && 
-                       /[a-zA-Z]{3,}/.test(line) && 
-                       !line.startsWith('<') && 
-                       !line.includes('<?xml') && 
-                       !line.includes('xmlns:');
-            });
-        
-        if (lines.length > 0) {
-            extractedText += lines.join('\n');
-            saveDocumentText(extractedText);
-            return extractedText;
+        if (paragraphs.length > 0) {
+            return `# ${file.name}\n\n${paragraphs.join('\n')}`;
         }
         
         // If no text found
-        const fallbackText = `# ${file.name}\n\nThis document appears to contain primarily non-text content or uses an encoding that cannot be directly extracted in the browser.`;
-        saveDocumentText(fallbackText);
-        return fallbackText;
+        return `# ${file.name}\n\nThis document appears to contain primarily non-text content or uses an encoding that cannot be directly extracted in the browser.`;
     }
     catch (error) {
         console.error("Error processing DOC file:", error);
-        const errorText = `# ${file.name}\n\nError extracting text: ${error.message}`;
-        saveDocumentText(errorText);
-        return errorText;
+        return `# ${file.name}\n\nError extracting text: ${error.message}`;
     }
 }
 
+/**
+ * Open a file as a stream of decoded text
+ * Bytes are decoded chunk by chunk, so the file is never held in memory as bytes.
+ * A byte order mark matching the encoding is stripped by TextDecoderStream.
+ * @param {File} file - File to read
+ * @param {string} encoding - Encoding label from sniffFileType
+ * @param {Object} [options] - Extraction options (progress is reported as stage 'text')
+ * @returns {ReadableStream<string>}
+ */
+function openTextFileStream(file, encoding, options = {}) {
+    let bytesRead = 0;
+    let reportedPercent = -1;
+    
+    const progress = new TransformStream({
+        transform(chunk, controller) {
+            bytesRead += chunk.byteLength;
+            
+            // Report whole percents only; large files arrive in thousands of chunks
+            const percent = Math.floor(bytesRead * 100 / Math.max(file.size, 1));
+            if (percent !== reportedPercent) {
+                reportedPercent = percent;
+                reportExtractionProgress(options, 'text', bytesRead, file.size);
+            }
+            controller.enqueue(chunk);
+        }
+    });
+    
+    return file.stream().pipeThrough(progress).pipeThrough(new TextDecoderStream(encoding));
+}
+
 /**
  * Read file as text
+ * Streams the file through TextDecoderStream, so the bytes are never held
+ * whole. The decoded chunks are still joined into one string, so peak memory
+ * is about twice the text; TXT files above maxFileSize are read with
+ * readTextFileIntoPages instead.
  * @param {File} file - File to read
+ * @param {string} [encoding] - Encoding label; detected from the first bytes when omitted
+ * @param {Object} [options] - Extraction options
  * @returns {Promise<string>} - File content as text
  */
-function readTextFile(file) {
-    return new Promise((resolve, reject) => {
-        const reader = new FileReader();
-        reader.onload = (e) => resolve(e.target.result);
-        reader.onerror = (e) => reject(new Error('Failed to read file as text'));
-        reader.readAsText(file);
-    });
+async function readTextFile(file, encoding = null, options = {}) {
+    if (!encoding) {
+        const head = await readFileAsArrayBuffer(file.slice(0, SNIFF_SAMPLE_SIZE));
+        encoding = sniffFileType(head).encoding || 'utf-8';
+    }
+    
+    const reader = openTextFileStream(file, encoding, options).getReader();
+    const parts = [];
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        parts.push(value);
+    }
+    
+    return parts.join('');
+}
+
+/**
+ * Read a large text file into a page store
+ * Decoded lines are grouped into parts of about textPageChars characters and
+ * each part is written to the store as soon as it is complete, so memory
+ * stays proportional to a part (plus the store's working set) rather than to
+ * the file. The leading parts are also returned as the document text.
+ * @param {File} file - Text file
+ * @param {string} encoding - Encoding label from sniffFileType
+ * @param {Object} paged - Store from createPagedDocument
+ * @param {Object} [options] - Extraction options
+ * @returns {Promise<string>} - Excerpt of the first parts
+ */
+async function readTextFileIntoPages(file, encoding, paged, options = {}) {
+    const { textPageChars, excerptChars } = getLargeFileSettings();
+    const reader = openTextFileStream(file, encoding, options).getReader();
+    
+    let excerpt = '';
+    let lines = [];
+    let lineChars = 0;
+    let rest = '';
+    
+    const addPart = async () => {
+        const text = lines.join('\n');
+        const partNumber = paged.pageCount + 1;
+        lines = [];
+        lineChars = 0;
+        
+        if (excerpt.length < excerptChars) {
+            excerpt += `## Part ${partNumber}\n\n${text}\n\n`;
+            paged.excerptPageCount++;
+        }
+        // Waiting here holds the reader back while a batch is written
+        await paged.addPage(partNumber, text);
+    };
+    
+    const addLine = async (line) => {
+        lines.push(line.endsWith('\r') ? line.slice(0, -1) : line);
+        lineChars += line.length + 1;
+        if (lineChars >= textPageChars) {
+            await addPart();
+        }
+    };
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        
+        const chunkLines = (rest + value).split('\n');
+        rest = chunkLines.pop();
+        for (const line of chunkLines) {
+            await addLine(line);
+        }
+        
+        // A line longer than a part (e.g. a file without line breaks) is cut
+        while (rest.length >= textPageChars) {
+            await addLine(rest.slice(0, textPageChars));
+            rest = rest.slice(textPageChars);
+        }
+    }
+    
+    if (rest) {
+        await addLine(rest);
+    }
+    if (lines.length > 0) {
+        await addPart();
+    }
+    await paged.flush();
+    
+    let text = `# ${file.name}\n\nText Document - ${paged.pageCount} parts\n\n${excerpt}`;
+    if (paged.excerptPageCount < paged.pageCount) {
+        text += `Large document: showing the first ${paged.excerptPageCount} of ${paged.pageCount} parts. ` +
+            `The remaining parts are searched when you ask a question.\n`;
+    }
+    return text;
 }
 
 /**
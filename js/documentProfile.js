@@ -0,0 +1,218 @@
+/**
+ * Document Profile Module
+ * Computes the statistics and features used by Document Analysis Mode
+ * answers and question chips once, when a document is extracted, so those
+ * answers don't rescan the document text for every question.
+ */
+
+// Profile of the document questions are asked about
+let activeDocumentProfile = null;
+
+// Characters at the start of the text searched for headings, key lines and keywords
+const PROFILE_SAMPLE_CHARS = 200000;
+
+// Preview length kept in the profile (the longest preview shown)
+const PROFILE_PREVIEW_CHARS = 800;
+
+// Limits on the lines kept as features
+const PROFILE_MAX_KEY_LINES = 5;
+const PROFILE_MAX_HEADINGS = 20;
+const PROFILE_MAX_KEYWORDS = 10;
+
+// Words too common to be keywords
+const PROFILE_STOP_WORDS = new Set([
+    'about', 'after', 'also', 'been', 'before', 'being', 'between', 'both', 'could', 'does',
+    'each', 'from', 'have', 'here', 'into', 'more', 'most', 'must', 'only', 'other', 'over',
+    'same', 'shall', 'should', 'some', 'such', 'than', 'that', 'their', 'them', 'then',
+    'there', 'these', 'they', 'this', 'those', 'through', 'under', 'upon', 'very', 'were',
+    'what', 'when', 'where', 'which', 'while', 'will', 'with', 'would', 'your'
+]);
+
+// Content that suggests what a document is about (matched as in the original chip rules)
+const PROFILE_DOMAINS = {
+    finance: ['sales', 'revenue', 'profit', '$'],
+    project: ['project', 'timeline', 'schedule', 'plan'],
+    recommendations: ['recommend', 'conclusion', 'summary']
+};
+
+/**
+ * Check whether a character code is whitespace (as matched by \s)
+ * @param {number} code - UTF-16 code unit
+ * @returns {boolean}
+ */
+function isProfileWhitespace(code) {
+    return code <= 32 ? (code === 32 || (code >= 9 && code <= 13)) :
+        code === 160 || code === 0x1680 || (code >= 0x2000 && code <= 0x200A) ||
+        code === 0x2028 || code === 0x2029 || code === 0x202F || code === 0x205F ||
+        code === 0x3000 || code === 0xFEFF;
+}
+
+/**
+ * Check whether a line stands out as key content for a summary
+ * @param {string} line - Non-empty line
+ * @returns {boolean}
+ */
+function isProfileKeyLine(line) {
+    return line === line.toUpperCase() || // ALL CAPS lines
+        (line.length < 50 && line.length > 10) || // Short lines (potential headings)
+        line.endsWith(':') || // Lines ending with colon
+        /^[A-Z0-9]/.test(line); // Lines starting with capital letter or number
+}
+
+/**
+ * Check whether a line looks like a section heading
+ * @param {string} line - Trimmed line
+ * @returns {boolean}
+ */
+function isProfileHeading(line) {
+    if (line.length < 3 || line.length > 80) return false;
+
+    return /^#{1,6}\s/.test(line) || // Markdown heading
+        /^\d+(\.\d+)*\.?\s+[A-Z]/.test(line) || // Numbered section
+        (/[A-Z]{3}/.test(line) && line === line.toUpperCase()) || // ALL CAPS
+        (line.endsWith(':') && line.length <= 60);
+}
+
+/**
+ * Find the most frequent content words in a text sample
+ * @param {string} sample - Start of the document
+ * @returns {string[]}
+ */
+function getProfileKeywords(sample) {
+    const counts = new Map();
+    const wordRegex = /[a-z][a-z'-]{3,}/g;
+    const lower = sample.toLowerCase();
+    let match;
+
+    while ((match = wordRegex.exec(lower)) !== null) {
+        const word = match[0];
+        if (!PROFILE_STOP_WORDS.has(word)) {
+            counts.set(word, (counts.get(word) || 0) + 1);
+        }
+    }
+
+    return Array.from(counts.entries())
+        .filter(([, count]) => count > 1)
+        .sort((a, b) => b[1] - a[1] || (a[0] < b[0] ? -1 : 1))
+        .slice(0, PROFILE_MAX_KEYWORDS)
+        .map(([word]) => word);
+}
+
+/**
+ * Build the profile of a document
+ * Line and word counts and the key lines come from one pass over the text
+ * @param {string} text - Document text
+ * @returns {Object} - {text, chars, lineCount, nonEmptyLineCount, wordCount, title, preview, keyLines, headings, keywords, domains}
+ */
+function buildDocumentProfile(text) {
+    text = text || '';
+
+    let lineCount = 1;
+    let nonEmptyLineCount = 0;
+    let wordCount = 0;
+    let title = null;
+    const keyLines = [];
+    const headings = [];
+
+    let lineStart = 0;
+    let lineHasContent = false;
+    let inWord = false;
+
+    // Called at the end of each line
+    function endLine(end) {
+        if (!lineHasContent) return;
+        nonEmptyLineCount++;
+
+        // Beyond the sample only the counts are kept (the title is the first non-empty line)
+        if (title !== null && (lineStart >= PROFILE_SAMPLE_CHARS ||
+            (keyLines.length >= PROFILE_MAX_KEY_LINES && headings.length >= PROFILE_MAX_HEADINGS))) {
+            return;
+        }
+
+        const line = text.slice(lineStart, end);
+        if (title === null) title = line;
+        if (keyLines.length < PROFILE_MAX_KEY_LINES && isProfileKeyLine(line)) keyLines.push(line);
+
+        const trimmed = line.trim();
+        if (headings.length < PROFILE_MAX_HEADINGS && isProfileHeading(trimmed)) {
+            headings.push(trimmed.replace(/^#+\s*/, '').replace(/:$/, ''));
+        }
+    }
+
+    for (let i = 0; i < text.length; i++) {
+        const code = text.charCodeAt(i);
+
+        if (code === 10) {
+            endLine(i);
+            lineCount++;
+            lineStart = i + 1;
+            lineHasContent = false;
+            inWord = false;
+        } else if (isProfileWhitespace(code)) {
+            inWord = false;
+        } else {
+            lineHasContent = true;
+            if (!inWord) {
+                wordCount++;
+                inWord = true;
+            }
+        }
+    }
+    endLine(text.length);
+
+    const domains = {};
+    for (const [domain, terms] of Object.entries(PROFILE_DOMAINS)) {
+        domains[domain] = terms.some(term => text.includes(term));
+    }
+
+    return {
+        text,
+        chars: text.length,
+        lineCount,
+        nonEmptyLineCount,
+        wordCount,
+        title: title || 'Untitled Document',
+        preview: text.substring(0, PROFILE_PREVIEW_CHARS),
+        keyLines,
+        headings,
+        keywords: getProfileKeywords(text.substring(0, PROFILE_SAMPLE_CHARS)),
+        domains
+    };
+}
+
+/**
+ * Get a preview of the start of a profiled document
+ * @param {Object} profile - Document profile
+ * @param {number} length - Maximum characters
+ * @returns {string}
+ */
+function getProfilePreview(profile, length) {
+    return profile.preview.substring(0, length) + (profile.chars > length ? '...' : '');
+}
+
+/**
+ * Make a profile the one used for the current document
+ * @param {Object|null} profile - Profile from buildDocumentProfile
+ */
+function setActiveDocumentProfile(profile) {
+    activeDocumentProfile = profile;
+}
+
+/**
+ * Get the profile of a document text
+ * Returns the active profile when it belongs to this text, otherwise builds one
+ * @param {string} text - Document text
+ * @returns {Object}
+ */
+function getDocumentProfile(text) {
+    if (activeDocumentProfile && activeDocumentProfile.text === text) {
+        return activeDocumentProfile;
+    }
+    return buildDocumentProfile(text);
+}
+
+// Make functions globally available
+window.buildDocumentProfile = buildDocumentProfile;
+window.setActiveDocumentProfile = setActiveDocumentProfile;
+window.getDocumentProfile = getDocumentProfile;
+window.getProfilePreview = getProfilePreview;
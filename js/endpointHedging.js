@@ -0,0 +1,424 @@
+/**
+ * Endpoint Hedging Module
+ * Sends chat requests to a list of OpenAI-compatible endpoints
+ * (LLM_CONFIG.openai.endpoints). The request goes to the endpoint with the
+ * best recent latency; if no token has streamed back by that endpoint's
+ * adaptive p95 time to first token, the next endpoint is asked as well. The
+ * first answer wins and the other request is aborted. Time to first token is
+ * kept per endpoint in a log-scale histogram in localStorage, next to counts
+ * of failed requests and of requests that lost the race without a token.
+ */
+
+const ENDPOINT_LATENCY_KEY = 'endpoint_latency';
+
+// Histogram buckets: upper bounds growing by 25% from 100ms (the last is about 90s)
+const LATENCY_BUCKET_BASE = 100;
+const LATENCY_BUCKET_GROWTH = 1.25;
+const LATENCY_BUCKET_COUNT = 32;
+
+// Histograms are halved once they hold this many samples, so old latency fades out
+const LATENCY_HISTORY_LIMIT = 200;
+
+/**
+ * Get hedging settings with defaults
+ * @returns {{enabled: boolean, percentile: number, minDelayMs: number, maxDelayMs: number, defaultDelayMs: number, minSamples: number}}
+ */
+function getHedgingSettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.openai.hedging) || {};
+    return {
+        enabled: settings.enabled !== false,
+        percentile: settings.percentile || 0.95,
+        minDelayMs: settings.minDelayMs || 1000,
+        maxDelayMs: settings.maxDelayMs || 15000,
+        defaultDelayMs: settings.defaultDelayMs || 5000,
+        minSamples: settings.minSamples || 10
+    };
+}
+
+/**
+ * Get the configured chat endpoints
+ * Entries of LLM_CONFIG.openai.endpoints inherit apiUrl, apiKey and model
+ * from LLM_CONFIG.openai; without a list the single configured endpoint is used.
+ * @returns {{name: string, apiUrl: string, apiKey: string, model: string}[]}
+ */
+function getChatEndpoints() {
+    const openai = LLM_CONFIG.openai;
+    const defaults = {
+        apiUrl: openai.apiUrl || 'https://api.openai.com/v1/chat/completions',
+        apiKey: openai.apiKey,
+        model: openai.model || 'gpt-3.5-turbo'
+    };
+    const list = Array.isArray(openai.endpoints) && openai.endpoints.length ? openai.endpoints : [{}];
+
+    return list.map(entry => {
+        const endpoint = { ...defaults, ...entry };
+        endpoint.name = entry.name || `${endpoint.model} @ ${new URL(endpoint.apiUrl, 'https://localhost').host}`;
+        return endpoint;
+    });
+}
+
+/**
+ * Check whether requests are hedged across several endpoints
+ * @returns {boolean}
+ */
+function isEndpointHedgingEnabled() {
+    return getHedgingSettings().enabled && getChatEndpoints().length > 1;
+}
+
+/**
+ * Load the latency histograms of all endpoints
+ * @returns {Object<string, {buckets: number[], errors: number, timeouts: number}>} - By endpoint name
+ */
+function loadLatencyHistograms() {
+    try {
+        return JSON.parse(localStorage.getItem(ENDPOINT_LATENCY_KEY) || '{}');
+    } catch (e) {
+        return {};
+    }
+}
+
+/**
+ * Get the latency histogram of an endpoint
+ * @param {Object} histograms - All histograms
+ * @param {string} name - Endpoint name
+ * @returns {{buckets: number[], errors: number, timeouts: number}}
+ */
+function getLatencyHistogram(histograms, name) {
+    if (!histograms[name]) {
+        histograms[name] = { buckets: new Array(LATENCY_BUCKET_COUNT).fill(0), errors: 0, timeouts: 0 };
+    }
+    // Histograms saved before timeouts were counted
+    histograms[name].timeouts = histograms[name].timeouts || 0;
+    return histograms[name];
+}
+
+/**
+ * Get the histogram bucket of a latency
+ * @param {number} latencyMs - Time to first token
+ * @returns {number}
+ */
+function getLatencyBucket(latencyMs) {
+    if (latencyMs <= LATENCY_BUCKET_BASE) return 0;
+    const bucket = Math.ceil(Math.log(latencyMs / LATENCY_BUCKET_BASE) / Math.log(LATENCY_BUCKET_GROWTH));
+    return Math.min(bucket, LATENCY_BUCKET_COUNT - 1);
+}
+
+/**
+ * Record the outcome of a request to an endpoint
+ * Its time to first token, 'error' for a failed request, or 'timeout' for a
+ * request aborted before its first token because another endpoint answered.
+ * A timeout only says the first token would have come later than the wait,
+ * so it is counted apart from the latency samples instead of as one.
+ * @param {string} name - Endpoint name
+ * @param {number|string} outcome - Time to first token (ms), 'error' or 'timeout'
+ */
+function recordEndpointLatency(name, outcome) {
+    const histograms = loadLatencyHistograms();
+    const histogram = getLatencyHistogram(histograms, name);
+
+    if (outcome === 'error') {
+        histogram.errors++;
+    } else if (outcome === 'timeout') {
+        histogram.timeouts++;
+    } else {
+        histogram.buckets[getLatencyBucket(outcome)]++;
+    }
+
+    const total = histogram.buckets.reduce((sum, count) => sum + count, 0) + histogram.errors + histogram.timeouts;
+    if (total > LATENCY_HISTORY_LIMIT) {
+        histogram.buckets = histogram.buckets.map(count => count >> 1);
+        histogram.errors >>= 1;
+        histogram.timeouts >>= 1;
+    }
+
+    try {
+        localStorage.setItem(ENDPOINT_LATENCY_KEY, JSON.stringify(histograms));
+    } catch (e) {
+        // Hedging falls back to the default delay without history
+    }
+}
+
+/**
+ * Get the latency below which a share of an endpoint's first tokens arrived
+ * @param {{buckets: number[]}} histogram - Latency histogram
+ * @param {number} percentile - Share, e.g. 0.95
+ * @returns {number|null} - Bucket upper bound (ms), null without samples
+ */
+function getLatencyPercentile(histogram, percentile) {
+    const total = histogram.buckets.reduce((sum, count) => sum + count, 0);
+    if (total === 0) return null;
+
+    const target = Math.ceil(total * percentile);
+    let seen = 0;
+    for (let i = 0; i < histogram.buckets.length; i++) {
+        seen += histogram.buckets[i];
+        if (seen >= target) return LATENCY_BUCKET_BASE * Math.pow(LATENCY_BUCKET_GROWTH, i);
+    }
+    return null;
+}
+
+/**
+ * Get the latency statistics of every configured endpoint
+ * @returns {{name: string, samples: number, errors: number, timeouts: number, p50: number|null, p95: number|null}[]}
+ */
+function getEndpointLatencyStats() {
+    const histograms = loadLatencyHistograms();
+    const settings = getHedgingSettings();
+
+    return getChatEndpoints().map(endpoint => {
+        const histogram = getLatencyHistogram(histograms, endpoint.name);
+        return {
+            name: endpoint.name,
+            samples: histogram.buckets.reduce((sum, count) => sum + count, 0),
+            errors: histogram.errors,
+            timeouts: histogram.timeouts,
+            p50: getLatencyPercentile(histogram, 0.5),
+            p95: getLatencyPercentile(histogram, settings.percentile)
+        };
+    });
+}
+
+/**
+ * Order endpoints by expected time to first token
+ * Endpoints with too few samples keep their configured order ahead of the
+ * measured ones, so every endpoint gets measured; errors and lost races
+ * without a first token count as a maxDelayMs wait.
+ * @returns {{endpoint: Object, hedgeDelayMs: number}[]}
+ */
+function rankChatEndpoints() {
+    const settings = getHedgingSettings();
+    const stats = getEndpointLatencyStats();
+
+    const ranked = getChatEndpoints().map((endpoint, index) => {
+        const stat = stats[index];
+        const measured = stat.samples >= settings.minSamples;
+        const attempts = stat.samples + stat.errors + stat.timeouts;
+        const errorShare = attempts ? (stat.errors + stat.timeouts) / attempts : 0;
+        const hedgeDelayMs = measured ?
+            Math.min(settings.maxDelayMs, Math.max(settings.minDelayMs, stat.p95)) :
+            settings.defaultDelayMs;
+
+        return {
+            endpoint,
+            hedgeDelayMs,
+            measured,
+            score: measured ? stat.p50 * (1 - errorShare) + settings.maxDelayMs * errorShare : index
+        };
+    });
+
+    ranked.sort((a, b) => (a.measured - b.measured) || (a.score - b.score));
+    return ranked;
+}
+
+/**
+ * Read a streamed chat completion
+ * @param {Response} response - Response of a streaming request
+ * @param {Function} onFirstToken - Called when the first content arrives
+ * @returns {Promise<{content: string, usage: Object|null}>}
+ */
+async function readChatStream(response, onFirstToken) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let content = '';
+    let usage = null;
+    let started = false;
+
+    for (;;) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(0), { stream: !done });
+
+        // Server-sent events, one "data:" line per chunk
+        const lines = buffer.split('\n');
+        buffer = done ? '' : lines.pop();
+
+        for (const line of lines) {
+            const payload = line.trim();
+            if (!payload.startsWith('data:')) continue;
+            const data = payload.substring(5).trim();
+            if (data === '[DONE]') continue;
+
+            const chunk = JSON.parse(data);
+            if (chunk.usage) usage = chunk.usage;
+            const delta = chunk.choices && chunk.choices[0] && chunk.choices[0].delta;
+            if (delta && delta.content) {
+                if (!started) {
+                    started = true;
+                    onFirstToken();
+                }
+                content += delta.content;
+            }
+        }
+
+        if (done) break;
+    }
+
+    return { content, usage };
+}
+
+/**
+ * Send a streaming chat request to one endpoint
+ * @param {Object} endpoint - Chat endpoint
+ * @param {{role: string, content: string}[]} messages - Chat messages
+ * @param {number} maxTokens - Completion limit
+ * @param {AbortSignal} signal - Cancels the request
+ * @param {Function} onFirstToken - Called when the first content arrives
+ * @returns {Promise<{content: string, usage: Object|null}>}
+ */
+async function sendStreamingChatRequest(endpoint, messages, maxTokens, signal, onFirstToken) {
+    const response = await fetch(endpoint.apiUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${endpoint.apiKey}`
+        },
+        body: JSON.stringify({
+            model: endpoint.model,
+            messages: messages,
+            temperature: LLM_CONFIG.openai.temperature || 0.3,
+            max_tokens: maxTokens,
+            stream: true,
+            stream_options: { include_usage: true }
+        }),
+        signal
+    });
+
+    if (!response.ok) {
+        const errorText = await response.text();
+        let errorMessage;
+        try {
+            const errorJson = JSON.parse(errorText);
+            errorMessage = errorJson.error?.message || `${endpoint.name} responded with status ${response.status}`;
+        } catch (e) {
+            errorMessage = `${endpoint.name} responded with status ${response.status}: ${errorText.substring(0, 100)}`;
+        }
+        throw new Error(errorMessage);
+    }
+
+    return readChatStream(response, onFirstToken);
+}
+
+/**
+ * Send chat messages to the best endpoint, hedged by the next one
+ * The next endpoint is also asked when the current one fails, or when it has
+ * not streamed a token within its p95 time to first token. The first complete
+ * answer is returned and the other requests are aborted.
+ * @param {{role: string, content: string}[]} messages - Chat messages
+ * @param {Object} [options] - {maxTokens} to override the configured limit, {signal} to cancel
+ * @returns {Promise<{content: string, usage: Object|null, latencyMs: number, endpoint: string, hedged: boolean}>}
+ */
+function requestHedgedCompletion(messages, options = {}) {
+    const ranked = rankChatEndpoints();
+    const maxTokens = options.maxTokens || LLM_CONFIG.openai.maxTokens || 800;
+    const startTime = performance.now();
+
+    return new Promise((resolve, reject) => {
+        const attempts = [];
+        let settled = false;
+        let hedgeTimer = null;
+        let lastError = null;
+
+        // lostRace: another endpoint answered, so requests still waiting for
+        // their first token are recorded as timeouts (not when the caller aborts)
+        const finish = (lostRace) => {
+            settled = true;
+            clearTimeout(hedgeTimer);
+            if (options.signal) options.signal.removeEventListener('abort', onAbort);
+            for (const attempt of attempts) {
+                if (!attempt.done) {
+                    attempt.controller.abort();
+                    if (lostRace && attempt.firstTokenMs === null) {
+                        recordEndpointLatency(attempt.endpoint.name, 'timeout');
+                    }
+                }
+            }
+        };
+
+        const onAbort = () => {
+            if (settled) return;
+            finish(false);
+            reject(new DOMException('The request was aborted', 'AbortError'));
+        };
+
+        const startNext = () => {
+            clearTimeout(hedgeTimer);
+            if (settled || attempts.length >= ranked.length) return;
+
+            const { endpoint, hedgeDelayMs } = ranked[attempts.length];
+            const attempt = {
+                endpoint,
+                controller: new AbortController(),
+                startTime: performance.now(),
+                firstTokenMs: null,
+                done: false
+            };
+            attempts.push(attempt);
+
+            if (attempts.length > 1) {
+                console.log(`Hedging request to ${endpoint.name}`);
+                // The hedge is a request of its own
+                if (typeof apiUsageMonitor !== 'undefined' && typeof apiUsageMonitor.recordAPICall === 'function') {
+                    apiUsageMonitor.recordAPICall();
+                }
+            }
+
+            const onFirstToken = () => {
+                attempt.firstTokenMs = performance.now() - attempt.startTime;
+                recordEndpointLatency(endpoint.name, attempt.firstTokenMs);
+                // Streaming in time: no hedge needed
+                if (attempt === attempts[attempts.length - 1]) clearTimeout(hedgeTimer);
+            };
+
+            sendStreamingChatRequest(endpoint, messages, maxTokens, attempt.controller.signal, onFirstToken)
+                .then(result => {
+                    attempt.done = true;
+                    if (settled) return;
+                    finish(true);
+                    resolve({
+                        content: result.content,
+                        usage: result.usage,
+                        latencyMs: performance.now() - startTime,
+                        endpoint: endpoint.name,
+                        hedged: attempts.length > 1
+                    });
+                })
+                .catch(error => {
+                    attempt.done = true;
+                    if (settled) return;
+                    console.warn(`Chat request to ${endpoint.name} failed:`, error.message);
+                    recordEndpointLatency(endpoint.name, 'error');
+                    lastError = error;
+
+                    // Fail over at once; give up when no request is left
+                    if (attempts.length < ranked.length) {
+                        startNext();
+                    } else if (attempts.every(other => other.done)) {
+                        finish(false);
+                        reject(lastError);
+                    }
+                });
+
+            if (attempts.length < ranked.length) {
+                hedgeTimer = setTimeout(() => {
+                    if (attempt.firstTokenMs === null) startNext();
+                }, hedgeDelayMs);
+            }
+        };
+
+        if (options.signal) {
+            if (options.signal.aborted) {
+                reject(new DOMException('The request was aborted', 'AbortError'));
+                return;
+            }
+            options.signal.addEventListener('abort', onAbort);
+        }
+
+        startNext();
+    });
+}
+
+// Make functions globally available
+window.getChatEndpoints = getChatEndpoints;
+window.isEndpointHedgingEnabled = isEndpointHedgingEnabled;
+window.getEndpointLatencyStats = getEndpointLatencyStats;
+window.requestHedgedCompletion = requestHedgedCompletion;
@@ -0,0 +1,370 @@
+/**
+ * Entity Index Module
+ * Monetary amounts, percentages, dates and quarter references found in a
+ * document at extraction, with their positions and normalized values in
+ * typed arrays. Entities of each kind are also sorted by value, so questions
+ * such as "largest revenue figure" or "all amounts over $100k" are answered
+ * by a binary search and a range scan instead of an LLM call.
+ */
+
+// Index of the document questions are asked about
+let activeEntityIndex = null;
+
+// Entity kinds, in the order of their segments in the sorted index
+const ENTITY_KINDS = ['amount', 'percent', 'date', 'quarter'];
+const ENTITY_LABELS = { amount: 'amounts', percent: 'percentages', date: 'dates', quarter: 'quarter references' };
+
+const ENTITY_MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'];
+const ENTITY_MONTH_NAMES = 'jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?';
+const ENTITY_SCALES = { k: 1e3, thousand: 1e3, m: 1e6, mm: 1e6, million: 1e6, b: 1e9, bn: 1e9, billion: 1e9 };
+const ENTITY_ORDINALS = { first: 1, second: 2, third: 3, fourth: 4 };
+
+// Patterns for each kind (the number and unit are captured)
+const ENTITY_PATTERNS = {
+    amount: /(?:[$€£]\s?(\d[\d,]*(?:\.\d+)?)(?:\s?(k|mm|m|bn|b|thousand|million|billion)\b)?|\b(\d[\d,]*(?:\.\d+)?)\s?(thousand|million|billion)?\s?(?:usd|dollars|eur|euros|gbp)\b)/gi,
+    percent: /(?<![\w.])([-+]?\d+(?:\.\d+)?)\s?(?:%|percent\b|per cent\b)/gi,
+    date: new RegExp(`\\b(?:(\\d{4})-(\\d{1,2})-(\\d{1,2})|(\\d{1,2})/(\\d{1,2})/(\\d{4})|(${ENTITY_MONTH_NAMES})\\.?\\s+(?:(\\d{1,2})(?:st|nd|rd|th)?,?\\s+)?(\\d{4})|(\\d{1,2})\\s+(${ENTITY_MONTH_NAMES})\\.?\\s+(\\d{4}))\\b`, 'gi'),
+    quarter: /\b(?:q([1-4])|(first|second|third|fourth)\s+quarter)(?:\s*(?:of\s+)?(?:fy\s?)?['’]?(\d{4}|\d{2}(?!\d)))?\b/gi
+};
+
+// Words of a question that select entities (as opposed to topic words)
+// Nouns that make a question about the entities themselves
+const ENTITY_NOUNS = {
+    amount: '(?:amounts?|dollars?|money|sums|figures?)',
+    percent: '(?:percent(?:age)?s?)',
+    date: '(?:dates?|deadlines?)',
+    quarter: '(?:quarters?|q[1-4])'
+};
+
+const ENTITY_QUESTION_WORDS = new Set([
+    'what', 'which', 'is', 'are', 'was', 'were', 'the', 'a', 'an', 'of', 'in', 'on', 'for', 'all', 'any', 'list',
+    'show', 'me', 'find', 'every', 'each', 'how', 'many', 'there', 'document', 'this', 'and', 'or', 'than', 'to',
+    'figure', 'figures', 'amount', 'amounts', 'number', 'numbers', 'value', 'values', 'dollar', 'dollars',
+    'percent', 'percentage', 'percentages', 'date', 'dates', 'quarter', 'quarters', 'reference', 'references',
+    'mentioned', 'largest', 'highest', 'biggest', 'maximum', 'max', 'top', 'most', 'recent', 'smallest', 'lowest',
+    'minimum', 'min', 'earliest', 'latest', 'over', 'above', 'more', 'greater', 'exceeding', 'under',
+    'below', 'less', 'fewer', 'at', 'between', 'before', 'after', 'since', 'until', 'by', 'k', 'm', 'bn', 'million',
+    'thousand', 'billion', 'usd', 'money', 'deadline', 'deadlines', 'sum', 'sums'
+]);
+
+/**
+ * Get entity index settings with defaults
+ * @returns {{maxTextChars: number, maxListed: number}}
+ */
+function getEntitySettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.entities) || {};
+    return {
+        maxTextChars: settings.maxTextChars || 32 * 1024 * 1024,
+        maxListed: settings.maxListed || 10
+    };
+}
+
+/**
+ * Parse a number with thousands separators and an optional scale word
+ * @param {string} digits - Number text, e.g. "1,250.5"
+ * @param {string} [scale] - k, m, million, ...
+ * @returns {number}
+ */
+function parseEntityNumber(digits, scale) {
+    const value = parseFloat(digits.replace(/,/g, ''));
+    return scale ? value * (ENTITY_SCALES[scale.toLowerCase()] || 1) : value;
+}
+
+/**
+ * Get the month number of a month name
+ * @param {string} name - Month name or abbreviation
+ * @returns {number} - 0-11
+ */
+function getEntityMonth(name) {
+    return ENTITY_MONTHS.indexOf(name.substring(0, 3).toLowerCase());
+}
+
+/**
+ * Normalize a match of one of the ENTITY_PATTERNS
+ * Dates become UTC milliseconds; quarters become year * 10 + quarter
+ * (just the quarter when no year is given)
+ * @param {string} kind - Entity kind
+ * @param {Array} match - Regex match
+ * @returns {number} - Value, or NaN when the match is not a valid entity
+ */
+function getEntityValue(kind, match) {
+    if (kind === 'amount') {
+        return match[1] !== undefined ? parseEntityNumber(match[1], match[2]) : parseEntityNumber(match[3], match[4]);
+    }
+    if (kind === 'percent') {
+        return parseFloat(match[1]);
+    }
+    if (kind === 'quarter') {
+        const quarter = match[1] ? parseInt(match[1], 10) : ENTITY_ORDINALS[match[2].toLowerCase()];
+        if (!match[3]) return quarter;
+        const year = match[3].length === 2 ? 2000 + parseInt(match[3], 10) : parseInt(match[3], 10);
+        return year * 10 + quarter;
+    }
+
+    let year, month, day;
+    if (match[1]) {
+        [year, month, day] = [+match[1], +match[2] - 1, +match[3]];
+    } else if (match[4]) {
+        [year, month, day] = [+match[6], +match[4] - 1, +match[5]];
+    } else if (match[7]) {
+        [year, month, day] = [+match[9], getEntityMonth(match[7]), match[8] ? +match[8] : 1];
+    } else {
+        [year, month, day] = [+match[12], getEntityMonth(match[11]), +match[10]];
+    }
+    if (month < 0 || month > 11 || day < 1 || day > 31) return NaN;
+    return Date.UTC(year, month, day);
+}
+
+/**
+ * Build the entity index of a document
+ * @param {string} text - Document text
+ * @returns {Object|null} - Index, or null when the text is longer than maxTextChars
+ */
+function buildEntityIndex(text) {
+    text = text || '';
+    if (text.length > getEntitySettings().maxTextChars) return null;
+
+    const found = [];
+    ENTITY_KINDS.forEach((kind, kindId) => {
+        const pattern = ENTITY_PATTERNS[kind];
+        pattern.lastIndex = 0;
+        let match;
+        while ((match = pattern.exec(text)) !== null) {
+            const value = getEntityValue(kind, match);
+            if (!Number.isNaN(value)) {
+                found.push({ kind: kindId, value, offset: match.index, length: match[0].length });
+            }
+        }
+    });
+
+    // Entities in document order, and a permutation sorted by kind, then value
+    found.sort((a, b) => a.offset - b.offset || a.kind - b.kind);
+    const count = found.length;
+    const kinds = new Uint8Array(count);
+    const values = new Float64Array(count);
+    const offsets = new Int32Array(count);
+    const lengths = new Uint16Array(count);
+    found.forEach((entity, i) => {
+        kinds[i] = entity.kind;
+        values[i] = entity.value;
+        offsets[i] = entity.offset;
+        lengths[i] = Math.min(entity.length, 65535);
+    });
+
+    const order = new Int32Array(count);
+    for (let i = 0; i < count; i++) order[i] = i;
+    order.sort((a, b) => kinds[a] - kinds[b] || values[a] - values[b] || a - b);
+
+    const kindStart = new Int32Array(ENTITY_KINDS.length + 1);
+    for (let i = 0; i < count; i++) kindStart[kinds[i] + 1]++;
+    for (let k = 0; k < ENTITY_KINDS.length; k++) kindStart[k + 1] += kindStart[k];
+
+    return { text, count, kinds, values, offsets, lengths, order, kindStart };
+}
+
+/**
+ * Find the entities of a kind with a value in a range (range scan)
+ * @param {Object} index - Result of buildEntityIndex
+ * @param {string} kind - Entity kind
+ * @param {number} [min=-Infinity] - Smallest value (inclusive)
+ * @param {number} [max=Infinity] - Largest value (inclusive)
+ * @returns {Int32Array} - Entity ids, by ascending value
+ */
+function scanEntityRange(index, kind, min = -Infinity, max = Infinity) {
+    const { order, values, kindStart } = index;
+    const kindId = ENTITY_KINDS.indexOf(kind);
+
+    // First entity of the segment with value >= min
+    let low = kindStart[kindId];
+    let high = kindStart[kindId + 1];
+    while (low < high) {
+        const middle = (low + high) >>> 1;
+        if (values[order[middle]] < min) low = middle + 1;
+        else high = middle;
+    }
+
+    let end = low;
+    while (end < kindStart[kindId + 1] && values[order[end]] <= max) end++;
+    return order.subarray(low, end);
+}
+
+/**
+ * Get the line an entity occurs on
+ * @param {Object} index - Result of buildEntityIndex
+ * @param {number} id - Entity id
+ * @returns {string}
+ */
+function getEntityLine(index, id) {
+    const offset = index.offsets[id];
+    const start = index.text.lastIndexOf('\n', offset - 1) + 1;
+    let end = index.text.indexOf('\n', offset);
+    if (end === -1) end = index.text.length;
+    return index.text.slice(start, end).trim();
+}
+
+/**
+ * Parse an amount, percentage or date given as a bound in a question
+ * @param {string} kind - Entity kind
+ * @param {string} text - Text following "over", "before", ...
+ * @returns {number} - Normalized value or NaN
+ */
+function parseEntityBound(kind, text) {
+    if (kind === 'date') {
+        const pattern = ENTITY_PATTERNS.date;
+        pattern.lastIndex = 0;
+        const match = pattern.exec(text);
+        if (match && match.index === 0) return getEntityValue('date', match);
+        const year = text.match(/^(\d{4})\b/);
+        return year ? Date.UTC(+year[1], 0, 1) : NaN;
+    }
+    if (kind === 'quarter') {
+        const pattern = ENTITY_PATTERNS.quarter;
+        pattern.lastIndex = 0;
+        const match = pattern.exec(text);
+        return match && match.index === 0 && match[3] ? getEntityValue('quarter', match) : NaN;
+    }
+
+    const match = text.match(/^[$€£]?\s?(\d[\d,]*(?:\.\d+)?)\s?(k|mm|m|bn|b|thousand|million|billion)?\b/i);
+    return match ? parseEntityNumber(match[1], match[2]) : NaN;
+}
+
+/**
+ * Format an entity value for an answer
+ * @param {Object} index - Result of buildEntityIndex
+ * @param {number} id - Entity id
+ * @returns {string}
+ */
+function formatEntity(index, id) {
+    return index.text.substr(index.offsets[id], index.lengths[id]).replace(/\s+/g, ' ');
+}
+
+/**
+ * Answer a question about the amounts, percentages, dates or quarters of
+ * the current document from the entity index
+ * @param {string} query - The user's question
+ * @param {Object} [index] - Entity index (defaults to the current document's)
+ * @returns {string|null} - Markdown answer, or null when the question isn't one the index answers
+ */
+function answerEntityQuestion(query, index = activeEntityIndex) {
+    if (!index || index.count === 0) return null;
+
+    const queryLower = query.toLowerCase();
+    const start = performance.now();
+
+    // Kind: from a literal bound ("over $100k", "above 10%") or an entity noun;
+    // topic words alone ("sales", "revenue") leave the question to the LLM
+    let kind = null;
+    if (/[$€£]\s?\d|\d\s?(k|m|bn)\b/.test(queryLower)) kind = 'amount';
+    else if (/\d\s?%/.test(queryLower)) kind = 'percent';
+    else kind = ENTITY_KINDS.find(candidate => new RegExp(`\\b${ENTITY_NOUNS[candidate]}\\b`).test(queryLower)) || null;
+    if (!kind) return null;
+
+    // A superlative or list word must apply to the entities ("largest amounts",
+    // "all revenue figures"), not to something else ("top sales person")
+    const appliesToEntities = (words) =>
+        new RegExp(`\\b(?:${words})\\s+(?:(?:the|of the)\\s+)?(?:[a-z]+\\s+)?${ENTITY_NOUNS[kind]}\\b`).test(queryLower);
+
+    // Operation: a superlative, a range or a list
+    let min = -Infinity;
+    let max = Infinity;
+    let sort = 'document';
+    let title;
+    let limit = getEntitySettings().maxListed;
+    let showSum = kind === 'amount';
+
+    const between = queryLower.match(/\bbetween\s+(.+?)\s+and\s+(.+)$/);
+    const lower = queryLower.match(/\b(?:over|above|more than|greater than|exceeding|at least|after|since)\s+(.+)$/);
+    const upper = queryLower.match(/\b(?:under|below|less than|fewer than|at most|before|until)\s+(.+)$/);
+
+    if (between) {
+        min = parseEntityBound(kind, between[1]);
+        max = parseEntityBound(kind, between[2]);
+        sort = 'ascending';
+        title = `${ENTITY_LABELS[kind]} between ${between[1]} and ${between[2].replace(/\?$/, '')}`;
+    } else if (lower) {
+        min = parseEntityBound(kind, lower[1]);
+        sort = 'descending';
+        title = `${ENTITY_LABELS[kind]} from ${lower[1].replace(/\?$/, '')}`;
+    } else if (upper) {
+        max = parseEntityBound(kind, upper[1]);
+        sort = 'ascending';
+        title = `${ENTITY_LABELS[kind]} up to ${upper[1].replace(/\?$/, '')}`;
+    } else if (appliesToEntities('largest|highest|biggest|max(?:imum)?|top|latest|most recent')) {
+        sort = 'descending';
+        limit = 5;
+        showSum = false;
+        title = kind === 'date' || kind === 'quarter' ? `Latest ${ENTITY_LABELS[kind]}` : `Largest ${ENTITY_LABELS[kind]}`;
+    } else if (appliesToEntities('smallest|lowest|min(?:imum)?|earliest')) {
+        sort = 'ascending';
+        limit = 5;
+        showSum = false;
+        title = kind === 'date' || kind === 'quarter' ? `Earliest ${ENTITY_LABELS[kind]}` : `Smallest ${ENTITY_LABELS[kind]}`;
+    } else if (appliesToEntities('all|list|every|how many')) {
+        title = `All ${ENTITY_LABELS[kind]}`;
+    } else {
+        return null;
+    }
+    if (Number.isNaN(min) || Number.isNaN(max)) return null;
+
+    let ids = Array.from(scanEntityRange(index, kind, min, max));
+
+    // "Q4" without a year matches the fourth quarter of any year
+    const quarterMatch = kind === 'quarter' && !lower && !upper && !between ? queryLower.match(/\bq([1-4])\b/) : null;
+    if (quarterMatch) {
+        ids = ids.filter(id => index.values[id] % 10 === +quarterMatch[1]);
+        title = `References to Q${quarterMatch[1]}`;
+    }
+
+    // Topic words ("revenue") keep the entities on lines that mention them;
+    // when no line does, the question is about something the index can't see
+    const monthPattern = new RegExp(`^(?:${ENTITY_MONTH_NAMES})$`);
+    const topicWords = (queryLower.replace(/\bq[1-4]\b/g, ' ').match(/[a-z]{3,}/g) || [])
+        .filter(word => !ENTITY_QUESTION_WORDS.has(word) && !monthPattern.test(word));
+    let topicNote = '';
+    if (topicWords.length > 0) {
+        ids = ids.filter(id => {
+            const line = getEntityLine(index, id).toLowerCase();
+            return topicWords.some(word => line.includes(word.replace(/s$/, '')));
+        });
+        if (ids.length === 0) return null;
+        topicNote = ` on lines mentioning ${topicWords.map(word => `"${word}"`).join(' or ')}`;
+    }
+
+    if (sort === 'descending') ids.reverse();
+    else if (sort === 'document') ids.sort((a, b) => a - b);
+
+    const milliseconds = performance.now() - start;
+    const heading = title.charAt(0).toUpperCase() + title.slice(1);
+    if (ids.length === 0) {
+        return `## ${heading}\n\nNo ${ENTITY_LABELS[kind]} in the document match this question.\n\n` +
+            `Searched ${index.kindStart[ENTITY_KINDS.indexOf(kind) + 1] - index.kindStart[ENTITY_KINDS.indexOf(kind)]} ${ENTITY_LABELS[kind]} found in the document.`;
+    }
+
+    const shown = ids.slice(0, limit);
+    let total = '';
+    if (showSum && ids.length > 1) {
+        const sum = ids.reduce((acc, id) => acc + index.values[id], 0);
+        total = `\n\nSum of the ${ids.length} matching amounts: **${sum.toLocaleString()}**`;
+    }
+
+    return `## ${heading}\n\n` +
+        `Found ${ids.length} ${ENTITY_LABELS[kind]}${topicNote}:\n\n` +
+        shown.map((id, i) => `${i + 1}. **${formatEntity(index, id)}** — ${getEntityLine(index, id).substring(0, 160)}`).join('\n') +
+        (ids.length > shown.length ? `\n\n...and ${ids.length - shown.length} more.` : '') +
+        total +
+        `\n\nAnswered locally from the document's entity index in ${milliseconds.toFixed(1)} ms.`;
+}
+
+/**
+ * Make an index the one used for the current document
+ * @param {Object|null} index - Result of buildEntityIndex
+ */
+function setActiveEntityIndex(index) {
+    activeEntityIndex = index;
+}
+
+// Make functions globally available
+window.buildEntityIndex = buildEntityIndex;
+window.scanEntityRange = scanEntityRange;
+window.answerEntityQuestion = answerEntityQuestion;
+window.setActiveEntityIndex = setActiveEntityIndex;
@@ -0,0 +1,139 @@
+/**
+ * File Sniffer Module
+ * Detects the real format of an uploaded file from its first bytes so the
+ * right extractor runs first, regardless of the file extension
+ */
+
+// Number of leading bytes inspected for text detection
+const SNIFF_SAMPLE_SIZE = 4096;
+
+/**
+ * Check whether bytes start with a given signature
+ * @param {Uint8Array} bytes - File bytes
+ * @param {number[]} signature - Expected leading bytes
+ * @param {number} [offset=0] - Offset to compare at
+ * @returns {boolean}
+ */
+function startsWithBytes(bytes, signature, offset = 0) {
+    if (bytes.length < offset + signature.length) return false;
+
+    for (let i = 0; i < signature.length; i++) {
+        if (bytes[offset + i] !== signature[i]) return false;
+    }
+    return true;
+}
+
+/**
+ * Find a signature within the first bytes of a file
+ * PDF files may have junk before the %PDF header (allowed up to 1 KB)
+ * @param {Uint8Array} bytes - File bytes
+ * @param {number[]} signature - Bytes to find
+ * @param {number} limit - Last offset to check
+ * @returns {boolean}
+ */
+function containsBytesNearStart(bytes, signature, limit) {
+    const end = Math.min(limit, bytes.length - signature.length);
+    for (let offset = 0; offset <= end; offset++) {
+        if (startsWithBytes(bytes, signature, offset)) return true;
+    }
+    return false;
+}
+
+/**
+ * Detect the format of a file from its content
+ * @param {ArrayBuffer} arrayBuffer - File content
+ * @returns {{format: string, encoding: string|null}} - format is one of
+ *          'pdf', 'zip', 'ole', 'text' or 'unknown'; encoding is set for text
+ */
+function sniffFileType(arrayBuffer) {
+    const bytes = new Uint8Array(arrayBuffer, 0, Math.min(SNIFF_SAMPLE_SIZE, arrayBuffer.byteLength));
+
+    // %PDF
+    if (containsBytesNearStart(bytes, [0x25, 0x50, 0x44, 0x46], 1024)) {
+        return { format: 'pdf', encoding: null };
+    }
+
+    // PK\x03\x04 (DOCX, XLSX and other Office Open XML files)
+    if (startsWithBytes(bytes, [0x50, 0x4B, 0x03, 0x04])) {
+        return { format: 'zip', encoding: null };
+    }
+
+    // OLE compound file (Word 97-2003 .doc, legacy .xls)
+    if (startsWithBytes(bytes, [0xD0, 0xCF, 0x11, 0xE0, 0xA1, 0xB1, 0x1A, 0xE1])) {
+        return { format: 'ole', encoding: null };
+    }
+
+    // Byte order marks
+    if (startsWithBytes(bytes, [0xEF, 0xBB, 0xBF])) {
+        return { format: 'text', encoding: 'utf-8' };
+    }
+    if (startsWithBytes(bytes, [0xFF, 0xFE])) {
+        return { format: 'text', encoding: 'utf-16le' };
+    }
+    if (startsWithBytes(bytes, [0xFE, 0xFF])) {
+        return { format: 'text', encoding: 'utf-16be' };
+    }
+
+    const encoding = detectTextEncoding(bytes);
+    return encoding ? { format: 'text', encoding } : { format: 'unknown', encoding: null };
+}
+
+/**
+ * Detect whether a byte sample is text and which encoding it uses
+ * @param {Uint8Array} bytes - Leading bytes of the file
+ * @returns {string|null} - 'utf-8', 'utf-16le', 'utf-16be', 'windows-1252' or null for binary content
+ */
+function detectTextEncoding(bytes) {
+    if (bytes.length === 0) return 'utf-8';
+
+    // UTF-16 without a byte order mark: mostly-ASCII text has a NUL in every other byte
+    const utf16 = detectUtf16WithoutBom(bytes);
+    if (utf16) return utf16;
+
+    let controlBytes = 0;
+    for (let i = 0; i < bytes.length; i++) {
+        const byte = bytes[i];
+
+        // NUL bytes never appear in 8-bit text
+        if (byte === 0) return null;
+
+        // Control characters other than tab, newline, form feed and carriage return
+        if (byte < 0x20 && byte !== 0x09 && byte !== 0x0A && byte !== 0x0C && byte !== 0x0D) {
+            controlBytes++;
+        }
+    }
+
+    if (controlBytes / bytes.length > 0.05) return null;
+
+    try {
+        // stream: true tolerates a multi-byte character cut off at the end of the sample
+        new TextDecoder('utf-8', { fatal: true }).decode(bytes, { stream: true });
+        return 'utf-8';
+    } catch (error) {
+        return 'windows-1252';
+    }
+}
+
+/**
+ * Detect BOM-less UTF-16 from the position of NUL bytes
+ * @param {Uint8Array} bytes - Leading bytes of the file
+ * @returns {string|null} - 'utf-16le', 'utf-16be' or null
+ */
+function detectUtf16WithoutBom(bytes) {
+    const pairs = Math.floor(bytes.length / 2);
+    if (pairs < 2) return null;
+
+    let evenZeros = 0;
+    let oddZeros = 0;
+    for (let i = 0; i < pairs * 2; i += 2) {
+        if (bytes[i] === 0) evenZeros++;
+        if (bytes[i + 1] === 0) oddZeros++;
+    }
+
+    if (oddZeros > pairs * 0.3 && evenZeros < pairs * 0.05) return 'utf-16le';
+    if (evenZeros > pairs * 0.3 && oddZeros < pairs * 0.05) return 'utf-16be';
+    return null;
+}
+
+// Make functions globally available
+window.sniffFileType = sniffFileType;
@@ -0,0 +1,175 @@
+/**
+ * Header/Footer Filter Module
+ * Detects running headers, footers and page numbers that repeat across
+ * pages and strips them from extracted text before it is indexed or sent
+ * to the LLM
+ */
+
+/**
+ * Get header/footer filter settings with defaults
+ * @returns {{edgeLines: number, minPages: number, pageRatio: number}}
+ */
+function getHeaderFooterSettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document &&
+                      LLM_CONFIG.document.headerFooter) || {};
+    return {
+        edgeLines: settings.edgeLines || 3,
+        minPages: settings.minPages || 3,
+        pageRatio: settings.pageRatio || 0.5
+    };
+}
+
+// Lines that look like page numbers or numbered running footers
+// ("12", "- 12 -", "Page 3 of 40", "Acme Corp | 3/40")
+const PAGE_NUMBER_LINE_PATTERN = /^\W*\d+\W*$|\b(page|pg|p|slide)\.?\s*\d+|\b\d+\s*(of|\/)\s*\d+\W*$/i;
+
+/**
+ * Compute a fingerprint for a line
+ * Digits are folded together in page-number lines, so "Page 3 of 40" and
+ * "Page 4 of 40" match; other lines must repeat exactly
+ * @param {string} line - Line of text
+ * @returns {number} - 32-bit FNV-1a hash, or 0 for blank lines
+ */
+function fingerprintLine(line) {
+    let normalized = line.toLowerCase().replace(/\s+/g, ' ').trim();
+    if (PAGE_NUMBER_LINE_PATTERN.test(normalized)) normalized = normalized.replace(/\d+/g, '#');
+    if (!normalized) return 0;
+
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < normalized.length; i++) {
+        hash ^= normalized.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+
+    // Keep 0 reserved for blank lines
+    return (hash >>> 0) || 1;
+}
+
+/**
+ * Get the indexes of the first and last lines of a page
+ * Only these lines are considered as header/footer candidates; on short
+ * pages the window shrinks so that the middle third is never a candidate
+ * @param {number} lineCount - Number of lines on the page
+ * @param {number} edgeLines - Lines to take from each edge
+ * @returns {number[]} - Line indexes
+ */
+function getEdgeLineIndexes(lineCount, edgeLines) {
+    edgeLines = Math.min(edgeLines, Math.floor(lineCount / 3));
+    const indexes = [];
+    for (let i = 0; i < lineCount; i++) {
+        if (i < edgeLines || i >= lineCount - edgeLines) {
+            indexes.push(i);
+        }
+    }
+    return indexes;
+}
+
+/**
+ * Create a filter for repeated page lines
+ * Pages are fed one at a time while they are extracted (counting pass);
+ * once all pages are seen, filterPage strips the recurring lines
+ * @returns {Object} - Filter with addPage, filterPage and getReport methods
+ */
+function createHeaderFooterFilter() {
+    const settings = getHeaderFooterSettings();
+
+    // Fingerprint -> number of pages it appears on
+    const pageCounts = new Map();
+    let pageCount = 0;
+    let charsBefore = 0;
+    let charsAfter = 0;
+    let linesRemoved = 0;
+
+    // Indexes of the recurring lines of a page; none when they are all it has
+    function findRepeatedLines(lines) {
+        const repeated = new Set();
+        if (pageCount < settings.minPages) return repeated;
+
+        const threshold = Math.max(settings.minPages, Math.ceil(pageCount * settings.pageRatio));
+        for (const index of getEdgeLineIndexes(lines.length, settings.edgeLines)) {
+            if ((pageCounts.get(fingerprintLine(lines[index])) || 0) >= threshold) repeated.add(index);
+        }
+
+        const hasContent = lines.some((line, index) => !repeated.has(index) && line.trim());
+        return hasContent ? repeated : new Set();
+    }
+
+    return {
+        /**
+         * Count the edge lines of a page
+         * @param {string[]} lines - Page lines
+         */
+        addPage: function(lines) {
+            pageCount++;
+
+            const seen = new Set();
+            for (const index of getEdgeLineIndexes(lines.length, settings.edgeLines)) {
+                const fingerprint = fingerprintLine(lines[index]);
+                if (fingerprint && !seen.has(fingerprint)) {
+                    seen.add(fingerprint);
+                    pageCounts.set(fingerprint, (pageCounts.get(fingerprint) || 0) + 1);
+                }
+            }
+        },
+
+        /**
+         * Remove recurring header/footer lines from a page
+         * @param {string[]} lines - Page lines
+         * @returns {string[]} - Remaining lines
+         */
+        filterPage: function(lines) {
+            const repeated = findRepeatedLines(lines);
+            const kept = [];
+
+            for (let i = 0; i < lines.length; i++) {
+                const line = lines[i];
+                charsBefore += line.length + 1;
+
+                if (repeated.has(i)) {
+                    linesRemoved++;
+                    continue;
+                }
+
+                kept.push(line);
+                charsAfter += line.length + 1;
+            }
+
+            return kept;
+        },
+
+        /**
+         * Remove recurring header/footer lines without counting them in the
+         * report (for pages that are read again after extraction)
+         * @param {string[]} lines - Page lines
+         * @returns {string[]} - Remaining lines
+         */
+        stripPage: function(lines) {
+            const repeated = findRepeatedLines(lines);
+            return lines.filter((line, i) => !repeated.has(i));
+        },
+
+        /**
+         * Get the before/after size report
+         * @returns {{pages: number, linesRemoved: number, charsBefore: number, charsAfter: number, charsSaved: number, tokensBefore: number, tokensAfter: number, tokensSaved: number}}
+         */
+        getReport: function() {
+            // Same ~4 characters per token estimate as estimateTokenCount
+            const tokensBefore = Math.ceil(charsBefore / 4);
+            const tokensAfter = Math.ceil(charsAfter / 4);
+
+            return {
+                pages: pageCount,
+                linesRemoved,
+                charsBefore,
+                charsAfter,
+                charsSaved: charsBefore - charsAfter,
+                tokensBefore,
+                tokensAfter,
+                tokensSaved: tokensBefore - tokensAfter
+            };
+        }
+    };
+}
+
+// Make functions globally available
+window.createHeaderFooterFilter = createHeaderFooterFilter;
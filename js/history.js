@@ -0,0 +1,359 @@
+/**
+ * Q&A History Module
+ * Keeps every question and answer asked about a document and renders them
+ * in a virtualized list so the DOM stays small regardless of history length
+ */
+
+// Current document key and its history log
+let qaHistoryKey = null;
+let qaHistoryLog = createEmptyHistoryLog();
+
+// DOM elements
+let qaHistoryPanel;
+let qaHistoryViewport;
+let qaHistorySpacer;
+let qaHistoryCount;
+
+// Pool of row elements reused while scrolling
+const qaHistoryRows = [];
+
+// Changes on every edit or reload of the log, so rows never show stale entries
+let qaHistoryGeneration = 0;
+
+// Pending render / persist handles
+let qaHistoryFrame = null;
+let qaHistoryPersistTimer = null;
+let qaHistoryPendingWrite = null;
+
+/**
+ * Create an empty history log
+ * Entries are stored as parallel arrays instead of one object per entry
+ * @returns {{questions: string[], answers: string[], timestamps: number[]}}
+ */
+function createEmptyHistoryLog() {
+    return { questions: [], answers: [], timestamps: [] };
+}
+
+/**
+ * Drop the oldest entries of a log beyond the maxEntries cap
+ * @param {{questions: string[], answers: string[], timestamps: number[]}} log - History log
+ */
+function trimQAHistoryLog(log) {
+    const overflow = log.questions.length - getHistorySettings().maxEntries;
+    if (overflow > 0) {
+        log.questions.splice(0, overflow);
+        log.answers.splice(0, overflow);
+        log.timestamps.splice(0, overflow);
+    }
+}
+
+/**
+ * Build a stable key identifying an uploaded file
+ * @param {File} file - Uploaded file
+ * @returns {string} - Document key
+ */
+function getDocumentKey(file) {
+    return `${file.name}:${file.size}:${file.lastModified || 0}`;
+}
+
+/**
+ * Get history settings with defaults
+ * @returns {{rowHeight: number, overscan: number, maxEntries: number, persistDelay: number}}
+ */
+function getHistorySettings() {
+    const settings = (typeof UI_CONFIG !== 'undefined' && UI_CONFIG.history) || {};
+    return {
+        rowHeight: settings.rowHeight || 72,
+        overscan: settings.overscan || 6,
+        maxEntries: settings.maxEntries || 1000,
+        persistDelay: settings.persistDelay || 500
+    };
+}
+
+/**
+ * Set up the history panel
+ * This should be called during initialization
+ */
+function setupQAHistoryPanel() {
+    qaHistoryPanel = document.getElementById('qa-history');
+    qaHistoryViewport = document.getElementById('qa-history-viewport');
+    qaHistorySpacer = document.getElementById('qa-history-spacer');
+    qaHistoryCount = document.getElementById('qa-history-count');
+
+    if (!qaHistoryPanel || !qaHistoryViewport || !qaHistorySpacer) {
+        console.warn('Q&A history elements not found');
+        return;
+    }
+
+    // Re-render on scroll, at most once per frame
+    qaHistoryViewport.addEventListener('scroll', scheduleQAHistoryRender, { passive: true });
+    window.addEventListener('resize', scheduleQAHistoryRender);
+
+    // One delegated click handler for all rows
+    qaHistoryViewport.addEventListener('click', function(event) {
+        const row = event.target.closest('.qa-history-row');
+        if (row && row.dataset.index !== undefined) {
+            showQAHistoryEntry(parseInt(row.dataset.index, 10));
+        }
+    });
+
+    console.log('Q&A history panel initialized');
+}
+
+/**
+ * Load the history for a document from storage
+ * Questions answered while the saved history is loading are kept after it
+ * @param {string} documentKey - Key from getDocumentKey
+ * @returns {Promise<void>}
+ */
+async function loadQAHistory(documentKey) {
+    // Write the previous document's pending changes before switching
+    flushQAHistoryPersist();
+
+    qaHistoryKey = documentKey;
+    qaHistoryLog = createEmptyHistoryLog();
+    qaHistoryGeneration++;
+
+    try {
+        const saved = typeof storageGet === 'function' ?
+            await storageGet('qaHistory', documentKey) : null;
+
+        // Ignore results if another document was loaded in the meantime
+        if (saved && qaHistoryKey === documentKey) {
+            const recorded = qaHistoryLog;
+            qaHistoryLog = {
+                questions: (saved.questions || []).concat(recorded.questions),
+                answers: (saved.answers || []).concat(recorded.answers),
+                timestamps: (saved.timestamps || []).concat(recorded.timestamps)
+            };
+            trimQAHistoryLog(qaHistoryLog);
+            qaHistoryGeneration++;
+
+            // The pending write holds only the entries recorded meanwhile
+            if (recorded.questions.length > 0) {
+                scheduleQAHistoryPersist();
+            }
+        }
+    } catch (error) {
+        console.error('Error loading Q&A history:', error);
+    }
+
+    if (qaHistoryViewport) {
+        qaHistoryViewport.scrollTop = 0;
+    }
+    renderQAHistory();
+}
+
+/**
+ * Append a question and answer to the current history
+ * @param {string} question - The user's question
+ * @param {string} answer - The response shown to the user
+ */
+function recordQAHistoryEntry(question, answer) {
+    qaHistoryLog.questions.push(question);
+    qaHistoryLog.answers.push(answer);
+    qaHistoryLog.timestamps.push(Date.now());
+
+    // Drop the oldest entries once the cap is exceeded
+    trimQAHistoryLog(qaHistoryLog);
+    qaHistoryGeneration++;
+
+    scheduleQAHistoryPersist();
+    renderQAHistory();
+}
+
+/**
+ * Get the number of entries in the current history
+ * @returns {number} - Entry count
+ */
+function getQAHistoryLength() {
+    return qaHistoryLog.questions.length;
+}
+
+/**
+ * Persist the current history after a short delay
+ * Several answers in quick succession result in a single write
+ */
+function scheduleQAHistoryPersist() {
+    if (!qaHistoryKey || typeof storagePut !== 'function') return;
+
+    // A pending write of another document is written now rather than dropped
+    if (qaHistoryPendingWrite && qaHistoryPendingWrite.documentKey !== qaHistoryKey) {
+        flushQAHistoryPersist();
+    }
+
+    if (qaHistoryPersistTimer) {
+        clearTimeout(qaHistoryPersistTimer);
+    }
+
+    qaHistoryPendingWrite = { documentKey: qaHistoryKey, log: qaHistoryLog };
+    qaHistoryPersistTimer = setTimeout(flushQAHistoryPersist, getHistorySettings().persistDelay);
+}
+
+/**
+ * Write the pending history change, if any, right away
+ */
+function flushQAHistoryPersist() {
+    if (qaHistoryPersistTimer) {
+        clearTimeout(qaHistoryPersistTimer);
+        qaHistoryPersistTimer = null;
+    }
+    if (!qaHistoryPendingWrite) return;
+
+    const { documentKey, log } = qaHistoryPendingWrite;
+    qaHistoryPendingWrite = null;
+    storagePut('qaHistory', documentKey, log).catch(error => {
+        console.error('Error saving Q&A history:', error);
+    });
+}
+
+/**
+ * Request a render on the next animation frame
+ */
+function scheduleQAHistoryRender() {
+    if (qaHistoryFrame !== null) return;
+
+    qaHistoryFrame = requestAnimationFrame(() => {
+        qaHistoryFrame = null;
+        renderQAHistory();
+    });
+}
+
+/**
+ * Render the rows currently in view
+ * Only visible rows (plus a small overscan) exist in the DOM
+ */
+function renderQAHistory() {
+    if (!qaHistoryPanel || !qaHistoryViewport || !qaHistorySpacer) return;
+
+    const count = getQAHistoryLength();
+    qaHistoryPanel.classList.toggle('hidden', count === 0);
+
+    if (qaHistoryCount) {
+        qaHistoryCount.textContent = `(${count})`;
+    }
+
+    const { rowHeight, overscan } = getHistorySettings();
+    qaHistorySpacer.style.height = `${count * rowHeight}px`;
+
+    // Determine visible slot range (slot 0 is the newest entry)
+    const scrollTop = qaHistoryViewport.scrollTop;
+    const viewportHeight = qaHistoryViewport.clientHeight || rowHeight * 5;
+    const firstSlot = Math.max(0, Math.floor(scrollTop / rowHeight) - overscan);
+    const lastSlot = Math.min(count, Math.ceil((scrollTop + viewportHeight) / rowHeight) + overscan);
+    const visibleCount = Math.max(0, lastSlot - firstSlot);
+
+    // Grow the row pool as needed
+    while (qaHistoryRows.length < visibleCount) {
+        const row = createQAHistoryRow(rowHeight);
+        qaHistoryRows.push(row);
+        qaHistorySpacer.appendChild(row);
+    }
+
+    // Fill rows for the visible range and hide the rest
+    for (let i = 0; i < qaHistoryRows.length; i++) {
+        const row = qaHistoryRows[i];
+
+        if (i >= visibleCount) {
+            row.style.display = 'none';
+            continue;
+        }
+
+        const slot = firstSlot + i;
+        const index = count - 1 - slot;
+
+        row.style.display = '';
+        row.style.transform = `translateY(${slot * rowHeight}px)`;
+
+        // Skip DOM writes when the row already shows this entry of this log
+        if (row.dataset.index === String(index) && row.dataset.generation === String(qaHistoryGeneration)) {
+            continue;
+        }
+
+        row.dataset.index = index;
+        row.dataset.generation = qaHistoryGeneration;
+        row.questionEl.textContent = qaHistoryLog.questions[index];
+        row.answerEl.textContent = getAnswerSnippet(qaHistoryLog.answers[index]);
+        row.timeEl.textContent = new Date(qaHistoryLog.timestamps[index]).toLocaleTimeString();
+    }
+}
+
+/**
+ * Create a reusable history row element
+ * @param {number} rowHeight - Fixed row height in pixels
+ * @returns {HTMLElement} - Row element
+ */
+function createQAHistoryRow(rowHeight) {
+    const row = document.createElement('div');
+    row.className = 'qa-history-row';
+    row.style.height = `${rowHeight}px`;
+
+    const header = document.createElement('div');
+    header.className = 'qa-history-row-header';
+
+    row.questionEl = document.createElement('span');
+    row.questionEl.className = 'qa-history-question';
+
+    row.timeEl = document.createElement('span');
+    row.timeEl.className = 'qa-history-time';
+
+    row.answerEl = document.createElement('div');
+    row.answerEl.className = 'qa-history-answer';
+
+    header.appendChild(row.questionEl);
+    header.appendChild(row.timeEl);
+    row.appendChild(header);
+    row.appendChild(row.answerEl);
+
+    return row;
+}
+
+/**
+ * Get a short plain-text snippet of an answer for the list
+ * @param {string} answer - Full answer text
+ * @returns {string} - Snippet
+ */
+function getAnswerSnippet(answer) {
+    const text = (answer || '')
+        .substring(0, 400)
+        .replace(/<[^>]+>/g, ' ')
+        .replace(/[#*`]/g, '')
+        .replace(/\s+/g, ' ')
+        .trim();
+
+    return text.length > 200 ? text.substring(0, 200) + '...' : text;
+}
+
+/**
+ * Show a history entry in the response area
+ * @param {number} index - Entry index in the log
+ */
+function showQAHistoryEntry(index) {
+    const answer = qaHistoryLog.answers[index];
+    if (answer === undefined) return;
+
+    const responseContainer = document.getElementById('response-container');
+    const responseContent = document.getElementById('response-content');
+
+    if (responseContainer) {
+        responseContainer.classList.remove('hidden');
+    }
+
+    if (responseContent) {
+        responseContent.innerHTML = `<div class="response-text">${answer}</div>`;
+    }
+
+    const queryInput = document.getElementById('query-input');
+    if (queryInput) {
+        queryInput.value = qaHistoryLog.questions[index];
+        if (typeof updateCharCount === 'function') {
+            updateCharCount();
+        }
+    }
+}
+
+// Make functions globally available
+window.setupQAHistoryPanel = setupQAHistoryPanel;
+window.loadQAHistory = loadQAHistory;
+window.recordQAHistoryEntry = recordQAHistoryEntry;
+window.getDocumentKey = getDocumentKey;
@@ -0,0 +1,424 @@
+/**
+ * Ingestion Queue Module
+ * Extracts many uploaded documents with bounded concurrency. Smaller files
+ * go first unless the user prioritizes one, and each document becomes
+ * queryable as soon as its extraction finishes.
+ */
+
+// Shared queue and its panel
+let ingestionQueue = null;
+let ingestSection;
+let ingestList;
+let ingestSummary;
+const ingestRows = new Map();
+
+/**
+ * Get ingestion settings with defaults
+ * @returns {{concurrency: number, maxBytesInFlight: number}}
+ */
+function getIngestionSettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.ingestion) || {};
+    return {
+        concurrency: settings.concurrency || 2,
+        maxBytesInFlight: settings.maxBytesInFlight || 64 * 1024 * 1024
+    };
+}
+
+/**
+ * Create an ingestion queue
+ * Jobs are picked by user priority, then smallest file first. A job only
+ * starts while the bytes being extracted stay under maxBytesInFlight (a
+ * single large file is still allowed on its own), which bounds memory.
+ * @param {Object} options - {process(file, onProgress), onUpdate(job), concurrency, maxBytesInFlight}
+ * @returns {Object} - Queue with add, prioritize, getJobs and isActive methods
+ */
+function createIngestionQueue(options) {
+    const { process, onUpdate } = options;
+    const concurrency = Math.max(1, options.concurrency || 1);
+    const maxBytesInFlight = options.maxBytesInFlight || Infinity;
+
+    const jobs = [];
+    const pending = [];
+    let running = 0;
+    let bytesInFlight = 0;
+    let nextJobId = 1;
+    let priorityCounter = 0;
+
+    function notify(job) {
+        if (typeof onUpdate === 'function') onUpdate(job);
+    }
+
+    // Highest priority first, then smallest, then oldest
+    function takeNextJob() {
+        let best = 0;
+        for (let i = 1; i < pending.length; i++) {
+            const a = pending[i];
+            const b = pending[best];
+            if (a.priority !== b.priority ? a.priority > b.priority :
+                a.size !== b.size ? a.size < b.size : a.id < b.id) {
+                best = i;
+            }
+        }
+        return pending[best];
+    }
+
+    function pump() {
+        while (running < concurrency && pending.length > 0) {
+            const job = takeNextJob();
+
+            // Backpressure: wait for running jobs to release memory
+            if (running > 0 && bytesInFlight + job.size > maxBytesInFlight) break;
+
+            pending.splice(pending.indexOf(job), 1);
+            start(job);
+        }
+    }
+
+    function start(job) {
+        running++;
+        bytesInFlight += job.size;
+        job.status = 'processing';
+        job.startedAt = performance.now();
+        notify(job);
+
+        const onProgress = (progress) => {
+            job.progress = progress;
+            notify(job);
+        };
+
+        Promise.resolve()
+            .then(() => process(job.file, onProgress))
+            .then(result => {
+                job.status = 'done';
+                job.result = result;
+            })
+            .catch(error => {
+                console.error(`Error ingesting ${job.file.name}:`, error);
+                job.status = 'error';
+                job.error = error.message;
+            })
+            .finally(() => {
+                running--;
+                bytesInFlight -= job.size;
+                job.seconds = (performance.now() - job.startedAt) / 1000;
+                notify(job);
+                pump();
+            });
+    }
+
+    return {
+        /**
+         * Add files to the queue
+         * @param {File[]} files - Files to extract
+         * @returns {Object[]} - Created jobs
+         */
+        add(files) {
+            const added = files.map(file => ({
+                id: nextJobId++,
+                file,
+                size: file.size,
+                priority: 0,
+                status: 'queued',
+                progress: null,
+                result: null,
+                error: null
+            }));
+
+            for (const job of added) {
+                jobs.push(job);
+                pending.push(job);
+                notify(job);
+            }
+            pump();
+            return added;
+        },
+
+        /**
+         * Add a job that failed before reaching the queue (e.g. validation)
+         * @param {File} file - Rejected file
+         * @param {string} message - Reason
+         * @returns {Object} - Created job
+         */
+        reject(file, message) {
+            const job = { id: nextJobId++, file, size: file.size, priority: 0, status: 'error', progress: null, result: null, error: message };
+            jobs.push(job);
+            notify(job);
+            return job;
+        },
+
+        /**
+         * Move a queued job ahead of every other queued job
+         * @param {number} jobId - Job id
+         */
+        prioritize(jobId) {
+            const job = pending.find(item => item.id === jobId);
+            if (job) {
+                job.priority = ++priorityCounter;
+                notify(job);
+            }
+        },
+
+        getJobs() {
+            return jobs;
+        },
+
+        getJob(jobId) {
+            return jobs.find(job => job.id === jobId) || null;
+        },
+
+        isActive() {
+            return running > 0 || pending.length > 0;
+        }
+    };
+}
+
+/**
+ * Get the shared ingestion queue, creating it on first use
+ * @returns {Object}
+ */
+function getIngestionQueue() {
+    if (!ingestionQueue) {
+        const settings = getIngestionSettings();
+        ingestionQueue = createIngestionQueue({
+            process: (file, onProgress) => extractDocument(file, { onProgress }),
+            onUpdate: handleIngestionUpdate,
+            concurrency: settings.concurrency,
+            maxBytesInFlight: settings.maxBytesInFlight
+        });
+    }
+    return ingestionQueue;
+}
+
+/**
+ * Set up the document queue panel and drag-and-drop
+ * This should be called during initialization
+ */
+function setupIngestionPanel() {
+    ingestSection = document.getElementById('ingest-section');
+    ingestList = document.getElementById('ingest-list');
+    ingestSummary = document.getElementById('ingest-summary');
+
+    if (!ingestSection || !ingestList) {
+        console.warn('Ingestion queue elements not found');
+        return;
+    }
+
+    // One delegated click handler for all rows
+    ingestList.addEventListener('click', function(event) {
+        const row = event.target.closest('.ingest-row');
+        if (!row) return;
+
+        const jobId = parseInt(row.dataset.jobId, 10);
+        if (event.target.closest('.ingest-prioritize')) {
+            getIngestionQueue().prioritize(jobId);
+            return;
+        }
+
+        const job = getIngestionQueue().getJob(jobId);
+        if (job && job.status === 'done' && typeof activateDocument === 'function') {
+            activateDocument(job.file, job.result);
+            updateActiveIngestRow(jobId);
+        }
+    });
+
+    const addButton = document.getElementById('ingest-add-button');
+    const fileInput = document.getElementById('file-input');
+    if (addButton && fileInput) {
+        addButton.addEventListener('click', () => fileInput.click());
+    }
+
+    // Dropping files on the upload area or the queue panel queues them
+    const dropZones = [document.querySelector('.upload-container'), ingestSection];
+    for (const zone of dropZones) {
+        if (!zone) continue;
+
+        zone.addEventListener('dragover', function(event) {
+            event.preventDefault();
+            zone.classList.add('highlight');
+        });
+        zone.addEventListener('dragleave', function() {
+            zone.classList.remove('highlight');
+        });
+        zone.addEventListener('drop', function(event) {
+            event.preventDefault();
+            zone.classList.remove('highlight');
+            enqueueDocuments(Array.from(event.dataTransfer.files || []));
+        });
+    }
+}
+
+/**
+ * Queue files for extraction
+ * Files that fail validation are listed with their error instead
+ * @param {File[]} files - Files to queue
+ */
+function enqueueDocuments(files) {
+    if (files.length === 0) return;
+
+    const queue = getIngestionQueue();
+    const accepted = [];
+
+    for (const file of files) {
+        const error = typeof validateUploadFile === 'function' ? validateUploadFile(file) : null;
+        if (error) {
+            queue.reject(file, error);
+        } else {
+            accepted.push(file);
+        }
+    }
+
+    queue.add(accepted);
+}
+
+/**
+ * Update the panel when a job changes
+ * Finished documents join the document collection, and the first one becomes
+ * the current document right away when no other document is loaded
+ * @param {Object} job - Changed job
+ */
+function handleIngestionUpdate(job) {
+    renderIngestRow(job);
+    renderIngestSummary();
+
+    if (job.status === 'done' && typeof addDocumentToCollection === 'function') {
+        addDocumentToCollection(getDocumentKey(job.file), job.file.name, job.result.text);
+    }
+
+    if (job.status === 'done' && !window.documentText && typeof activateDocument === 'function') {
+        activateDocument(job.file, job.result);
+        updateActiveIngestRow(job.id);
+    }
+}
+
+/**
+ * Render (or update) the row for a job
+ * @param {Object} job - Queue job
+ */
+function renderIngestRow(job) {
+    if (!ingestList) return;
+
+    let row = ingestRows.get(job.id);
+    if (!row) {
+        row = document.createElement('li');
+        row.className = 'ingest-row';
+        row.dataset.jobId = job.id;
+        row.innerHTML = `
+            <div class="ingest-row-main">
+                <span class="ingest-name"></span>
+                <span class="ingest-size"></span>
+                <button class="small-button ingest-prioritize" title="Process this document next">Next</button>
+            </div>
+            <progress class="ingest-progress" max="1" value="0"></progress>
+            <div class="ingest-status"></div>
+        `;
+        row.querySelector('.ingest-name').textContent = job.file.name;
+        row.querySelector('.ingest-size').textContent = formatFileSize(job.size);
+        ingestList.appendChild(row);
+        ingestRows.set(job.id, row);
+    }
+
+    row.dataset.status = job.status;
+    row.querySelector('.ingest-prioritize').hidden = job.status !== 'queued';
+    row.querySelector('.ingest-status').textContent = describeIngestJob(job);
+
+    const progress = row.querySelector('.ingest-progress');
+    if (job.status === 'processing' && job.progress && job.progress.total > 0) {
+        progress.value = job.progress.done / job.progress.total;
+    } else if (job.status === 'processing') {
+        progress.removeAttribute('value'); // Indeterminate
+    } else {
+        progress.value = job.status === 'queued' ? 0 : 1;
+    }
+}
+
+/**
+ * Describe the state of a job for its row
+ * @param {Object} job - Queue job
+ * @returns {string}
+ */
+function describeIngestJob(job) {
+    switch (job.status) {
+        case 'queued':
+            return job.priority > 0 ? 'Queued (next)' : 'Queued';
+        case 'processing':
+            if (job.progress && job.progress.stage === 'ocr') {
+                return `Recognizing scanned pages (${job.progress.done}/${job.progress.total})`;
+            }
+            if (job.progress && job.progress.stage === 'pages') {
+                return `Extracting page ${job.progress.done} of ${job.progress.total}`;
+            }
+            if (job.progress && job.progress.stage === 'text') {
+                return `Reading ${formatFileSize(job.progress.done)} of ${formatFileSize(job.progress.total)}`;
+            }
+            if (job.progress && job.progress.stage === 'sheets') {
+                return `Reading sheet ${job.progress.done} of ${job.progress.total}`;
+            }
+            return 'Extracting...';
+        case 'done':
+            return `Ready in ${job.seconds.toFixed(1)}s - click to ask questions about it`;
+        default:
+            return `Error: ${job.error}`;
+    }
+}
+
+/**
+ * Show queue totals in the panel header
+ */
+function renderIngestSummary() {
+    if (!ingestSection) return;
+
+    const jobs = getIngestionQueue().getJobs();
+    ingestSection.classList.toggle('hidden', jobs.length === 0);
+
+    if (ingestSummary) {
+        const done = jobs.filter(job => job.status === 'done').length;
+        const failed = jobs.filter(job => job.status === 'error').length;
+        ingestSummary.textContent = `(${done} of ${jobs.length} ready${failed ? `, ${failed} failed` : ''})`;
+    }
+}
+
+/**
+ * Highlight the row of the document being queried
+ * @param {number} jobId - Active job id
+ */
+function updateActiveIngestRow(jobId) {
+    for (const [id, row] of ingestRows) {
+        row.classList.toggle('active', id === jobId);
+    }
+}
+
+/**
+ * Check whether any files have been queued this session
+ * @returns {boolean}
+ */
+function hasIngestionJobs() {
+    return ingestionQueue !== null && ingestionQueue.getJobs().length > 0;
+}
+
+/**
+ * Check whether a finished job holds a large document, so it can be made
+ * the current document again
+ * @param {Object} pagedDocument - Store from createPagedDocument
+ * @returns {boolean}
+ */
+function isPagedDocumentQueued(pagedDocument) {
+    return ingestionQueue !== null &&
+        ingestionQueue.getJobs().some(job => job.result && job.result.paged === pagedDocument);
+}
+
+/**
+ * Format a file size for display
+ * @param {number} bytes - Size in bytes
+ * @returns {string}
+ */
+function formatFileSize(bytes) {
+    if (bytes < 1024) return `${bytes} B`;
+    if (bytes < 1024 * 1024) return `${(bytes / 1024).toFixed(0)} KB`;
+    return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+}
+
+// Make functions globally available
+window.createIngestionQueue = createIngestionQueue;
+window.enqueueDocuments = enqueueDocuments;
+window.hasIngestionJobs = hasIngestionJobs;
+window.isPagedDocumentQueued = isPagedDocumentQueued;
@@ -17,14 +17,7 @@ async function getLLMResponse(query, documentText) {
         return "Error: No document content available. Please upload a document first.";
     }
     
-    // Check for OpenAI API configuration
-    const useApi = document.getElementById('mock-mode-toggle') ? 
-                  !document.getElementById('mock-mode-toggle').checked : false;
-    
-    if (useApi && typeof LLM_CONFIG !== 'undefined' && 
-        LLM_CONFIG.openai && 
-        LLM_CONFIG.openai.apiKey && 
-        LLM_CONFIG.openai.apiKey !== 'your-openai-api-key') {
+    if (isOpenAiApiEnabled()) {
         
         try {
             // Record API call if usage monitor exists
@@ -53,6 +46,21 @@ async function getLLMResponse(query, documentText) {
     }
 }
 
+/**
+ * Check whether questions should go to the OpenAI API
+ * True when Document Analysis Mode is off and an API key is configured
+ * @returns {boolean}
+ */
+function isOpenAiApiEnabled() {
+    const useApi = document.getElementById('mock-mode-toggle') ? 
+                  !document.getElementById('mock-mode-toggle').checked : false;
+    
+    return useApi && typeof LLM_CONFIG !== 'undefined' && 
+        !!LLM_CONFIG.openai && 
+        !!LLM_CONFIG.openai.apiKey && 
+        LLM_CONFIG.openai.apiKey !== 'your-openai-api-key';
+}
+
 /**
  * Call OpenAI API for a response
  * @param {string} query - The user's question
@@ -60,34 +68,48 @@ async function getLLMResponse(query, documentText) {
  * @returns {Promise<string>} - API response
  */
 async function callOpenAiApi(query, documentText) {
+    // Show loading notification
+    showNotification('Calling OpenAI API...', 'info');
+    
+    const completion = await requestChatCompletion(buildChatMessages(query, documentText));
+    
+    // Show success notification
+    showNotification('API response received successfully', 'success');
+    
+    return completion.content;
+}
+
+/**
+ * Send chat messages to the OpenAI API
+ * @param {{role: string, content: string}[]} messages - Chat messages
+ * @param {Object} [options] - {maxTokens} to override the configured limit, {signal} to cancel
+ * @returns {Promise<{content: string, usage: Object|null, latencyMs: number, endpoint?: string}>}
+ */
+async function requestChatCompletion(messages, options = {}) {
+    // Several endpoints: the request is hedged across them
+    if (typeof isEndpointHedgingEnabled === 'function' && isEndpointHedgingEnabled()) {
+        const completion = await requestHedgedCompletion(messages, options);
+        console.log(`Answer from ${completion.endpoint}${completion.hedged ? ' (hedged)' : ''}`);
+        
+        if (completion.usage && typeof apiUsageMonitor !== 'undefined' &&
+            typeof apiUsageMonitor.recordTokenUsage === 'function') {
+            apiUsageMonitor.recordTokenUsage(completion.usage, completion.latencyMs);
+            updateApiUsageUI();
+        }
+        return completion;
+    }
+    
     // Get configuration
     const apiUrl = LLM_CONFIG.openai.apiUrl || 'https://api.openai.com/v1/chat/completions';
     const apiKey = LLM_CONFIG.openai.apiKey;
     const model = LLM_CONFIG.openai.model || 'gpt-3.5-turbo';
     const temperature = LLM_CONFIG.openai.temperature || 0.3;
-    const maxTokens = LLM_CONFIG.openai.maxTokens || 800;
+    const maxTokens = options.maxTokens || LLM_CONFIG.openai.maxTokens || 800;
     
     console.log(`Calling OpenAI API with model: ${model}, temperature: ${temperature}`);
     
-    // Truncate document to avoid token limits (approx 4 chars per token)
-    const maxChars = 8000; // Safe limit for most models
-    const truncatedText = documentText.length > maxChars ? 
-                        documentText.substring(0, maxChars) + "... [truncated for token limit]" : 
-                        documentText;
-    
-    // Create prompt
-    const prompt = `
-Document content:
-${truncatedText}
-
-Question: ${query}
-
-Please answer based only on the document content above. If the answer cannot be found in the document, say so clearly.`;
-    
-    // Show loading notification
-    showNotification('Calling OpenAI API...', 'info');
-    
     // Call API
+    const startTime = performance.now();
     const response = await fetch(apiUrl, {
         method: 'POST',
         headers: {
@@ -96,19 +118,11 @@ Please answer based only on the document content above. If the answer cannot be
         },
         body: JSON.stringify({
             model: model,
-            messages: [
-                {
-                    role: 'system',
-                    content: 'You are a helpful assistant that answers questions about documents with precision and clarity.'
-                },
-                {
-                    role: 'user',
-                    content: prompt
-                }
-            ],
+            messages: messages,
             temperature: temperature,
             max_tokens: maxTokens
-        })
+        }),
+        signal: options.signal
     });
     
     // Check for HTTP errors
@@ -129,11 +143,57 @@ Please answer based only on the document content above. If the answer cannot be
     }
     
     const data = await response.json();
+    const latencyMs = performance.now() - startTime;
     
-    // Show success notification
-    showNotification('API response received successfully', 'success');
+    // Track how much of the prompt the provider served from its cache
+    if (data.usage && typeof apiUsageMonitor !== 'undefined' &&
+        typeof apiUsageMonitor.recordTokenUsage === 'function') {
+        apiUsageMonitor.recordTokenUsage(data.usage, latencyMs);
+        updateApiUsageUI();
+    }
+    
+    return {
+        content: data.choices[0].message.content,
+        usage: data.usage || null,
+        latencyMs
+    };
+}
+
+/**
+ * Build the chat messages for a question
+ * In the 'cacheable' layout the prompt starts with a byte-identical prefix
+ * (instructions, then the document) and ends with the question, so providers
+ * that cache prompt prefixes can reuse it for every question on the same document.
+ * The 'inline' layout puts the document and question in one user message.
+ * @param {string} query - The user's question
+ * @param {string} documentText - Document text or retrieved context
+ * @returns {{role: string, content: string}[]}
+ */
+function buildChatMessages(query, documentText) {
+    const layout = LLM_CONFIG.openai.promptLayout || 'cacheable';
+    
+    // Truncate document to avoid token limits (approx 4 chars per token)
+    const maxChars = 8000; // Safe limit for most models
+    const truncatedText = documentText.length > maxChars ? 
+                        documentText.substring(0, maxChars) + "... [truncated for token limit]" : 
+                        documentText;
+    
+    const systemPrompt = 'You are a helpful assistant that answers questions about documents with precision and clarity.';
+    const instructions = 'Please answer based only on the document content above. If the answer cannot be found in the document, say so clearly.';
+    
+    if (layout === 'inline') {
+        return [
+            { role: 'system', content: systemPrompt },
+            { role: 'user', content: `\nDocument content:\n${truncatedText}\n\nQuestion: ${query}\n\n${instructions}` }
+        ];
+    }
     
-    return data.choices[0].message.content;
+    // Everything that varies per question comes last
+    return [
+        { role: 'system', content: `${systemPrompt} ${instructions.replace('above', 'provided')}` },
+        { role: 'user', content: `Document content:\n${truncatedText}` },
+        { role: 'user', content: `Question: ${query}` }
+    ];
 }
 
 /**
@@ -142,18 +202,13 @@ Please answer based only on the document content above. If the answer cannot be
  * @returns {string} - Formatted document content
  */
 function getDocumentContent(documentText) {
-    // Get document size information
-    const lines = documentText.split('\n');
-    const wordCount = documentText.split(/\s+/).length;
-    
-    // Create a preview with the first part of the document
-    const previewLength = Math.min(800, documentText.length);
-    const preview = documentText.substring(0, previewLength) + 
-                  (documentText.length > previewLength ? '...' : '');
+    // Size information and preview from the document profile
+    const profile = getDocumentProfile(documentText);
+    const preview = getProfilePreview(profile, 800);
     
     return `## Document Content Analysis
 
-This document contains ${lines.length} lines and approximately ${wordCount} words.
+This document contains ${profile.lineCount} lines and approximately ${profile.wordCount} words.
 
 ### Document Preview:
 
@@ -174,8 +229,24 @@ function updateApiUsageUI() {
         typeof apiUsageMonitor.getUsageCount === 'function') {
         
         const count = apiUsageMonitor.getUsageCount();
-        apiCallCount.textContent = `API Calls: ${count}`;
+        apiCallCount.textContent = `API Calls: ${count}` + getPromptCacheSummary();
+    }
+}
+
+/**
+ * Describe prompt cache use for the API usage counter
+ * @returns {string} - e.g. " (62% of prompt tokens cached)", or '' before any usage is known
+ */
+function getPromptCacheSummary() {
+    if (typeof apiUsageMonitor === 'undefined' || typeof apiUsageMonitor.getTokenUsage !== 'function') {
+        return '';
     }
+    
+    const usage = apiUsageMonitor.getTokenUsage();
+    if (usage.promptTokens === 0) return '';
+    
+    const percent = Math.round(usage.cachedTokens / usage.promptTokens * 100);
+    return ` (${percent}% of prompt tokens cached)`;
 }
 
 /**
@@ -197,7 +268,7 @@ function setupAPIUsageUI() {
     if (typeof apiUsageMonitor !== 'undefined' && 
         typeof apiUsageMonitor.getUsageCount === 'function') {
         const count = apiUsageMonitor.getUsageCount();
-        apiCallCount.textContent = `API Calls: ${count}`;
+        apiCallCount.textContent = `API Calls: ${count}` + getPromptCacheSummary();
     }
     
     // Setup reset button
@@ -215,4 +286,7 @@ function setupAPIUsageUI() {
 
 // Expose functions globally
 window.getLLMResponse = getLLMResponse;
+window.isOpenAiApiEnabled = isOpenAiApiEnabled;
+window.requestChatCompletion = requestChatCompletion;
+window.buildChatMessages = buildChatMessages;
 window.setupAPIUsageUI = setupAPIUsageUI;
\ No newline at end of file
@@ -0,0 +1,402 @@
+/**
+ * OCR Module
+ * Recognizes text on scanned PDF pages with a locally bundled WASM OCR
+ * engine. Pages are rendered to bitmaps on the main thread and recognized
+ * in parallel by a pool of workers, one per core. Results are cached by a
+ * hash of the page image so re-uploads skip recognition.
+ */
+
+const OCR_WORKER_URL = 'js/workers/ocrWorker.js';
+
+// Shared worker pool, created on first use
+let ocrPool = null;
+
+// Set once the engine fails to load so later documents skip OCR quickly
+let ocrEngineUnavailable = false;
+
+// In-memory cache (page image hash -> text) in front of IndexedDB, least
+// recently used first
+const ocrMemoryCache = new Map();
+const OCR_MEMORY_CACHE_PAGES = 500;
+
+/**
+ * Get OCR settings with defaults
+ * @returns {{enabled: boolean, engineUrl: string, languageDataUrl: string, language: string, maxWorkers: number, renderScale: number, cacheMaxPages: number, cacheMaxBytes: number}}
+ */
+function getOcrSettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.ocr) || {};
+    return {
+        enabled: settings.enabled !== false,
+        engineUrl: settings.engineUrl || 'lib/ocr/tesseract-core-simd-lstm.wasm.js',
+        languageDataUrl: settings.languageDataUrl || 'lib/ocr/eng.traineddata.gz',
+        language: settings.language || 'eng',
+        maxWorkers: settings.maxWorkers || 8,
+        renderScale: settings.renderScale || 2,
+        cacheMaxPages: settings.cacheMaxPages || 5000,
+        cacheMaxBytes: settings.cacheMaxBytes || 32 * 1024 * 1024
+    };
+}
+
+/**
+ * Check whether OCR can run in this browser
+ * @returns {boolean}
+ */
+function isOcrAvailable() {
+    return getOcrSettings().enabled &&
+        !ocrEngineUnavailable &&
+        typeof Worker !== 'undefined' &&
+        typeof WebAssembly !== 'undefined';
+}
+
+/**
+ * Number of OCR workers to run (one per core, capped by settings)
+ * @returns {number}
+ */
+function getOcrPoolSize() {
+    const cores = navigator.hardwareConcurrency || 2;
+    return Math.max(1, Math.min(cores, getOcrSettings().maxWorkers));
+}
+
+/**
+ * Create a pool of OCR workers that share a FIFO task queue
+ * @param {number} size - Number of workers
+ * @returns {Object} - Pool with recognize and terminate methods
+ */
+function createOcrPool(size) {
+    const settings = getOcrSettings();
+
+    // Worker scripts resolve relative URLs against their own location
+    const config = {
+        engineUrl: new URL(settings.engineUrl, document.baseURI).href,
+        languageDataUrl: new URL(settings.languageDataUrl, document.baseURI).href,
+        language: settings.language
+    };
+
+    const workers = [];
+    const idleWorkers = [];
+    const queue = [];
+    const tasks = new Map();
+    let nextTaskId = 1;
+    let failed = null;
+
+    function rejectAll(error) {
+        failed = error;
+        for (const task of tasks.values()) task.reject(error);
+        for (const task of queue) task.reject(error);
+        tasks.clear();
+        queue.length = 0;
+    }
+
+    function dispatch() {
+        while (idleWorkers.length > 0 && queue.length > 0) {
+            const worker = idleWorkers.pop();
+            const task = queue.shift();
+
+            tasks.set(task.id, task);
+
+            // Transfer the pixel buffer instead of copying it
+            worker.postMessage({
+                type: 'recognize',
+                id: task.id,
+                width: task.image.width,
+                height: task.image.height,
+                pixels: task.image.pixels
+            }, [task.image.pixels.buffer]);
+            task.image = null;
+        }
+    }
+
+    function handleMessage(worker, event) {
+        const message = event.data;
+
+        if (message.type === 'ready') {
+            idleWorkers.push(worker);
+            dispatch();
+            return;
+        }
+
+        if (message.type === 'init-error') {
+            console.error('OCR engine failed to load:', message.message);
+            rejectAll(new Error(message.message));
+            return;
+        }
+
+        const task = tasks.get(message.id);
+        if (!task) return;
+        tasks.delete(message.id);
+
+        if (message.type === 'result') {
+            task.resolve(message.text);
+        } else {
+            task.reject(new Error(message.message));
+        }
+
+        idleWorkers.push(worker);
+        dispatch();
+    }
+
+    for (let i = 0; i < size; i++) {
+        const worker = new Worker(OCR_WORKER_URL);
+        worker.onmessage = (event) => handleMessage(worker, event);
+        worker.onerror = (event) => {
+            console.error('OCR worker error:', event.message);
+            rejectAll(new Error(event.message || 'OCR worker error'));
+        };
+        worker.postMessage({ type: 'init', config });
+        workers.push(worker);
+    }
+
+    return {
+        size,
+
+        // Error that stopped the pool (engine failed to load), or null
+        get failed() {
+            return failed;
+        },
+
+        /**
+         * Recognize text in a page bitmap
+         * @param {{width: number, height: number, pixels: Uint8ClampedArray}} image - RGBA bitmap
+         * @returns {Promise<string>}
+         */
+        recognize(image) {
+            if (failed) return Promise.reject(failed);
+
+            return new Promise((resolve, reject) => {
+                queue.push({ id: nextTaskId++, image, resolve, reject });
+                dispatch();
+            });
+        },
+
+        terminate() {
+            rejectAll(new Error('OCR pool terminated'));
+            for (const worker of workers) worker.terminate();
+        }
+    };
+}
+
+/**
+ * Get the shared OCR pool, creating it on first use
+ * @returns {Object}
+ */
+function getOcrPool() {
+    if (!ocrPool) {
+        ocrPool = createOcrPool(getOcrPoolSize());
+    }
+    return ocrPool;
+}
+
+/**
+ * Render a PDF page to an RGBA bitmap
+ * @param {Object} pdf - PDF.js document
+ * @param {number} pageNumber - 1-based page number
+ * @param {number} scale - Render scale
+ * @param {HTMLCanvasElement} canvas - Reusable canvas
+ * @returns {Promise<{width: number, height: number, pixels: Uint8ClampedArray}>}
+ */
+async function renderPageForOcr(pdf, pageNumber, scale, canvas) {
+    const page = await pdf.getPage(pageNumber);
+    const viewport = page.getViewport({ scale });
+
+    canvas.width = Math.ceil(viewport.width);
+    canvas.height = Math.ceil(viewport.height);
+
+    const context = canvas.getContext('2d', { willReadFrequently: true });
+    context.fillStyle = '#ffffff';
+    context.fillRect(0, 0, canvas.width, canvas.height);
+
+    await page.render({ canvasContext: context, viewport }).promise;
+    page.cleanup();
+
+    const imageData = context.getImageData(0, 0, canvas.width, canvas.height);
+    return { width: imageData.width, height: imageData.height, pixels: imageData.data };
+}
+
+/**
+ * Hash a page bitmap for the OCR cache
+ * @param {{width: number, height: number, pixels: Uint8ClampedArray}} image - RGBA bitmap
+ * @returns {Promise<string>} - Hex SHA-256 digest prefixed with the image size
+ */
+async function hashOcrImage(image) {
+    const digest = await crypto.subtle.digest('SHA-256', image.pixels);
+    const hex = Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+    return `${image.width}x${image.height}:${hex}`;
+}
+
+/**
+ * Keep OCR text in the in-memory cache as the most recently used entry
+ * @param {string} hash - Page image hash
+ * @param {string} text - Recognized text
+ */
+function rememberOcrText(hash, text) {
+    ocrMemoryCache.delete(hash);
+    ocrMemoryCache.set(hash, text);
+    if (ocrMemoryCache.size > OCR_MEMORY_CACHE_PAGES) {
+        ocrMemoryCache.delete(ocrMemoryCache.keys().next().value);
+    }
+}
+
+/**
+ * Mark a stored page as recently used and evict beyond the cache limits
+ * @param {string} hash - Page image hash
+ * @param {number|null} bytes - Size of a newly stored text, null for a read
+ * @returns {Promise<void>}
+ */
+async function touchOcrCache(hash, bytes) {
+    const { cacheMaxPages, cacheMaxBytes } = getOcrSettings();
+    const evicted = await touchStorageManifest('ocrCache', hash, bytes,
+        { maxEntries: cacheMaxPages, maxBytes: cacheMaxBytes });
+    for (const key of evicted) {
+        ocrMemoryCache.delete(key);
+    }
+}
+
+/**
+ * Look up cached OCR text for a page image
+ * @param {string} hash - Page image hash
+ * @returns {Promise<string|undefined>}
+ */
+async function getCachedOcrText(hash) {
+    if (ocrMemoryCache.has(hash)) {
+        const text = ocrMemoryCache.get(hash);
+        rememberOcrText(hash, text);
+        return text;
+    }
+
+    try {
+        const text = await storageGet('ocrCache', hash);
+        if (typeof text === 'string') {
+            rememberOcrText(hash, text);
+            touchOcrCache(hash, null).catch(() => {});
+            return text;
+        }
+    } catch (error) {
+        console.warn('Failed to read OCR cache:', error);
+    }
+    return undefined;
+}
+
+/**
+ * Store OCR text for a page image
+ * The store is bounded by cacheMaxPages and cacheMaxBytes; least recently
+ * used pages are evicted
+ * @param {string} hash - Page image hash
+ * @param {string} text - Recognized text
+ */
+function putCachedOcrText(hash, text) {
+    rememberOcrText(hash, text);
+    storagePut('ocrCache', hash, text)
+        .then(() => touchOcrCache(hash, text.length * 2))
+        .catch(error => {
+            console.warn('Failed to write OCR cache:', error);
+        });
+}
+
+/**
+ * Recognize text on PDF pages
+ * Rendering runs ahead of recognition by at most two pages per worker, so
+ * memory stays bounded while every worker is kept busy.
+ * @param {Object} pdf - PDF.js document
+ * @param {number[]} pageNumbers - Pages to recognize
+ * @param {Object} [options] - {onProgress(done, total), useCache, pool}
+ * @returns {Promise<Map<number, string>>} - Page number -> recognized text
+ */
+async function ocrPdfPages(pdf, pageNumbers, options = {}) {
+    const { onProgress = null, useCache = true } = options;
+    const results = new Map();
+    if (pageNumbers.length === 0) return results;
+
+    const pool = options.pool || getOcrPool();
+    const { renderScale } = getOcrSettings();
+    const canvas = document.createElement('canvas');
+    const inFlight = new Set();
+    const maxInFlight = pool.size * 2;
+
+    const start = performance.now();
+    let cacheHits = 0;
+    let failures = 0;
+
+    const reportProgress = () => {
+        if (typeof onProgress === 'function') {
+            onProgress(results.size + failures, pageNumbers.length);
+        }
+    };
+
+    for (const pageNumber of pageNumbers) {
+        if (ocrEngineUnavailable) break;
+
+        let image;
+        try {
+            image = await renderPageForOcr(pdf, pageNumber, renderScale, canvas);
+        } catch (error) {
+            console.error(`Error rendering page ${pageNumber} for OCR:`, error);
+            failures++;
+            continue;
+        }
+
+        // Hash before the pixels are transferred to a worker
+        const hash = useCache ? await hashOcrImage(image) : null;
+        if (hash) {
+            const cached = await getCachedOcrText(hash);
+            if (cached !== undefined) {
+                results.set(pageNumber, cached);
+                cacheHits++;
+                reportProgress();
+                continue;
+            }
+        }
+
+        const task = pool.recognize(image)
+            .then(text => {
+                results.set(pageNumber, text);
+                if (hash) putCachedOcrText(hash, text);
+            })
+            .catch(error => {
+                console.error(`OCR failed for page ${pageNumber}:`, error);
+                failures++;
+                if (pool === ocrPool && pool.failed) {
+                    ocrEngineUnavailable = true;
+                }
+            })
+            .finally(() => {
+                inFlight.delete(task);
+                reportProgress();
+            });
+        inFlight.add(task);
+
+        // Backpressure: wait for a worker before rendering more pages
+        while (inFlight.size >= maxInFlight) {
+            await Promise.race(inFlight);
+        }
+    }
+
+    await Promise.all(inFlight);
+
+    const seconds = (performance.now() - start) / 1000;
+    const recognized = results.size - cacheHits;
+    const pagesPerMinute = seconds > 0 ? recognized / seconds * 60 : 0;
+
+    const report = {
+        pages: pageNumbers.length,
+        recognized,
+        cacheHits,
+        failures,
+        workers: pool.size,
+        cores: navigator.hardwareConcurrency || null,
+        seconds: Number(seconds.toFixed(2)),
+        pagesPerMinute: Number(pagesPerMinute.toFixed(1)),
+        pagesPerMinutePerWorker: Number((pagesPerMinute / pool.size).toFixed(1))
+    };
+    window.lastOcrReport = report;
+
+    console.log(`OCR: ${recognized} pages recognized (${cacheHits} cached, ${failures} failed) ` +
+        `in ${report.seconds}s with ${pool.size} workers on ${report.cores} cores - ` +
+        `${report.pagesPerMinute} pages/min`);
+
+    return results;
+}
+
+// Make functions globally available
+window.isOcrAvailable = isOcrAvailable;
+window.createOcrPool = createOcrPool;
+window.ocrPdfPages = ocrPdfPages;
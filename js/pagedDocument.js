@@ -0,0 +1,538 @@
+/**
+ * Paged Document Module
+ * Large-file mode for PDFs and text files above the regular size limit. PDFs
+ * are read in slices (PDF.js range requests served by Blob.slice) and text
+ * files are decoded as a stream and cut into parts of whole lines; extracted
+ * pages are written to IndexedDB as they are produced, and only an LRU
+ * working set of pages stays in memory. Search, question context and the full
+ * preview load pages on demand.
+ */
+
+// Object store holding the pages of large documents
+const PAGED_DOCUMENT_STORE = 'documentPages';
+
+// Record listing the documents whose pages are stored
+const PAGED_DOCUMENT_MANIFEST_KEY = 'manifest';
+
+// Large document currently being asked about
+let activePagedDocument = null;
+
+// Large documents of this session by key, least recently used first
+const pagedDocuments = new Map();
+let pagedManifestUpdate = Promise.resolve();
+
+/**
+ * Get large-file settings with defaults
+ * @returns {{enabled: boolean, maxFileSize: number, rangeChunkSize: number, textPageChars: number, workingSetPages: number, excerptChars: number, writeBatchPages: number, previewBatchPages: number, searchResults: number, maxStoredDocuments: number}}
+ */
+function getLargeFileSettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.largeFile) || {};
+    return {
+        enabled: settings.enabled !== false,
+        maxFileSize: settings.maxFileSize || 1024 * 1024 * 1024,
+        rangeChunkSize: settings.rangeChunkSize || 1024 * 1024,
+        textPageChars: settings.textPageChars || 4000,
+        workingSetPages: settings.workingSetPages || 100,
+        excerptChars: settings.excerptChars || 100000,
+        writeBatchPages: settings.writeBatchPages || 50,
+        previewBatchPages: settings.previewBatchPages || 20,
+        searchResults: settings.searchResults || 5,
+        maxStoredDocuments: settings.maxStoredDocuments || 3
+    };
+}
+
+/**
+ * Check whether a file should be processed in large-file mode
+ * PDFs and TXT files use it; CSV rows already stream into the table store
+ * @param {File} file - Uploaded file
+ * @returns {boolean}
+ */
+function isLargeFile(file) {
+    const maxSize = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.maxFileSize) ||
+        20 * 1024 * 1024;
+    return getLargeFileSettings().enabled && file.size > maxSize && /\.(pdf|txt)$/i.test(file.name);
+}
+
+/**
+ * Get the names used for a large document and its pages
+ * Text files have no pages of their own, so their parts are numbered instead
+ * @param {Object} pagedDocument - Store from createPagedDocument
+ * @returns {{document: string, page: string, pages: string}}
+ */
+function getPagedLabels(pagedDocument) {
+    return pagedDocument.format === 'text' ?
+        { document: 'Text Document', page: 'Part', pages: 'parts' } :
+        { document: 'PDF Document', page: 'Page', pages: 'pages' };
+}
+
+/**
+ * Open a PDF with PDF.js, reading only the byte ranges it asks for
+ * A range that cannot be read destroys the loading task, so neither opening
+ * nor later page reads wait for bytes that will never arrive
+ * @param {File} file - PDF file
+ * @returns {Promise<Object>} - PDF.js document
+ */
+function openPdfFromBlob(file) {
+    const { rangeChunkSize } = getLargeFileSettings();
+    const transport = new window.pdfjsLib.PDFDataRangeTransport(file.size, null);
+
+    let rejectRead;
+    const readFailed = new Promise((resolve, reject) => {
+        rejectRead = reject;
+    });
+    // Failures after the document opened surface through its destroyed task
+    readFailed.catch(() => {});
+
+    const loadingTask = window.pdfjsLib.getDocument({
+        range: transport,
+        rangeChunkSize,
+        disableAutoFetch: true,
+        disableStream: true
+    });
+
+    transport.requestDataRange = (begin, end) => {
+        file.slice(begin, end).arrayBuffer()
+            .then(buffer => transport.onDataRange(begin, new Uint8Array(buffer)))
+            .catch(error => {
+                console.error(`Failed to read bytes ${begin}-${end} of ${file.name}:`, error);
+                rejectRead(new Error(`Could not read ${file.name}: ${error.message}`));
+                loadingTask.destroy();
+            });
+    };
+
+    return Promise.race([loadingTask.promise, readFailed]);
+}
+
+/**
+ * Create a page store for one large document
+ * Pages are written to IndexedDB in batches; pages that are not written yet
+ * are never evicted, and without IndexedDB every page stays in memory
+ * @param {string} key - Document key (see getDocumentKey)
+ * @param {string} name - Display name
+ * @param {string} [format='pdf'] - 'pdf' or 'text'
+ * @returns {Object} - Store with addPage, flush, getPage, forEachPage and search methods
+ */
+function createPagedDocument(key, name, format = 'pdf') {
+    const settings = getLargeFileSettings();
+    const pageNumbers = [];
+    const workingSet = new Map(); // page number -> raw text, least recently used first
+    const savedPages = new Set();
+    let pendingWrites = [];
+    let writing = Promise.resolve();
+    let canSpill = true;
+    let pageFilter = null;
+    let destroyed = false;
+
+    const pageKey = (pageNumber) => `${key}:${String(pageNumber).padStart(7, '0')}`;
+    const firstKey = pageKey(0);
+    const lastKey = pageKey(9999999);
+
+    // Drop pages left over from an earlier upload of the same file
+    writing = storageDeleteRange(PAGED_DOCUMENT_STORE, firstKey, lastKey).catch(() => {});
+
+    function applyFilter(text) {
+        return pageFilter ? pageFilter(text.split('\n')).join('\n') : text;
+    }
+
+    function evict() {
+        if (!canSpill) return;
+
+        for (const pageNumber of workingSet.keys()) {
+            if (workingSet.size <= settings.workingSetPages) break;
+            if (savedPages.has(pageNumber)) workingSet.delete(pageNumber);
+        }
+    }
+
+    function remember(pageNumber, text) {
+        workingSet.delete(pageNumber);
+        workingSet.set(pageNumber, text);
+        evict();
+    }
+
+    const pagedDocument = {
+        key,
+        name,
+        format,
+
+        // Pages already shown in the document text (set by the extractor)
+        excerptPageCount: 0,
+
+        get pageCount() {
+            return pageNumbers.length;
+        },
+
+        get pageNumbers() {
+            return pageNumbers;
+        },
+
+        /**
+         * Add an extracted page
+         * Await the result to apply backpressure while a batch is being written
+         * @param {number} pageNumber - Page number
+         * @param {string} text - Page text
+         * @returns {Promise<void>}
+         */
+        addPage(pageNumber, text) {
+            pageNumbers.push(pageNumber);
+            if (destroyed) return Promise.resolve();
+
+            remember(pageNumber, text);
+            pendingWrites.push([pageNumber, text]);
+
+            return pendingWrites.length >= settings.writeBatchPages ? this.flush() : Promise.resolve();
+        },
+
+        /**
+         * Write pending pages to IndexedDB
+         * @returns {Promise<void>}
+         */
+        flush() {
+            const batch = pendingWrites;
+            pendingWrites = [];
+            if (batch.length === 0 || destroyed) return writing;
+
+            writing = writing.then(async () => {
+                if (!canSpill || !(await openStorage())) {
+                    canSpill = false;
+                    return;
+                }
+
+                try {
+                    await storagePutMany(PAGED_DOCUMENT_STORE, batch.map(([pageNumber, text]) => [pageKey(pageNumber), text]));
+                    for (const [pageNumber] of batch) savedPages.add(pageNumber);
+                    evict();
+                } catch (error) {
+                    // Quota exceeded or similar: keep everything in memory from now on
+                    console.error(`Failed to store pages of ${name}:`, error);
+                    canSpill = false;
+                }
+            });
+            return writing;
+        },
+
+        /**
+         * Use a line filter (e.g. header/footer removal) when pages are read
+         * @param {Function} filter - Receives and returns page lines
+         */
+        setPageFilter(filter) {
+            pageFilter = filter;
+        },
+
+        /**
+         * Get the text of a page, loading it from IndexedDB when needed
+         * @param {number} pageNumber - Page number
+         * @returns {Promise<string|null>}
+         */
+        async getPage(pageNumber) {
+            if (destroyed) return null;
+            if (workingSet.has(pageNumber)) {
+                const text = workingSet.get(pageNumber);
+                remember(pageNumber, text);
+                return applyFilter(text);
+            }
+
+            await writing;
+            const text = await storageGet(PAGED_DOCUMENT_STORE, pageKey(pageNumber));
+            if (text === undefined) return null;
+
+            remember(pageNumber, text);
+            return applyFilter(text);
+        },
+
+        /**
+         * Visit every page in order without disturbing the working set
+         * @param {Function} callback - Called with (pageNumber, text); must not await
+         * @returns {Promise<void>}
+         */
+        async forEachPage(callback) {
+            if (destroyed) return;
+            await this.flush();
+
+            if (!canSpill) {
+                for (const pageNumber of pageNumbers) {
+                    // Pages written before storage failed may have been evicted
+                    const text = workingSet.has(pageNumber) ? workingSet.get(pageNumber) :
+                        await storageGet(PAGED_DOCUMENT_STORE, pageKey(pageNumber));
+                    if (text !== undefined) callback(pageNumber, applyFilter(text));
+                }
+                return;
+            }
+
+            await storageForEachInRange(PAGED_DOCUMENT_STORE, firstKey, lastKey, (storedKey, text) => {
+                callback(parseInt(storedKey.slice(storedKey.lastIndexOf(':') + 1), 10), applyFilter(text));
+            });
+        },
+
+        /**
+         * Find the pages that best match a query
+         * Pages are streamed from storage one at a time, so memory stays bounded
+         * @param {string} query - Search query
+         * @param {number} [limit] - Pages to return
+         * @returns {Promise<{pageNumber: number, score: number, text: string}[]>}
+         */
+        async search(query, limit = settings.searchResults) {
+            const terms = Array.from(new Set(tokenizeForIndex(query)));
+            if (terms.length === 0) return [];
+
+            const results = [];
+            await this.forEachPage((pageNumber, text) => {
+                const lower = text.toLowerCase();
+                let score = 0;
+
+                for (const term of terms) {
+                    let count = 0;
+                    for (let index = lower.indexOf(term); index !== -1; index = lower.indexOf(term, index + term.length)) {
+                        count++;
+                    }
+                    // Matching more distinct terms beats repeating one term
+                    if (count > 0) score += 1 + Math.log(count);
+                }
+
+                if (score === 0) return;
+                if (results.length < limit || score > results[results.length - 1].score) {
+                    results.push({ pageNumber, score, text });
+                    results.sort((a, b) => b.score - a.score);
+                    if (results.length > limit) results.pop();
+                }
+            });
+
+            return results;
+        },
+
+        get destroyed() {
+            return destroyed;
+        },
+
+        /**
+         * Drop the pages held in memory (another store now owns the key)
+         */
+        release() {
+            destroyed = true;
+            workingSet.clear();
+            pendingWrites = [];
+        },
+
+        /**
+         * Remove the document's pages from memory and storage
+         * @returns {Promise<void>}
+         */
+        async destroy() {
+            this.release();
+            await writing;
+            await storageDeleteRange(PAGED_DOCUMENT_STORE, firstKey, lastKey).catch(() => {});
+        }
+    };
+
+    trackPagedDocument(pagedDocument);
+    return pagedDocument;
+}
+
+/**
+ * Register a new large document and bound the documents kept in storage
+ * Pages are extracted again on every upload, so pages listed in the manifest
+ * by an earlier session are deleted, and beyond maxStoredDocuments the least
+ * recently used documents of this session (other than the active one) are
+ * removed.
+ * @param {Object} pagedDocument - Store from createPagedDocument
+ */
+function trackPagedDocument(pagedDocument) {
+    const previous = pagedDocuments.get(pagedDocument.key);
+    if (previous) {
+        // Same file uploaded again: the new store already cleared its pages
+        previous.release();
+        pagedDocuments.delete(pagedDocument.key);
+    }
+    pagedDocuments.set(pagedDocument.key, pagedDocument);
+
+    const { maxStoredDocuments } = getLargeFileSettings();
+    for (const [key, stored] of pagedDocuments) {
+        if (pagedDocuments.size <= maxStoredDocuments) break;
+        if (stored !== pagedDocument && stored !== activePagedDocument) removePagedDocument(key);
+    }
+
+    updatePagedManifest();
+}
+
+/**
+ * Write the keys of this session's documents to the manifest and delete the
+ * pages of documents no longer listed
+ * @returns {Promise<void>}
+ */
+function updatePagedManifest() {
+    pagedManifestUpdate = pagedManifestUpdate.then(async () => {
+        if (typeof openStorage !== 'function' || !(await openStorage())) return;
+
+        const stored = (await storageGet(PAGED_DOCUMENT_STORE, PAGED_DOCUMENT_MANIFEST_KEY)) || [];
+        const manifest = Array.from(pagedDocuments.keys());
+        await storagePut(PAGED_DOCUMENT_STORE, PAGED_DOCUMENT_MANIFEST_KEY, manifest);
+
+        for (const key of stored) {
+            if (!pagedDocuments.has(key)) {
+                await storageDeleteRange(PAGED_DOCUMENT_STORE, `${key}:0000000`, `${key}:9999999`);
+            }
+        }
+    }).catch(error => console.warn('Could not update the stored page manifest:', error));
+    return pagedManifestUpdate;
+}
+
+/**
+ * Remove a large document and its stored pages
+ * @param {string} key - Document key
+ * @returns {Promise<void>}
+ */
+function removePagedDocument(key) {
+    const pagedDocument = pagedDocuments.get(key);
+    if (!pagedDocument) return Promise.resolve();
+
+    pagedDocuments.delete(key);
+    if (activePagedDocument === pagedDocument) activePagedDocument = null;
+    updatePagedManifest();
+    return pagedDocument.destroy();
+}
+
+/**
+ * Set the large document questions are asked about
+ * The document it replaces is removed unless a finished ingestion job can
+ * still make it active again
+ * @param {Object|null} pagedDocument - Store from createPagedDocument, or null
+ */
+function setActivePagedDocument(pagedDocument) {
+    const previous = activePagedDocument;
+    activePagedDocument = pagedDocument || null;
+
+    if (pagedDocument && pagedDocument.destroyed) {
+        console.warn(`Pages of ${pagedDocument.name} were removed to bound storage; upload it again to search every page`);
+    }
+
+    if (pagedDocument && pagedDocuments.has(pagedDocument.key)) {
+        // Most recently used last
+        pagedDocuments.delete(pagedDocument.key);
+        pagedDocuments.set(pagedDocument.key, pagedDocument);
+    }
+
+    if (previous && previous !== pagedDocument && pagedDocuments.get(previous.key) === previous &&
+        !(typeof isPagedDocumentQueued === 'function' && isPagedDocumentQueued(previous))) {
+        removePagedDocument(previous.key);
+    }
+}
+
+/**
+ * Get the active large document
+ * @returns {Object|null}
+ */
+function getActivePagedDocument() {
+    return activePagedDocument;
+}
+
+/**
+ * Build LLM context from the pages that best match a question
+ * @param {string} query - The user's question
+ * @param {Object} [pagedDocument] - Document to search (defaults to the active one)
+ * @returns {Promise<string>}
+ */
+async function buildPagedContext(query, pagedDocument = activePagedDocument) {
+    const maxChars = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.maxCharacterLimit) || 12000;
+    const results = await pagedDocument.search(query);
+
+    // Fall back to the start of the document when nothing matches
+    const pages = results.length > 0 ? results.sort((a, b) => a.pageNumber - b.pageNumber) :
+        [{ pageNumber: pagedDocument.pageNumbers[0], text: await pagedDocument.getPage(pagedDocument.pageNumbers[0]) || '' }];
+
+    const labels = getPagedLabels(pagedDocument);
+    let context = `# ${pagedDocument.name}\n\n${labels.document} - ${pagedDocument.pageCount} ${labels.pages} (most relevant ${labels.pages} below)\n\n`;
+    for (const page of pages) {
+        const section = `## ${labels.page} ${page.pageNumber}\n\n${page.text}\n\n`;
+        if (context.length + section.length > maxChars) {
+            context += section.substring(0, Math.max(0, maxChars - context.length));
+            break;
+        }
+        context += section;
+    }
+    return context;
+}
+
+/**
+ * Answer a question in mock mode by listing the best matching pages
+ * @param {string} query - The user's question
+ * @param {Object} [pagedDocument] - Document to search (defaults to the active one)
+ * @returns {Promise<string>}
+ */
+async function generatePagedSearchResponse(query, pagedDocument = activePagedDocument) {
+    const start = performance.now();
+    const results = await pagedDocument.search(query);
+    const seconds = (performance.now() - start) / 1000;
+    const labels = getPagedLabels(pagedDocument);
+
+    if (results.length === 0) {
+        return `I couldn't find ${labels.pages} matching your question in the ${pagedDocument.pageCount} ${labels.pages} of ${pagedDocument.name}. Please try different terms.`;
+    }
+
+    const passages = results.map((result, i) => {
+        const snippet = result.text.length > 300 ? result.text.substring(0, 300) + '...' : result.text;
+        return `${i + 1}. **${labels.page} ${result.pageNumber}**\n${snippet}`;
+    });
+
+    return `## Best matching ${labels.pages}
+
+${passages.join('\n\n')}
+
+Searched ${pagedDocument.pageCount} ${labels.pages} in ${seconds.toFixed(2)}s.`;
+}
+
+/**
+ * Load the pages after the excerpt into the full preview as the user scrolls
+ * @param {HTMLElement} container - Full preview content element
+ */
+function appendPagedPreview(container) {
+    const pagedDocument = activePagedDocument;
+    if (!pagedDocument || pagedDocument.pageCount <= pagedDocument.excerptPageCount) return;
+
+    const { previewBatchPages } = getLargeFileSettings();
+    const documentText = container.querySelector('.document-text') || container;
+    let nextIndex = pagedDocument.excerptPageCount;
+
+    const sentinel = document.createElement('div');
+    sentinel.className = 'paged-preview-sentinel';
+    documentText.appendChild(sentinel);
+
+    let loading = false;
+    const observer = new IntersectionObserver(async (entries) => {
+        if (loading || !entries.some(entry => entry.isIntersecting)) return;
+        loading = true;
+
+        const end = Math.min(nextIndex + previewBatchPages, pagedDocument.pageCount);
+        sentinel.textContent = `Loading ${getPagedLabels(pagedDocument).pages} ${nextIndex + 1}-${end} of ${pagedDocument.pageCount}...`;
+
+        let html = '';
+        for (; nextIndex < end; nextIndex++) {
+            const pageNumber = pagedDocument.pageNumbers[nextIndex];
+            const text = await pagedDocument.getPage(pageNumber);
+            if (text && text.trim()) {
+                html += `<div class="page-break"></div><div class="document-page" data-page="${pageNumber}">${formatPlainText(text)}</div>`;
+            }
+        }
+        sentinel.insertAdjacentHTML('beforebegin', html);
+
+        // Stop when the modal was closed or another document was opened meanwhile
+        if (nextIndex >= pagedDocument.pageCount || !sentinel.isConnected || activePagedDocument !== pagedDocument) {
+            observer.disconnect();
+            sentinel.remove();
+        } else {
+            // Observe again so a sentinel that is still in view loads the next batch
+            sentinel.textContent = '';
+            observer.unobserve(sentinel);
+            observer.observe(sentinel);
+        }
+        loading = false;
+    }, { root: container.closest('.modal-content') || null, rootMargin: '800px' });
+
+    observer.observe(sentinel);
+}
+
+// Make functions globally available
+window.isLargeFile = isLargeFile;
+window.createPagedDocument = createPagedDocument;
+window.setActivePagedDocument = setActivePagedDocument;
+window.getActivePagedDocument = getActivePagedDocument;
+window.removePagedDocument = removePagedDocument;
+window.appendPagedPreview = appendPagedPreview;
@@ -0,0 +1,506 @@
+/**
+ * PDF Scanner Module
+ * Byte-level PDF object scanner used when PDF.js cannot parse a file.
+ * Walks the file once, inflates FlateDecode content streams with
+ * DecompressionStream and extracts the operands of the Tj/TJ text operators.
+ */
+
+// Bytes scanned between yields to the event loop
+const PDF_SCAN_CHUNK_SIZE = 1024 * 1024;
+
+// Upper bound for a single inflated stream (protects against zip bombs)
+const PDF_MAX_INFLATED_STREAM = 16 * 1024 * 1024;
+
+// How far back from a "stream" keyword to look for its dictionary
+const PDF_DICT_LOOKBACK = 2048;
+
+const PDF_STREAM_KEYWORD = asciiToBytes('stream');
+const PDF_ENDSTREAM_KEYWORD = asciiToBytes('endstream');
+
+// Streams that never contain page text
+const PDF_SKIPPED_STREAM_PATTERN = /\/Subtype\s*\/(Image|Type1C|CIDFontType0C|OpenType|XML)\b|\/Type\s*\/(XRef|ObjStm|Metadata|EmbeddedFile)\b|\/Length[123]\b/;
+
+/**
+ * Convert an ASCII string to bytes
+ * @param {string} text - ASCII text
+ * @returns {Uint8Array}
+ */
+function asciiToBytes(text) {
+    const bytes = new Uint8Array(text.length);
+    for (let i = 0; i < text.length; i++) {
+        bytes[i] = text.charCodeAt(i);
+    }
+    return bytes;
+}
+
+/**
+ * Decode bytes as Latin-1 without creating huge argument lists
+ * @param {Uint8Array} bytes - Bytes to decode
+ * @returns {string}
+ */
+function latin1FromBytes(bytes) {
+    let result = '';
+    for (let i = 0; i < bytes.length; i += 8192) {
+        result += String.fromCharCode.apply(null, bytes.subarray(i, i + 8192));
+    }
+    return result;
+}
+
+/**
+ * Find a byte sequence
+ * Uses the native TypedArray.indexOf for the first byte, so the search is linear
+ * @param {Uint8Array} bytes - Bytes to search
+ * @param {Uint8Array} needle - Sequence to find
+ * @param {number} from - Start offset
+ * @returns {number} - Offset of the match, or -1
+ */
+function indexOfBytes(bytes, needle, from) {
+    const first = needle[0];
+    const last = bytes.length - needle.length;
+    let position = from;
+
+    while (position <= last) {
+        position = bytes.indexOf(first, position);
+        if (position < 0 || position > last) return -1;
+
+        let matched = true;
+        for (let i = 1; i < needle.length; i++) {
+            if (bytes[position + i] !== needle[i]) {
+                matched = false;
+                break;
+            }
+        }
+        if (matched) return position;
+
+        position++;
+    }
+
+    return -1;
+}
+
+/**
+ * Check whether a byte is PDF whitespace
+ * @param {number} byte
+ * @returns {boolean}
+ */
+function isPdfWhitespace(byte) {
+    return byte === 0x20 || byte === 0x0A || byte === 0x0D || byte === 0x09 || byte === 0x0C || byte === 0x00;
+}
+
+/**
+ * Check whether a byte is a PDF delimiter
+ * @param {number} byte
+ * @returns {boolean}
+ */
+function isPdfDelimiter(byte) {
+    // ( ) < > [ ] { } / %
+    return byte === 0x28 || byte === 0x29 || byte === 0x3C || byte === 0x3E ||
+           byte === 0x5B || byte === 0x5D || byte === 0x7B || byte === 0x7D ||
+           byte === 0x2F || byte === 0x25;
+}
+
+/**
+ * Give the browser a chance to handle other work between chunks
+ * @returns {Promise<void>}
+ */
+function yieldToEventLoop() {
+    return new Promise(resolve => setTimeout(resolve, 0));
+}
+
+/**
+ * Inflate a zlib (FlateDecode) stream
+ * Data after the end of the compressed stream or a corrupt tail is tolerated:
+ * everything inflated up to that point is returned.
+ * @param {Uint8Array} data - Compressed bytes
+ * @returns {Promise<Uint8Array>} - Inflated bytes
+ */
+async function inflatePdfStream(data) {
+    const reader = new Blob([data]).stream()
+        .pipeThrough(new DecompressionStream('deflate'))
+        .getReader();
+
+    const chunks = [];
+    let total = 0;
+
+    try {
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            total += value.length;
+            if (total > PDF_MAX_INFLATED_STREAM) {
+                await reader.cancel();
+                break;
+            }
+            chunks.push(value);
+        }
+    } catch (error) {
+        // Keep whatever was inflated before the error
+    }
+
+    const result = new Uint8Array(Math.min(total, PDF_MAX_INFLATED_STREAM));
+    let offset = 0;
+    for (const chunk of chunks) {
+        result.set(chunk.subarray(0, result.length - offset), offset);
+        offset += chunk.length;
+        if (offset >= result.length) break;
+    }
+    return result;
+}
+
+/**
+ * Decode the bytes of a PDF string operand
+ * @param {number[]} bytes - String bytes
+ * @returns {string}
+ */
+function decodePdfStringBytes(bytes) {
+    // UTF-16BE strings start with a byte order mark
+    if (bytes.length >= 2 && bytes[0] === 0xFE && bytes[1] === 0xFF) {
+        let result = '';
+        for (let i = 2; i + 1 < bytes.length; i += 2) {
+            result += String.fromCharCode((bytes[i] << 8) | bytes[i + 1]);
+        }
+        return result;
+    }
+
+    return latin1FromBytes(Uint8Array.from(bytes));
+}
+
+/**
+ * Read a literal string "( ... )" starting at an opening parenthesis
+ * @param {Uint8Array} content - Content stream bytes
+ * @param {number} start - Offset of "("
+ * @returns {[string, number]} - Decoded string and offset after the closing ")"
+ */
+function readPdfLiteralString(content, start) {
+    const bytes = [];
+    let depth = 1;
+    let i = start + 1;
+
+    while (i < content.length && depth > 0) {
+        const byte = content[i++];
+
+        if (byte === 0x5C) { // backslash escape
+            const next = content[i++];
+            switch (next) {
+                case 0x6E: bytes.push(0x0A); break; // \n
+                case 0x72: bytes.push(0x0D); break; // \r
+                case 0x74: bytes.push(0x09); break; // \t
+                case 0x62: bytes.push(0x08); break; // \b
+                case 0x66: bytes.push(0x0C); break; // \f
+                case 0x0D: if (content[i] === 0x0A) i++; break; // line continuation
+                case 0x0A: break;
+                default:
+                    if (next >= 0x30 && next <= 0x37) {
+                        // Up to three octal digits
+                        let code = next - 0x30;
+                        for (let digits = 1; digits < 3 && content[i] >= 0x30 && content[i] <= 0x37; digits++) {
+                            code = code * 8 + (content[i++] - 0x30);
+                        }
+                        bytes.push(code & 0xFF);
+                    } else if (next !== undefined) {
+                        bytes.push(next);
+                    }
+            }
+        } else if (byte === 0x28) {
+            depth++;
+            bytes.push(byte);
+        } else if (byte === 0x29) {
+            depth--;
+            if (depth > 0) bytes.push(byte);
+        } else {
+            bytes.push(byte);
+        }
+    }
+
+    return [decodePdfStringBytes(bytes), i];
+}
+
+/**
+ * Read a hex string "< ... >" starting at "<"
+ * @param {Uint8Array} content - Content stream bytes
+ * @param {number} start - Offset of "<"
+ * @returns {[string, number]} - Decoded string and offset after ">"
+ */
+function readPdfHexString(content, start) {
+    const bytes = [];
+    let high = -1;
+    let i = start + 1;
+
+    while (i < content.length && content[i] !== 0x3E) {
+        const byte = content[i++];
+        let value = -1;
+
+        if (byte >= 0x30 && byte <= 0x39) value = byte - 0x30;
+        else if (byte >= 0x41 && byte <= 0x46) value = byte - 0x37;
+        else if (byte >= 0x61 && byte <= 0x66) value = byte - 0x57;
+
+        if (value < 0) continue;
+
+        if (high < 0) {
+            high = value;
+        } else {
+            bytes.push((high << 4) | value);
+            high = -1;
+        }
+    }
+
+    // A trailing odd digit is padded with 0
+    if (high >= 0) bytes.push(high << 4);
+
+    return [decodePdfStringBytes(bytes), i + 1];
+}
+
+/**
+ * Check whether an extracted line is readable text
+ * Strings drawn with embedded-font glyph IDs decode to control characters
+ * @param {string} line - Extracted line
+ * @returns {boolean}
+ */
+function isReadablePdfText(line) {
+    let control = 0;
+    for (let i = 0; i < line.length; i++) {
+        const code = line.charCodeAt(i);
+        if (code < 0x20 && code !== 0x09) control++;
+    }
+    return control / line.length < 0.1;
+}
+
+/**
+ * Extract text from a content stream
+ * Single pass tokenizer that tracks BT/ET blocks and the Tj, TJ, ' and " operators
+ * @param {Uint8Array} content - Decoded content stream
+ * @param {string[]} lines - Output array of text lines
+ */
+function extractPdfContentText(content, lines) {
+    let operands = [];
+    let arrayStack = [];
+    let line = '';
+    let i = 0;
+
+    const flushLine = () => {
+        const trimmed = line.replace(/\s+/g, ' ').trim();
+        if (trimmed && isReadablePdfText(trimmed)) {
+            lines.push(trimmed);
+        }
+        line = '';
+    };
+
+    const pushOperand = (value) => {
+        if (arrayStack.length > 0) {
+            arrayStack[arrayStack.length - 1].push(value);
+        } else {
+            operands.push(value);
+        }
+    };
+
+    while (i < content.length) {
+        const byte = content[i];
+
+        if (isPdfWhitespace(byte)) {
+            i++;
+        } else if (byte === 0x25) { // % comment
+            while (i < content.length && content[i] !== 0x0A && content[i] !== 0x0D) i++;
+        } else if (byte === 0x28) {
+            const [text, next] = readPdfLiteralString(content, i);
+            pushOperand(text);
+            i = next;
+        } else if (byte === 0x3C) {
+            if (content[i + 1] === 0x3C) {
+                i += 2; // dictionary start (marked content properties)
+            } else {
+                const [text, next] = readPdfHexString(content, i);
+                pushOperand(text);
+                i = next;
+            }
+        } else if (byte === 0x3E) {
+            i += content[i + 1] === 0x3E ? 2 : 1;
+        } else if (byte === 0x5B) {
+            arrayStack.push([]);
+            i++;
+        } else if (byte === 0x5D) {
+            const array = arrayStack.pop() || [];
+            pushOperand(array);
+            i++;
+        } else if (byte === 0x2F) { // name
+            i++;
+            while (i < content.length && !isPdfWhitespace(content[i]) && !isPdfDelimiter(content[i])) i++;
+            pushOperand(null);
+        } else if ((byte >= 0x30 && byte <= 0x39) || byte === 0x2B || byte === 0x2D || byte === 0x2E) {
+            const start = i++;
+            while (i < content.length && ((content[i] >= 0x30 && content[i] <= 0x39) || content[i] === 0x2E)) i++;
+            pushOperand(parseFloat(latin1FromBytes(content.subarray(start, i))));
+        } else if (isPdfDelimiter(byte)) {
+            i++; // stray delimiter such as { or }
+        } else {
+            // Operator
+            const start = i;
+            while (i < content.length && !isPdfWhitespace(content[i]) && !isPdfDelimiter(content[i])) i++;
+            const operator = latin1FromBytes(content.subarray(start, i));
+
+            switch (operator) {
+                case 'ET':
+                case 'T*':
+                    flushLine();
+                    break;
+                case 'Td':
+                case 'TD': {
+                    const ty = operands[operands.length - 1];
+                    if (typeof ty === 'number' && ty !== 0) {
+                        flushLine();
+                    } else if (line) {
+                        line += ' ';
+                    }
+                    break;
+                }
+                case 'Tm':
+                    flushLine();
+                    break;
+                case 'Tj':
+                case "'":
+                case '"': {
+                    if (operator !== 'Tj') flushLine();
+                    const text = operands[operands.length - 1];
+                    if (typeof text === 'string') line += text;
+                    break;
+                }
+                case 'TJ': {
+                    const array = operands[operands.length - 1];
+                    if (Array.isArray(array)) {
+                        for (const item of array) {
+                            if (typeof item === 'string') {
+                                line += item;
+                            } else if (typeof item === 'number' && item < -250) {
+                                // Large negative kerning is a word gap
+                                line += ' ';
+                            }
+                        }
+                    }
+                    break;
+                }
+                case 'BI': {
+                    // Inline image: skip binary data up to "EI"
+                    let end = i;
+                    while (end < content.length - 2 &&
+                           !(isPdfWhitespace(content[end]) && content[end + 1] === 0x45 && content[end + 2] === 0x49 &&
+                             (end + 3 >= content.length || isPdfWhitespace(content[end + 3])))) {
+                        end++;
+                    }
+                    i = end + 3;
+                    break;
+                }
+            }
+
+            operands = [];
+            arrayStack = [];
+        }
+    }
+
+    flushLine();
+}
+
+/**
+ * Locate the dictionary text that precedes a "stream" keyword
+ * @param {Uint8Array} bytes - PDF bytes
+ * @param {number} streamStart - Offset of the "stream" keyword
+ * @returns {string} - Dictionary text (may include a little preceding syntax)
+ */
+function getPdfStreamDictionary(bytes, streamStart) {
+    const windowStart = Math.max(0, streamStart - PDF_DICT_LOOKBACK);
+    const text = latin1FromBytes(bytes.subarray(windowStart, streamStart));
+    const objIndex = text.lastIndexOf(' obj');
+    return objIndex >= 0 ? text.substring(objIndex) : text;
+}
+
+/**
+ * Scan a PDF file and extract text from its content streams
+ * Runs in linear time over the input and yields to the event loop after
+ * each chunk of PDF_SCAN_CHUNK_SIZE bytes
+ * @param {Uint8Array} bytes - PDF file bytes
+ * @param {Object} [options]
+ * @param {Function} [options.onProgress] - Called with the fraction of bytes scanned
+ * @returns {Promise<{lines: string[], stats: Object}>} - Text lines and scan statistics
+ */
+async function scanPdfText(bytes, options = {}) {
+    const lines = [];
+    const stats = {
+        bytes: bytes.length,
+        streams: 0,
+        inflatedStreams: 0,
+        skippedStreams: 0,
+        inflatedBytes: 0
+    };
+
+    const canInflate = typeof DecompressionStream !== 'undefined';
+    let position = 0;
+    let nextYield = PDF_SCAN_CHUNK_SIZE;
+
+    while (position < bytes.length) {
+        const keyword = indexOfBytes(bytes, PDF_STREAM_KEYWORD, position);
+        if (keyword < 0) break;
+
+        // "stream" inside a stray "endstream"
+        if (keyword >= 3 && bytes[keyword - 3] === 0x65 && bytes[keyword - 2] === 0x6E && bytes[keyword - 1] === 0x64) {
+            position = keyword + PDF_STREAM_KEYWORD.length;
+            continue;
+        }
+
+        // Stream data starts after the end-of-line that follows the keyword
+        let dataStart = keyword + PDF_STREAM_KEYWORD.length;
+        if (bytes[dataStart] === 0x0D) dataStart++;
+        if (bytes[dataStart] === 0x0A) dataStart++;
+
+        const dictionary = getPdfStreamDictionary(bytes, keyword);
+
+        // Prefer a direct /Length; fall back to searching for "endstream"
+        let dataEnd = -1;
+        const lengthMatch = dictionary.match(/\/Length\s+(\d+)(?!\s+\d+\s+R)/);
+        if (lengthMatch) {
+            const candidate = dataStart + parseInt(lengthMatch[1], 10);
+            const check = indexOfBytes(bytes, PDF_ENDSTREAM_KEYWORD, candidate);
+            if (check >= 0 && check - candidate <= 4) {
+                dataEnd = candidate;
+            }
+        }
+        if (dataEnd < 0) {
+            dataEnd = indexOfBytes(bytes, PDF_ENDSTREAM_KEYWORD, dataStart);
+            if (dataEnd < 0) break;
+            while (dataEnd > dataStart && (bytes[dataEnd - 1] === 0x0A || bytes[dataEnd - 1] === 0x0D)) dataEnd--;
+        }
+
+        stats.streams++;
+
+        const filterMatch = dictionary.match(/\/Filter\s*(\[[^\]]*\]|\/\w+)/);
+        const filters = filterMatch ? filterMatch[1].match(/\/\w+/g) || [] : [];
+        const isFlate = filters.length === 1 && (filters[0] === '/FlateDecode' || filters[0] === '/Fl');
+
+        if (PDF_SKIPPED_STREAM_PATTERN.test(dictionary) || (filters.length > 0 && !isFlate) || (isFlate && !canInflate)) {
+            stats.skippedStreams++;
+        } else {
+            let content = bytes.subarray(dataStart, dataEnd);
+
+            if (isFlate) {
+                content = await inflatePdfStream(content);
+                stats.inflatedStreams++;
+                stats.inflatedBytes += content.length;
+            }
+
+            extractPdfContentText(content, lines);
+        }
+
+        position = dataEnd + PDF_ENDSTREAM_KEYWORD.length;
+
+        if (position >= nextYield) {
+            nextYield = position + PDF_SCAN_CHUNK_SIZE;
+            if (typeof options.onProgress === 'function') {
+                options.onProgress(Math.min(1, position / bytes.length));
+            }
+            await yieldToEventLoop();
+        }
+    }
+
+    return { lines, stats };
+}
+
+// Make functions globally available
+window.scanPdfText = scanPdfText;
@@ -0,0 +1,159 @@
+/**
+ * PDF Triage Module
+ * Decides from a small page sample whether a PDF is text-native, scanned or
+ * mixed, so text PDFs never pay for OCR and scanned PDFs skip the text pass
+ */
+
+/**
+ * Get triage settings with defaults
+ * @returns {{samplePages: number, minTextChars: number, minImageCoverage: number}}
+ */
+function getTriageSettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.triage) || {};
+    return {
+        samplePages: settings.samplePages || 5,
+        minTextChars: settings.minTextChars || 50,
+        minImageCoverage: settings.minImageCoverage || 0.5
+    };
+}
+
+/**
+ * Pick evenly spaced pages to sample, always including the first and last
+ * @param {number} numPages - Pages in the document
+ * @param {number} count - Pages to sample
+ * @returns {number[]} - 1-based page numbers
+ */
+function getSamplePageNumbers(numPages, count) {
+    if (numPages <= count) {
+        return Array.from({ length: numPages }, (_, i) => i + 1);
+    }
+    if (count <= 1) {
+        return [1];
+    }
+
+    const pageNumbers = new Set();
+    for (let i = 0; i < count; i++) {
+        pageNumbers.add(1 + Math.round(i * (numPages - 1) / (count - 1)));
+    }
+    return Array.from(pageNumbers);
+}
+
+/**
+ * Measure the share of a page covered by painted images
+ * Only the determinant of the transformation matrix is tracked, since an
+ * image is painted into the unit square and its area scales with it
+ * @param {Object} page - PDF.js page
+ * @returns {Promise<number>} - Coverage between 0 and 1
+ */
+async function measureImageCoverage(page) {
+    const OPS = window.pdfjsLib.OPS;
+    const operatorList = await page.getOperatorList();
+
+    const [x1, y1, x2, y2] = page.view;
+    const pageArea = Math.abs((x2 - x1) * (y2 - y1));
+    if (pageArea === 0) return 0;
+
+    const stack = [];
+    let scale = 1;
+    let imageArea = 0;
+
+    for (let i = 0; i < operatorList.fnArray.length; i++) {
+        const fn = operatorList.fnArray[i];
+        const args = operatorList.argsArray[i];
+
+        switch (fn) {
+            case OPS.save:
+                stack.push(scale);
+                break;
+            case OPS.restore:
+                if (stack.length > 0) scale = stack.pop();
+                break;
+            case OPS.transform:
+                scale *= Math.abs(args[0] * args[3] - args[1] * args[2]);
+                break;
+            case OPS.paintFormXObjectBegin:
+                stack.push(scale);
+                if (args && args[0]) {
+                    const m = args[0];
+                    scale *= Math.abs(m[0] * m[3] - m[1] * m[2]);
+                }
+                break;
+            case OPS.paintFormXObjectEnd:
+                if (stack.length > 0) scale = stack.pop();
+                break;
+            case OPS.paintImageXObject:
+            case OPS.paintInlineImageXObject:
+            case OPS.paintImageMaskXObject:
+            case OPS.paintJpegXObject:
+                imageArea += scale;
+                break;
+        }
+    }
+
+    return Math.min(1, imageArea / pageArea);
+}
+
+/**
+ * Classify a single page as text or scanned
+ * Image coverage is only measured for pages with little text, so text-rich
+ * pages cost a single getTextContent call
+ * @param {Object} page - PDF.js page
+ * @returns {Promise<{kind: string, textChars: number, imageCoverage: number|null, textContent: Object}>}
+ */
+async function analyzePdfPage(page) {
+    const settings = getTriageSettings();
+    const textContent = await page.getTextContent();
+
+    let textChars = 0;
+    for (const item of textContent.items) {
+        textChars += item.str.trim().length;
+    }
+
+    if (textChars >= settings.minTextChars) {
+        return { kind: 'text', textChars, imageCoverage: null, textContent };
+    }
+
+    const imageCoverage = await measureImageCoverage(page);
+    const kind = imageCoverage >= settings.minImageCoverage ? 'scanned' : 'text';
+    return { kind, textChars, imageCoverage, textContent };
+}
+
+/**
+ * Triage a PDF from a sample of its pages
+ * @param {Object} pdf - PDF.js document
+ * @returns {Promise<{mode: string, pages: Map<number, Object>, seconds: number}>} -
+ *          mode is 'text', 'scanned' or 'mixed'; pages holds the sampled page analyses
+ */
+async function triagePdf(pdf) {
+    const start = performance.now();
+    const { samplePages } = getTriageSettings();
+    const pages = new Map();
+
+    for (const pageNumber of getSamplePageNumbers(pdf.numPages, samplePages)) {
+        try {
+            const page = await pdf.getPage(pageNumber);
+            pages.set(pageNumber, await analyzePdfPage(page));
+        } catch (error) {
+            console.warn(`Triage could not analyze page ${pageNumber}:`, error);
+        }
+    }
+
+    const kinds = Array.from(pages.values(), analysis => analysis.kind);
+    const scanned = kinds.filter(kind => kind === 'scanned').length;
+
+    let mode = 'mixed';
+    if (scanned === 0) {
+        mode = 'text';
+    } else if (scanned === kinds.length) {
+        mode = 'scanned';
+    }
+
+    const seconds = (performance.now() - start) / 1000;
+    console.log(`PDF triage: ${mode} (${scanned} of ${kinds.length} sampled pages scanned) in ${seconds.toFixed(2)}s`);
+
+    return { mode, pages, seconds };
+}
+
+// Make functions globally available
+window.triagePdf = triagePdf;
+window.analyzePdfPage = analyzePdfPage;
@@ -104,9 +104,19 @@ function showFullPreview() {
     // Update modal content
     fullPreviewContent.innerHTML = formattedContent;
     
+    // Large documents load the pages after the excerpt while scrolling
+    if (typeof appendPagedPreview === 'function') {
+        appendPagedPreview(fullPreviewContent);
+    }
+    
     // Show modal
     fullPreviewModal.classList.remove('hidden');
     
+    // Show page thumbnails (PDF only)
+    if (typeof showThumbnailStrip === 'function') {
+        showThumbnailStrip();
+    }
+    
     // Prevent scrolling on the body while modal is open
     document.body.style.overflow = 'hidden';
     
@@ -121,6 +131,11 @@ function hideFullPreview() {
     
     fullPreviewModal.classList.add('hidden');
     
+    // Stop rendering thumbnails while the modal is closed
+    if (typeof hideThumbnailStrip === 'function') {
+        hideThumbnailStrip();
+    }
+    
     // Restore scrolling
     document.body.style.overflow = '';
 }
@@ -158,17 +173,19 @@ function formatDocumentContent(content, fileName) {
 function formatPdfContent(content) {
     // Check if content has already been processed with markdown-like syntax
     if (content.includes('# ') || content.includes('## Page')) {
-        // Split by page markers
-        const parts = content.split(/## Page \d+/);
+        // Split by page markers (captured page numbers alternate with page text)
+        const parts = content.split(/## Page (\d+)/);
         let pages = [];
         
         // First part is the header
         const header = parts[0];
         
         // Process each page
-        for (let i = 1; i < parts.length; i++) {
-            if (parts[i].trim()) {
-                pages.push(`<div class="document-page">${formatPlainText(parts[i])}</div>`);
+        for (let i = 1; i < parts.length; i += 2) {
+            const pageNumber = parts[i];
+            const pageText = parts[i + 1] || '';
+            if (pageText.trim()) {
+                pages.push(`<div class="document-page" data-page="${pageNumber}">${formatPlainText(pageText)}</div>`);
             }
         }
         
@@ -0,0 +1,255 @@
+/**
+ * Speculative Answers Module
+ * Opt-in prefetching of answers to the suggested question chips. After a
+ * document is loaded, the top chips are sent to the API while the browser
+ * is idle, within a per-session call and token budget taken from
+ * LLM_CONFIG.apiUsage. Typing a question cancels the prefetch; a chip whose
+ * answer is ready is answered from the cache without another request.
+ */
+
+// Prefetched answers of the current document: question -> {promise, answer}
+let speculativeAnswers = new Map();
+let speculativeDocumentText = null;
+
+// Controller of the running prefetch
+let speculativeAbort = null;
+
+const SPECULATIVE_USAGE_KEY = 'speculative_usage';
+
+/**
+ * Get speculative answer settings with defaults
+ * The call budget is a share of apiUsage.maxCallsPerSession, and prefetching
+ * stops before the session reaches apiUsage.warningThreshold
+ * @returns {{enabled: boolean, maxChips: number, callBudget: number, tokenBudget: number, callCeiling: number, idleTimeout: number}}
+ */
+function getSpeculativeSettings() {
+    const usage = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.apiUsage) || {};
+    const settings = usage.speculative || {};
+    const maxCalls = usage.maxCallsPerSession || 50;
+    return {
+        enabled: settings.enabled === true,
+        maxChips: settings.maxChips || 3,
+        callBudget: Math.floor(maxCalls * (settings.callShare || 0.2)),
+        tokenBudget: settings.tokenBudget || 20000,
+        callCeiling: usage.warningThreshold || maxCalls,
+        idleTimeout: settings.idleTimeout || 3000
+    };
+}
+
+/**
+ * Get the calls and tokens spent on prefetching this session
+ * @returns {{calls: number, tokens: number}}
+ */
+function getSpeculativeUsage() {
+    try {
+        return { calls: 0, tokens: 0, ...JSON.parse(sessionStorage.getItem(SPECULATIVE_USAGE_KEY) || '{}') };
+    } catch (e) {
+        return { calls: 0, tokens: 0 };
+    }
+}
+
+/**
+ * Add to the calls and tokens spent on prefetching
+ * @param {number} calls - Calls made
+ * @param {number} tokens - Tokens used
+ */
+function recordSpeculativeUsage(calls, tokens) {
+    const usage = getSpeculativeUsage();
+    usage.calls += calls;
+    usage.tokens += tokens;
+    sessionStorage.setItem(SPECULATIVE_USAGE_KEY, JSON.stringify(usage));
+}
+
+/**
+ * Check whether one more prefetch fits the budget
+ * @param {number} estimatedTokens - Expected prompt and answer tokens
+ * @param {Object} settings - Speculative settings
+ * @returns {boolean}
+ */
+function hasSpeculativeBudget(estimatedTokens, settings) {
+    const usage = getSpeculativeUsage();
+    const sessionCalls = typeof apiUsageMonitor !== 'undefined' ? apiUsageMonitor.getUsageCount() : 0;
+
+    return usage.calls < settings.callBudget &&
+        usage.tokens + estimatedTokens <= settings.tokenBudget &&
+        sessionCalls + 1 < settings.callCeiling;
+}
+
+/**
+ * Check whether a question would be sent to the API as a plain single-document
+ * question (the only answers that are prefetched)
+ * @param {string} question - Suggested question
+ * @returns {boolean}
+ */
+function isSpeculativeCandidate(question) {
+    if (typeof isOpenAiApiEnabled !== 'function' || !isOpenAiApiEnabled()) return false;
+    if (typeof isCollectionModeEnabled === 'function' && isCollectionModeEnabled()) return false;
+    if (typeof getActivePagedDocument === 'function' && getActivePagedDocument()) return false;
+
+    // Answered locally anyway
+    if (typeof answerTableQuestion === 'function' && answerTableQuestion(question)) return false;
+    if (typeof answerEntityQuestion === 'function' && answerEntityQuestion(question)) return false;
+    return true;
+}
+
+/**
+ * Wait until the browser is idle
+ * @param {number} timeout - Longest wait (ms)
+ * @returns {Promise<void>}
+ */
+function waitForIdle(timeout) {
+    return new Promise(resolve => {
+        if (typeof requestIdleCallback === 'function') {
+            requestIdleCallback(() => resolve(), { timeout });
+        } else {
+            setTimeout(resolve, 0);
+        }
+    });
+}
+
+/**
+ * Prefetch the answer to one question
+ * @param {string} question - Suggested question
+ * @param {string} text - Document text
+ * @param {AbortSignal} signal - Cancels the request
+ * @returns {Promise<string|null>} - Answer, or null when it failed or was cancelled
+ */
+async function prefetchAnswer(question, text, signal) {
+    try {
+        const context = typeof buildSummaryContext === 'function' ? await buildSummaryContext(question, text) : text;
+        if (signal.aborted) return null;
+
+        if (typeof apiUsageMonitor !== 'undefined' && typeof apiUsageMonitor.recordAPICall === 'function') {
+            apiUsageMonitor.recordAPICall();
+        }
+        recordSpeculativeUsage(1, 0);
+        const completion = await requestChatCompletion(buildChatMessages(question, context), { signal });
+
+        const tokens = completion.usage ? completion.usage.total_tokens :
+            estimateTokenCount(context) + estimateTokenCount(completion.content);
+        recordSpeculativeUsage(0, tokens);
+        return completion.content;
+    } catch (error) {
+        if (error.name !== 'AbortError') {
+            console.warn(`Prefetching "${question}" failed:`, error.message);
+        }
+        return null;
+    }
+}
+
+/**
+ * Prefetch answers to the top suggested questions once the browser is idle
+ * Replaces any prefetch in progress
+ * @param {string[]} questions - Suggested questions, best first
+ */
+async function scheduleSpeculativeAnswers(questions) {
+    cancelSpeculativeAnswers();
+
+    const settings = getSpeculativeSettings();
+    const text = typeof documentText !== 'undefined' ? documentText : window.documentText;
+    if (!settings.enabled || !text) return;
+
+    if (speculativeDocumentText !== text) {
+        speculativeAnswers = new Map();
+        speculativeDocumentText = text;
+    }
+
+    const controller = new AbortController();
+    speculativeAbort = controller;
+    const maxTokens = LLM_CONFIG.openai.maxTokens || 800;
+
+    for (const question of questions.slice(0, settings.maxChips)) {
+        await waitForIdle(settings.idleTimeout);
+        if (controller.signal.aborted) return;
+        if (speculativeAnswers.has(question) || !isSpeculativeCandidate(question)) continue;
+
+        // The prompt is at most the 8000-character context plus the question
+        const estimatedTokens = estimateTokenCount(text.substring(0, 8000)) + maxTokens;
+        if (!hasSpeculativeBudget(estimatedTokens, settings)) {
+            console.log('Speculative answers: session budget reached');
+            return;
+        }
+
+        const entry = { answer: null, promise: null };
+        entry.promise = prefetchAnswer(question, text, controller.signal).then(answer => {
+            if (answer) {
+                entry.answer = answer;
+                markPrefetchedChip(question);
+            } else if (speculativeAnswers.get(question) === entry) {
+                speculativeAnswers.delete(question);
+            }
+            return answer;
+        });
+        speculativeAnswers.set(question, entry);
+
+        // One request at a time, so typing never waits on several
+        await entry.promise;
+    }
+}
+
+/**
+ * Cancel the prefetch in progress (requests in flight are aborted)
+ */
+function cancelSpeculativeAnswers() {
+    if (speculativeAbort) {
+        speculativeAbort.abort();
+        speculativeAbort = null;
+    }
+}
+
+/**
+ * Get the prefetched answer to a question, if there is one
+ * An answer still in flight is returned as a promise
+ * @param {string} question - The question asked
+ * @returns {Promise<string|null>|null}
+ */
+function getSpeculativeAnswer(question) {
+    const entry = speculativeAnswers.get(question);
+    if (!entry) return null;
+
+    // Only while the document and the way the question would be answered are unchanged
+    const text = typeof documentText !== 'undefined' ? documentText : window.documentText;
+    if (speculativeDocumentText !== text || !isSpeculativeCandidate(question)) return null;
+    return entry.answer ? Promise.resolve(entry.answer) : entry.promise;
+}
+
+/**
+ * Mark the chip of a question whose answer is ready
+ * @param {string} question - Suggested question
+ */
+function markPrefetchedChip(question) {
+    const chips = document.querySelectorAll('.recommendation-chip');
+    for (const chip of chips) {
+        if (chip.textContent === question) {
+            chip.classList.add('prefetched');
+            chip.title = 'Answer ready';
+        }
+    }
+}
+
+/**
+ * Check whether a question's answer has been prefetched
+ * @param {string} question - Suggested question
+ * @returns {boolean}
+ */
+function hasSpeculativeAnswer(question) {
+    const entry = speculativeAnswers.get(question);
+    return Boolean(entry && entry.answer) && getSpeculativeAnswer(question) !== null;
+}
+
+/**
+ * Cancel prefetching as soon as the user types a question
+ */
+function setupSpeculativeAnswers() {
+    const queryInput = document.getElementById('query-input');
+    if (queryInput) {
+        queryInput.addEventListener('input', cancelSpeculativeAnswers);
+    }
+}
+
+// Make functions globally available
+window.scheduleSpeculativeAnswers = scheduleSpeculativeAnswers;
+window.cancelSpeculativeAnswers = cancelSpeculativeAnswers;
+window.getSpeculativeAnswer = getSpeculativeAnswer;
+window.hasSpeculativeAnswer = hasSpeculativeAnswer;
+window.setupSpeculativeAnswers = setupSpeculativeAnswers;
@@ -0,0 +1,360 @@
+/**
+ * Spreadsheet Parser Module
+ * Streams XLSX sheets and CSV files into column-oriented tables (see
+ * tableStore.js). Rows are parsed as chunks arrive, so the whole sheet is
+ * never held as one string.
+ */
+
+// XML entities used in sheet and shared string parts
+const XML_ENTITIES = { amp: '&', lt: '<', gt: '>', quot: '"', apos: "'" };
+
+/**
+ * Decode XML character references and entities
+ * @param {string} text - Raw XML text
+ * @returns {string}
+ */
+function decodeXmlText(text) {
+    if (text.indexOf('&') === -1) return text;
+
+    return text.replace(/&(#x[0-9a-f]+|#\d+|\w+);/gi, (match, entity) => {
+        if (entity[0] === '#') {
+            const code = entity[1] === 'x' || entity[1] === 'X' ?
+                parseInt(entity.slice(2), 16) : parseInt(entity.slice(1), 10);
+            return String.fromCodePoint(code);
+        }
+        return XML_ENTITIES[entity] !== undefined ? XML_ENTITIES[entity] : match;
+    });
+}
+
+/**
+ * Concatenate the text runs (<t>) inside an XML fragment
+ * @param {string} xml - Fragment such as a shared string item or inline string
+ * @returns {string}
+ */
+function getXmlRunText(xml) {
+    let text = '';
+    const runRegex = /<t\b[^>]*>([\s\S]*?)<\/t>/g;
+    let match;
+    while ((match = runRegex.exec(xml)) !== null) {
+        text += match[1];
+    }
+    return decodeXmlText(text);
+}
+
+/**
+ * Feed complete XML elements from a text stream to a callback
+ * Only the unfinished tail of the last chunk is kept between chunks
+ * @param {ReadableStream<string>} stream - Decoded XML
+ * @param {string} closingTag - Closing tag that ends each element, e.g. '</row>'
+ * @param {RegExp} elementRegex - Global regex matching one element
+ * @param {Function} onElement - Called with each regex match
+ * @returns {Promise<void>}
+ */
+async function streamXmlElements(stream, closingTag, elementRegex, onElement) {
+    const reader = stream.getReader();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (!done) buffer += value;
+
+        // Parse up to the last complete element and keep the rest
+        const end = done ? buffer.length : buffer.lastIndexOf(closingTag) + closingTag.length;
+        if (end >= closingTag.length || done) {
+            const complete = buffer.slice(0, end);
+            buffer = buffer.slice(end);
+
+            elementRegex.lastIndex = 0;
+            let match;
+            while ((match = elementRegex.exec(complete)) !== null) {
+                onElement(match);
+            }
+        }
+
+        if (done) break;
+    }
+}
+
+/**
+ * Convert a column reference such as "AB" to a zero-based index
+ * @param {string} letters - Column letters
+ * @returns {number}
+ */
+function columnLettersToIndex(letters) {
+    let index = 0;
+    for (let i = 0; i < letters.length; i++) {
+        index = index * 26 + (letters.charCodeAt(i) - 64);
+    }
+    return index - 1;
+}
+
+/**
+ * Read the shared string table of a workbook
+ * @param {ArrayBuffer} arrayBuffer - XLSX content
+ * @param {Map} entries - ZIP directory
+ * @returns {Promise<string[]>}
+ */
+async function readSharedStrings(arrayBuffer, entries) {
+    const strings = [];
+    const entry = entries.get('xl/sharedStrings.xml');
+    if (!entry) return strings;
+
+    await streamXmlElements(
+        openZipEntryTextStream(arrayBuffer, entry),
+        '</si>',
+        /<si\b[^>]*>([\s\S]*?)<\/si>/g,
+        match => strings.push(getXmlRunText(match[1].replace(/<rPh\b[\s\S]*?<\/rPh>/g, '')))
+    );
+
+    return strings;
+}
+
+/**
+ * List the sheets of a workbook with their part names
+ * @param {ArrayBuffer} arrayBuffer - XLSX content
+ * @param {Map} entries - ZIP directory
+ * @returns {Promise<{name: string, path: string}[]>}
+ */
+async function readWorkbookSheets(arrayBuffer, entries) {
+    const workbook = await readZipEntryText(arrayBuffer, entries.get('xl/workbook.xml'));
+    const relsEntry = entries.get('xl/_rels/workbook.xml.rels');
+    const rels = relsEntry ? await readZipEntryText(arrayBuffer, relsEntry) : '';
+
+    // Relationship id -> target part
+    const targets = new Map();
+    const relRegex = /<Relationship\b([^>]*)\/?>/g;
+    let match;
+    while ((match = relRegex.exec(rels)) !== null) {
+        const id = match[1].match(/\bId="([^"]+)"/);
+        const target = match[1].match(/\bTarget="([^"]+)"/);
+        if (id && target) targets.set(id[1], target[1]);
+    }
+
+    const sheets = [];
+    const sheetRegex = /<sheet\b([^>]*)\/?>/g;
+    while ((match = sheetRegex.exec(workbook)) !== null) {
+        const name = match[1].match(/\bname="([^"]*)"/);
+        const relId = match[1].match(/\br:id="([^"]+)"/);
+        let target = relId ? targets.get(relId[1]) : null;
+        if (!name || !target) continue;
+
+        // Targets are relative to xl/ unless absolute
+        target = target.startsWith('/') ? target.slice(1) : `xl/${target}`;
+        sheets.push({ name: decodeXmlText(name[1]), path: target });
+    }
+
+    return sheets;
+}
+
+/**
+ * Parse an XLSX workbook into tables
+ * @param {ArrayBuffer} arrayBuffer - XLSX content
+ * @param {Object} [options] - {onProgress({stage, done, total})}
+ * @returns {Promise<Object[]>} - One table per non-empty sheet
+ */
+async function parseXlsx(arrayBuffer, options = {}) {
+    const entries = readZipDirectory(arrayBuffer);
+    if (!entries.has('xl/workbook.xml')) {
+        throw new Error('Not an Excel workbook (xl/workbook.xml not found)');
+    }
+
+    const sharedStrings = await readSharedStrings(arrayBuffer, entries);
+    const sheets = await readWorkbookSheets(arrayBuffer, entries);
+    const tables = [];
+
+    for (let s = 0; s < sheets.length; s++) {
+        const sheet = sheets[s];
+        const entry = entries.get(sheet.path);
+        if (!entry) continue;
+
+        if (typeof options.onProgress === 'function') {
+            options.onProgress({ stage: 'sheets', done: s + 1, total: sheets.length });
+        }
+
+        const builder = createTableBuilder(sheet.name);
+        const cellRegex = /<c\b([^>]*?)(?:\/>|>([\s\S]*?)<\/c>)/g;
+
+        await streamXmlElements(
+            openZipEntryTextStream(arrayBuffer, entry),
+            '</row>',
+            /<row\b[^>]*?(?:\/>|>([\s\S]*?)<\/row>)/g,
+            match => {
+                if (!match[1]) return;
+
+                const cells = [];
+                let nextColumn = 0;
+                let cell;
+                cellRegex.lastIndex = 0;
+
+                while ((cell = cellRegex.exec(match[1])) !== null) {
+                    const attributes = cell[1];
+                    const content = cell[2] || '';
+
+                    const ref = attributes.match(/\br="([A-Z]+)\d+"/);
+                    const column = ref ? columnLettersToIndex(ref[1]) : nextColumn;
+                    nextColumn = column + 1;
+
+                    const type = (attributes.match(/\bt="(\w+)"/) || [])[1];
+                    const raw = (content.match(/<v>([\s\S]*?)<\/v>/) || [])[1];
+                    let value = '';
+
+                    if (type === 's') {
+                        value = sharedStrings[parseInt(raw, 10)] || '';
+                    } else if (type === 'inlineStr') {
+                        value = getXmlRunText(content);
+                    } else if (type === 'b') {
+                        value = raw === '1' ? 'TRUE' : 'FALSE';
+                    } else if (raw !== undefined) {
+                        value = decodeXmlText(raw);
+                    }
+
+                    while (cells.length < column) cells.push('');
+                    cells[column] = value;
+                }
+
+                builder.addRow(cells);
+            }
+        );
+
+        const table = builder.finish();
+        if (table) tables.push(table);
+    }
+
+    return tables;
+}
+
+/**
+ * Guess the delimiter of a CSV file from its first line
+ * @param {string} sample - Start of the file
+ * @returns {string}
+ */
+function detectCsvDelimiter(sample) {
+    const firstLine = sample.split(/\r?\n/, 1)[0];
+    let best = ',';
+    let bestCount = 0;
+
+    for (const delimiter of [',', ';', '\t', '|']) {
+        const count = firstLine.split(delimiter).length - 1;
+        if (count > bestCount) {
+            best = delimiter;
+            bestCount = count;
+        }
+    }
+    return best;
+}
+
+/**
+ * Parse a CSV text stream into a table
+ * Handles quoted fields with embedded delimiters, quotes ("") and newlines
+ * @param {ReadableStream<string>} stream - Decoded CSV text
+ * @param {string} name - Table name
+ * @returns {Promise<Object|null>}
+ */
+async function parseCsvStream(stream, name) {
+    const reader = stream.getReader();
+    const builder = createTableBuilder(name);
+
+    let delimiterCode = -1;
+    let sample = '';
+    let row = [];
+    let field = '';
+    let inQuotes = false;
+    let quotePending = false; // Saw a quote inside a quoted field
+    let skipLineFeed = false;
+
+    function parseChunk(chunk) {
+        let start = 0;
+        for (let i = 0; i < chunk.length; i++) {
+            const code = chunk.charCodeAt(i);
+
+            if (skipLineFeed) {
+                skipLineFeed = false;
+                if (code === 10) {
+                    start = i + 1;
+                    continue;
+                }
+            }
+
+            if (inQuotes) {
+                if (quotePending) {
+                    quotePending = false;
+                    if (code === 34) {
+                        // Escaped quote: keep one
+                        field += '"';
+                        start = i + 1;
+                        continue;
+                    }
+                    inQuotes = false;
+                } else {
+                    if (code === 34) {
+                        field += chunk.slice(start, i);
+                        quotePending = true;
+                        start = i + 1;
+                    }
+                    continue;
+                }
+            }
+
+            if (code === 34 && field === '' && i === start) {
+                inQuotes = true;
+                start = i + 1;
+            } else if (code === delimiterCode) {
+                row.push(field + chunk.slice(start, i));
+                field = '';
+                start = i + 1;
+            } else if (code === 10 || code === 13) {
+                row.push(field + chunk.slice(start, i));
+                builder.addRow(row);
+                row = [];
+                field = '';
+                start = i + 1;
+                skipLineFeed = code === 13;
+            }
+        }
+
+        // Carry the unfinished field into the next chunk
+        field += chunk.slice(start);
+    }
+
+    while (true) {
+        const { done, value } = await reader.read();
+
+        // Hold back the start of the file until its first line is complete
+        if (delimiterCode < 0) {
+            if (!done) sample += value;
+            if (!done && !/[\r\n]/.test(sample)) continue;
+
+            delimiterCode = detectCsvDelimiter(sample).charCodeAt(0);
+            parseChunk(sample);
+            sample = '';
+        } else if (!done) {
+            parseChunk(value);
+        }
+
+        if (done) break;
+    }
+
+    if (field !== '' || row.length > 0) {
+        row.push(field);
+        builder.addRow(row);
+    }
+
+    return builder.finish();
+}
+
+/**
+ * Describe parsed tables as document text
+ * @param {string} fileName - Source file name
+ * @param {Object[]} tables - Parsed tables
+ * @returns {string}
+ */
+function formatTablesAsDocument(fileName, tables) {
+    if (tables.length === 0) {
+        return `# ${fileName}\n\nThis spreadsheet does not contain any data.`;
+    }
+    return `# ${fileName}\n\n` + tables.map(table => formatTableAsText(table)).join('\n\n');
+}
+
+// Make functions globally available
+window.parseXlsx = parseXlsx;
+window.parseCsvStream = parseCsvStream;
@@ -0,0 +1,219 @@
+/**
+ * Storage Module
+ * Small IndexedDB wrapper used to persist document data between sessions
+ */
+
+// Database settings
+const STORAGE_DB_NAME = 'doc-qa-app';
+const STORAGE_DB_VERSION = 5;
+
+// Object stores created on upgrade (keys are supplied by the caller)
+const STORAGE_STORES = ['qaHistory', 'ocrCache', 'documentPages', 'chunkVectors', 'vectorIndex', 'termIndexes'];
+
+// Record listing the keys of a store, least recently used first
+const STORAGE_MANIFEST_KEY = 'manifest';
+
+// Cached database connection
+let storageDbPromise = null;
+
+// Manifest updates by store name, applied one at a time
+const storageManifestUpdates = new Map();
+
+/**
+ * Open (or reuse) the application database
+ * @returns {Promise<IDBDatabase|null>} - Database, or null when IndexedDB is unavailable
+ */
+function openStorage() {
+    if (storageDbPromise) {
+        return storageDbPromise;
+    }
+
+    if (typeof indexedDB === 'undefined') {
+        console.warn('IndexedDB not available. Data will not persist between sessions.');
+        storageDbPromise = Promise.resolve(null);
+        return storageDbPromise;
+    }
+
+    storageDbPromise = new Promise((resolve) => {
+        const request = indexedDB.open(STORAGE_DB_NAME, STORAGE_DB_VERSION);
+
+        request.onupgradeneeded = () => {
+            const db = request.result;
+
+            // Create any store that does not exist yet
+            for (const storeName of STORAGE_STORES) {
+                if (!db.objectStoreNames.contains(storeName)) {
+                    db.createObjectStore(storeName);
+                }
+            }
+        };
+
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => {
+            console.error('Failed to open IndexedDB:', request.error);
+            resolve(null);
+        };
+    });
+
+    return storageDbPromise;
+}
+
+/**
+ * Run a single request against an object store
+ * @param {string} storeName - Object store name
+ * @param {string} mode - Transaction mode ('readonly' or 'readwrite')
+ * @param {Function} makeRequest - Receives the store and returns an IDBRequest
+ * @returns {Promise<*>} - Request result (undefined when storage is unavailable)
+ */
+async function runStorageRequest(storeName, mode, makeRequest) {
+    const db = await openStorage();
+    if (!db) return undefined;
+
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction(storeName, mode);
+        const request = makeRequest(transaction.objectStore(storeName));
+
+        transaction.oncomplete = () => resolve(request.result);
+        transaction.onerror = () => reject(transaction.error);
+        transaction.onabort = () => reject(transaction.error);
+    });
+}
+
+/**
+ * Read a value from storage
+ * @param {string} storeName - Object store name
+ * @param {string} key - Record key
+ * @returns {Promise<*>} - Stored value or undefined
+ */
+function storageGet(storeName, key) {
+    return runStorageRequest(storeName, 'readonly', store => store.get(key));
+}
+
+/**
+ * Write a value to storage
+ * @param {string} storeName - Object store name
+ * @param {string} key - Record key
+ * @param {*} value - Value to store (must be structured-cloneable)
+ * @returns {Promise<void>}
+ */
+function storagePut(storeName, key, value) {
+    return runStorageRequest(storeName, 'readwrite', store => store.put(value, key));
+}
+
+/**
+ * Delete a value from storage
+ * @param {string} storeName - Object store name
+ * @param {string} key - Record key
+ * @returns {Promise<void>}
+ */
+function storageDelete(storeName, key) {
+    return runStorageRequest(storeName, 'readwrite', store => store.delete(key));
+}
+
+/**
+ * Write several values in one transaction
+ * @param {string} storeName - Object store name
+ * @param {Array<[string, *]>} entries - Key/value pairs
+ * @returns {Promise<void>}
+ */
+function storagePutMany(storeName, entries) {
+    return runStorageRequest(storeName, 'readwrite', store => {
+        let request = null;
+        for (const [key, value] of entries) {
+            request = store.put(value, key);
+        }
+        return request || store.count();
+    });
+}
+
+/**
+ * Visit every record in a key range, in key order
+ * The callback runs inside the transaction and must not await
+ * @param {string} storeName - Object store name
+ * @param {string} lower - First key (inclusive)
+ * @param {string} upper - Last key (inclusive)
+ * @param {Function} callback - Called with (key, value); return false to stop
+ * @returns {Promise<void>}
+ */
+async function storageForEachInRange(storeName, lower, upper, callback) {
+    const db = await openStorage();
+    if (!db) return;
+
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction(storeName, 'readonly');
+        const request = transaction.objectStore(storeName).openCursor(IDBKeyRange.bound(lower, upper));
+
+        request.onsuccess = () => {
+            const cursor = request.result;
+            if (cursor && callback(cursor.key, cursor.value) !== false) {
+                cursor.continue();
+            }
+        };
+        transaction.oncomplete = () => resolve();
+        transaction.onerror = () => reject(transaction.error);
+        transaction.onabort = () => reject(transaction.error);
+    });
+}
+
+/**
+ * Delete every record in a key range
+ * @param {string} storeName - Object store name
+ * @param {string} lower - First key (inclusive)
+ * @param {string} upper - Last key (inclusive)
+ * @returns {Promise<void>}
+ */
+function storageDeleteRange(storeName, lower, upper) {
+    return runStorageRequest(storeName, 'readwrite', store => store.delete(IDBKeyRange.bound(lower, upper)));
+}
+
+/**
+ * Record that a record was written or read, and delete the least recently
+ * used records of the store beyond the limits
+ * The store's manifest lists {key, bytes} entries, least recently used first;
+ * the record just touched is never evicted.
+ * @param {string} storeName - Object store name
+ * @param {string} key - Record key
+ * @param {number|null} bytes - Size of a record just written, or null for a read
+ * @param {{maxEntries: number, maxBytes: number}} limits - Records and bytes kept
+ * @returns {Promise<string[]>} - Keys of the evicted records
+ */
+function touchStorageManifest(storeName, key, bytes, limits) {
+    const previous = storageManifestUpdates.get(storeName) || Promise.resolve();
+    const update = previous.then(async () => {
+        // Older manifests listed keys only
+        const manifest = ((await storageGet(storeName, STORAGE_MANIFEST_KEY)) || [])
+            .map(entry => typeof entry === 'string' ? { key: entry, bytes: 0 } : entry);
+
+        const position = manifest.findIndex(entry => entry.key === key);
+        const existing = position === -1 ? null : manifest.splice(position, 1)[0];
+        if (bytes === null && !existing) return [];
+        manifest.push({ key, bytes: bytes === null ? existing.bytes : bytes });
+
+        let total = manifest.reduce((sum, entry) => sum + entry.bytes, 0);
+        const evicted = [];
+        while (manifest.length > 1 && (manifest.length > limits.maxEntries || total > limits.maxBytes)) {
+            const entry = manifest.shift();
+            total -= entry.bytes;
+            evicted.push(entry.key);
+        }
+
+        await storagePut(storeName, STORAGE_MANIFEST_KEY, manifest);
+        for (const evictedKey of evicted) {
+            await storageDelete(storeName, evictedKey);
+        }
+        return evicted;
+    });
+
+    storageManifestUpdates.set(storeName, update.catch(() => []));
+    return update;
+}
+
+// Make functions globally available
+window.openStorage = openStorage;
+window.storageGet = storageGet;
+window.storagePut = storagePut;
+window.storageDelete = storageDelete;
+window.storagePutMany = storagePutMany;
+window.storageForEachInRange = storageForEachInRange;
+window.storageDeleteRange = storageDeleteRange;
+window.touchStorageManifest = touchStorageManifest;
@@ -0,0 +1,195 @@
+/**
+ * Summarizer Module
+ * Extractive document summaries computed offline in workers/summaryWorker.js
+ * (TextRank over TF-IDF sentence vectors). The summary of the current
+ * document is prepared when it is loaded, answers summary questions in
+ * Document Analysis Mode and replaces the truncated start of long documents
+ * as LLM context for overview questions.
+ */
+
+const SUMMARY_WORKER_URL = 'js/workers/summaryWorker.js';
+
+// Worker and requests waiting for it
+let summaryWorker = null;
+let summaryRequestCounter = 0;
+const summaryRequests = new Map();
+
+// Summary of the current document: {text, promise, result}
+let activeSummary = null;
+
+// Questions that ask for an overview of the whole document
+// ("about" only in "what is this (document) about?", not "what does it say about X")
+const SUMMARY_QUESTION_PATTERN = /\b(summar(y|ise|ize)|overview|main points|key points|gist|tl;?dr)\b|\bwhat(?:'s| is| does)? (?:this|the|it)(?: \w+)? (?:about|say)\s*\??\s*$/i;
+
+/**
+ * Get summary settings with defaults
+ * @returns {{maxSentences: number, contextSentences: number, maxTextChars: number}}
+ */
+function getSummarySettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.summary) || {};
+    return {
+        maxSentences: settings.maxSentences || 7,
+        contextSentences: settings.contextSentences || 25,
+        maxTextChars: settings.maxTextChars || 2 * 1024 * 1024
+    };
+}
+
+/**
+ * Get (or create) the summary worker
+ * @returns {Worker|null} - null when workers are not available
+ */
+function getSummaryWorker() {
+    if (typeof Worker === 'undefined') return null;
+
+    if (!summaryWorker) {
+        summaryWorker = new Worker(SUMMARY_WORKER_URL);
+        summaryWorker.onmessage = function(event) {
+            const message = event.data;
+            const request = summaryRequests.get(message.id);
+            if (!request) return;
+
+            summaryRequests.delete(message.id);
+            if (message.type === 'summary') {
+                request.resolve(message);
+            } else {
+                request.reject(new Error(message.message));
+            }
+        };
+        summaryWorker.onerror = function(event) {
+            console.error('Summary worker error:', event.message);
+            for (const request of summaryRequests.values()) {
+                request.reject(new Error(event.message || 'Summary worker failed'));
+            }
+            summaryRequests.clear();
+            summaryWorker = null;
+        };
+    }
+    return summaryWorker;
+}
+
+/**
+ * Summarize text by extracting its most central sentences
+ * @param {string} text - Document text
+ * @param {number} [maxSentences] - Sentences to return
+ * @returns {Promise<{sentences: {index: number, text: string, score: number}[], sentenceCount: number, elapsedMs: number}>}
+ */
+function summarizeText(text, maxSentences = getSummarySettings().maxSentences) {
+    const worker = getSummaryWorker();
+    if (!worker) {
+        return Promise.reject(new Error('Web Workers are not supported in this browser'));
+    }
+
+    return new Promise((resolve, reject) => {
+        const id = ++summaryRequestCounter;
+        summaryRequests.set(id, { resolve, reject });
+        worker.postMessage({ type: 'summarize', id, text, maxSentences });
+    });
+}
+
+/**
+ * Start summarizing the current document in the background
+ * Very long texts are summarized from their first maxTextChars characters
+ * @param {string} text - Document text
+ */
+function prepareDocumentSummary(text) {
+    if (activeSummary && activeSummary.text === text) return;
+
+    const settings = getSummarySettings();
+    const summary = { text, promise: null, result: null };
+    activeSummary = summary;
+
+    if (!text) return;
+
+    // Enough sentences for the LLM context; answers show the best of them
+    summary.promise = summarizeText(text.substring(0, settings.maxTextChars), settings.contextSentences)
+        .then(result => {
+            summary.result = result;
+            console.log(`Summary: ${result.sentences.length} of ${result.sentenceCount} sentences in ${result.elapsedMs.toFixed(0)} ms`);
+            return result;
+        })
+        .catch(error => {
+            console.warn('Extractive summary failed:', error);
+            return null;
+        });
+}
+
+/**
+ * Get the summary of a document once it is ready
+ * @param {string} text - Document text
+ * @returns {Promise<Object|null>}
+ */
+async function getDocumentSummary(text) {
+    prepareDocumentSummary(text);
+    return activeSummary.promise ? activeSummary.promise : null;
+}
+
+/**
+ * Get the summary of a document if it has already been computed
+ * @param {string} text - Document text
+ * @returns {Object|null}
+ */
+function getCachedDocumentSummary(text) {
+    return activeSummary && activeSummary.text === text ? activeSummary.result : null;
+}
+
+/**
+ * Pick the best sentences of a summary, in document order
+ * @param {Object} summary - Result of summarizeText
+ * @param {number} count - Sentences to keep
+ * @returns {string[]}
+ */
+function getTopSummarySentences(summary, count) {
+    return summary.sentences
+        .slice()
+        .sort((a, b) => b.score - a.score || a.index - b.index)
+        .slice(0, count)
+        .sort((a, b) => a.index - b.index)
+        .map(sentence => sentence.text);
+}
+
+/**
+ * Check whether a question asks for an overview of the document
+ * @param {string} query - The user's question
+ * @returns {boolean}
+ */
+function isSummaryQuestion(query) {
+    return SUMMARY_QUESTION_PATTERN.test(query);
+}
+
+/**
+ * Build LLM context for a question about the current document
+ * For overview questions on documents longer than the prompt budget, the
+ * extractive summary covers the whole document where the truncated text
+ * would only cover its start
+ * @param {string} query - The user's question
+ * @param {string} text - Document text
+ * @param {number} [maxChars=8000] - Prompt budget for the document
+ * @returns {Promise<string>}
+ */
+async function buildSummaryContext(query, text, maxChars = 8000) {
+    if (text.length <= maxChars || !isSummaryQuestion(query)) return text;
+
+    const summary = await getDocumentSummary(text);
+    if (!summary || summary.sentences.length === 0) return text;
+
+    // Highest ranked sentences that fit the budget
+    const header = 'Key sentences extracted from the whole document, in document order:\n\n';
+    let length = header.length;
+    let count = 0;
+    for (const sentence of summary.sentences.slice().sort((a, b) => b.score - a.score)) {
+        if (length + sentence.text.length + 1 > maxChars && count > 0) break;
+        length += sentence.text.length + 1;
+        count++;
+    }
+
+    return header + getTopSummarySentences(summary, count).join('\n');
+}
+
+// Make functions globally available
+window.summarizeText = summarizeText;
+window.prepareDocumentSummary = prepareDocumentSummary;
+window.getDocumentSummary = getDocumentSummary;
+window.getCachedDocumentSummary = getCachedDocumentSummary;
+window.getTopSummarySentences = getTopSummarySentences;
+window.isSummaryQuestion = isSummaryQuestion;
+window.buildSummaryContext = buildSummaryContext;
@@ -0,0 +1,432 @@
+/**
+ * Table Store Module
+ * Column-oriented storage for spreadsheet and CSV data. Numeric columns are
+ * kept in Float64Arrays so questions like "what is the total revenue" are
+ * computed locally with tight loops instead of asking the LLM to add up text.
+ */
+
+// Tables of the current document
+let activeTables = null;
+
+// Share of non-empty cells that must parse as numbers for a numeric column
+const NUMERIC_COLUMN_RATIO = 0.8;
+
+// Aggregations recognized in questions
+const TABLE_AGGREGATIONS = [
+    { op: 'sum', label: 'Total', pattern: /\b(total|sum|overall)\b/ },
+    { op: 'avg', label: 'Average', pattern: /\b(average|mean|avg)\b/ },
+    { op: 'max', label: 'Maximum', pattern: /\b(max|maximum|highest|largest|biggest|most)\b/ },
+    { op: 'min', label: 'Minimum', pattern: /\b(min|minimum|lowest|smallest|least)\b/ },
+    { op: 'count', label: 'Count', pattern: /\b(how many|count|number of)\b/ }
+];
+
+// "Which region sold the most?" and "Who sold the least?" ask for a row, not
+// for a column's maximum or minimum
+const TABLE_ROW_QUESTION_PATTERN = /^\s*(which|what)\b/;
+const TABLE_PERSON_QUESTION_PATTERN = /^\s*(who|whom|whose)\b/;
+
+// Words that restrict a question to some rows ("total revenue in the North
+// region"); aggregates only cover whole columns, so those go to the LLM.
+// Phrases naming the data as a whole are removed first
+const TABLE_FILTER_PATTERN = /\b(in|for|where|during|from|with|without|only|except|excluding|when|whose)\b/;
+const TABLE_WHOLE_DATA_PATTERN = /\b(in total|in all|(?:in|of|from|for) (?:the|this|all|each) (?:table|sheet|spreadsheet|file|data|dataset|document|rows))\b/g;
+
+// Words too common to identify a cell value such as product "A"
+const TABLE_VALUE_STOP_WORDS = new Set(['a', 'an', 'the', 'i', 'is', 'it', 'of', 'to', 'and', 'or', 'are', 'was', 'be']);
+
+/**
+ * Parse a cell as a number
+ * Accepts thousands separators, currency symbols, percentages and
+ * accounting-style negatives such as (1,200)
+ * @param {string} value - Cell text
+ * @returns {number} - Parsed number or NaN
+ */
+function parseCellNumber(value) {
+    if (value === '') return NaN;
+
+    let text = value.trim();
+    let sign = 1;
+    if (text.startsWith('(') && text.endsWith(')')) {
+        sign = -1;
+        text = text.slice(1, -1);
+    }
+
+    text = text.replace(/[$€£¥,\s]/g, '').replace(/%$/, '');
+    if (!/^[-+]?(\d+\.?\d*|\.\d+)(e[-+]?\d+)?$/i.test(text)) return NaN;
+    return sign * parseFloat(text);
+}
+
+/**
+ * Create a builder that appends rows into column buffers
+ * The first non-empty row is used as the header row when it is text
+ * @param {string} name - Table (sheet) name
+ * @returns {Object} - Builder with addRow and finish methods
+ */
+function createTableBuilder(name) {
+    let headers = null;
+    let columns = [];
+    let rowCount = 0;
+    let capacity = 1024;
+
+    function addColumn(index) {
+        columns[index] = {
+            numbers: new Float64Array(capacity).fill(NaN),
+            strings: new Array(rowCount).fill(''),
+            numericCount: 0,
+            nonEmptyCount: 0
+        };
+    }
+
+    function grow() {
+        capacity *= 2;
+        for (const column of columns) {
+            const numbers = new Float64Array(capacity).fill(NaN);
+            numbers.set(column.numbers);
+            column.numbers = numbers;
+        }
+    }
+
+    return {
+        /**
+         * Append one row
+         * @param {string[]} cells - Cell texts (missing cells are empty strings)
+         */
+        addRow(cells) {
+            if (!headers) {
+                if (cells.every(cell => cell.trim() === '')) return;
+
+                // A mostly numeric first row is data, not headers
+                const numeric = cells.filter(cell => !Number.isNaN(parseCellNumber(cell))).length;
+                if (numeric > 0 && numeric >= cells.length / 2) {
+                    headers = cells.map((_, i) => `Column ${i + 1}`);
+                } else {
+                    headers = cells.map((cell, i) => cell.trim() || `Column ${i + 1}`);
+                    cells.forEach((_, i) => addColumn(i));
+                    return;
+                }
+                cells.forEach((_, i) => addColumn(i));
+            }
+
+            if (rowCount === capacity) grow();
+
+            // Rows wider than the header row get extra columns
+            for (let i = headers.length; i < cells.length; i++) {
+                headers.push(`Column ${i + 1}`);
+                addColumn(i);
+            }
+
+            for (let i = 0; i < columns.length; i++) {
+                const column = columns[i];
+                const cell = i < cells.length ? cells[i] : '';
+                column.strings.push(cell);
+
+                if (cell !== '') {
+                    column.nonEmptyCount++;
+                    const number = parseCellNumber(cell);
+                    if (!Number.isNaN(number)) {
+                        column.numbers[rowCount] = number;
+                        column.numericCount++;
+                    }
+                }
+            }
+            rowCount++;
+        },
+
+        /**
+         * Finish the table and settle the type of every column
+         * @returns {{name: string, rowCount: number, columns: Object[]}|null} - Null for an empty sheet
+         */
+        finish() {
+            if (!headers) return null;
+
+            const finished = columns.map((column, i) => {
+                const isNumeric = column.numericCount > 0 &&
+                    column.numericCount >= column.nonEmptyCount * NUMERIC_COLUMN_RATIO;
+                return isNumeric ?
+                    { name: headers[i], type: 'number', values: column.numbers.slice(0, rowCount) } :
+                    { name: headers[i], type: 'text', values: column.strings };
+            });
+
+            columns = [];
+            return { name, rowCount, columns: finished };
+        }
+    };
+}
+
+/**
+ * Aggregate a numeric column, skipping empty cells (NaN)
+ * @param {Float64Array} values - Column values
+ * @param {string} op - 'sum', 'avg', 'min', 'max' or 'count'
+ * @returns {number}
+ */
+function aggregateColumn(values, op) {
+    let sum = 0;
+    let count = 0;
+    let min = Infinity;
+    let max = -Infinity;
+
+    for (let i = 0; i < values.length; i++) {
+        const value = values[i];
+        if (value !== value) continue; // NaN
+
+        sum += value;
+        count++;
+        if (value < min) min = value;
+        if (value > max) max = value;
+    }
+
+    switch (op) {
+        case 'sum': return sum;
+        case 'avg': return count > 0 ? sum / count : NaN;
+        case 'min': return count > 0 ? min : NaN;
+        case 'max': return count > 0 ? max : NaN;
+        default: return count;
+    }
+}
+
+/**
+ * Aggregate a numeric column per distinct value of a text column
+ * @param {string[]} keys - Group column values
+ * @param {Float64Array} values - Numeric column values
+ * @param {string} op - Aggregation
+ * @returns {[string, number][]} - Groups sorted by value, largest first
+ */
+function aggregateColumnByGroup(keys, values, op) {
+    const groups = new Map();
+
+    for (let i = 0; i < values.length; i++) {
+        const value = values[i];
+        if (value !== value) continue;
+
+        const key = keys[i] || '(blank)';
+        let group = groups.get(key);
+        if (!group) {
+            group = { sum: 0, count: 0, min: Infinity, max: -Infinity };
+            groups.set(key, group);
+        }
+        group.sum += value;
+        group.count++;
+        if (value < group.min) group.min = value;
+        if (value > group.max) group.max = value;
+    }
+
+    const results = [];
+    for (const [key, group] of groups) {
+        const result = op === 'avg' ? group.sum / group.count : op === 'count' ? group.count : group[op];
+        results.push([key, result]);
+    }
+    return results.sort((a, b) => b[1] - a[1]);
+}
+
+/**
+ * Split a header or question into lowercase words
+ * @param {string} text - Text to split
+ * @returns {string[]}
+ */
+function getTableWords(text) {
+    return text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+}
+
+/**
+ * Find the column whose header best matches the words of a question
+ * @param {Object[]} tables - Tables to search
+ * @param {string[]} words - Question words
+ * @param {string} type - Column type to consider
+ * @returns {{table: Object, column: Object}|null}
+ */
+function findTableColumn(tables, words, type) {
+    let best = null;
+    let bestScore = 0;
+
+    for (const table of tables) {
+        for (const column of table.columns) {
+            if (column.type !== type) continue;
+
+            const headerWords = getTableWords(column.name);
+            if (headerWords.length === 0) continue;
+
+            const matched = headerWords.filter(word => words.includes(word)).length;
+            const score = matched / headerWords.length + matched;
+            if (matched > 0 && score > bestScore) {
+                best = { table, column };
+                bestScore = score;
+            }
+        }
+    }
+
+    return best;
+}
+
+/**
+ * Check whether a question names a value of a text column ("north", "a")
+ * @param {Object[]} tables - Tables to search
+ * @param {string[]} words - Question words
+ * @returns {boolean}
+ */
+function mentionsTableValue(tables, words) {
+    const wordSet = new Set(words.filter(word => !TABLE_VALUE_STOP_WORDS.has(word)));
+    if (wordSet.size === 0) return false;
+
+    for (const table of tables) {
+        for (const column of table.columns) {
+            if (column.type !== 'text') continue;
+
+            const seen = new Set();
+            for (const value of column.values) {
+                if (seen.has(value)) continue;
+                seen.add(value);
+
+                const valueWords = getTableWords(value);
+                if (valueWords.length > 0 && valueWords.every(word => wordSet.has(word))) return true;
+            }
+        }
+    }
+
+    return false;
+}
+
+/**
+ * Format a number for an answer
+ * @param {number} value - Number to format
+ * @returns {string}
+ */
+function formatTableNumber(value) {
+    if (!Number.isFinite(value)) return 'n/a';
+    return value.toLocaleString(undefined, { maximumFractionDigits: 2 });
+}
+
+/**
+ * Answer aggregate questions ("what is the total revenue", "average price
+ * by region") from the current document's tables
+ * @param {string} query - The user's question
+ * @param {Object[]} [tables] - Tables to use (defaults to the current document's)
+ * @returns {string|null} - Answer, or null when the question is not a whole-column aggregate
+ */
+function answerTableQuestion(query, tables = activeTables) {
+    if (!tables || tables.length === 0) return null;
+
+    const queryLower = query.toLowerCase();
+    let aggregation = TABLE_AGGREGATIONS.find(item => item.pattern.test(queryLower));
+    if (!aggregation) return null;
+
+    // "... by region" groups by a text column
+    const byMatch = queryLower.match(/\b(?:by|per|for each)\s+(.+?)\s*\??$/);
+    const groupWords = byMatch ? getTableWords(byMatch[1]) : [];
+    const measureText = (byMatch ? queryLower.slice(0, byMatch.index) : queryLower).replace(TABLE_WHOLE_DATA_PATTERN, ' ');
+    const measureWords = getTableWords(measureText);
+
+    // Only whole-column aggregates are computed here; a question that
+    // filters rows ("in the North region", "for product A") is left to the LLM
+    if (TABLE_FILTER_PATTERN.test(measureText) || mentionsTableValue(tables, measureWords)) return null;
+
+    const target = findTableColumn(tables, measureWords, 'number');
+
+    // "How many rows/records" without a numeric column counts rows
+    if (!target) {
+        if (aggregation.op !== 'count' || !/\b(rows|records|entries|lines)\b/.test(queryLower)) return null;
+        const table = tables[0];
+        return `## Row count\n\n**${table.rowCount.toLocaleString()}** rows in sheet "${table.name}".\n\nComputed locally from the spreadsheet data.`;
+    }
+
+    const { table, column } = target;
+    const start = performance.now();
+
+    // "How many units were sold" asks for the total of the units column,
+    // not for the number of rows that have one
+    if (aggregation.op === 'count' && !/\b(count|rows|records|entries|values)\b/.test(queryLower)) {
+        aggregation = TABLE_AGGREGATIONS.find(item => item.op === 'sum');
+    }
+
+    // Questions about who, or about which value of a text column ("which
+    // region ... the most revenue"), want the row with the extreme value;
+    // leave those to the LLM
+    if ((aggregation.op === 'max' || aggregation.op === 'min') && !byMatch &&
+        (TABLE_PERSON_QUESTION_PATTERN.test(queryLower) ||
+         (TABLE_ROW_QUESTION_PATTERN.test(queryLower) && findTableColumn([table], measureWords, 'text')))) {
+        return null;
+    }
+
+    const group = groupWords.length > 0 ? findTableColumn([table], groupWords, 'text') : null;
+    let body;
+
+    if (group) {
+        const groups = aggregateColumnByGroup(group.column.values, column.values, aggregation.op);
+        const shown = groups.slice(0, 20);
+        body = `${aggregation.label} of **${column.name}** by **${group.column.name}** in sheet "${table.name}":\n\n` +
+            shown.map(([key, value]) => `- ${key}: ${formatTableNumber(value)}`).join('\n') +
+            (groups.length > shown.length ? `\n- ...and ${groups.length - shown.length} more groups` : '');
+    } else {
+        const value = aggregateColumn(column.values, aggregation.op);
+        body = `${aggregation.label} of **${column.name}** in sheet "${table.name}": **${formatTableNumber(value)}**\n\n` +
+            `Based on ${aggregateColumn(column.values, 'count').toLocaleString()} numeric values in ${table.rowCount.toLocaleString()} rows.`;
+    }
+
+    const milliseconds = performance.now() - start;
+    return `## ${aggregation.label} of ${column.name}\n\n${body}\n\nComputed locally from the spreadsheet data in ${milliseconds.toFixed(1)} ms.`;
+}
+
+/**
+ * Describe a table as text for the preview, search and LLM context
+ * Only a bounded number of rows is rendered; the full data stays in the columns
+ * @param {Object} table - Finished table
+ * @param {number} [maxRows=100] - Rows to include
+ * @returns {string}
+ */
+function formatTableAsText(table, maxRows = 100) {
+    const lines = [`## Sheet: ${table.name}`, '', `${table.rowCount} rows × ${table.columns.length} columns`, '', 'Columns:'];
+
+    for (const column of table.columns) {
+        if (column.type === 'number') {
+            lines.push(`- ${column.name} (number: total ${formatTableNumber(aggregateColumn(column.values, 'sum'))}, ` +
+                `min ${formatTableNumber(aggregateColumn(column.values, 'min'))}, ` +
+                `max ${formatTableNumber(aggregateColumn(column.values, 'max'))})`);
+        } else {
+            lines.push(`- ${column.name} (text)`);
+        }
+    }
+
+    lines.push('', table.columns.map(column => column.name).join('\t'));
+
+    const rows = Math.min(maxRows, table.rowCount);
+    for (let row = 0; row < rows; row++) {
+        lines.push(table.columns.map(column => {
+            const value = column.values[row];
+            return column.type === 'number' ? (Number.isNaN(value) ? '' : String(value)) : value;
+        }).join('\t'));
+    }
+
+    if (table.rowCount > rows) {
+        lines.push(`... ${table.rowCount - rows} more rows`);
+    }
+
+    return lines.join('\n');
+}
+
+/**
+ * Set the tables of the current document
+ * @param {Object[]|null} tables - Tables, or null for documents without tables
+ */
+function setActiveTables(tables) {
+    activeTables = tables && tables.length > 0 ? tables : null;
+}
+
+/**
+ * Suggest aggregate questions for the current document's tables
+ * @returns {string[]}
+ */
+function getTableQuestionSuggestions() {
+    if (!activeTables) return [];
+
+    for (const table of activeTables) {
+        const numeric = table.columns.find(column => column.type === 'number');
+        if (numeric) {
+            return [`What is the total ${numeric.name}?`, `What is the average ${numeric.name}?`];
+        }
+    }
+    return [];
+}
+
+// Make functions globally available
+window.createTableBuilder = createTableBuilder;
+window.answerTableQuestion = answerTableQuestion;
+window.setActiveTables = setActiveTables;
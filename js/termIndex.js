@@ -0,0 +1,846 @@
+/**
+ * Term Index Module
+ * Word index of a document built once at extraction: the positions of each
+ * term's occurrences (delta-encoded), and the character trigrams of every
+ * term in the vocabulary. Search questions are answered from the postings
+ * instead of rescanning the text, with exact phrases, NEAR/k and AND, and
+ * misspelt terms ("recomendations") are resolved to vocabulary terms within
+ * a bounded edit distance. Candidates are pruned by shared trigrams before
+ * their edit distance is computed. Indexes are stored in IndexedDB in a
+ * versioned binary format together with the document text, so a document
+ * opened again is restored without extracting or indexing it.
+ */
+
+// Index of the document questions are asked about
+let activeTermIndex = null;
+
+// Terms are runs of lowercase letters and digits
+const TERM_PATTERN = /[a-z0-9]+/g;
+
+// Words of a search question that are not search terms
+const SEARCH_STOP_WORDS = new Set([
+    'find', 'search', 'for', 'about', 'where', 'is', 'are', 'show', 'me', 'the', 'and', 'all',
+    'any', 'lines', 'mentions', 'of', 'with', 'containing', 'word', 'words', 'phrase'
+]);
+
+// Words apart for NEAR without a distance
+const DEFAULT_NEAR_DISTANCE = 5;
+
+// Stored index format: "DQTI", version, then the header fields below
+const TERM_INDEX_MAGIC = 0x49545144;
+const TERM_INDEX_VERSION = 1;
+const TERM_INDEX_HEADER_WORDS = 10;
+const TERM_INDEX_FORMAT_BYTES = 16;
+
+// Terms per block of the dictionary; the first term of a block is stored whole
+const TERM_DICTIONARY_BLOCK = 16;
+
+// Stored indexes, keyed by document key (evicted through the store's manifest)
+const TERM_INDEX_STORE = 'termIndexes';
+
+/**
+ * Get term search settings with defaults
+ * @returns {{maxIndexChars: number, maxEdits: number, fuzzyMinLength: number, maxFuzzyTerms: number, persistMinChars: number, persistMaxDocuments: number, persistMaxBytes: number}}
+ */
+function getTermSearchSettings() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.search) || {};
+    return {
+        maxIndexChars: settings.maxIndexChars || 32 * 1024 * 1024,
+        maxEdits: settings.maxEdits !== undefined ? settings.maxEdits : 2,
+        fuzzyMinLength: settings.fuzzyMinLength || 5,
+        maxFuzzyTerms: settings.maxFuzzyTerms || 3,
+        persistMinChars: settings.persistMinChars !== undefined ? settings.persistMinChars : 100000,
+        persistMaxDocuments: settings.persistMaxDocuments || 20,
+        persistMaxBytes: settings.persistMaxBytes || 256 * 1024 * 1024
+    };
+}
+
+/**
+ * Get the distinct trigrams of a term
+ * @param {string} term - Lowercase term
+ * @param {boolean} padded - Include the boundary trigrams ("$ab", "yz$")
+ * @returns {string[]}
+ */
+function getTermTrigrams(term, padded) {
+    const source = padded ? `$${term}$` : term;
+    const trigrams = new Set();
+    for (let i = 0; i + 3 <= source.length; i++) {
+        trigrams.add(source.substring(i, i + 3));
+    }
+    return Array.from(trigrams);
+}
+
+/**
+ * Number of bytes of a varint
+ * @param {number} value - Non-negative integer
+ * @returns {number}
+ */
+function getVarintLength(value) {
+    let length = 1;
+    while (value >= 128) {
+        value = Math.floor(value / 128);
+        length++;
+    }
+    return length;
+}
+
+/**
+ * Build the term index of a document
+ * Every word is a token numbered in document order; the postings of a term
+ * are the positions of its tokens, stored as varint-encoded gaps
+ * @param {string} text - Document text
+ * @returns {Object|null} - Index, or null when the text is longer than maxIndexChars
+ */
+function buildTermIndex(text) {
+    text = text || '';
+    if (text.length > getTermSearchSettings().maxIndexChars) return null;
+
+    const vocabulary = new Map();
+    const terms = [];
+    let lineStarts = new Int32Array(1024);
+    let lineFirstToken = new Int32Array(1024);
+    let lineCount = 0;
+
+    // Term of each token
+    let tokenTerms = new Int32Array(4096);
+    let tokenCount = 0;
+
+    let start = 0;
+    while (start <= text.length) {
+        let end = text.indexOf('\n', start);
+        if (end === -1) end = text.length;
+
+        if (lineCount === lineStarts.length) {
+            lineStarts = growInt32Array(lineStarts);
+            lineFirstToken = growInt32Array(lineFirstToken);
+        }
+        lineStarts[lineCount] = start;
+        lineFirstToken[lineCount++] = tokenCount;
+
+        const lower = text.slice(start, end).toLowerCase();
+        TERM_PATTERN.lastIndex = 0;
+        let match;
+        while ((match = TERM_PATTERN.exec(lower)) !== null) {
+            let id = vocabulary.get(match[0]);
+            if (id === undefined) {
+                id = terms.length;
+                vocabulary.set(match[0], id);
+                terms.push(match[0]);
+            }
+            if (tokenCount === tokenTerms.length) tokenTerms = growInt32Array(tokenTerms);
+            tokenTerms[tokenCount++] = id;
+        }
+
+        start = end + 1;
+    }
+
+    // Term ids in sorted order, so the dictionary can be stored as a sorted table
+    const sortedTerms = terms.slice().sort();
+    const rank = new Int32Array(terms.length);
+    sortedTerms.forEach((term, id) => {
+        rank[vocabulary.get(term)] = id;
+        vocabulary.set(term, id);
+    });
+    for (let position = 0; position < tokenCount; position++) tokenTerms[position] = rank[tokenTerms[position]];
+
+    // Positional postings (CSR over bytes): sizes first, then the gaps
+    const termCounts = new Int32Array(terms.length);
+    const lastPosition = new Int32Array(terms.length);
+    const postingStart = new Int32Array(terms.length + 1);
+    for (let position = 0; position < tokenCount; position++) {
+        const id = tokenTerms[position];
+        postingStart[id + 1] += getVarintLength(position - lastPosition[id]);
+        lastPosition[id] = position;
+        termCounts[id]++;
+    }
+    for (let t = 0; t < terms.length; t++) postingStart[t + 1] += postingStart[t];
+
+    const postings = new Uint8Array(postingStart[terms.length]);
+    const fill = postingStart.slice(0, terms.length);
+    lastPosition.fill(0);
+    for (let position = 0; position < tokenCount; position++) {
+        const id = tokenTerms[position];
+        let gap = position - lastPosition[id];
+        lastPosition[id] = position;
+        while (gap >= 128) {
+            postings[fill[id]++] = (gap & 127) | 128;
+            gap >>>= 7;
+        }
+        postings[fill[id]++] = gap;
+    }
+
+    // One more entry than lines: the end of the last line
+    const lineBounds = new Int32Array(lineCount + 1);
+    lineBounds.set(lineFirstToken.subarray(0, lineCount));
+    lineBounds[lineCount] = tokenCount;
+    lineFirstToken = lineBounds;
+
+    const index = {
+        text,
+        lineStarts: lineStarts.slice(0, lineCount),
+        lineFirstToken,
+        lineCount,
+        tokenCount,
+        vocabulary,
+        terms: sortedTerms,
+        termCount: terms.length,
+        termCounts,
+        postingStart,
+        postings,
+        dictionary: null,
+        trigrams: null
+    };
+
+    // Trigrams are built at ingest, so the first misspelt search doesn't wait
+    ensureTermDictionary(index);
+    return index;
+}
+
+/**
+ * Make the term strings, term lookup and trigram postings of an index
+ * available; indexes loaded from storage only decode them when first needed
+ * @param {Object} index - Term index
+ */
+function ensureTermDictionary(index) {
+    if (!index.terms) index.terms = decodeTermDictionary(index.dictionary, index.termCount);
+    if (!index.vocabulary) index.vocabulary = new Map(index.terms.map((term, id) => [term, id]));
+    if (index.trigrams) return;
+
+    // Trigram postings: ids of the terms containing each trigram
+    const trigramTerms = new Map();
+    for (let id = 0; id < index.terms.length; id++) {
+        for (const trigram of getTermTrigrams(index.terms[id], true)) {
+            const list = trigramTerms.get(trigram);
+            if (list) list.push(id);
+            else trigramTerms.set(trigram, [id]);
+        }
+    }
+    index.trigrams = new Map();
+    for (const [trigram, list] of trigramTerms) index.trigrams.set(trigram, Int32Array.from(list));
+}
+
+/**
+ * Get the id of a term
+ * @param {Object} index - Term index
+ * @param {string} term - Lowercase term
+ * @returns {number|undefined}
+ */
+function getTermId(index, term) {
+    return index.vocabulary ? index.vocabulary.get(term) : findDictionaryTerm(index.dictionary, index.termCount, term);
+}
+
+/**
+ * Decode the token positions of a term
+ * @param {Object} index - Result of buildTermIndex
+ * @param {number} id - Term id
+ * @param {Int32Array} out - Receives termCounts[id] positions, ascending
+ * @param {number} [offset=0] - Where to write in out
+ */
+function decodeTermPositions(index, id, out, offset = 0) {
+    const { postings } = index;
+    let position = 0;
+    let p = index.postingStart[id];
+    const end = index.postingStart[id + 1];
+
+    while (p < end) {
+        let gap = 0;
+        let shift = 0;
+        let byte;
+        do {
+            byte = postings[p++];
+            gap |= (byte & 127) << shift;
+            shift += 7;
+        } while (byte & 128);
+        position += gap;
+        out[offset++] = position;
+    }
+}
+
+/**
+ * Get the positions of any of several terms, ascending
+ * @param {Object} index - Result of buildTermIndex
+ * @param {number[]} ids - Term ids
+ * @returns {Int32Array}
+ */
+function getTermsPositions(index, ids) {
+    let total = 0;
+    for (const id of ids) total += index.termCounts[id];
+
+    const positions = new Int32Array(total);
+    let offset = 0;
+    for (const id of ids) {
+        decodeTermPositions(index, id, positions, offset);
+        offset += index.termCounts[id];
+    }
+
+    // Terms never share a position, so the merged list has no duplicates
+    return ids.length > 1 ? positions.sort() : positions;
+}
+
+/**
+ * Edit distance between two strings, or maxEdits + 1 once it is exceeded
+ * @param {string} a - First string
+ * @param {string} b - Second string
+ * @param {number} maxEdits - Largest distance of interest
+ * @returns {number}
+ */
+function boundedEditDistance(a, b, maxEdits) {
+    if (Math.abs(a.length - b.length) > maxEdits) return maxEdits + 1;
+
+    let previous = new Int32Array(b.length + 1);
+    let current = new Int32Array(b.length + 1);
+    for (let j = 0; j <= b.length; j++) previous[j] = j;
+
+    for (let i = 1; i <= a.length; i++) {
+        current[0] = i;
+        let rowMin = i;
+        for (let j = 1; j <= b.length; j++) {
+            const cost = a.charCodeAt(i - 1) === b.charCodeAt(j - 1) ? 0 : 1;
+            current[j] = Math.min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost);
+            if (current[j] < rowMin) rowMin = current[j];
+        }
+        if (rowMin > maxEdits) return maxEdits + 1;
+        [previous, current] = [current, previous];
+    }
+
+    return previous[b.length];
+}
+
+/**
+ * Find the vocabulary terms matching a search term
+ * Terms containing the search term match exactly (only the term itself for
+ * words of a phrase); when there are none, terms within the allowed edit
+ * distance match as corrections
+ * @param {Object} index - Result of buildTermIndex
+ * @param {string} term - Lowercase search term
+ * @param {boolean} [wholeWord=false] - Don't match longer terms containing it
+ * @returns {{exact: number[], fuzzy: {id: number, distance: number}[]}}
+ */
+function matchIndexedTerm(index, term, wholeWord = false) {
+    const settings = getTermSearchSettings();
+
+    const id = getTermId(index, term);
+    if (term.length < 3 || (wholeWord && id !== undefined)) {
+        return { exact: id === undefined ? [] : [id], fuzzy: [] };
+    }
+
+    ensureTermDictionary(index);
+    const { terms, trigrams } = index;
+
+    // Shared trigrams per vocabulary term: inner ones for substring matches,
+    // all (with the word boundaries) for the edit distance filter
+    const inner = getTermTrigrams(term, false);
+    const padded = getTermTrigrams(term, true);
+    const innerSet = new Set(inner);
+    const innerHits = new Uint16Array(terms.length);
+    const allHits = new Uint16Array(terms.length);
+    let touched = new Int32Array(256);
+    let touchedCount = 0;
+
+    for (const trigram of padded) {
+        const list = trigrams.get(trigram);
+        if (!list) continue;
+        const isInner = innerSet.has(trigram);
+        for (let i = 0; i < list.length; i++) {
+            const id = list[i];
+            if (allHits[id] === 0) {
+                if (touchedCount === touched.length) touched = growInt32Array(touched);
+                touched[touchedCount++] = id;
+            }
+            allHits[id]++;
+            if (isInner) innerHits[id]++;
+        }
+    }
+
+    // A term containing the search term has all its inner trigrams
+    const exact = [];
+    for (let n = 0; n < touchedCount; n++) {
+        const id = touched[n];
+        if (innerHits[id] === inner.length && !wholeWord && terms[id].includes(term)) exact.push(id);
+    }
+    if (exact.length > 0 || term.length < settings.fuzzyMinLength) {
+        return { exact: exact.sort((a, b) => a - b), fuzzy: [] };
+    }
+
+    // Each edit removes at most three of the term's trigrams
+    const maxEdits = Math.min(settings.maxEdits, term.length < 8 ? 1 : 2);
+    const minShared = Math.max(1, padded.length - 3 * maxEdits);
+    const fuzzy = [];
+    for (let n = 0; n < touchedCount; n++) {
+        const id = touched[n];
+        if (allHits[id] < minShared) continue;
+        const distance = boundedEditDistance(term, terms[id], maxEdits);
+        if (distance <= maxEdits) fuzzy.push({ id, distance });
+    }
+
+    fuzzy.sort((a, b) => a.distance - b.distance || index.termCounts[b.id] - index.termCounts[a.id]);
+    return { exact: [], fuzzy: fuzzy.slice(0, settings.maxFuzzyTerms) };
+}
+
+/**
+ * Get the text of a line
+ * @param {Object} index - Result of buildTermIndex
+ * @param {number} line - Line number
+ * @returns {string}
+ */
+function getIndexedLine(index, line) {
+    const end = line + 1 < index.lineCount ? index.lineStarts[line + 1] - 1 : index.text.length;
+    return index.text.slice(index.lineStarts[line], end);
+}
+
+/**
+ * Parse a search question into clauses
+ * "quoted words" are phrases, a NEAR/k b (k defaults to 5) matches words
+ * at most k words apart, and AND between clauses requires all of them on a
+ * line; otherwise a line matches any clause
+ * @param {string} query - The user's question
+ * @returns {{clauses: Object[], requireAll: boolean, labels: string[]}}
+ */
+function parseSearchQuery(query) {
+    const phrases = [];
+    const tokens = query
+        .replace(/"([^"]*)"/g, (match, phrase) => ` \u0000${phrases.push(phrase) - 1} `)
+        .split(/\s+/)
+        .filter(Boolean);
+
+    const clauses = [];
+    let requireAll = false;
+    let near = null;
+
+    for (const token of tokens) {
+        const nearMatch = token.match(/^NEAR(?:\/(\d+))?$/);
+        if (token === 'AND') {
+            requireAll = true;
+            continue;
+        }
+        if (nearMatch && clauses.length > 0) {
+            near = { distance: nearMatch[1] ? parseInt(nearMatch[1], 10) : DEFAULT_NEAR_DISTANCE, left: clauses.pop() };
+            continue;
+        }
+
+        // Quoted text and hyphenated tokens ("q1-2024") are phrases
+        const quoted = token.startsWith('\u0000');
+        const words = (quoted ? phrases[parseInt(token.substring(1), 10)] : token).toLowerCase().match(TERM_PATTERN) || [];
+        if (words.length === 0) continue;
+        if (!quoted && words.length === 1 && (words[0].length <= 2 || SEARCH_STOP_WORDS.has(words[0]))) continue;
+
+        let clause = words.length > 1 ?
+            { type: 'phrase', words, label: `"${words.join(' ')}"` } :
+            { type: 'term', words, label: words[0] };
+        if (near) {
+            clause = { type: 'near', distance: near.distance, left: near.left, right: clause,
+                label: `${near.left.label} NEAR/${near.distance} ${clause.label}` };
+            near = null;
+        }
+        clauses.push(clause);
+    }
+    if (near) clauses.push(near.left);
+
+    return { clauses, requireAll, labels: clauses.map(clause => clause.label) };
+}
+
+/**
+ * Get the positions where a clause matches
+ * @param {Object} index - Result of buildTermIndex
+ * @param {Object} clause - Clause from parseSearchQuery
+ * @param {Object[]} corrections - Receives {term, matches} for corrected words
+ * @returns {{positions: Int32Array, span: number, weight: number}} - Positions of the first word, words covered, clause weight
+ */
+function evaluateSearchClause(index, clause, corrections) {
+    if (clause.type === 'near') {
+        const left = evaluateSearchClause(index, clause.left, corrections);
+        const right = evaluateSearchClause(index, clause.right, corrections);
+        const positions = [];
+
+        // Both lists are ascending, so the first right match that isn't too
+        // far behind only moves forward
+        let r = 0;
+        for (let l = 0; l < left.positions.length; l++) {
+            const position = left.positions[l];
+            while (r < right.positions.length && right.positions[r] + right.span - 1 < position - clause.distance) r++;
+            if (r < right.positions.length && right.positions[r] <= position + left.span - 1 + clause.distance) {
+                positions.push(position);
+            }
+        }
+
+        return { positions: Int32Array.from(positions), span: left.span, weight: left.weight + right.weight };
+    }
+
+    // Positions of each word (phrase words must match whole)
+    const lists = clause.words.map(word => {
+        const { exact, fuzzy } = matchIndexedTerm(index, word, clause.type === 'phrase');
+        if (fuzzy.length > 0) {
+            corrections.push({ term: word, matches: fuzzy.map(match => index.terms[match.id]) });
+        }
+        return getTermsPositions(index, exact.concat(fuzzy.map(match => match.id)));
+    });
+    if (lists.length === 1) return { positions: lists[0], span: 1, weight: 1 };
+
+    // Phrase: word i must be at position + i
+    const cursors = new Int32Array(lists.length);
+    const positions = [];
+    for (const position of lists[0]) {
+        let matched = true;
+        for (let w = 1; w < lists.length && matched; w++) {
+            const list = lists[w];
+            while (cursors[w] < list.length && list[cursors[w]] < position + w) cursors[w]++;
+            matched = cursors[w] < list.length && list[cursors[w]] === position + w;
+        }
+        if (matched) positions.push(position);
+    }
+
+    return { positions: Int32Array.from(positions), span: lists.length, weight: lists.length };
+}
+
+/**
+ * Find the lines matching a search question, best first
+ * A line scores each clause it matches by the clause weight (phrases count
+ * their words) and, with diminishing returns, the number of matches
+ * @param {Object} index - Result of buildTermIndex
+ * @param {{clauses: Object[], requireAll: boolean}} searchQuery - Result of parseSearchQuery
+ * @returns {{lines: string[], corrections: {term: string, matches: string[]}[]}}
+ */
+function searchTermIndex(index, searchQuery) {
+    const corrections = [];
+    const scores = new Float64Array(index.lineCount);
+    const clauseMatches = new Uint16Array(index.lineCount);
+    const touched = [];
+
+    for (const clause of searchQuery.clauses) {
+        const { positions, weight } = evaluateSearchClause(index, clause, corrections);
+
+        // Positions are ascending, so lines are visited in order
+        let line = 0;
+        let p = 0;
+        while (p < positions.length) {
+            while (index.lineFirstToken[line + 1] <= positions[p]) line++;
+            let hits = 0;
+            while (p < positions.length && positions[p] < index.lineFirstToken[line + 1]) {
+                hits++;
+                p++;
+            }
+
+            if (clauseMatches[line] === 0) touched.push(line);
+            clauseMatches[line]++;
+            scores[line] += weight * (1 + Math.log(hits));
+        }
+    }
+
+    const required = searchQuery.requireAll ? searchQuery.clauses.length : 1;
+    const lines = touched
+        .filter(line => clauseMatches[line] >= required)
+        .sort((a, b) => scores[b] - scores[a] || a - b)
+        .map(line => getIndexedLine(index, line).trim());
+
+    return { lines, corrections };
+}
+
+/**
+ * Encode sorted terms as a prefix-compressed string table
+ * Each entry is varint(shared prefix length), varint(suffix length), suffix;
+ * every TERM_DICTIONARY_BLOCK-th entry shares nothing, so lookups can binary
+ * search the block starts. Terms are ASCII (see TERM_PATTERN).
+ * @param {string[]} terms - Sorted terms
+ * @returns {{bytes: Uint8Array, blockOffsets: Int32Array}}
+ */
+function encodeTermDictionary(terms) {
+    const blockOffsets = new Int32Array(Math.ceil(terms.length / TERM_DICTIONARY_BLOCK));
+    let bytes = new Uint8Array(1024);
+    let length = 0;
+
+    function writeVarint(value) {
+        while (value >= 128) {
+            bytes[length++] = (value & 127) | 128;
+            value >>>= 7;
+        }
+        bytes[length++] = value;
+    }
+
+    let previous = '';
+    terms.forEach((term, id) => {
+        if (length + term.length + 10 > bytes.length) {
+            const grown = new Uint8Array(Math.max(bytes.length * 2, length + term.length + 10));
+            grown.set(bytes);
+            bytes = grown;
+        }
+
+        let shared = 0;
+        if (id % TERM_DICTIONARY_BLOCK === 0) {
+            blockOffsets[id / TERM_DICTIONARY_BLOCK] = length;
+        } else {
+            while (shared < previous.length && shared < term.length &&
+                previous.charCodeAt(shared) === term.charCodeAt(shared)) shared++;
+        }
+
+        writeVarint(shared);
+        writeVarint(term.length - shared);
+        for (let i = shared; i < term.length; i++) bytes[length++] = term.charCodeAt(i);
+        previous = term;
+    });
+
+    return { bytes: bytes.slice(0, length), blockOffsets };
+}
+
+/**
+ * Read the dictionary entries of a block, calling back with each term
+ * @param {{bytes: Uint8Array, blockOffsets: Int32Array}} dictionary - Encoded dictionary
+ * @param {number} block - Block number
+ * @param {number} termCount - Terms in the dictionary
+ * @param {Function} callback - Called with (term, id); return false to stop
+ */
+function readDictionaryBlock(dictionary, block, termCount, callback) {
+    const { bytes } = dictionary;
+    let p = dictionary.blockOffsets[block];
+    let term = '';
+
+    function readVarint() {
+        let value = 0;
+        let shift = 0;
+        let byte;
+        do {
+            byte = bytes[p++];
+            value |= (byte & 127) << shift;
+            shift += 7;
+        } while (byte & 128);
+        return value;
+    }
+
+    const end = Math.min(termCount, (block + 1) * TERM_DICTIONARY_BLOCK);
+    for (let id = block * TERM_DICTIONARY_BLOCK; id < end; id++) {
+        const shared = readVarint();
+        const suffixLength = readVarint();
+        term = term.substring(0, shared) + String.fromCharCode.apply(null, bytes.subarray(p, p + suffixLength));
+        p += suffixLength;
+        if (callback(term, id) === false) return;
+    }
+}
+
+/**
+ * Decode every term of a dictionary
+ * @param {{bytes: Uint8Array, blockOffsets: Int32Array}} dictionary - Encoded dictionary
+ * @param {number} termCount - Terms in the dictionary
+ * @returns {string[]}
+ */
+function decodeTermDictionary(dictionary, termCount) {
+    const terms = new Array(termCount);
+    for (let block = 0; block < dictionary.blockOffsets.length; block++) {
+        readDictionaryBlock(dictionary, block, termCount, (term, id) => {
+            terms[id] = term;
+        });
+    }
+    return terms;
+}
+
+/**
+ * Look a term up in an encoded dictionary without decoding it
+ * @param {{bytes: Uint8Array, blockOffsets: Int32Array}} dictionary - Encoded dictionary
+ * @param {number} termCount - Terms in the dictionary
+ * @param {string} term - Term to find
+ * @returns {number|undefined} - Term id
+ */
+function findDictionaryTerm(dictionary, termCount, term) {
+    // Last block whose first term is <= term
+    let low = 0;
+    let high = dictionary.blockOffsets.length - 1;
+    while (low < high) {
+        const middle = (low + high + 1) >>> 1;
+        let first = '';
+        readDictionaryBlock(dictionary, middle, termCount, value => {
+            first = value;
+            return false;
+        });
+        if (first <= term) low = middle;
+        else high = middle - 1;
+    }
+
+    let found;
+    if (dictionary.blockOffsets.length > 0) {
+        readDictionaryBlock(dictionary, low, termCount, (value, id) => {
+            if (value === term) found = id;
+            return value < term;
+        });
+    }
+    return found;
+}
+
+/**
+ * Serialize a term index and its document text to one ArrayBuffer
+ * Layout (4-byte aligned sections): header words, format name, line starts,
+ * first token of each line, term counts, posting offsets, dictionary block
+ * offsets, dictionary, postings, UTF-8 text
+ * @param {Object} index - Result of buildTermIndex
+ * @param {string} format - Document format (route of extractDocument)
+ * @returns {ArrayBuffer}
+ */
+function serializeTermIndex(index, format) {
+    const dictionary = index.dictionary || encodeTermDictionary(index.terms);
+    const textBytes = new TextEncoder().encode(index.text);
+    const align = length => (length + 3) & ~3;
+
+    const sections = [
+        new Int32Array(0), // header, written below
+        new Uint8Array(TERM_INDEX_FORMAT_BYTES),
+        index.lineStarts,
+        index.lineFirstToken,
+        index.termCounts,
+        index.postingStart,
+        dictionary.blockOffsets,
+        dictionary.bytes,
+        index.postings,
+        textBytes
+    ];
+    let total = TERM_INDEX_HEADER_WORDS * 4;
+    for (let i = 1; i < sections.length; i++) total += align(sections[i].byteLength);
+
+    const buffer = new ArrayBuffer(total);
+    new Uint32Array(buffer, 0, TERM_INDEX_HEADER_WORDS).set([
+        TERM_INDEX_MAGIC, TERM_INDEX_VERSION, index.lineCount, index.tokenCount, index.termCount,
+        dictionary.blockOffsets.length, dictionary.bytes.length, index.postings.length, textBytes.length, 0
+    ]);
+    for (let i = 0; i < Math.min(format.length, TERM_INDEX_FORMAT_BYTES); i++) {
+        sections[1][i] = format.charCodeAt(i);
+    }
+
+    let offset = TERM_INDEX_HEADER_WORDS * 4;
+    for (let i = 1; i < sections.length; i++) {
+        const section = sections[i];
+        new Uint8Array(buffer, offset, section.byteLength).set(new Uint8Array(section.buffer, section.byteOffset, section.byteLength));
+        offset += align(section.byteLength);
+    }
+
+    return buffer;
+}
+
+/**
+ * Open a serialized term index
+ * Arrays are views into the buffer; only the text is decoded, and the term
+ * strings wait until a search needs them
+ * @param {ArrayBuffer} buffer - Result of serializeTermIndex
+ * @returns {{index: Object, format: string}|null} - null for another format version
+ */
+function deserializeTermIndex(buffer) {
+    if (!(buffer instanceof ArrayBuffer) || buffer.byteLength < TERM_INDEX_HEADER_WORDS * 4) return null;
+
+    const header = new Uint32Array(buffer, 0, TERM_INDEX_HEADER_WORDS);
+    if (header[0] !== TERM_INDEX_MAGIC || header[1] !== TERM_INDEX_VERSION) return null;
+    const [, , lineCount, tokenCount, termCount, blockCount, dictionaryBytes, postingsBytes, textBytes] = header;
+
+    let offset = TERM_INDEX_HEADER_WORDS * 4;
+    function view(Type, length) {
+        const array = new Type(buffer, offset, length);
+        offset += (array.byteLength + 3) & ~3;
+        return array;
+    }
+
+    const formatBytes = view(Uint8Array, TERM_INDEX_FORMAT_BYTES);
+    const format = String.fromCharCode.apply(null, formatBytes.subarray(0, formatBytes.indexOf(0) === -1 ? TERM_INDEX_FORMAT_BYTES : formatBytes.indexOf(0)));
+    const lineStarts = view(Int32Array, lineCount);
+    const lineFirstToken = view(Int32Array, lineCount + 1);
+    const termCounts = view(Int32Array, termCount);
+    const postingStart = view(Int32Array, termCount + 1);
+    const blockOffsets = view(Int32Array, blockCount);
+    const dictionary = { blockOffsets, bytes: view(Uint8Array, dictionaryBytes) };
+    const postings = view(Uint8Array, postingsBytes);
+    const text = new TextDecoder().decode(view(Uint8Array, textBytes));
+
+    return {
+        format,
+        index: {
+            text,
+            lineStarts,
+            lineFirstToken,
+            lineCount,
+            tokenCount,
+            vocabulary: null,
+            terms: null,
+            termCount,
+            termCounts,
+            postingStart,
+            postings,
+            dictionary,
+            trigrams: null
+        }
+    };
+}
+
+/**
+ * Load the stored index and text of a document opened before
+ * @param {string} key - Document key
+ * @returns {Promise<{index: Object, format: string}|null>}
+ */
+async function loadStoredTermIndex(key) {
+    if (typeof storageGet !== 'function') return null;
+    try {
+        const buffer = await storageGet(TERM_INDEX_STORE, key);
+        const stored = buffer ? deserializeTermIndex(buffer) : null;
+
+        // Used again: move it to the most recently used end of the manifest
+        if (stored && typeof touchStorageManifest === 'function') {
+            touchStorageManifest(TERM_INDEX_STORE, key, null, getTermIndexStorageLimits()).catch(() => {});
+        }
+        return stored;
+    } catch (error) {
+        console.warn('Could not load the stored index:', error);
+        return null;
+    }
+}
+
+/**
+ * Get the limits of the stored indexes
+ * @returns {{maxEntries: number, maxBytes: number}}
+ */
+function getTermIndexStorageLimits() {
+    const settings = getTermSearchSettings();
+    return { maxEntries: settings.persistMaxDocuments, maxBytes: settings.persistMaxBytes };
+}
+
+/**
+ * Store the index and text of a document, evicting the least recently used
+ * stored documents beyond persistMaxDocuments or persistMaxBytes
+ * @param {string} key - Document key
+ * @param {Object} index - Result of buildTermIndex
+ * @param {string} format - Document format
+ * @returns {Promise<void>}
+ */
+async function saveStoredTermIndex(key, index, format) {
+    const settings = getTermSearchSettings();
+    if (typeof storagePut !== 'function' || index.text.length < settings.persistMinChars) return;
+
+    try {
+        const buffer = serializeTermIndex(index, format);
+        if (buffer.byteLength > settings.persistMaxBytes) return;
+
+        await storagePut(TERM_INDEX_STORE, key, buffer);
+        await touchStorageManifest(TERM_INDEX_STORE, key, buffer.byteLength, getTermIndexStorageLimits());
+    } catch (error) {
+        console.warn('Could not store the index:', error);
+    }
+}
+
+/**
+ * Make an index the one used for the current document
+ * @param {Object|null} index - Result of buildTermIndex
+ */
+function setActiveTermIndex(index) {
+    activeTermIndex = index;
+}
+
+/**
+ * Get the term index of a document text, if one was built
+ * @param {string} text - Document text
+ * @returns {Object|null}
+ */
+function getTermIndex(text) {
+    return activeTermIndex && activeTermIndex.text === text ? activeTermIndex : null;
+}
+
+// Make functions globally available
+window.buildTermIndex = buildTermIndex;
+window.parseSearchQuery = parseSearchQuery;
+window.searchTermIndex = searchTermIndex;
+window.setActiveTermIndex = setActiveTermIndex;
+window.getTermIndex = getTermIndex;
+window.serializeTermIndex = serializeTermIndex;
+window.deserializeTermIndex = deserializeTermIndex;
+window.loadStoredTermIndex = loadStoredTermIndex;
+window.saveStoredTermIndex = saveStoredTermIndex;
@@ -0,0 +1,386 @@
+/**
+ * Thumbnail Strip Module
+ * Shows lazily rendered PDF page thumbnails in the full preview modal.
+ * Pages are rasterized in a worker and only while their thumbnail is in view.
+ */
+
+const THUMBNAIL_WORKER_URL = 'js/workers/thumbnailWorker.js';
+
+// Worker and current source document
+let thumbnailWorker = null;
+let thumbnailSource = null;
+let thumbnailSourceCounter = 0;
+
+// Compressed thumbnail cache (page number -> Blob), kept in LRU order
+const thumbnailCache = new Map();
+let thumbnailCacheBytes = 0;
+
+// Render scheduling state
+const thumbnailVisiblePages = new Set();
+const thumbnailPendingPages = new Set();
+let thumbnailRendersInFlight = 0;
+
+// DOM state
+let thumbnailStrip;
+let thumbnailObserver = null;
+const thumbnailCanvases = new Map();
+
+/**
+ * Get thumbnail settings with defaults
+ * @returns {{width: number, cacheBytes: number, maxConcurrentRenders: number, imageType: string, quality: number}}
+ */
+function getThumbnailSettings() {
+    const settings = (typeof UI_CONFIG !== 'undefined' && UI_CONFIG.thumbnails) || {};
+    return {
+        width: settings.width || 110,
+        cacheBytes: settings.cacheBytes || 16 * 1024 * 1024,
+        maxConcurrentRenders: settings.maxConcurrentRenders || 2,
+        imageType: settings.imageType || 'image/webp',
+        quality: settings.quality || 0.7
+    };
+}
+
+/**
+ * Check whether the browser can render thumbnails off the main thread
+ * @returns {boolean}
+ */
+function isThumbnailRenderingSupported() {
+    return typeof Worker !== 'undefined' &&
+           typeof OffscreenCanvas !== 'undefined' &&
+           typeof IntersectionObserver !== 'undefined' &&
+           typeof createImageBitmap === 'function';
+}
+
+/**
+ * Set the PDF file thumbnails should be rendered from
+ * Call with null when the current document is not a PDF
+ * @param {File|null} file - PDF file
+ */
+function setThumbnailSource(file) {
+    clearThumbnailCache();
+    thumbnailPendingPages.clear();
+    thumbnailSource = file ? { id: ++thumbnailSourceCounter, file, numPages: 0, aspectRatio: 1.3, opened: false } : null;
+
+    if (!file && thumbnailWorker) {
+        thumbnailWorker.postMessage({ type: 'close' });
+    }
+}
+
+/**
+ * Get (or create) the thumbnail worker
+ * @returns {Worker}
+ */
+function getThumbnailWorker() {
+    if (!thumbnailWorker) {
+        thumbnailWorker = new Worker(THUMBNAIL_WORKER_URL);
+        thumbnailWorker.onmessage = handleThumbnailWorkerMessage;
+        thumbnailWorker.onerror = function(event) {
+            console.error('Thumbnail worker error:', event.message);
+        };
+    }
+    return thumbnailWorker;
+}
+
+/**
+ * Show the thumbnail strip for the current source
+ * Called when the full preview modal opens
+ */
+function showThumbnailStrip() {
+    thumbnailStrip = document.getElementById('thumbnail-strip');
+    if (!thumbnailStrip) return;
+
+    if (!thumbnailSource || !isThumbnailRenderingSupported()) {
+        thumbnailStrip.classList.add('hidden');
+        return;
+    }
+
+    if (thumbnailSource.opened) {
+        buildThumbnailPlaceholders();
+        return;
+    }
+
+    // Open the document in the worker; placeholders are built once it replies
+    getThumbnailWorker().postMessage({
+        type: 'open',
+        id: thumbnailSource.id,
+        file: thumbnailSource.file,
+        // Large files are read in ranges instead of being loaded whole
+        rangeChunkSize: typeof isLargeFile === 'function' && isLargeFile(thumbnailSource.file) ?
+            getLargeFileSettings().rangeChunkSize : 0,
+        libUrl: new URL(PDFJS_CDN, location.href).href,
+        workerUrl: new URL(PDFJS_WORKER_CDN, location.href).href
+    });
+}
+
+/**
+ * Hide the thumbnail strip and stop rendering
+ * Called when the full preview modal closes
+ */
+function hideThumbnailStrip() {
+    if (thumbnailObserver) {
+        thumbnailObserver.disconnect();
+        thumbnailObserver = null;
+    }
+
+    thumbnailVisiblePages.clear();
+    thumbnailPendingPages.clear();
+    thumbnailCanvases.clear();
+
+    if (thumbnailStrip) {
+        thumbnailStrip.innerHTML = '';
+        thumbnailStrip.classList.add('hidden');
+    }
+}
+
+/**
+ * Create one placeholder per page and observe their visibility
+ */
+function buildThumbnailPlaceholders() {
+    if (!thumbnailStrip || !thumbnailSource) return;
+
+    hideThumbnailStrip();
+
+    const { width } = getThumbnailSettings();
+    const height = Math.round(width * thumbnailSource.aspectRatio);
+    const fragment = document.createDocumentFragment();
+
+    thumbnailObserver = new IntersectionObserver(handleThumbnailVisibility, {
+        root: thumbnailStrip,
+        rootMargin: `${height * 2}px 0px`
+    });
+
+    for (let pageNumber = 1; pageNumber <= thumbnailSource.numPages; pageNumber++) {
+        const item = document.createElement('div');
+        item.className = 'thumbnail-item';
+        item.dataset.page = pageNumber;
+
+        const canvas = document.createElement('canvas');
+        canvas.className = 'thumbnail-canvas';
+        canvas.width = width;
+        canvas.height = height;
+        canvas.style.width = `${width}px`;
+        canvas.style.height = `${height}px`;
+        canvas.dataset.page = pageNumber;
+
+        const label = document.createElement('span');
+        label.className = 'thumbnail-label';
+        label.textContent = pageNumber;
+
+        item.appendChild(canvas);
+        item.appendChild(label);
+        fragment.appendChild(item);
+
+        thumbnailCanvases.set(pageNumber, canvas);
+        thumbnailObserver.observe(canvas);
+    }
+
+    thumbnailStrip.appendChild(fragment);
+    thumbnailStrip.classList.remove('hidden');
+    thumbnailStrip.onclick = handleThumbnailClick;
+}
+
+/**
+ * Track which thumbnails are in view and queue renders for them
+ * @param {IntersectionObserverEntry[]} entries
+ */
+function handleThumbnailVisibility(entries) {
+    for (const entry of entries) {
+        const pageNumber = parseInt(entry.target.dataset.page, 10);
+
+        if (entry.isIntersecting) {
+            thumbnailVisiblePages.add(pageNumber);
+
+            if (thumbnailCache.has(pageNumber)) {
+                drawThumbnail(pageNumber);
+            } else {
+                thumbnailPendingPages.add(pageNumber);
+            }
+        } else {
+            // Drop queued work and free the decoded pixels of off-screen thumbnails
+            thumbnailVisiblePages.delete(pageNumber);
+            thumbnailPendingPages.delete(pageNumber);
+            releaseThumbnail(entry.target);
+        }
+    }
+
+    pumpThumbnailRenders();
+}
+
+/**
+ * Send queued render requests to the worker, bounded by the concurrency limit
+ */
+function pumpThumbnailRenders() {
+    if (!thumbnailSource) return;
+
+    const settings = getThumbnailSettings();
+
+    for (const pageNumber of thumbnailPendingPages) {
+        if (thumbnailRendersInFlight >= settings.maxConcurrentRenders) break;
+
+        thumbnailPendingPages.delete(pageNumber);
+        thumbnailRendersInFlight++;
+
+        getThumbnailWorker().postMessage({
+            type: 'render',
+            id: thumbnailSource.id,
+            pageNumber,
+            width: settings.width * (window.devicePixelRatio || 1),
+            imageType: settings.imageType,
+            quality: settings.quality
+        });
+    }
+}
+
+/**
+ * Handle messages from the thumbnail worker
+ * @param {MessageEvent} event
+ */
+function handleThumbnailWorkerMessage(event) {
+    const message = event.data;
+
+    // Ignore replies for a document that has since been replaced
+    if (!thumbnailSource || message.id !== thumbnailSource.id) {
+        if (message.pageNumber) {
+            thumbnailRendersInFlight = Math.max(0, thumbnailRendersInFlight - 1);
+        }
+        return;
+    }
+
+    if (message.type === 'opened') {
+        thumbnailSource.opened = true;
+        thumbnailSource.numPages = message.numPages;
+        thumbnailSource.aspectRatio = message.aspectRatio;
+
+        const modal = document.getElementById('full-preview-modal');
+        if (modal && !modal.classList.contains('hidden')) {
+            buildThumbnailPlaceholders();
+        }
+        return;
+    }
+
+    if (message.type === 'error' && !message.pageNumber) {
+        console.error('Error opening PDF for thumbnails:', message.message);
+        return;
+    }
+
+    thumbnailRendersInFlight = Math.max(0, thumbnailRendersInFlight - 1);
+
+    if (message.type === 'rendered') {
+        putCachedThumbnail(message.pageNumber, message.blob);
+
+        if (thumbnailVisiblePages.has(message.pageNumber)) {
+            drawThumbnail(message.pageNumber);
+        }
+    } else if (message.type === 'error') {
+        console.error(`Error rendering thumbnail for page ${message.pageNumber}:`, message.message);
+    }
+
+    pumpThumbnailRenders();
+}
+
+/**
+ * Decode a cached thumbnail and draw it into its canvas
+ * @param {number} pageNumber - Page number
+ */
+async function drawThumbnail(pageNumber) {
+    const blob = getCachedThumbnail(pageNumber);
+    const canvas = thumbnailCanvases.get(pageNumber);
+    if (!blob || !canvas) return;
+
+    try {
+        // Decoding happens off the main thread
+        const bitmap = await createImageBitmap(blob);
+
+        if (!thumbnailVisiblePages.has(pageNumber) || thumbnailCanvases.get(pageNumber) !== canvas) {
+            bitmap.close();
+            return;
+        }
+
+        canvas.width = bitmap.width;
+        canvas.height = bitmap.height;
+        canvas.getContext('bitmaprenderer').transferFromImageBitmap(bitmap);
+        canvas.classList.add('rendered');
+    } catch (error) {
+        console.error(`Error drawing thumbnail for page ${pageNumber}:`, error);
+    }
+}
+
+/**
+ * Release the pixels held by an off-screen thumbnail canvas
+ * @param {HTMLCanvasElement} canvas
+ */
+function releaseThumbnail(canvas) {
+    if (!canvas.classList.contains('rendered')) return;
+
+    canvas.getContext('bitmaprenderer').transferFromImageBitmap(null);
+    canvas.classList.remove('rendered');
+}
+
+/**
+ * Read a thumbnail from the cache and mark it as recently used
+ * @param {number} pageNumber - Page number
+ * @returns {Blob|undefined}
+ */
+function getCachedThumbnail(pageNumber) {
+    const blob = thumbnailCache.get(pageNumber);
+    if (blob) {
+        thumbnailCache.delete(pageNumber);
+        thumbnailCache.set(pageNumber, blob);
+    }
+    return blob;
+}
+
+/**
+ * Add a thumbnail to the cache, evicting least recently used entries
+ * until the cache fits its memory budget
+ * @param {number} pageNumber - Page number
+ * @param {Blob} blob - Compressed image
+ */
+function putCachedThumbnail(pageNumber, blob) {
+    const { cacheBytes } = getThumbnailSettings();
+
+    if (thumbnailCache.has(pageNumber)) {
+        thumbnailCacheBytes -= thumbnailCache.get(pageNumber).size;
+        thumbnailCache.delete(pageNumber);
+    }
+
+    thumbnailCache.set(pageNumber, blob);
+    thumbnailCacheBytes += blob.size;
+
+    for (const [oldestPage, oldestBlob] of thumbnailCache) {
+        if (thumbnailCacheBytes <= cacheBytes || oldestPage === pageNumber) break;
+
+        thumbnailCache.delete(oldestPage);
+        thumbnailCacheBytes -= oldestBlob.size;
+    }
+}
+
+/**
+ * Empty the thumbnail cache
+ */
+function clearThumbnailCache() {
+    thumbnailCache.clear();
+    thumbnailCacheBytes = 0;
+}
+
+/**
+ * Scroll the preview text to the page of a clicked thumbnail
+ * @param {MouseEvent} event
+ */
+function handleThumbnailClick(event) {
+    const item = event.target.closest('.thumbnail-item');
+    if (!item) return;
+
+    const previewContainer = document.getElementById('full-preview-content');
+    const pageElement = previewContainer ?
+        previewContainer.querySelector(`.document-page[data-page="${item.dataset.page}"]`) : null;
+
+    if (pageElement) {
+        pageElement.scrollIntoView({ block: 'start' });
+    }
+}
+
+// Make functions globally available
+window.setThumbnailSource = setThumbnailSource;
+window.showThumbnailStrip = showThumbnailStrip;
+window.hideThumbnailStrip = hideThumbnailStrip;
@@ -0,0 +1,562 @@
+/**
+ * Vector Index Module
+ * Offline embeddings for retrieval: hashed word and character n-gram
+ * features projected into a fixed number of dimensions (no model download).
+ * Chunk vectors are stored in one contiguous Float32Array and searched with
+ * a blocked matrix-vector scan, or through an IVF index (k-means centroids
+ * with inverted lists) once the collection is large; documentCollection.js
+ * fuses the result with its BM25 ranking by reciprocal rank fusion. Vectors
+ * and centroids are kept in IndexedDB between sessions.
+ */
+
+// Rows scored per block of the scan
+const VECTOR_BLOCK_ROWS = 64;
+
+// Weight of word features relative to character trigrams
+const VECTOR_WORD_WEIGHT = 2;
+
+// Format version of stored vector segments
+const VECTOR_SEGMENT_VERSION = 1;
+
+// Version of embedText's features; stored vectors of another version are not reused
+const VECTOR_EMBEDDING_VERSION = 1;
+
+// Reciprocal rank fusion constant (60 in the original RRF paper)
+const RRF_K = 60;
+
+/**
+ * Hash a string to 32 bits (FNV-1a)
+ * @param {string} text - Input
+ * @returns {number} - Unsigned 32-bit hash
+ */
+function hashFeature(text) {
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return hash >>> 0;
+}
+
+/**
+ * Embed text as a unit-length hashed n-gram vector
+ * Each word contributes itself and its character trigrams (with word
+ * boundaries), so inflected forms such as "deliver" / "delivered" /
+ * "delivery" land close together. The hash picks a dimension and a sign.
+ * @param {string} text - Text to embed
+ * @param {number} dimensions - Vector size
+ * @param {Float32Array} [out] - Array to write into
+ * @returns {Float32Array}
+ */
+function embedText(text, dimensions, out = new Float32Array(dimensions)) {
+    out.fill(0);
+
+    for (const term of tokenizeForIndex(text)) {
+        let hash = hashFeature(term);
+        out[hash % dimensions] += (hash & 0x80000000 ? -1 : 1) * VECTOR_WORD_WEIGHT;
+
+        const padded = `#${term}#`;
+        for (let i = 0; i + 3 <= padded.length; i++) {
+            hash = hashFeature(padded.substr(i, 3));
+            out[hash % dimensions] += hash & 0x80000000 ? -1 : 1;
+        }
+    }
+
+    // Dampen repeated features, then normalize so dot product = cosine
+    let norm = 0;
+    for (let d = 0; d < dimensions; d++) {
+        const value = out[d];
+        out[d] = value > 0 ? Math.sqrt(value) : -Math.sqrt(-value);
+        norm += out[d] * out[d];
+    }
+
+    norm = Math.sqrt(norm);
+    if (norm > 0) {
+        for (let d = 0; d < dimensions; d++) out[d] /= norm;
+    }
+    return out;
+}
+
+/**
+ * Score every row of a matrix against a query vector
+ * @param {Float32Array} data - Row-major matrix
+ * @param {number} rowCount - Rows to score
+ * @param {number} dimensions - Row length
+ * @param {Float32Array} query - Query vector
+ * @param {Float32Array} out - Receives one dot product per row
+ */
+function scoreRows(data, rowCount, dimensions, query, out) {
+    for (let r = 0; r < rowCount; r++) {
+        const offset = r * dimensions;
+        let dot = 0;
+        for (let d = 0; d < dimensions; d++) {
+            dot += data[offset + d] * query[d];
+        }
+        out[r] = dot;
+    }
+}
+
+/**
+ * Train IVF centroids with spherical k-means on a sample of rows
+ * @param {Float32Array} data - Row-major unit vectors
+ * @param {number} rows - Number of rows
+ * @param {number} dimensions - Vector size
+ * @param {number} listCount - Number of centroids (inverted lists)
+ * @param {Object} [options] - {iterations, sampleSize}
+ * @returns {Float32Array} - listCount unit-length centroids, row-major
+ */
+function trainIvfCentroids(data, rows, dimensions, listCount, options = {}) {
+    const iterations = options.iterations || 8;
+    // About 32 sample rows per centroid are enough to place it
+    const sampleSize = Math.min(rows, options.sampleSize || Math.min(8192, listCount * 32));
+
+    // Evenly spaced sample rows; the first centroids are spread over the sample
+    const sample = new Int32Array(sampleSize);
+    for (let i = 0; i < sampleSize; i++) sample[i] = Math.floor(i * rows / sampleSize);
+
+    const centroids = new Float32Array(listCount * dimensions);
+    for (let c = 0; c < listCount; c++) {
+        const row = sample[Math.floor(c * sampleSize / listCount)];
+        centroids.set(data.subarray(row * dimensions, (row + 1) * dimensions), c * dimensions);
+    }
+
+    const sums = new Float32Array(listCount * dimensions);
+    const sizes = new Int32Array(listCount);
+    const scores = new Float32Array(listCount);
+
+    for (let iteration = 0; iteration < iterations; iteration++) {
+        sums.fill(0);
+        sizes.fill(0);
+
+        for (let i = 0; i < sampleSize; i++) {
+            const vector = data.subarray(sample[i] * dimensions, (sample[i] + 1) * dimensions);
+            scoreRows(centroids, listCount, dimensions, vector, scores);
+
+            let best = 0;
+            for (let c = 1; c < listCount; c++) {
+                if (scores[c] > scores[best]) best = c;
+            }
+            sizes[best]++;
+            const offset = best * dimensions;
+            for (let d = 0; d < dimensions; d++) sums[offset + d] += vector[d];
+        }
+
+        // New centroid = normalized mean; empty lists keep their centroid
+        for (let c = 0; c < listCount; c++) {
+            if (sizes[c] === 0) continue;
+            const offset = c * dimensions;
+            let norm = 0;
+            for (let d = 0; d < dimensions; d++) norm += sums[offset + d] * sums[offset + d];
+            norm = Math.sqrt(norm) || 1;
+            for (let d = 0; d < dimensions; d++) centroids[offset + d] = sums[offset + d] / norm;
+        }
+    }
+
+    return centroids;
+}
+
+/**
+ * Create a store of fixed-size vectors in one contiguous Float32Array
+ * Row r occupies data[r * dimensions .. (r + 1) * dimensions).
+ * Once a quantizer (IVF centroids) is set, every row is also filed in the
+ * inverted list of its nearest centroid, and searches only scan the lists
+ * closest to the query.
+ * @param {number} dimensions - Vector size
+ * @returns {Object} - Store with add, addVector, search and quantizer methods
+ */
+function createVectorStore(dimensions) {
+    let data = new Float32Array(dimensions * 256);
+    let rows = 0;
+
+    // IVF state: {id, listCount, centroids, trainedRows}, list of each row, rows of each list
+    let quantizer = null;
+    let rowLists = new Int32Array(256);
+    let lists = [];
+    let listSizes = null;
+
+    function reserveRow() {
+        if ((rows + 1) * dimensions > data.length) {
+            const grown = new Float32Array(data.length * 2);
+            grown.set(data);
+            data = grown;
+        }
+        if (rows === rowLists.length) {
+            rowLists = growInt32Array(rowLists);
+        }
+        return rows++;
+    }
+
+    function fileRow(row, list) {
+        if (listSizes[list] === lists[list].length) {
+            lists[list] = growInt32Array(lists[list]);
+        }
+        lists[list][listSizes[list]++] = row;
+        rowLists[row] = list;
+    }
+
+    function nearestList(vector) {
+        const scores = new Float32Array(quantizer.listCount);
+        scoreRows(quantizer.centroids, quantizer.listCount, dimensions, vector, scores);
+        let best = 0;
+        for (let c = 1; c < quantizer.listCount; c++) {
+            if (scores[c] > scores[best]) best = c;
+        }
+        return best;
+    }
+
+    // Insert a row into the sorted top-k arrays
+    function offer(top, row, score, k) {
+        if (top.found === k && score <= top.scores[k - 1]) return;
+
+        let position = top.found < k ? top.found++ : k - 1;
+        while (position > 0 && top.scores[position - 1] < score) {
+            top.scores[position] = top.scores[position - 1];
+            top.rows[position] = top.rows[position - 1];
+            position--;
+        }
+        top.scores[position] = score;
+        top.rows[position] = row;
+    }
+
+    return {
+        dimensions,
+
+        /**
+         * Embed text and append it as the next row
+         * @param {string} text - Text to embed
+         * @returns {number} - Row index
+         */
+        add(text) {
+            const row = reserveRow();
+            const vector = embedText(text, dimensions, data.subarray(row * dimensions, (row + 1) * dimensions));
+            if (quantizer) fileRow(row, nearestList(vector));
+            return row;
+        },
+
+        /**
+         * Append a vector computed earlier
+         * @param {Float32Array} vector - Unit-length vector
+         * @param {number} [list=-1] - Its inverted list under the current quantizer, if known
+         * @returns {number} - Row index
+         */
+        addVector(vector, list = -1) {
+            const row = reserveRow();
+            data.set(vector, row * dimensions);
+            if (quantizer) fileRow(row, list >= 0 && list < quantizer.listCount ? list : nearestList(vector));
+            return row;
+        },
+
+        size() {
+            return rows;
+        },
+
+        /**
+         * Get the vector of a row (a view into the store)
+         * @param {number} row - Row index
+         * @returns {Float32Array}
+         */
+        getVector(row) {
+            return data.subarray(row * dimensions, (row + 1) * dimensions);
+        },
+
+        /**
+         * Get the inverted list a row is filed in
+         * @param {number} row - Row index
+         * @returns {number} - List id, or -1 without a quantizer
+         */
+        getRowList(row) {
+            return quantizer ? rowLists[row] : -1;
+        },
+
+        getQuantizer() {
+            return quantizer;
+        },
+
+        /**
+         * Use a set of IVF centroids and file every row under it
+         * @param {{id: string, listCount: number, centroids: Float32Array, trainedRows: number}|null} next - Quantizer, or null for exact search only
+         */
+        setQuantizer(next) {
+            quantizer = next;
+            if (!quantizer) {
+                lists = [];
+                listSizes = null;
+                return;
+            }
+
+            lists = Array.from({ length: quantizer.listCount }, () => new Int32Array(16));
+            listSizes = new Int32Array(quantizer.listCount);
+            for (let row = 0; row < rows; row++) {
+                fileRow(row, nearestList(this.getVector(row)));
+            }
+        },
+
+        /**
+         * Train a quantizer on the rows stored so far and switch to it
+         * @param {number} listCount - Number of inverted lists
+         * @param {Object} [options] - {iterations, sampleSize}
+         * @returns {Object} - The new quantizer
+         */
+        train(listCount, options = {}) {
+            const centroids = trainIvfCentroids(data, rows, dimensions, listCount, options);
+            this.setQuantizer({
+                id: `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`,
+                listCount,
+                centroids,
+                trainedRows: rows
+            });
+            return quantizer;
+        },
+
+        /**
+         * Find the rows most similar to a query vector
+         * Without a quantizer (or with options.exact) every row is scored a
+         * block at a time; otherwise only the nprobe inverted lists whose
+         * centroids are closest to the query are scanned
+         * @param {Float32Array} query - Unit-length query vector
+         * @param {number} k - Results wanted
+         * @param {Function} [accept] - (row) => boolean, to skip removed rows
+         * @param {Object} [options] - {nprobe, exact}
+         * @returns {{row: number, score: number}[]} - Best first
+         */
+        search(query, k, accept = null, options = {}) {
+            const top = { rows: new Int32Array(k), scores: new Float32Array(k).fill(-Infinity), found: 0 };
+
+            if (!quantizer || options.exact) {
+                const blockScores = new Float32Array(VECTOR_BLOCK_ROWS);
+
+                for (let blockStart = 0; blockStart < rows; blockStart += VECTOR_BLOCK_ROWS) {
+                    const blockRows = Math.min(rows, blockStart + VECTOR_BLOCK_ROWS) - blockStart;
+
+                    // Matrix-vector product for this block of rows
+                    scoreRows(data.subarray(blockStart * dimensions), blockRows, dimensions, query, blockScores);
+
+                    // Insert the block's winners into the sorted top-k
+                    for (let r = 0; r < blockRows; r++) {
+                        const score = blockScores[r];
+                        if (top.found === k && score <= top.scores[k - 1]) continue;
+                        if (accept && !accept(blockStart + r)) continue;
+                        offer(top, blockStart + r, score, k);
+                    }
+                }
+            } else {
+                // Closest lists first
+                const listCount = quantizer.listCount;
+                const nprobe = Math.min(listCount, options.nprobe || 8);
+                const listScores = new Float32Array(listCount);
+                scoreRows(quantizer.centroids, listCount, dimensions, query, listScores);
+
+                const probe = { rows: new Int32Array(nprobe), scores: new Float32Array(nprobe).fill(-Infinity), found: 0 };
+                for (let c = 0; c < listCount; c++) offer(probe, c, listScores[c], nprobe);
+
+                for (let p = 0; p < probe.found; p++) {
+                    const list = lists[probe.rows[p]];
+                    const size = listSizes[probe.rows[p]];
+
+                    for (let i = 0; i < size; i++) {
+                        const row = list[i];
+                        const offset = row * dimensions;
+                        let dot = 0;
+                        for (let d = 0; d < dimensions; d++) {
+                            dot += data[offset + d] * query[d];
+                        }
+                        if (top.found === k && dot <= top.scores[k - 1]) continue;
+                        if (accept && !accept(row)) continue;
+                        offer(top, row, dot, k);
+                    }
+                }
+            }
+
+            const results = [];
+            for (let i = 0; i < top.found; i++) {
+                results.push({ row: top.rows[i], score: top.scores[i] });
+            }
+            return results;
+        }
+    };
+}
+
+/**
+ * Double the capacity of a typed array
+ * @param {Int32Array} array - Full array
+ * @returns {Int32Array}
+ */
+function growInt32Array(array) {
+    const grown = new Int32Array(array.length * 2);
+    grown.set(array);
+    return grown;
+}
+
+/**
+ * Encode vectors compactly for storage
+ * Each vector is stored as signed bytes plus one scale (4x smaller than float32)
+ * @param {Float32Array} vectors - Row-major vectors
+ * @param {number} dimensions - Vector size
+ * @param {Int32Array|null} lists - Inverted list of each vector
+ * @param {string|null} quantizerId - Quantizer the lists belong to
+ * @returns {{version: number, dimensions: number, count: number, codes: Int8Array, scales: Float32Array, lists: Uint16Array|null, quantizerId: string|null}}
+ */
+function encodeVectorSegment(vectors, dimensions, lists, quantizerId) {
+    const count = vectors.length / dimensions;
+    const codes = new Int8Array(vectors.length);
+    const scales = new Float32Array(count);
+
+    for (let r = 0; r < count; r++) {
+        const offset = r * dimensions;
+        let max = 0;
+        for (let d = 0; d < dimensions; d++) max = Math.max(max, Math.abs(vectors[offset + d]));
+        scales[r] = max / 127 || 1;
+        for (let d = 0; d < dimensions; d++) {
+            codes[offset + d] = Math.round(vectors[offset + d] / scales[r]);
+        }
+    }
+
+    return {
+        version: VECTOR_SEGMENT_VERSION,
+        dimensions,
+        count,
+        codes,
+        scales,
+        lists: lists ? Uint16Array.from(lists) : null,
+        quantizerId
+    };
+}
+
+/**
+ * Decode one vector of a stored segment
+ * @param {Object} segment - Result of encodeVectorSegment
+ * @param {number} index - Vector index
+ * @param {Float32Array} out - Receives the vector
+ * @returns {Float32Array}
+ */
+function decodeSegmentVector(segment, index, out) {
+    const { dimensions, codes, scales } = segment;
+    const offset = index * dimensions;
+    for (let d = 0; d < dimensions; d++) {
+        out[d] = codes[offset + d] * scales[index];
+    }
+    return out;
+}
+
+/**
+ * Get the limits of the stored chunk vectors
+ * @returns {{maxEntries: number, maxBytes: number}}
+ */
+function getVectorStorageLimits() {
+    const settings = (typeof LLM_CONFIG !== 'undefined' && LLM_CONFIG.document && LLM_CONFIG.document.collection) || {};
+    return {
+        maxEntries: settings.vectorStoreMaxDocuments || 100,
+        maxBytes: settings.vectorStoreMaxBytes || 64 * 1024 * 1024
+    };
+}
+
+/**
+ * Get the storage key of a document's vectors
+ * Vectors only fit the chunking and embedding they were computed with, so
+ * both are part of the key
+ * @param {string} key - Document key
+ * @param {number} dimensions - Vector size
+ * @param {number} chunkChars - Chunk size the document was split with
+ * @returns {string}
+ */
+function getVectorSegmentKey(key, dimensions, chunkChars) {
+    return `${key}|c${chunkChars}|d${dimensions}|e${VECTOR_EMBEDDING_VERSION}`;
+}
+
+/**
+ * Load the stored vectors of a document
+ * @param {string} key - Document key
+ * @param {number} dimensions - Expected vector size
+ * @param {number} chunkChars - Chunk size the document is split with
+ * @returns {Promise<Object|null>} - Segment, or null when missing or stale
+ */
+async function loadDocumentVectors(key, dimensions, chunkChars) {
+    try {
+        const segmentKey = getVectorSegmentKey(key, dimensions, chunkChars);
+        const segment = await storageGet('chunkVectors', segmentKey);
+        if (!segment || segment.version !== VECTOR_SEGMENT_VERSION || segment.dimensions !== dimensions) return null;
+
+        touchStorageManifest('chunkVectors', segmentKey, null, getVectorStorageLimits()).catch(() => {});
+        return segment;
+    } catch (error) {
+        console.warn('Could not load stored vectors:', error);
+        return null;
+    }
+}
+
+/**
+ * Store the vectors of a document, evicting the least recently used
+ * documents' vectors beyond the configured count and size
+ * @param {string} key - Document key
+ * @param {Object} segment - Result of encodeVectorSegment
+ * @param {number} chunkChars - Chunk size the document was split with
+ * @returns {Promise<void>}
+ */
+async function saveDocumentVectors(key, segment, chunkChars) {
+    try {
+        const segmentKey = getVectorSegmentKey(key, segment.dimensions, chunkChars);
+        const bytes = segment.codes.byteLength + segment.scales.byteLength + (segment.lists ? segment.lists.byteLength : 0);
+        await storagePut('chunkVectors', segmentKey, segment);
+        await touchStorageManifest('chunkVectors', segmentKey, bytes, getVectorStorageLimits());
+    } catch (error) {
+        console.warn('Could not store vectors:', error);
+    }
+}
+
+/**
+ * Load the stored IVF quantizer for a vector size
+ * @param {number} dimensions - Vector size
+ * @returns {Promise<Object|null>}
+ */
+async function loadVectorQuantizer(dimensions) {
+    try {
+        return (await storageGet('vectorIndex', `ivf-${dimensions}`)) || null;
+    } catch (error) {
+        console.warn('Could not load the vector index:', error);
+        return null;
+    }
+}
+
+/**
+ * Store an IVF quantizer
+ * @param {number} dimensions - Vector size
+ * @param {Object} quantizer - {id, listCount, centroids, trainedRows}
+ * @returns {Promise<void>}
+ */
+async function saveVectorQuantizer(dimensions, quantizer) {
+    try {
+        await storagePut('vectorIndex', `ivf-${dimensions}`, quantizer);
+    } catch (error) {
+        console.warn('Could not store the vector index:', error);
+    }
+}
+
+/**
+ * Fuse several rankings by reciprocal rank fusion
+ * Each list adds 1 / (RRF_K + rank) to an item's score, so items ranked
+ * well by either retriever rise without comparing their raw scores
+ * @param {number[][]} rankings - Item ids, best first, one list per retriever
+ * @returns {{id: number, score: number}[]} - Best first
+ */
+function fuseRankings(rankings) {
+    const scores = new Map();
+    for (const ranking of rankings) {
+        ranking.forEach((id, rank) => {
+            scores.set(id, (scores.get(id) || 0) + 1 / (RRF_K + rank + 1));
+        });
+    }
+
+    return Array.from(scores, ([id, score]) => ({ id, score }))
+        .sort((a, b) => b.score - a.score || a.id - b.id);
+}
+
+// Make functions globally available
+window.embedText = embedText;
+window.createVectorStore = createVectorStore;
+window.fuseRankings = fuseRankings;
+window.encodeVectorSegment = encodeVectorSegment;
+window.loadDocumentVectors = loadDocumentVectors;
+window.saveDocumentVectors = saveDocumentVectors;
+window.decodeSegmentVector = decodeSegmentVector;
+window.loadVectorQuantizer = loadVectorQuantizer;
+window.saveVectorQuantizer = saveVectorQuantizer;
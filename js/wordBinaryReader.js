@@ -0,0 +1,364 @@
+/**
+ * Word Binary Reader Module
+ * Extracts text from Word 97-2003 (.doc) files. The OLE compound file is
+ * read in place with DataView; the piece table in the table stream says
+ * where each run of text lives in the WordDocument stream, and each run is
+ * decoded straight from a view of the original buffer.
+ */
+
+// Compound file sector markers
+const CFB_END_OF_CHAIN = 0xFFFFFFFE;
+
+// Directory entry types
+const CFB_STREAM_ENTRY = 2;
+const CFB_ROOT_ENTRY = 5;
+
+// Word file identification and FIB flags
+const WORD_FIB_IDENT = 0xA5EC;
+const WORD_FIB_ENCRYPTED = 0x0100;
+const WORD_FIB_WHICH_TABLE = 0x0200;
+
+// Offset of fcClx/lcbClx within FibRgFcLcb97
+const WORD_FIB_CLX_OFFSET = 0x108;
+
+// Piece descriptor flag for 8-bit (cp1252) text
+const WORD_PIECE_COMPRESSED = 0x40000000;
+
+// Field characters: begin, separator, end
+const WORD_FIELD_BEGIN = 0x13;
+const WORD_FIELD_SEPARATOR = 0x14;
+const WORD_FIELD_END = 0x15;
+
+/**
+ * Open an OLE compound file
+ * @param {ArrayBuffer} arrayBuffer - File content
+ * @returns {{view: DataView, getStream: Function}} - getStream(name) returns the
+ *          stream's size and the file offset of each of its sectors, or null
+ */
+function openCompoundFile(arrayBuffer) {
+    const view = new DataView(arrayBuffer);
+    const sectorShift = view.getUint16(0x1E, true);
+    const miniSectorShift = view.getUint16(0x20, true);
+    const sectorSize = 1 << sectorShift;
+    const sectorCount = Math.floor((arrayBuffer.byteLength - sectorSize) / sectorSize) + 1;
+
+    if (sectorShift !== 9 && sectorShift !== 12) {
+        throw new Error('Corrupt compound file header');
+    }
+
+    const sectorOffset = (sector) => (sector + 1) * sectorSize;
+    const entriesPerSector = sectorSize / 4;
+
+    // FAT sector numbers: 109 in the header, the rest in a DIFAT chain
+    const fatSectors = [];
+    for (let i = 0; i < 109; i++) {
+        const sector = view.getUint32(0x4C + i * 4, true);
+        if (sector >= CFB_END_OF_CHAIN) break;
+        fatSectors.push(sector);
+    }
+    let difatSector = view.getUint32(0x44, true);
+    let difatCount = view.getUint32(0x48, true);
+    while (difatCount-- > 0 && difatSector < CFB_END_OF_CHAIN) {
+        const base = sectorOffset(difatSector);
+        for (let i = 0; i < entriesPerSector - 1; i++) {
+            const sector = view.getUint32(base + i * 4, true);
+            if (sector >= CFB_END_OF_CHAIN) break;
+            fatSectors.push(sector);
+        }
+        difatSector = view.getUint32(base + (entriesPerSector - 1) * 4, true);
+    }
+
+    const fat = new Uint32Array(fatSectors.length * entriesPerSector);
+    fatSectors.forEach((sector, index) => {
+        const base = sectorOffset(sector);
+        for (let i = 0; i < entriesPerSector; i++) {
+            fat[index * entriesPerSector + i] = view.getUint32(base + i * 4, true);
+        }
+    });
+
+    /**
+     * Follow a sector chain in a FAT
+     * @param {Uint32Array} table - FAT or mini FAT
+     * @param {number} start - First sector
+     * @returns {number[]}
+     */
+    function readChain(table, start) {
+        const chain = [];
+        let sector = start;
+        while (sector < CFB_END_OF_CHAIN) {
+            if (sector >= table.length || chain.length > table.length) {
+                throw new Error('Corrupt compound file sector chain');
+            }
+            chain.push(sector);
+            sector = table[sector];
+        }
+        return chain;
+    }
+
+    // Directory entries, 128 bytes each
+    const entries = new Map();
+    let root = null;
+    for (const sector of readChain(fat, view.getUint32(0x30, true))) {
+        const base = sectorOffset(sector);
+        for (let offset = base; offset < base + sectorSize; offset += 128) {
+            const type = view.getUint8(offset + 0x42);
+            if (type !== CFB_STREAM_ENTRY && type !== CFB_ROOT_ENTRY) continue;
+
+            const nameLength = Math.max(0, view.getUint16(offset + 0x40, true) - 2);
+            let name = '';
+            for (let i = 0; i < nameLength; i += 2) {
+                name += String.fromCharCode(view.getUint16(offset + i, true));
+            }
+
+            const entry = {
+                name,
+                start: view.getUint32(offset + 0x74, true),
+                size: view.getUint32(offset + 0x78, true)
+            };
+            if (type === CFB_ROOT_ENTRY) {
+                root = entry;
+            } else if (!entries.has(name)) {
+                entries.set(name, entry);
+            }
+        }
+    }
+
+    // Small streams live in the mini stream, which is itself stored in the root entry
+    const miniCutoff = view.getUint32(0x38, true);
+    let miniFat = null;
+    let miniStreamSectors = null;
+
+    function loadMiniStream() {
+        if (miniFat) return;
+
+        const miniFatChain = readChain(fat, view.getUint32(0x3C, true));
+        miniFat = new Uint32Array(miniFatChain.length * entriesPerSector);
+        miniFatChain.forEach((sector, index) => {
+            const base = sectorOffset(sector);
+            for (let i = 0; i < entriesPerSector; i++) {
+                miniFat[index * entriesPerSector + i] = view.getUint32(base + i * 4, true);
+            }
+        });
+        miniStreamSectors = root ? readChain(fat, root.start) : [];
+    }
+
+    return {
+        view,
+
+        /**
+         * Locate a stream
+         * @param {string} name - Stream name, e.g. 'WordDocument'
+         * @returns {{size: number, unitShift: number, offsets: Float64Array}|null} -
+         *          offsets[i] is the file offset of bytes [i << unitShift, (i + 1) << unitShift)
+         */
+        getStream(name) {
+            const entry = entries.get(name);
+            if (!entry) return null;
+
+            if (entry.size >= miniCutoff) {
+                const chain = readChain(fat, entry.start);
+                const offsets = new Float64Array(chain.length);
+                for (let i = 0; i < chain.length; i++) {
+                    if (chain[i] >= sectorCount) throw new Error('Compound file is truncated');
+                    offsets[i] = sectorOffset(chain[i]);
+                }
+                return { size: entry.size, unitShift: sectorShift, offsets };
+            }
+
+            loadMiniStream();
+            const chain = readChain(miniFat, entry.start);
+            const offsets = new Float64Array(chain.length);
+            for (let i = 0; i < chain.length; i++) {
+                const position = chain[i] << miniSectorShift;
+                const container = miniStreamSectors[position >> sectorShift];
+                if (container === undefined) throw new Error('Corrupt compound file mini stream');
+                offsets[i] = sectorOffset(container) + (position & (sectorSize - 1));
+            }
+            return { size: entry.size, unitShift: miniSectorShift, offsets };
+        }
+    };
+}
+
+/**
+ * Visit the contiguous file ranges that hold part of a stream
+ * Neighbouring sectors that are adjacent in the file are merged
+ * @param {Object} stream - Stream from getStream
+ * @param {number} start - Stream offset
+ * @param {number} length - Byte count
+ * @param {Function} callback - Called with (fileOffset, byteLength)
+ */
+function forEachStreamRange(stream, start, length, callback) {
+    const unitSize = 2 ** stream.unitShift;
+    const end = Math.min(start + length, stream.size);
+    let position = start;
+
+    while (position < end) {
+        let unit = Math.floor(position / unitSize);
+        const fileOffset = stream.offsets[unit] + (position - unit * unitSize);
+        let rangeEnd = Math.min(end, (unit + 1) * unitSize);
+
+        while (rangeEnd < end && stream.offsets[unit + 1] === stream.offsets[unit] + unitSize) {
+            unit++;
+            rangeEnd = Math.min(end, (unit + 1) * unitSize);
+        }
+
+        callback(fileOffset, rangeEnd - position);
+        position = rangeEnd;
+    }
+}
+
+/**
+ * Copy part of a stream into one buffer (used for the small piece table)
+ * @param {ArrayBuffer} arrayBuffer - File content
+ * @param {Object} stream - Stream from getStream
+ * @param {number} start - Stream offset
+ * @param {number} length - Byte count
+ * @returns {DataView}
+ */
+function readStreamBytes(arrayBuffer, stream, start, length) {
+    const bytes = new Uint8Array(length);
+    let written = 0;
+    forEachStreamRange(stream, start, length, (fileOffset, byteLength) => {
+        bytes.set(new Uint8Array(arrayBuffer, fileOffset, byteLength), written);
+        written += byteLength;
+    });
+    return new DataView(bytes.buffer, 0, written);
+}
+
+/**
+ * Read the piece table (PlcPcd) from the Clx structure
+ * @param {DataView} clx - Clx bytes
+ * @returns {{cpStart: number, cpEnd: number, fc: number, compressed: boolean}[]}
+ */
+function readWordPieceTable(clx) {
+    let offset = 0;
+
+    // Skip Prc entries (formatting) before the Pcdt
+    while (offset < clx.byteLength && clx.getUint8(offset) === 0x01) {
+        offset += 3 + clx.getInt16(offset + 1, true);
+    }
+    if (offset >= clx.byteLength || clx.getUint8(offset) !== 0x02) {
+        throw new Error('Piece table not found in Word document');
+    }
+
+    const length = clx.getUint32(offset + 1, true);
+    const base = offset + 5;
+    const count = (length - 4) / 12; // n + 1 CPs and n 8-byte descriptors
+    const pieces = [];
+
+    for (let i = 0; i < count; i++) {
+        const descriptor = base + (count + 1) * 4 + i * 8;
+        const fc = clx.getUint32(descriptor + 2, true);
+        const compressed = (fc & WORD_PIECE_COMPRESSED) !== 0;
+
+        pieces.push({
+            cpStart: clx.getUint32(base + i * 4, true),
+            cpEnd: clx.getUint32(base + (i + 1) * 4, true),
+            fc: compressed ? (fc & ~WORD_PIECE_COMPRESSED) / 2 : fc,
+            compressed
+        });
+    }
+
+    return pieces;
+}
+
+/**
+ * Drop field instructions (e.g. HYPERLINK "...") and keep field results
+ * @param {string} text - Raw document text
+ * @returns {string}
+ */
+function stripWordFieldCodes(text) {
+    if (text.indexOf(String.fromCharCode(WORD_FIELD_BEGIN)) === -1) return text;
+
+    const parts = [];
+    const inCode = []; // One flag per open field
+    let start = 0;
+
+    for (let i = 0; i < text.length; i++) {
+        const code = text.charCodeAt(i);
+        if (code !== WORD_FIELD_BEGIN && code !== WORD_FIELD_SEPARATOR && code !== WORD_FIELD_END) continue;
+
+        if (!inCode.includes(true)) parts.push(text.slice(start, i));
+        start = i + 1;
+
+        if (code === WORD_FIELD_BEGIN) {
+            inCode.push(true);
+        } else if (code === WORD_FIELD_SEPARATOR) {
+            if (inCode.length > 0) inCode[inCode.length - 1] = false;
+        } else {
+            inCode.pop();
+        }
+    }
+
+    if (!inCode.includes(true)) parts.push(text.slice(start));
+    return parts.join('');
+}
+
+/**
+ * Extract the text of a Word 97-2003 document
+ * @param {ArrayBuffer} arrayBuffer - .doc file content
+ * @returns {string} - Document text with paragraphs on separate lines
+ */
+function extractWordBinaryText(arrayBuffer) {
+    const compoundFile = openCompoundFile(arrayBuffer);
+    const wordStream = compoundFile.getStream('WordDocument');
+    if (!wordStream) {
+        throw new Error('Not a Word document (no WordDocument stream)');
+    }
+
+    // The File Information Block starts the WordDocument stream
+    const fib = readStreamBytes(arrayBuffer, wordStream, 0, Math.min(wordStream.size, 1024));
+    if (fib.getUint16(0, true) !== WORD_FIB_IDENT) {
+        throw new Error('Unsupported Word file format');
+    }
+
+    const flags = fib.getUint16(0x0A, true);
+    if (flags & WORD_FIB_ENCRYPTED) {
+        throw new Error('Password-protected Word documents are not supported');
+    }
+
+    // Skip FibRgW and FibRgLw to reach FibRgFcLcb
+    const rgWCount = fib.getUint16(32, true);
+    const rgLwOffset = 34 + rgWCount * 2;
+    const rgLwCount = fib.getUint16(rgLwOffset, true);
+    const rgFcLcbOffset = rgLwOffset + 2 + rgLwCount * 4 + 2;
+
+    const fcClx = fib.getUint32(rgFcLcbOffset + WORD_FIB_CLX_OFFSET, true);
+    const lcbClx = fib.getUint32(rgFcLcbOffset + WORD_FIB_CLX_OFFSET + 4, true);
+
+    const tableStream = compoundFile.getStream(flags & WORD_FIB_WHICH_TABLE ? '1Table' : '0Table');
+    if (!tableStream || lcbClx === 0) {
+        throw new Error('Word document has no piece table');
+    }
+
+    const pieces = readWordPieceTable(readStreamBytes(arrayBuffer, tableStream, fcClx, lcbClx));
+    const utf16Decoder = new TextDecoder('utf-16le');
+    const ansiDecoder = new TextDecoder('windows-1252');
+    const parts = [];
+
+    for (const piece of pieces) {
+        const charCount = piece.cpEnd - piece.cpStart;
+        if (charCount <= 0) continue;
+
+        const decoder = piece.compressed ? ansiDecoder : utf16Decoder;
+        const byteLength = piece.compressed ? charCount : charCount * 2;
+
+        // Decode from views of the original buffer; only the strings are allocated
+        forEachStreamRange(wordStream, piece.fc, byteLength, (fileOffset, length) => {
+            parts.push(decoder.decode(new Uint8Array(arrayBuffer, fileOffset, length), { stream: !piece.compressed }));
+        });
+        if (!piece.compressed) parts.push(utf16Decoder.decode());
+    }
+
+    return stripWordFieldCodes(parts.join(''))
+        .replace(/\x07\x07/g, '\n')         // End of a table row
+        .replace(/\x07/g, '\t')             // End of a table cell
+        .replace(/[\r\x0B\x0C]/g, '\n')     // Paragraph, line and page breaks
+        .replace(/[\x00-\x08\x0E-\x1F]/g, '') // Object anchors and other control characters
+        .replace(/\t\n/g, '\n')
+        .replace(/\n{3,}/g, '\n\n')
+        .trim();
+}
+
+// Make functions globally available
+window.extractWordBinaryText = extractWordBinaryText;
@@ -0,0 +1,96 @@
+/**
+ * OCR Worker
+ * Runs the locally bundled Tesseract WASM engine (tesseract.js-core) on
+ * page bitmaps. One engine instance per worker; the pool in ocr.js runs
+ * one worker per core.
+ */
+
+let enginePromise = null;
+
+/**
+ * Fetch the language data, inflating it when it is gzip-compressed
+ * @param {string} url - Language data URL
+ * @returns {Promise<Uint8Array>}
+ */
+async function fetchLanguageData(url) {
+    const response = await fetch(url);
+    if (!response.ok) {
+        throw new Error(`Failed to load OCR language data (${response.status})`);
+    }
+
+    let stream = response.body;
+    if (url.endsWith('.gz')) {
+        stream = stream.pipeThrough(new DecompressionStream('gzip'));
+    }
+
+    return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+/**
+ * Load and initialize the OCR engine
+ * @param {Object} config - {engineUrl, languageDataUrl, language}
+ * @returns {Promise<{core: Object, api: Object}>}
+ */
+async function initEngine(config) {
+    importScripts(config.engineUrl);
+
+    if (typeof self.TesseractCore !== 'function') {
+        throw new Error('OCR engine script did not define TesseractCore');
+    }
+
+    const core = await self.TesseractCore({
+        locateFile: (path) => new URL(path, config.engineUrl).href
+    });
+
+    const languageData = await fetchLanguageData(config.languageDataUrl);
+    core.FS.writeFile(`${config.language}.traineddata`, languageData);
+
+    const api = new core.TessBaseAPI();
+    if (api.Init(null, config.language) !== 0) {
+        throw new Error(`Failed to initialize OCR engine for language "${config.language}"`);
+    }
+
+    return { core, api };
+}
+
+/**
+ * Recognize text in an RGBA bitmap
+ * @param {Object} message - {width, height, pixels}
+ * @returns {Promise<string>} - Recognized text
+ */
+async function recognize(message) {
+    const { core, api } = await enginePromise;
+
+    // Copy the pixels into WASM memory and hand them to Tesseract
+    const pointer = core._malloc(message.pixels.length);
+    try {
+        core.HEAPU8.set(message.pixels, pointer);
+        api.SetImage(pointer, message.width, message.height, 4, message.width * 4);
+        return api.GetUTF8Text() || '';
+    } finally {
+        api.Clear();
+        core._free(pointer);
+    }
+}
+
+self.onmessage = async function(event) {
+    const message = event.data;
+
+    if (message.type === 'init') {
+        enginePromise = initEngine(message.config);
+        enginePromise.then(
+            () => self.postMessage({ type: 'ready' }),
+            (error) => self.postMessage({ type: 'init-error', message: error.message })
+        );
+        return;
+    }
+
+    if (message.type === 'recognize') {
+        try {
+            const text = await recognize(message);
+            self.postMessage({ type: 'result', id: message.id, text });
+        } catch (error) {
+            self.postMessage({ type: 'error', id: message.id, message: error.message });
+        }
+    }
+};
@@ -0,0 +1,337 @@
+/**
+ * Summary Worker
+ * Extractive summarization with TextRank: sentences become sparse TF-IDF
+ * vectors, sentences that share terms are linked by cosine similarity, and
+ * the highest ranked sentences of the graph form the summary. Runs off the
+ * main thread.
+ */
+
+// Words that carry no topic
+const STOP_WORDS = new Set([
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'any', 'can', 'had', 'her', 'was',
+    'one', 'our', 'out', 'has', 'his', 'how', 'its', 'may', 'new', 'now', 'see', 'who', 'did',
+    'yes', 'also', 'been', 'from', 'have', 'into', 'more', 'most', 'only', 'other', 'over',
+    'such', 'than', 'that', 'their', 'them', 'then', 'there', 'these', 'they', 'this', 'those',
+    'were', 'what', 'when', 'where', 'which', 'while', 'will', 'with', 'would', 'your', 'each',
+    'about', 'after', 'being', 'could', 'should', 'shall', 'under', 'upon', 'very', 'some'
+]);
+
+// Sentence length limits (in terms and characters)
+const MIN_SENTENCE_TERMS = 4;
+const MAX_SENTENCE_CHARS = 500;
+
+// TextRank parameters
+const DAMPING = 0.85;
+const MAX_ITERATIONS = 50;
+const CONVERGENCE = 1e-6;
+const MIN_SIMILARITY = 0.05;
+
+// Terms in more than this share of sentences don't link sentences
+const MAX_DF_RATIO = 0.1;
+
+/**
+ * Split text into sentences
+ * Wrapped lines inside a paragraph are joined; blank lines end a sentence
+ * @param {string} text - Document text
+ * @returns {string[]}
+ */
+function splitSentences(text) {
+    const sentences = [];
+
+    for (const paragraph of text.split(/\n\s*\n/)) {
+        const joined = paragraph.replace(/\s+/g, ' ').trim();
+        if (!joined) continue;
+
+        for (const sentence of joined.split(/(?<=[.!?])\s+(?=["'(\[]?[A-Z0-9])/)) {
+            if (sentence.length <= MAX_SENTENCE_CHARS) {
+                sentences.push(sentence);
+            } else {
+                sentences.push(sentence.substring(0, MAX_SENTENCE_CHARS) + '...');
+            }
+        }
+    }
+
+    return sentences;
+}
+
+/**
+ * Build sparse TF-IDF vectors for sentences
+ * Rows are stored contiguously (CSR): the terms of sentence i are
+ * termIds[rowStart[i]..rowStart[i + 1]) with unit-length weights
+ * @param {string[][]} sentenceTerms - Terms of each sentence
+ * @returns {{rowStart: Int32Array, termIds: Int32Array, weights: Float32Array, df: Int32Array}}
+ */
+function buildTfIdfVectors(sentenceTerms) {
+    const vocabulary = new Map();
+    const count = sentenceTerms.length;
+
+    // Term ids of every sentence, sorted within the sentence so repeats are adjacent
+    let total = 0;
+    for (const terms of sentenceTerms) total += terms.length;
+    const ids = new Int32Array(total);
+    const idStart = new Int32Array(count + 1);
+    let offset = 0;
+
+    for (let i = 0; i < count; i++) {
+        idStart[i] = offset;
+        for (const term of sentenceTerms[i]) {
+            let id = vocabulary.get(term);
+            if (id === undefined) {
+                id = vocabulary.size;
+                vocabulary.set(term, id);
+            }
+            ids[offset++] = id;
+        }
+        ids.subarray(idStart[i], offset).sort();
+    }
+    idStart[count] = offset;
+
+    // Document frequency: each distinct id of a sentence counts once
+    const df = new Int32Array(vocabulary.size);
+    let nonZero = 0;
+    for (let i = 0; i < count; i++) {
+        for (let k = idStart[i]; k < idStart[i + 1]; k++) {
+            if (k === idStart[i] || ids[k] !== ids[k - 1]) {
+                df[ids[k]]++;
+                nonZero++;
+            }
+        }
+    }
+
+    const rowStart = new Int32Array(count + 1);
+    const termIds = new Int32Array(nonZero);
+    const weights = new Float32Array(nonZero);
+    offset = 0;
+
+    for (let i = 0; i < count; i++) {
+        rowStart[i] = offset;
+        let norm = 0;
+        let k = idStart[i];
+
+        while (k < idStart[i + 1]) {
+            const id = ids[k];
+            let tf = 0;
+            while (k < idStart[i + 1] && ids[k] === id) {
+                tf++;
+                k++;
+            }
+
+            const weight = (1 + Math.log(tf)) * Math.log(count / df[id]);
+            termIds[offset] = id;
+            weights[offset] = weight;
+            norm += weight * weight;
+            offset++;
+        }
+
+        norm = Math.sqrt(norm);
+        if (norm > 0) {
+            for (let w = rowStart[i]; w < offset; w++) weights[w] /= norm;
+        }
+    }
+    rowStart[count] = offset;
+
+    return { rowStart, termIds, weights, df };
+}
+
+/**
+ * Double the capacity of a typed array
+ * @param {Int32Array} array - Full array
+ * @returns {Int32Array}
+ */
+function growInt32Array(array) {
+    const grown = new Int32Array(array.length * 2);
+    grown.set(array);
+    return grown;
+}
+
+/**
+ * Build the sentence similarity graph
+ * Dot products are accumulated through per-term postings, so only sentences
+ * that share a term are compared
+ * @param {Object} vectors - Result of buildTfIdfVectors
+ * @param {number} count - Number of sentences
+ * @returns {{edgeStart: Int32Array, edgeTargets: Int32Array, edgeWeights: Float32Array, rowSums: Float64Array}}
+ */
+function buildSimilarityGraph(vectors, count) {
+    const { rowStart, termIds, weights, df } = vectors;
+    const maxDf = Math.max(2, Math.floor(count * MAX_DF_RATIO));
+
+    // Postings: sentences and weights for each term
+    const postingStart = new Int32Array(df.length + 1);
+    for (let t = 0; t < df.length; t++) postingStart[t + 1] = postingStart[t] + df[t];
+    const postingRows = new Int32Array(postingStart[df.length]);
+    const postingWeights = new Float32Array(postingStart[df.length]);
+    const fill = postingStart.slice(0, df.length);
+
+    for (let i = 0; i < count; i++) {
+        for (let k = rowStart[i]; k < rowStart[i + 1]; k++) {
+            const position = fill[termIds[k]]++;
+            postingRows[position] = i;
+            postingWeights[position] = weights[k];
+        }
+    }
+
+    // Each pair is scored once (j > i): postings are in sentence order, so
+    // sentence i's position in a posting list only moves forward
+    const cursor = postingStart.slice(0, df.length);
+    const accumulator = new Float32Array(count);
+    const touched = new Int32Array(count);
+    const degree = new Int32Array(count);
+    let pairFrom = new Int32Array(count * 4);
+    let pairTo = new Int32Array(count * 4);
+    let pairWeights = new Float32Array(count * 4);
+    let pairs = 0;
+
+    for (let i = 0; i < count; i++) {
+        let touchedCount = 0;
+
+        for (let k = rowStart[i]; k < rowStart[i + 1]; k++) {
+            const term = termIds[k];
+            const own = cursor[term]++;
+            if (df[term] < 2 || df[term] > maxDf) continue;
+
+            const weight = weights[k];
+            for (let p = own + 1; p < postingStart[term + 1]; p++) {
+                const j = postingRows[p];
+                if (accumulator[j] === 0) touched[touchedCount++] = j;
+                accumulator[j] += weight * postingWeights[p];
+            }
+        }
+
+        for (let n = 0; n < touchedCount; n++) {
+            const j = touched[n];
+            const similarity = accumulator[j];
+            accumulator[j] = 0;
+            if (similarity < MIN_SIMILARITY) continue;
+
+            if (pairs === pairFrom.length) {
+                pairFrom = growInt32Array(pairFrom);
+                pairTo = growInt32Array(pairTo);
+                const grown = new Float32Array(pairs * 2);
+                grown.set(pairWeights);
+                pairWeights = grown;
+            }
+            pairFrom[pairs] = i;
+            pairTo[pairs] = j;
+            pairWeights[pairs] = similarity;
+            degree[i]++;
+            degree[j]++;
+            pairs++;
+        }
+    }
+
+    // Adjacency lists in both directions
+    const edgeStart = new Int32Array(count + 1);
+    for (let i = 0; i < count; i++) edgeStart[i + 1] = edgeStart[i] + degree[i];
+    const edgeTargets = new Int32Array(edgeStart[count]);
+    const edgeWeights = new Float32Array(edgeStart[count]);
+    const rowSums = new Float64Array(count);
+    const next = edgeStart.slice(0, count);
+
+    for (let e = 0; e < pairs; e++) {
+        const a = pairFrom[e];
+        const b = pairTo[e];
+        const weight = pairWeights[e];
+        edgeTargets[next[a]] = b;
+        edgeWeights[next[a]++] = weight;
+        edgeTargets[next[b]] = a;
+        edgeWeights[next[b]++] = weight;
+        rowSums[a] += weight;
+        rowSums[b] += weight;
+    }
+
+    return { edgeStart, edgeTargets, edgeWeights, rowSums };
+}
+
+/**
+ * Rank sentences by power iteration over the similarity graph
+ * @param {Object} graph - Result of buildSimilarityGraph
+ * @param {number} count - Number of sentences
+ * @returns {Float64Array} - Score of each sentence
+ */
+function rankSentences(graph, count) {
+    const { edgeStart, edgeTargets, edgeWeights, rowSums } = graph;
+    let scores = new Float64Array(count).fill(1 / count);
+    let next = new Float64Array(count);
+
+    for (let iteration = 0; iteration < MAX_ITERATIONS; iteration++) {
+        // Sentences without links spread their score evenly
+        let danglingScore = 0;
+        for (let i = 0; i < count; i++) {
+            if (rowSums[i] === 0) danglingScore += scores[i];
+        }
+        next.fill((1 - DAMPING) / count + DAMPING * danglingScore / count);
+
+        for (let i = 0; i < count; i++) {
+            if (rowSums[i] === 0) continue;
+            const share = DAMPING * scores[i] / rowSums[i];
+            for (let e = edgeStart[i]; e < edgeStart[i + 1]; e++) {
+                next[edgeTargets[e]] += share * edgeWeights[e];
+            }
+        }
+
+        let change = 0;
+        for (let i = 0; i < count; i++) change += Math.abs(next[i] - scores[i]);
+
+        [scores, next] = [next, scores];
+        if (change < CONVERGENCE) break;
+    }
+
+    return scores;
+}
+
+/**
+ * Summarize text by picking its highest ranked sentences
+ * @param {string} text - Document text
+ * @param {number} maxSentences - Sentences in the summary
+ * @returns {{sentences: {index: number, text: string, score: number}[], sentenceCount: number}}
+ */
+function summarize(text, maxSentences) {
+    const candidates = [];
+    const sentenceTerms = [];
+
+    for (const sentence of splitSentences(text)) {
+        const terms = (sentence.toLowerCase().match(/[a-z0-9]{3,}/g) || [])
+            .filter(term => !STOP_WORDS.has(term));
+        if (terms.length < MIN_SENTENCE_TERMS) continue;
+
+        candidates.push(sentence);
+        sentenceTerms.push(terms);
+    }
+
+    const count = candidates.length;
+    if (count === 0) return { sentences: [], sentenceCount: 0 };
+
+    const vectors = buildTfIdfVectors(sentenceTerms);
+    const graph = buildSimilarityGraph(vectors, count);
+    const scores = rankSentences(graph, count);
+
+    // Best sentences, listed in document order
+    const order = Array.from({ length: count }, (_, i) => i)
+        .sort((a, b) => scores[b] - scores[a] || a - b)
+        .slice(0, maxSentences)
+        .sort((a, b) => a - b);
+
+    return {
+        sentences: order.map(i => ({ index: i, text: candidates[i], score: scores[i] * count })),
+        sentenceCount: count
+    };
+}
+
+self.onmessage = function(event) {
+    const message = event.data;
+    if (message.type !== 'summarize') return;
+
+    try {
+        const start = performance.now();
+        const summary = summarize(message.text, message.maxSentences);
+        self.postMessage({
+            type: 'summary',
+            id: message.id,
+            ...summary,
+            elapsedMs: performance.now() - start
+        });
+    } catch (error) {
+        self.postMessage({ type: 'error', id: message.id, message: error.message });
+    }
+};
@@ -0,0 +1,180 @@
+/**
+ * Thumbnail Worker
+ * Renders PDF page thumbnails with PDF.js on an OffscreenCanvas so that
+ * page rasterization never runs on the main thread
+ */
+
+let pdfDocument = null;
+let documentId = null;
+
+/**
+ * Canvas factory backed by OffscreenCanvas (no DOM in workers)
+ */
+class OffscreenCanvasFactory {
+    create(width, height) {
+        const canvas = new OffscreenCanvas(width, height);
+        return { canvas, context: canvas.getContext('2d') };
+    }
+
+    reset(canvasAndContext, width, height) {
+        canvasAndContext.canvas.width = width;
+        canvasAndContext.canvas.height = height;
+    }
+
+    destroy(canvasAndContext) {
+        canvasAndContext.canvas.width = 0;
+        canvasAndContext.canvas.height = 0;
+        canvasAndContext.canvas = null;
+        canvasAndContext.context = null;
+    }
+}
+
+const canvasFactory = new OffscreenCanvasFactory();
+
+/**
+ * Load PDF.js inside the worker
+ * @param {string} libUrl - PDF.js library URL
+ * @param {string} workerUrl - PDF.js worker URL
+ */
+function ensurePdfJs(libUrl, workerUrl) {
+    if (self.pdfjsLib) return;
+
+    importScripts(libUrl);
+    self.pdfjsLib.GlobalWorkerOptions.workerSrc = workerUrl;
+}
+
+/**
+ * Build PDF.js source options that read a large file in byte ranges
+ * @param {File} file - PDF file
+ * @param {number} rangeChunkSize - Bytes per range request
+ * @param {Function} onError - Called with the error when a range cannot be read
+ * @returns {Object} - getDocument parameters
+ */
+function getRangeSource(file, rangeChunkSize, onError) {
+    const transport = new self.pdfjsLib.PDFDataRangeTransport(file.size, null);
+    transport.requestDataRange = (begin, end) => {
+        file.slice(begin, end).arrayBuffer()
+            .then(buffer => transport.onDataRange(begin, new Uint8Array(buffer)))
+            .catch(onError);
+    };
+    return { range: transport, rangeChunkSize, disableAutoFetch: true, disableStream: true };
+}
+
+/**
+ * Open a PDF file for thumbnail rendering
+ * @param {Object} message - {id, file, rangeChunkSize, libUrl, workerUrl}
+ */
+async function openDocument(message) {
+    ensurePdfJs(message.libUrl, message.workerUrl);
+
+    if (pdfDocument) {
+        pdfDocument.destroy();
+        pdfDocument = null;
+    }
+
+    documentId = message.id;
+
+    // A range that cannot be read destroys the task, so nothing waits for it
+    let loadingTask = null;
+    let rejectRead;
+    const readFailed = new Promise((resolve, reject) => {
+        rejectRead = reject;
+    });
+    readFailed.catch(() => {});
+    const onReadError = (error) => {
+        rejectRead(new Error(`Could not read the file: ${error.message}`));
+        if (loadingTask) loadingTask.destroy();
+    };
+
+    const source = message.rangeChunkSize ?
+        getRangeSource(message.file, message.rangeChunkSize, onReadError) :
+        { data: new Uint8Array(await message.file.arrayBuffer()) };
+    loadingTask = self.pdfjsLib.getDocument({
+        ...source,
+        canvasFactory,
+        disableFontFace: true,
+        isOffscreenCanvasSupported: true
+    });
+    const pdf = await Promise.race([loadingTask.promise, readFailed]);
+
+    // A newer document may have been opened while this one was loading
+    if (documentId !== message.id) {
+        pdf.destroy();
+        return;
+    }
+
+    pdfDocument = pdf;
+
+    // The first page size is used to lay out placeholders
+    const firstPage = await pdf.getPage(1);
+    const viewport = firstPage.getViewport({ scale: 1 });
+
+    self.postMessage({
+        type: 'opened',
+        id: message.id,
+        numPages: pdf.numPages,
+        aspectRatio: viewport.height / viewport.width
+    });
+}
+
+/**
+ * Render one page to a compressed image
+ * @param {Object} message - {id, pageNumber, width, imageType, quality}
+ */
+async function renderThumbnail(message) {
+    if (!pdfDocument || message.id !== documentId) {
+        self.postMessage({ type: 'cancelled', id: message.id, pageNumber: message.pageNumber });
+        return;
+    }
+
+    const page = await pdfDocument.getPage(message.pageNumber);
+    const baseViewport = page.getViewport({ scale: 1 });
+    const viewport = page.getViewport({ scale: message.width / baseViewport.width });
+
+    const canvasAndContext = canvasFactory.create(
+        Math.ceil(viewport.width),
+        Math.ceil(viewport.height)
+    );
+
+    await page.render({
+        canvasContext: canvasAndContext.context,
+        viewport,
+        canvasFactory
+    }).promise;
+
+    // Compress before handing the image back; the main thread caches blobs
+    const blob = await canvasAndContext.canvas.convertToBlob({
+        type: message.imageType,
+        quality: message.quality
+    });
+
+    canvasFactory.destroy(canvasAndContext);
+    page.cleanup();
+
+    self.postMessage({ type: 'rendered', id: message.id, pageNumber: message.pageNumber, blob });
+}
+
+self.onmessage = async function(event) {
+    const message = event.data;
+
+    try {
+        if (message.type === 'open') {
+            await openDocument(message);
+        } else if (message.type === 'render') {
+            await renderThumbnail(message);
+        } else if (message.type === 'close') {
+            if (pdfDocument) {
+                pdfDocument.destroy();
+            }
+            pdfDocument = null;
+            documentId = null;
+        }
+    } catch (error) {
+        self.postMessage({
+            type: 'error',
+            id: message.id,
+            pageNumber: message.pageNumber,
+            message: error.message
+        });
+    }
+};
@@ -0,0 +1,117 @@
+/**
+ * ZIP Reader Module
+ * Reads entries of ZIP archives (XLSX, DOCX) straight from an ArrayBuffer.
+ * Entry data is never copied; compressed entries are inflated as a stream
+ * with DecompressionStream so large parts can be parsed incrementally.
+ */
+
+// Record signatures
+const ZIP_END_OF_DIRECTORY = 0x06054b50;
+const ZIP_CENTRAL_HEADER = 0x02014b50;
+const ZIP_LOCAL_HEADER = 0x04034b50;
+
+/**
+ * Read the central directory of a ZIP archive
+ * @param {ArrayBuffer} arrayBuffer - Archive content
+ * @returns {Map<string, {name: string, method: number, compressedSize: number, size: number, offset: number}>}
+ */
+function readZipDirectory(arrayBuffer) {
+    const view = new DataView(arrayBuffer);
+
+    // The end record sits within the last 64 KB (its comment can be up to 65535 bytes)
+    let end = -1;
+    const stop = Math.max(0, arrayBuffer.byteLength - 22 - 65535);
+    for (let offset = arrayBuffer.byteLength - 22; offset >= stop; offset--) {
+        if (view.getUint32(offset, true) === ZIP_END_OF_DIRECTORY) {
+            end = offset;
+            break;
+        }
+    }
+    if (end < 0) {
+        throw new Error('Not a ZIP archive (end of central directory not found)');
+    }
+
+    const entryCount = view.getUint16(end + 10, true);
+    let offset = view.getUint32(end + 16, true);
+    if (offset === 0xFFFFFFFF) {
+        throw new Error('ZIP64 archives are not supported');
+    }
+
+    const decoder = new TextDecoder();
+    const entries = new Map();
+
+    for (let i = 0; i < entryCount; i++) {
+        if (view.getUint32(offset, true) !== ZIP_CENTRAL_HEADER) {
+            throw new Error('Corrupt ZIP central directory');
+        }
+
+        const nameLength = view.getUint16(offset + 28, true);
+        const extraLength = view.getUint16(offset + 30, true);
+        const commentLength = view.getUint16(offset + 32, true);
+        const name = decoder.decode(new Uint8Array(arrayBuffer, offset + 46, nameLength));
+
+        entries.set(name, {
+            name,
+            method: view.getUint16(offset + 10, true),
+            compressedSize: view.getUint32(offset + 20, true),
+            size: view.getUint32(offset + 24, true),
+            offset: view.getUint32(offset + 42, true)
+        });
+
+        offset += 46 + nameLength + extraLength + commentLength;
+    }
+
+    return entries;
+}
+
+/**
+ * Open an entry as a stream of uncompressed bytes
+ * @param {ArrayBuffer} arrayBuffer - Archive content
+ * @param {Object} entry - Entry from readZipDirectory
+ * @returns {ReadableStream<Uint8Array>}
+ */
+function openZipEntryStream(arrayBuffer, entry) {
+    const view = new DataView(arrayBuffer);
+    if (view.getUint32(entry.offset, true) !== ZIP_LOCAL_HEADER) {
+        throw new Error(`Corrupt ZIP entry: ${entry.name}`);
+    }
+
+    // The local header has its own name and extra field lengths
+    const nameLength = view.getUint16(entry.offset + 26, true);
+    const extraLength = view.getUint16(entry.offset + 28, true);
+    const data = new Uint8Array(arrayBuffer, entry.offset + 30 + nameLength + extraLength, entry.compressedSize);
+    const stream = new Blob([data]).stream();
+
+    if (entry.method === 0) {
+        return stream;
+    }
+    if (entry.method === 8) {
+        return stream.pipeThrough(new DecompressionStream('deflate-raw'));
+    }
+    throw new Error(`Unsupported ZIP compression method ${entry.method} for ${entry.name}`);
+}
+
+/**
+ * Open an entry as a stream of decoded text
+ * @param {ArrayBuffer} arrayBuffer - Archive content
+ * @param {Object} entry - Entry from readZipDirectory
+ * @returns {ReadableStream<string>}
+ */
+function openZipEntryTextStream(arrayBuffer, entry) {
+    return openZipEntryStream(arrayBuffer, entry).pipeThrough(new TextDecoderStream());
+}
+
+/**
+ * Read a whole entry as text (for small parts such as workbook.xml)
+ * @param {ArrayBuffer} arrayBuffer - Archive content
+ * @param {Object} entry - Entry from readZipDirectory
+ * @returns {Promise<string>}
+ */
+function readZipEntryText(arrayBuffer, entry) {
+    return new Response(openZipEntryStream(arrayBuffer, entry)).text();
+}
+
+// Make functions globally available
+window.readZipDirectory = readZipDirectory;
+window.openZipEntryTextStream = openZipEntryTextStream;
+window.readZipEntryText = readZipEntryText;
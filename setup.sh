@@ -24,6 +24,18 @@ fi
 echo -e "${GREEN}Installing http-server...${NC}"
 npm install -g http-server
 
+# Download the offline OCR engine (Tesseract WASM core + English language data)
+echo -e "${GREEN}Downloading OCR engine files...${NC}"
+mkdir -p lib/ocr
+OCR_CORE_URL="https://cdn.jsdelivr.net/npm/tesseract.js-core@5.1.1"
+OCR_LANG_URL="https://cdn.jsdelivr.net/npm/@tesseract.js-data/eng@1.0.0/4.0.0_best_int"
+for asset in tesseract-core-simd-lstm.wasm.js tesseract-core-simd-lstm.wasm; do
+    curl -fsSL -o "lib/ocr/$asset" "$OCR_CORE_URL/$asset" || \
+        echo -e "${YELLOW}Could not download $asset. Scanned PDFs will not be OCR'd.${NC}"
+done
+curl -fsSL -o lib/ocr/eng.traineddata.gz "$OCR_LANG_URL/eng.traineddata.gz" || \
+    echo -e "${YELLOW}Could not download OCR language data. Scanned PDFs will not be OCR'd.${NC}"
+
 # Check if Python is installed
 if ! command -v python3 &> /dev/null; then
     echo -e "${RED}Python 3 not found. You'll need Python 3.7+ to run tests.${NC}"
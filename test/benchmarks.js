@@ -0,0 +1,477 @@
+/**
+ * Benchmarks Module
+ * In-browser performance benchmarks for document processing components.
+ * Not part of the application page; load it from the developer console with
+ * `document.head.appendChild(Object.assign(document.createElement('script'), {src: 'test/benchmarks.js'}))`
+ * and run e.g. `await benchmarkPdfScanner()`.
+ */
+
+/**
+ * Compress bytes with zlib (FlateDecode)
+ * @param {Uint8Array} bytes - Bytes to compress
+ * @returns {Promise<Uint8Array>}
+ */
+async function deflateBytes(bytes) {
+    const stream = new Blob([bytes]).stream().pipeThrough(new CompressionStream('deflate'));
+    return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+/**
+ * Build a synthetic PDF-like file of roughly the given size
+ * Mixes compressed text content streams with large binary image streams,
+ * which is what the fallback scanner sees in real documents
+ * @param {number} sizeBytes - Target size in bytes
+ * @returns {Promise<Uint8Array>}
+ */
+async function buildSyntheticPdf(sizeBytes) {
+    const encoder = new TextEncoder();
+    const parts = [encoder.encode('%PDF-1.7\n')];
+    let size = parts[0].length;
+    let objectNumber = 1;
+
+    // One page worth of text operators, compressed once and reused
+    let pageContent = 'BT /F1 11 Tf 72 720 Td\n';
+    for (let line = 0; line < 40; line++) {
+        pageContent += `(Line ${line} of the quarterly report with revenue figures and project notes) Tj 0 -14 Td\n`;
+        pageContent += `[(Operating) -300 (expenses) -300 (remained) -300 (stable)] TJ 0 -14 Td\n`;
+    }
+    pageContent += 'ET\n';
+    const compressedPage = await deflateBytes(encoder.encode(pageContent));
+
+    // Incompressible image data
+    const imageData = new Uint8Array(64 * 1024);
+    crypto.getRandomValues(imageData);
+
+    while (size < sizeBytes) {
+        const isImage = objectNumber % 4 === 0;
+        const data = isImage ? imageData : compressedPage;
+        const dictionary = isImage ?
+            `<< /Type /XObject /Subtype /Image /Width 256 /Height 256 /Filter /DCTDecode /Length ${data.length} >>` :
+            `<< /Filter /FlateDecode /Length ${data.length} >>`;
+
+        const header = encoder.encode(`${objectNumber} 0 obj\n${dictionary}\nstream\n`);
+        const footer = encoder.encode('\nendstream\nendobj\n');
+
+        parts.push(header, data, footer);
+        size += header.length + data.length + footer.length;
+        objectNumber++;
+    }
+
+    parts.push(encoder.encode('%%EOF\n'));
+    return new Uint8Array(await new Blob(parts).arrayBuffer());
+}
+
+/**
+ * Measure PDF scanner throughput for several input sizes
+ * Throughput should stay roughly constant as size grows (linear scaling)
+ * @param {number[]} [sizesMb=[1, 4, 16]] - Input sizes in MB
+ * @returns {Promise<Object[]>} - Rows of {sizeMb, seconds, mbPerSecond, lines, inflatedStreams}
+ */
+async function benchmarkPdfScanner(sizesMb = [1, 4, 16]) {
+    const results = [];
+
+    for (const sizeMb of sizesMb) {
+        const bytes = await buildSyntheticPdf(sizeMb * 1024 * 1024);
+
+        const start = performance.now();
+        const { lines, stats } = await scanPdfText(bytes);
+        const seconds = (performance.now() - start) / 1000;
+
+        results.push({
+            sizeMb,
+            seconds: Number(seconds.toFixed(3)),
+            mbPerSecond: Number((bytes.length / (1024 * 1024) / seconds).toFixed(1)),
+            lines: lines.length,
+            inflatedStreams: stats.inflatedStreams
+        });
+    }
+
+    console.table(results);
+    return results;
+}
+
+/**
+ * Measure .doc text extraction speed
+ * @param {File|ArrayBuffer} source - Word 97-2003 document
+ * @param {number} [runs=3] - Extractions to time
+ * @returns {Promise<Object[]>} - Rows of {run, sizeMb, seconds, mbPerSecond, characters}
+ */
+async function benchmarkWordBinary(source, runs = 3) {
+    const arrayBuffer = source instanceof ArrayBuffer ? source : await source.arrayBuffer();
+    const sizeMb = arrayBuffer.byteLength / (1024 * 1024);
+    const results = [];
+
+    for (let run = 1; run <= runs; run++) {
+        const start = performance.now();
+        const text = extractWordBinaryText(arrayBuffer);
+        const seconds = (performance.now() - start) / 1000;
+
+        results.push({
+            run,
+            sizeMb: Number(sizeMb.toFixed(1)),
+            seconds: Number(seconds.toFixed(3)),
+            mbPerSecond: Number((sizeMb / seconds).toFixed(1)),
+            characters: text.length
+        });
+    }
+
+    console.table(results);
+    return results;
+}
+
+/**
+ * Measure OCR throughput on a scanned PDF for several worker counts
+ * Pages per minute should grow with the number of workers up to the core count.
+ * The OCR cache is bypassed so every run recognizes every page.
+ * @param {File|ArrayBuffer} source - Scanned PDF
+ * @param {number[]} [workerCounts] - Pool sizes to try (defaults to 1, 2, 4... up to the core count)
+ * @param {number} [maxPages=8] - Pages to recognize per run
+ * @returns {Promise<Object[]>} - Rows of {workers, cores, pages, seconds, pagesPerMinute, pagesPerMinutePerWorker}
+ */
+async function benchmarkOcr(source, workerCounts = null, maxPages = 8) {
+    if (!isOcrAvailable()) {
+        throw new Error('OCR is not available in this browser');
+    }
+
+    const cores = navigator.hardwareConcurrency || 2;
+    if (!workerCounts) {
+        workerCounts = [];
+        for (let count = 1; count < cores; count *= 2) workerCounts.push(count);
+        workerCounts.push(cores);
+    }
+
+    await loadPdfJs();
+    const arrayBuffer = source instanceof ArrayBuffer ? source : await readFileAsArrayBuffer(source);
+    const pdf = await window.pdfjsLib.getDocument({ data: arrayBuffer.slice(0) }).promise;
+
+    const pageNumbers = [];
+    for (let i = 1; i <= Math.min(pdf.numPages, maxPages); i++) pageNumbers.push(i);
+
+    const results = [];
+    for (const workers of workerCounts) {
+        const pool = createOcrPool(workers);
+        try {
+            await ocrPdfPages(pdf, pageNumbers, { pool, useCache: false });
+        } finally {
+            pool.terminate();
+        }
+
+        const report = window.lastOcrReport;
+        results.push({
+            workers,
+            cores,
+            pages: report.recognized,
+            seconds: report.seconds,
+            pagesPerMinute: report.pagesPerMinute,
+            pagesPerMinutePerWorker: report.pagesPerMinutePerWorker
+        });
+    }
+
+    console.table(results);
+    return results;
+}
+
+/**
+ * Build synthetic document text with a Zipf-like vocabulary
+ * @param {number} paragraphs - Number of paragraphs
+ * @param {number} seed - Seed for the word generator
+ * @returns {string}
+ */
+function buildSyntheticDocument(paragraphs, seed) {
+    let state = seed;
+    const random = () => {
+        state = (state * 1664525 + 1013904223) >>> 0;
+        return state / 4294967296;
+    };
+
+    const lines = [];
+    for (let p = 0; p < paragraphs; p++) {
+        const words = [];
+        for (let w = 0; w < 60; w++) {
+            // Low ranks are common, high ranks rare
+            words.push(`term${Math.floor(Math.pow(random(), 3) * 20000)}`);
+        }
+        lines.push(words.join(' '));
+    }
+    return lines.join('\n');
+}
+
+/**
+ * Measure cross-document retrieval latency as the collection grows
+ * Latency should grow much more slowly than the number of chunks
+ * @param {number[]} [documentCounts=[10, 100, 1000]] - Collection sizes
+ * @param {number} [queries=50] - Queries timed per size
+ * @returns {Object[]} - Rows of {documents, chunks, indexMs, queryMs}
+ */
+function benchmarkCollectionRetrieval(documentCounts = [10, 100, 1000], queries = 50) {
+    const results = [];
+
+    for (const count of documentCounts) {
+        const index = createRetrievalIndex();
+
+        const indexStart = performance.now();
+        for (let d = 0; d < count; d++) {
+            index.add(`doc-${d}`, `Document ${d}`, buildSyntheticDocument(20, d + 1));
+        }
+        const indexMs = performance.now() - indexStart;
+
+        const queryStart = performance.now();
+        for (let q = 0; q < queries; q++) {
+            index.search(`term${1000 + q * 37} term${5000 + q * 11} term${q}`);
+        }
+        const queryMs = (performance.now() - queryStart) / queries;
+
+        results.push({
+            documents: count,
+            chunks: index.getStats().chunks,
+            indexMs: Number(indexMs.toFixed(0)),
+            queryMs: Number(queryMs.toFixed(2))
+        });
+    }
+
+    console.table(results);
+    return results;
+}
+
+/**
+ * Measure extractive summary latency in the summary worker
+ * A 100-page document is roughly 50,000 words
+ * @param {number[]} [pageCounts=[10, 100, 300]] - Document sizes in pages
+ * @returns {Promise<Object[]>} - Rows of {pages, sentences, workerMs, roundTripMs}
+ */
+async function benchmarkSummary(pageCounts = [10, 100, 300]) {
+    const results = [];
+
+    for (const pages of pageCounts) {
+        // About 500 words per page, as paragraphs of sentences
+        const text = buildSyntheticDocument(pages * 8, pages)
+            .split('\n')
+            .map(paragraph => paragraph.replace(/((?:\S+ ){14}\S+) /g, '$1. ').replace(/(^|\. )t/g, '$1T') + '.')
+            .join('\n\n');
+
+        const start = performance.now();
+        const summary = await summarizeText(text);
+        const roundTripMs = performance.now() - start;
+
+        results.push({
+            pages,
+            sentences: summary.sentenceCount,
+            workerMs: Number(summary.elapsedMs.toFixed(0)),
+            roundTripMs: Number(roundTripMs.toFixed(0))
+        });
+    }
+
+    console.table(results);
+    return results;
+}
+
+/**
+ * Reword a term the way a paraphrased question might (another inflection)
+ * @param {string} term - Lowercase term
+ * @param {Function} random - Random number source
+ * @returns {string}
+ */
+function rewordTerm(term, random) {
+    const stem = term.replace(/(ing|ion|ed|es|ly|s)$/, '');
+    if (stem.length < 4) return term;
+
+    const suffixes = ['', 's', 'ed', 'ing', 'ion'].filter(suffix => stem + suffix !== term);
+    return stem + suffixes[Math.floor(random() * suffixes.length)];
+}
+
+/**
+ * Measure recall@k and latency of lexical, vector and hybrid retrieval
+ * Queries are built from sentences of the corpus: 'exact' queries keep
+ * some of the sentence's words, 'reworded' queries also change their
+ * inflection. A query is a hit when a top-k passage contains the sentence.
+ * @param {(string|File)[]} [sources] - URLs or files of the corpus (defaults to the bundled docs)
+ * @param {number} [k=5] - Passages retrieved per query
+ * @param {number} [queryCount=200] - Queries per query type
+ * @returns {Promise<Object[]>} - Rows of {queries, retrieval, recallAtK, meanMs, p95Ms}
+ */
+async function benchmarkHybridRetrieval(sources = ['readme.md', 'docs/user-guide.md'], k = 5, queryCount = 200) {
+    const index = createRetrievalIndex();
+    const sentences = [];
+
+    for (const source of sources) {
+        const text = typeof source === 'string' ?
+            await (await fetch(source)).text() :
+            (await extractDocument(source)).text;
+        index.add(String(source.name || source), String(source.name || source), text);
+
+        for (const sentence of text.split(/(?<=[.!?])\s+|\n/)) {
+            if (tokenizeForIndex(sentence).length >= 6) sentences.push(sentence.trim());
+        }
+    }
+
+    let state = 42;
+    const random = () => {
+        state = (state * 1664525 + 1013904223) >>> 0;
+        return state / 4294967296;
+    };
+
+    const results = [];
+    for (const reworded of [false, true]) {
+        // Same queries for every retrieval mode
+        const queries = [];
+        for (let q = 0; q < queryCount && sentences.length > 0; q++) {
+            const sentence = sentences[Math.floor(random() * sentences.length)];
+            const terms = tokenizeForIndex(sentence).filter(() => random() < 0.6).slice(0, 6);
+            queries.push({
+                sentence,
+                query: (reworded ? terms.map(term => rewordTerm(term, random)) : terms).join(' ')
+            });
+        }
+
+        for (const retrieval of ['lexical', 'vector', 'hybrid']) {
+            const latencies = [];
+            let hits = 0;
+
+            for (const { sentence, query } of queries) {
+                const start = performance.now();
+                const passages = index.search(query, { topK: k, maxPerDocument: k, retrieval });
+                latencies.push(performance.now() - start);
+                if (passages.some(passage => passage.text.includes(sentence))) hits++;
+            }
+
+            latencies.sort((a, b) => a - b);
+            results.push({
+                queries: reworded ? 'reworded' : 'exact',
+                retrieval,
+                recallAtK: Number((hits / queries.length).toFixed(3)),
+                meanMs: Number((latencies.reduce((sum, ms) => sum + ms, 0) / latencies.length).toFixed(3)),
+                p95Ms: Number(latencies[Math.floor(latencies.length * 0.95)].toFixed(3))
+            });
+        }
+    }
+
+    console.log(`Corpus: ${index.getStats().chunks} passages, k = ${k}`);
+    console.table(results);
+    return results;
+}
+
+/**
+ * Measure recall and latency of the IVF vector index against exact search
+ * Passages are synthetic, each drawn from one of a few hundred topic
+ * vocabularies; each query is a fragment of one passage
+ * @param {number} [chunkCount=20000] - Passages in the index
+ * @param {number[]} [probeCounts=[1, 2, 4, 8, 16, 32]] - nprobe values to test
+ * @param {number} [k=10] - Neighbours per query
+ * @param {number} [queries=200] - Queries per setting
+ * @returns {Object[]} - Rows of {search, nprobe, recallAtK, meanMs, speedup}
+ */
+function benchmarkAnnRetrieval(chunkCount = 20000, probeCounts = [1, 2, 4, 8, 16, 32], k = 10, queries = 200) {
+    const { vectorDimensions } = getCollectionSettings();
+    const store = createVectorStore(vectorDimensions);
+    const topics = Math.max(10, Math.round(Math.sqrt(chunkCount) * 2));
+    let state = 7;
+    const random = () => {
+        state = (state * 1664525 + 1013904223) >>> 0;
+        return state / 4294967296;
+    };
+
+    const paragraphs = [];
+    for (let p = 0; p < chunkCount; p++) {
+        const topic = Math.floor(random() * topics);
+        const words = [];
+        for (let w = 0; w < 60; w++) {
+            // Mostly topic words, some words shared by all topics
+            words.push(random() < 0.7 ?
+                `t${topic}w${Math.floor(Math.pow(random(), 2) * 200)}` :
+                `term${Math.floor(Math.pow(random(), 3) * 5000)}`);
+        }
+        paragraphs.push(words.join(' '));
+    }
+
+    let start = performance.now();
+    for (const paragraph of paragraphs) store.add(paragraph);
+    const embedMs = performance.now() - start;
+
+    const queryVectors = [];
+    for (let q = 0; q < queries; q++) {
+        const words = paragraphs[(q * 7919) % paragraphs.length].split(' ');
+        queryVectors.push(embedText(words.slice(q % 20, q % 20 + 12).join(' '), vectorDimensions));
+    }
+
+    // Exact neighbours are the reference
+    start = performance.now();
+    const exact = queryVectors.map(query => new Set(store.search(query, k, null, { exact: true }).map(result => result.row)));
+    const exactMs = (performance.now() - start) / queries;
+    const results = [{ search: 'exact', nprobe: '-', recallAtK: 1, meanMs: Number(exactMs.toFixed(3)), speedup: 1 }];
+
+    const listCount = Math.round(Math.sqrt(chunkCount));
+    start = performance.now();
+    store.train(listCount);
+    const trainMs = performance.now() - start;
+
+    for (const nprobe of probeCounts) {
+        let found = 0;
+        start = performance.now();
+        const approximate = queryVectors.map(query => store.search(query, k, null, { nprobe }));
+        const meanMs = (performance.now() - start) / queries;
+
+        approximate.forEach((rows, q) => {
+            for (const result of rows) {
+                if (exact[q].has(result.row)) found++;
+            }
+        });
+
+        results.push({
+            search: 'ivf',
+            nprobe,
+            recallAtK: Number((found / (queries * k)).toFixed(3)),
+            meanMs: Number(meanMs.toFixed(3)),
+            speedup: Number((exactMs / meanMs).toFixed(1))
+        });
+    }
+
+    console.log(`${chunkCount} passages: embedded in ${embedMs.toFixed(0)} ms, ${listCount} lists trained in ${trainMs.toFixed(0)} ms`);
+    console.table(results);
+    return results;
+}
+
+/**
+ * Compare building a document's term index with restoring a stored one
+ * @param {number} [paragraphs=20000] - Paragraphs of synthetic text (~400 characters each)
+ * @returns {{chars: number, buildMs: number, serializeMs: number, bytes: number, restoreMs: number, firstSearchMs: number}}
+ */
+function benchmarkIndexRestore(paragraphs = 20000) {
+    const text = buildSyntheticDocument(paragraphs, 11);
+
+    let start = performance.now();
+    const index = buildTermIndex(text);
+    const buildMs = performance.now() - start;
+
+    start = performance.now();
+    const buffer = serializeTermIndex(index, 'text');
+    const serializeMs = performance.now() - start;
+
+    start = performance.now();
+    const restored = deserializeTermIndex(buffer).index;
+    const restoreMs = performance.now() - start;
+
+    start = performance.now();
+    searchTermIndex(restored, parseSearchQuery('find "term1 term2"'));
+    const firstSearchMs = performance.now() - start;
+
+    const result = {
+        chars: text.length,
+        buildMs: Number(buildMs.toFixed(1)),
+        serializeMs: Number(serializeMs.toFixed(1)),
+        bytes: buffer.byteLength,
+        restoreMs: Number(restoreMs.toFixed(1)),
+        firstSearchMs: Number(firstSearchMs.toFixed(1))
+    };
+    console.table([result]);
+    return result;
+}
+
+// Make functions globally available
+window.benchmarkPdfScanner = benchmarkPdfScanner;
+window.benchmarkWordBinary = benchmarkWordBinary;
+window.benchmarkOcr = benchmarkOcr;
+window.benchmarkCollectionRetrieval = benchmarkCollectionRetrieval;
+window.benchmarkSummary = benchmarkSummary;
+window.benchmarkHybridRetrieval = benchmarkHybridRetrieval;
+window.benchmarkAnnRetrieval = benchmarkAnnRetrieval;
+window.benchmarkIndexRestore = benchmarkIndexRestore;
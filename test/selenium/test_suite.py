@@ -39,7 +39,8 @@ PERFORMANCE_BENCHMARKS = {
     'page_load': 3.0,
     'file_upload': 5.0,
     'query_response': 3.0,
-    'character_counter': 1.0
+    'character_counter': 1.0,
+    'pdf_scanner_16mb': 4.0
 }
 
 class DocumentQATestSuite(unittest.TestCase):
@@ -115,6 +116,12 @@ class DocumentQATestSuite(unittest.TestCase):
             with open(txt_path, 'w') as f:
                 f.write("This is an invalid file type for testing.")
         
+        # Create a small CSV file for spreadsheet questions
+        csv_path = os.path.join(test_files_dir, 'sales.csv')
+        if not os.path.exists(csv_path):
+            with open(csv_path, 'w') as f:
+                f.write("Region,Revenue\nNorth,\"1,200\"\nSouth,800\nNorth,500\n")
+        
         print(f"Test files created at: {test_files_dir}")
         print(f"Sample PDF path: {os.path.abspath(pdf_path)}")
         print(f"Text as PDF path: {os.path.abspath(pdf_text_path)}")
@@ -682,9 +689,284 @@ class DocumentQATestSuite(unittest.TestCase):
             print(error_msg)
             self.record_test_result('positive', test_name, False, error_msg)
             return False
-    
+
+    def test_question_history(self):
+        """Test that answered questions are listed in the history panel."""
+        test_name = "Question history"
+        try:
+            if not self.test_file_upload():
+                self.record_test_result('positive', test_name, False, "Skipped because file upload failed")
+                return False
+
+            query_input = self.wait_for_element_visible(By.ID, "query-input", 5)
+            ask_button = self.driver.find_element(By.ID, "ask-button")
+
+            # Ask two questions so the list has more than one row
+            questions = ["What is this document about?", "Find sample in the document"]
+            for question in questions:
+                query_input.clear()
+                query_input.send_keys(question)
+                ask_button.click()
+                time.sleep(1)
+
+            self.wait_for_element_visible(By.ID, "qa-history", 5)
+            rows = self.driver.find_elements(By.CSS_SELECTOR, "#qa-history-viewport .qa-history-row")
+            visible_rows = [row for row in rows if row.is_displayed()]
+
+            self.assertGreaterEqual(len(visible_rows), len(questions), "History rows not rendered")
+
+            # Newest question is listed first
+            first_question = visible_rows[0].find_element(By.CLASS_NAME, "qa-history-question").text
+            self.assertEqual(first_question, questions[-1], "Newest question is not first")
+
+            self.record_test_result('positive', test_name, True, f"{len(visible_rows)} history rows rendered")
+            return True
+        except (AssertionError, NoSuchElementException, TimeoutException) as e:
+            self.record_test_result('positive', test_name, False, f"Error: {str(e)}")
+            return False
+
+    def test_multi_file_upload(self):
+        """Test that several files can be queued and each becomes ready."""
+        test_name = "Multi-file upload"
+        try:
+            if not self.test_page_loads_correctly():
+                self.record_test_result('positive', test_name, False, "Skipped because page didn't load correctly")
+                return False
+
+            file_paths = [os.path.abspath("test_files/sample.pdf"), os.path.abspath("test_files/text_as_pdf.pdf")]
+
+            # Multiple files are passed to a file input as newline-separated paths
+            file_input = self.driver.find_element(By.ID, "file-input")
+            file_input.send_keys("\n".join(file_paths))
+
+            self.wait_for_element_visible(By.ID, "ingest-section", 5)
+            WebDriverWait(self.driver, 15).until(
+                lambda driver: len(driver.find_elements(By.CSS_SELECTOR, '#ingest-list .ingest-row[data-status="done"]')) == len(file_paths)
+            )
+
+            # The first finished document is queryable right away
+            self.wait_for_element_visible(By.ID, "qa-section", 5)
+
+            # With two documents loaded, questions can span both
+            self.wait_for_element_visible(By.ID, "collection-mode", 5)
+
+            self.record_test_result('positive', test_name, True, f"{len(file_paths)} files processed through the queue")
+            return True
+        except (AssertionError, NoSuchElementException, TimeoutException) as e:
+            self.record_test_result('positive', test_name, False, f"Error: {str(e)}")
+            return False
+
+    def test_csv_aggregate_question(self):
+        """Test that totals over a CSV column are computed from the data."""
+        test_name = "CSV aggregate question"
+        try:
+            if not self.test_page_loads_correctly():
+                self.record_test_result('positive', test_name, False, "Skipped because page didn't load correctly")
+                return False
+
+            file_input = self.driver.find_element(By.ID, "file-input")
+            file_input.send_keys(os.path.abspath("test_files/sales.csv"))
+
+            query_input = self.wait_for_element_visible(By.ID, "query-input", 10)
+            query_input.clear()
+            query_input.send_keys("What is the total revenue?")
+            self.driver.find_element(By.ID, "ask-button").click()
+
+            # 1,200 + 800 + 500
+            WebDriverWait(self.driver, 10).until(
+                lambda driver: "2,500" in driver.find_element(By.ID, "response-content").text
+            )
+
+            self.record_test_result('positive', test_name, True, "Total computed from the CSV columns")
+            return True
+        except (AssertionError, NoSuchElementException, TimeoutException) as e:
+            self.record_test_result('positive', test_name, False, f"Error: {str(e)}")
+            return False
+
+    def test_batch_questions(self):
+        """Test that "Ask all" answers each line as a separate question."""
+        test_name = "Batch questions"
+        try:
+            if not self.test_page_loads_correctly():
+                self.record_test_result('positive', test_name, False, "Skipped because page didn't load correctly")
+                return False
+
+            file_input = self.driver.find_element(By.ID, "file-input")
+            file_input.send_keys(os.path.abspath("test_files/sales.csv"))
+
+            query_input = self.wait_for_element_visible(By.ID, "query-input", 10)
+            query_input.clear()
+            query_input.send_keys("What is the total revenue?\nWhat is the average revenue?")
+            self.driver.find_element(By.ID, "batch-ask-button").click()
+
+            WebDriverWait(self.driver, 10).until(
+                lambda driver: len(driver.find_elements(By.CSS_SELECTOR, ".batch-results tbody tr")) == 2
+            )
+            assert "2,500" in self.driver.find_element(By.ID, "response-content").text
+
+            self.record_test_result('positive', test_name, True, "Both questions answered in one table")
+            return True
+        except (AssertionError, NoSuchElementException, TimeoutException) as e:
+            self.record_test_result('positive', test_name, False, f"Error: {str(e)}")
+            return False
+
+    def test_term_index_line_boundary(self):
+        """Test search on a document whose line count fills the index's line table exactly."""
+        test_name = "Term index line boundary"
+        try:
+            if not self.test_page_loads_correctly():
+                self.record_test_result('positive', test_name, False, "Skipped because page didn't load correctly")
+                return False
+
+            # 1024 lines is the initial line table size; the hit is on the last line
+            self.driver.set_script_timeout(10)
+            results = self.driver.execute_async_script(
+                "const done = arguments[arguments.length - 1];"
+                "const lines = Array.from({length: 1024}, (_, i) => `line ${i} filler`);"
+                "lines[1023] = 'the final zebra line';"
+                "const index = buildTermIndex(lines.join('\\n'));"
+                "const query = parseSearchQuery('zebra');"
+                "const stored = deserializeTermIndex(serializeTermIndex(index, 'txt'));"
+                "done([searchTermIndex(index, query).lines, searchTermIndex(stored.index, query).lines]);"
+            )
+
+            self.assertEqual(results[0], ["the final zebra line"], "Last line not found")
+            self.assertEqual(results[1], ["the final zebra line"], "Last line not found after restoring the index")
+
+            self.record_test_result('positive', test_name, True, "Last of 1024 lines found before and after storage")
+            return True
+        except (AssertionError, NoSuchElementException, TimeoutException) as e:
+            self.record_test_result('positive', test_name, False, f"Error: {str(e)}")
+            return False
+
+    def test_header_footer_short_pages(self):
+        """Test that short pages keep their content while real running headers are removed."""
+        test_name = "Header/footer filter on short pages"
+        try:
+            if not self.test_page_loads_correctly():
+                self.record_test_result('positive', test_name, False, "Skipped because page didn't load correctly")
+                return False
+
+            self.driver.set_script_timeout(10)
+            results = self.driver.execute_async_script(
+                "const done = arguments[arguments.length - 1];"
+                "const slides = [1, 2, 3, 4].map(q => [`Q${q} Results`, `Revenue grew ${q * 3}% to $1.${q}M`, `Margin ${28 + q}%`]);"
+                "const slideFilter = createHeaderFooterFilter();"
+                "slides.forEach(page => slideFilter.addPage(page));"
+                "const pages = [1, 2, 3, 4, 5].map(n => ['ACME Annual Report', `Body ${n}`, 'alpha', 'beta', 'gamma', `delta ${n}`, `Page ${n} of 5`]);"
+                "const pageFilter = createHeaderFooterFilter();"
+                "pages.forEach(page => pageFilter.addPage(page));"
+                "done([slides.map(page => slideFilter.filterPage(page)), pageFilter.filterPage(pages[2])]);"
+            )
+
+            self.assertEqual(results[0][0], ["Q1 Results", "Revenue grew 3% to $1.1M", "Margin 29%"], "Slide content was stripped")
+            self.assertTrue(all(len(page) == 3 for page in results[0]), "Slide content was stripped")
+            self.assertEqual(results[1], ["Body 3", "alpha", "beta", "gamma", "delta 3"], "Running header/footer not removed")
+
+            self.record_test_result('positive', test_name, True, "Slides kept, running header and page numbers removed")
+            return True
+        except (AssertionError, NoSuchElementException, TimeoutException) as e:
+            self.record_test_result('positive', test_name, False, f"Error: {str(e)}")
+            return False
+
+    def test_table_questions(self):
+        """Test that table aggregates are computed locally only for whole-column questions."""
+        test_name = "Table questions"
+        try:
+            if not self.test_page_loads_correctly():
+                self.record_test_result('positive', test_name, False, "Skipped because page didn't load correctly")
+                return False
+
+            self.driver.set_script_timeout(10)
+            results = self.driver.execute_async_script(
+                "const done = arguments[arguments.length - 1];"
+                "const builder = createTableBuilder('Sales');"
+                "[['Region', 'Product', 'Units Sold', 'Revenue'], ['North', 'A', '10', '1000'], ['South', 'B', '5', '500'],"
+                " ['North', 'B', '7', '700'], ['East', 'A', '3', '300']].forEach(row => builder.addRow(row));"
+                "const tables = [builder.finish()];"
+                "done(['How many units were sold?', 'What is the total revenue?',"
+                " 'What is the total revenue in the North region?', 'What is the total revenue for product A?']"
+                ".map(question => answerTableQuestion(question, tables)));"
+            )
+
+            self.assertIn("**25**", results[0], "Units were counted instead of summed")
+            self.assertIn("**2,500**", results[1], "Total revenue not computed")
+            self.assertIsNone(results[2], "Region filter ignored")
+            self.assertIsNone(results[3], "Product filter ignored")
+
+            self.record_test_result('positive', test_name, True, "Totals computed, filtered questions left to the LLM")
+            return True
+        except (AssertionError, NoSuchElementException, TimeoutException) as e:
+            self.record_test_result('positive', test_name, False, f"Error: {str(e)}")
+            return False
+
+    def test_endpoint_hedging(self):
+        """Test hedging, caller aborts and failover against a stubbed fetch."""
+        test_name = "Endpoint hedging"
+        try:
+            if not self.test_page_loads_correctly():
+                self.record_test_result('positive', test_name, False, "Skipped because page didn't load correctly")
+                return False
+
+            # The slow endpoint is hedged after 100ms; a lost race is a timeout, not a latency sample
+            self.driver.set_script_timeout(10)
+            results = self.driver.execute_async_script(
+                "const done = arguments[arguments.length - 1];"
+                "const plans = {'https://slow.test/v1': {delayMs: 400, status: 200}, 'https://fast.test/v1': {delayMs: 10, status: 200}};"
+                "const aborted = [];"
+                "const realFetch = window.fetch;"
+                "const saved = {endpoints: LLM_CONFIG.openai.endpoints, hedging: LLM_CONFIG.openai.hedging};"
+                "LLM_CONFIG.openai.endpoints = [{name: 'slow', apiUrl: 'https://slow.test/v1'}, {name: 'fast', apiUrl: 'https://fast.test/v1'}];"
+                "LLM_CONFIG.openai.hedging = {defaultDelayMs: 100};"
+                "window.fetch = (url, init) => new Promise((resolve, reject) => {"
+                "    const plan = plans[url];"
+                "    init.signal.addEventListener('abort', () => { aborted.push(url); reject(new DOMException('Aborted', 'AbortError')); });"
+                '    const body = plan.status === 200 ? `data: ${JSON.stringify({choices: [{delta: {content: url}}]})}\\n\\ndata: [DONE]\\n\\n` : \'{"error": {"message": "down"}}\';'
+                "    setTimeout(() => resolve(new Response(body, {status: plan.status})), plan.delayMs);"
+                "});"
+                "const stats = () => Object.fromEntries(getEndpointLatencyStats().map(s => [s.name, [s.samples, s.errors, s.timeouts]]));"
+                "(async () => {"
+                "    const results = {};"
+                "    localStorage.removeItem('endpoint_latency');"
+                "    const hedged = await requestHedgedCompletion([{role: 'user', content: 'hi'}]);"
+                "    results.hedge = [hedged.endpoint, hedged.hedged, stats(), aborted.slice()];"
+                "    localStorage.removeItem('endpoint_latency');"
+                "    aborted.length = 0;"
+                "    const controller = new AbortController();"
+                "    setTimeout(() => controller.abort(), 50);"
+                "    results.abort = await requestHedgedCompletion([{role: 'user', content: 'hi'}], {signal: controller.signal})"
+                "        .then(() => 'resolved', error => error.name);"
+                "    results.abort = [results.abort, stats(), aborted.slice()];"
+                "    localStorage.removeItem('endpoint_latency');"
+                "    plans['https://slow.test/v1'] = {delayMs: 10, status: 500};"
+                "    const failover = await requestHedgedCompletion([{role: 'user', content: 'hi'}]);"
+                "    results.failover = [failover.endpoint, failover.content, stats()];"
+                "    return results;"
+                "})().then(done, error => done(String(error))).finally(() => {"
+                "    window.fetch = realFetch;"
+                "    Object.assign(LLM_CONFIG.openai, saved);"
+                "    localStorage.removeItem('endpoint_latency');"
+                "});"
+            )
+
+            self.assertEqual(results["hedge"][0], "fast", "Hedged request did not win")
+            self.assertTrue(results["hedge"][1], "Request was not hedged")
+            self.assertEqual(results["hedge"][2]["slow"], [0, 0, 1], "Lost race not recorded as a timeout")
+            self.assertEqual(results["hedge"][3], ["https://slow.test/v1"], "Losing request not aborted")
+            self.assertEqual(results["abort"][0], "AbortError", "Caller abort not reported")
+            self.assertEqual(results["abort"][1]["slow"], [0, 0, 0], "Caller abort recorded against the endpoint")
+            self.assertEqual(results["abort"][2], ["https://slow.test/v1"], "Request not aborted")
+            self.assertEqual(results["failover"][0], "fast", "No failover after an error")
+            self.assertEqual(results["failover"][2]["slow"], [0, 1, 0], "Error not recorded")
+
+            self.record_test_result('positive', test_name, True, "Hedge, abort and failover behave as expected")
+            return True
+        except (AssertionError, NoSuchElementException, TimeoutException) as e:
+            self.record_test_result('positive', test_name, False, f"Error: {str(e)}")
+            return False
+
     # NEGATIVE TEST CASES
-    
+
     def test_invalid_file_type(self):
         """Test that invalid file types are rejected."""
         test_name = "Invalid file type"
@@ -1124,6 +1406,43 @@ class DocumentQATestSuite(unittest.TestCase):
             self.record_test_result('performance', test_name, False, error_msg)
             return False
     
+    def test_pdf_scanner_throughput(self):
+        """Test that the fallback PDF scanner processes large files in linear time."""
+        test_name = "PDF scanner throughput"
+        try:
+            # The benchmarks are not part of the application page; load them first
+            self.driver.set_script_timeout(60)
+            results = self.driver.execute_async_script(
+                "const done = arguments[arguments.length - 1];"
+                "const run = () => benchmarkPdfScanner([4, 16]).then(done).catch(e => done({error: e.message}));"
+                "if (typeof benchmarkPdfScanner === 'function') { run(); } else {"
+                "    const script = document.createElement('script');"
+                "    script.src = 'test/benchmarks.js';"
+                "    script.onload = run;"
+                "    script.onerror = () => done({error: 'Could not load test/benchmarks.js'});"
+                "    document.head.appendChild(script);"
+                "}"
+            )
+
+            if isinstance(results, dict) and results.get('error'):
+                self.record_test_result('performance', test_name, False, results['error'])
+                return False
+
+            small, large = results[0], results[1]
+            print(f"PDF scanner: {small['mbPerSecond']} MB/s at 4MB, {large['mbPerSecond']} MB/s at 16MB")
+            self.record_performance_metric('pdf_scanner_16mb', large['seconds'])
+
+            # Linear scaling: throughput must not collapse as input grows
+            scales_linearly = large['mbPerSecond'] >= small['mbPerSecond'] * 0.5
+            self.record_test_result('performance', test_name, scales_linearly,
+                                    f"{small['mbPerSecond']} MB/s (4MB) vs {large['mbPerSecond']} MB/s (16MB)")
+            return scales_linearly
+        except Exception as e:
+            error_msg = f"Error benchmarking PDF scanner: {str(e)}"
+            print(error_msg)
+            self.record_test_result('performance', test_name, False, error_msg)
+            return False
+    
     @classmethod
     def tearDownClass(cls):
         """Clean up after all tests have run."""